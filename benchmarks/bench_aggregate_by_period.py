@@ -0,0 +1,93 @@
+"""
+File: bench_aggregate_by_period.py
+Description: Benchmarks aggregate_by_period_fast against aggregate_by_period.
+Dependencies: pandas
+Author: Sample Team
+
+Run with: python benchmarks/bench_aggregate_by_period.py --rows 10000000
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+
+# Add parent directory to path to import from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.helpers import aggregate_by_period, aggregate_by_period_fast
+from src.utils.synthetic import generate_dataset
+
+
+def timed(label: str, func, memory: bool = False):
+    """
+    Runs func once and prints its wall time (and optionally peak traced memory).
+    
+    Args:
+        label (str): Name printed with the timing.
+        func (Callable): The work to time.
+        memory (bool): Also trace peak memory (slows the run down).
+    
+    Returns:
+        float: Wall time in seconds.
+    """
+    if memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    seconds = time.perf_counter() - start
+    if memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{label:<55} {seconds:8.3f}s  peak {peak / 2**20:8.1f} MB")
+    else:
+        print(f"{label:<55} {seconds:8.3f}s")
+    return seconds
+
+
+def main() -> None:
+    """Runs the benchmark and prints timings."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    parser.add_argument('--memory', action='store_true', help="Trace peak memory too")
+    args = parser.parse_args()
+    
+    start = time.perf_counter()
+    lines = generate_dataset(args.rows)['fct_order_items']
+    print(f"Generated {len(lines):,} order lines: {time.perf_counter() - start:.1f}s")
+    
+    # aggregate_by_period parses dates itself, so give it the datetime column
+    dated = pd.DataFrame({'created': pd.to_datetime(lines['created'], unit='s'),
+                          'quantity': lines['quantity']})
+    
+    print("\nTotal quantity per day (one value column, no keys)")
+    current = timed("aggregate_by_period", lambda: aggregate_by_period(
+        dated, 'created', 'quantity', 'D'), args.memory)
+    fast = timed("aggregate_by_period_fast (int64 seconds)", lambda: aggregate_by_period_fast(
+        lines, 'created', 'quantity', 'D'), args.memory)
+    print(f"Speed-up: {current / fast:.1f}x")
+    
+    print("\nQuantity and price per place and week, sum and mean")
+    current = timed("groupby + pd.Grouper", lambda: lines.assign(
+        created=pd.to_datetime(lines['created'], unit='s')).groupby(
+        ['place_id', pd.Grouper(key='created', freq='W-MON', label='left', closed='left')]
+    )[['quantity', 'price']].agg(['sum', 'mean']), args.memory)
+    fast = timed("aggregate_by_period_fast", lambda: aggregate_by_period_fast(
+        lines, 'created', ['quantity', 'price'], 'W', group_by=['place_id'],
+        aggs=['sum', 'mean']), args.memory)
+    print(f"Speed-up: {current / fast:.1f}x")
+    
+    print("\nQuantity per place, item and month")
+    current = timed("groupby on parsed month", lambda: lines.groupby(
+        ['place_id', 'item_id', pd.to_datetime(lines['created'], unit='s').dt.to_period('M')]
+    )['quantity'].sum(), args.memory)
+    fast = timed("aggregate_by_period_fast", lambda: aggregate_by_period_fast(
+        lines, 'created', 'quantity', 'M', group_by=['place_id', 'item_id']), args.memory)
+    print(f"Speed-up: {current / fast:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
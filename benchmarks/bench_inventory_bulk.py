@@ -0,0 +1,72 @@
+"""
+File: bench_inventory_bulk.py
+Description: Benchmarks bulk InventoryService forecasting against the per-item loop.
+Dependencies: pandas, numpy
+Author: Sample Team
+
+Run with: python benchmarks/bench_inventory_bulk.py --items 40000 --rows 2000000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path to import from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.services.inventory_service import InventoryService
+
+
+def build_service(items: int, rows: int, seed: int = 0) -> InventoryService:
+    """
+    Builds an InventoryService over random daily sales.
+    
+    Args:
+        items (int): Number of distinct items.
+        rows (int): Number of sales rows.
+        seed (int): Random seed.
+    
+    Returns:
+        InventoryService: Service ready for forecasting.
+    """
+    rng = np.random.default_rng(seed)
+    sales = pd.DataFrame({
+        'item_id': rng.integers(0, items, rows),
+        'quantity': rng.integers(0, 50, rows),
+    })
+    return InventoryService(pd.DataFrame(), sales)
+
+
+def main() -> None:
+    """Runs the benchmark and prints timings."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--items', type=int, default=40_000)
+    parser.add_argument('--rows', type=int, default=2_000_000)
+    parser.add_argument('--loop-items', type=int, default=2_000,
+                        help="Items timed in the per-item loop (extrapolated to --items)")
+    args = parser.parse_args()
+    
+    start = time.perf_counter()
+    service = build_service(args.items, args.rows)
+    print(f"Service build: {time.perf_counter() - start:.3f}s")
+    
+    start = time.perf_counter()
+    bulk = service.generate_recommendations_bulk('all')
+    bulk_seconds = time.perf_counter() - start
+    print(f"Bulk recommendations for {len(bulk)} items: {bulk_seconds:.3f}s")
+    
+    sample = bulk['item_id'].iloc[:args.loop_items]
+    start = time.perf_counter()
+    for item_id in sample:
+        service.generate_recommendations(item_id)
+    loop_seconds = (time.perf_counter() - start) * len(bulk) / max(len(sample), 1)
+    print(f"Per-item loop (extrapolated to {len(bulk)} items): {loop_seconds:.3f}s")
+    print(f"Speed-up: {loop_seconds / bulk_seconds:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+"""
+File: budgets.py
+Description: Dataset scale and time/memory budgets shared by the benchmark suite.
+Dependencies: none
+Author: Sample Team
+
+BENCH_ROWS sets the number of fct_order_items rows (default 10,000) and
+BENCH_REPORT an optional JSON report path. Budgets grow linearly with
+BENCH_ROWS.
+"""
+
+import os
+
+
+BENCH_ROWS = int(os.environ.get('BENCH_ROWS', '10000'))
+BENCH_REPORT = os.environ.get('BENCH_REPORT')
+
+
+class Budget:
+    """
+    Time and peak-memory budget that scales with the dataset size.
+    
+    Attributes:
+        seconds (float): Allowed wall time at the current BENCH_ROWS.
+        megabytes (float): Allowed peak traced memory at the current BENCH_ROWS.
+    """
+    
+    def __init__(self, seconds_per_million: float, mb_per_million: float,
+                 min_seconds: float = 0.5, min_mb: float = 16):
+        """
+        Initialize a Budget.
+        
+        Args:
+            seconds_per_million (float): Wall time allowed per million order lines.
+            mb_per_million (float): Peak memory allowed per million order lines.
+            min_seconds (float): Floor for small datasets (absorbs fixed overhead).
+            min_mb (float): Floor for small datasets.
+        """
+        scale = BENCH_ROWS / 1_000_000
+        self.seconds = max(min_seconds, seconds_per_million * scale)
+        self.megabytes = max(min_mb, mb_per_million * scale)
@@ -0,0 +1,94 @@
+"""
+File: conftest.py
+Description: Shared fixtures for the hot-path benchmark suite.
+Dependencies: pytest, pandas
+Author: Sample Team
+
+The suite runs fully offline on synthetic data (src/utils/synthetic.py).
+Scale it with the BENCH_ROWS environment variable (fct_order_items rows,
+default 10,000). Every benchmark has a time and a peak-memory budget that
+grows linearly with BENCH_ROWS and fails the test when exceeded. Set
+BENCH_REPORT to a file path to also write all measurements as JSON.
+
+Run with: pytest benchmarks/ -q
+          BENCH_ROWS=10000000 pytest benchmarks/ -q
+"""
+
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import pytest
+
+# Add parent directory to path to import from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.budgets import BENCH_REPORT, BENCH_ROWS, Budget
+from src.utils.synthetic import write_dataset
+
+
+_results = []
+
+
+@pytest.fixture(scope='session')
+def dataset_dir(tmp_path_factory):
+    """Writes the synthetic CSV release once per session."""
+    directory = tmp_path_factory.mktemp('synthetic')
+    write_dataset(str(directory), order_items=BENCH_ROWS)
+    return str(directory)
+
+
+@pytest.fixture
+def measure(request):
+    """
+    Returns measure(func, budget, repeat=1) which runs func, checks the budget
+    and returns func's result.
+    
+    Wall time is the best of `repeat` untraced runs; peak memory comes from one
+    extra run under tracemalloc.
+    """
+    def run(func, budget: Budget, repeat: int = 1):
+        seconds = float('inf')
+        result = None
+        for _ in range(repeat):
+            gc.collect()
+            start = time.perf_counter()
+            result = func()
+            seconds = min(seconds, time.perf_counter() - start)
+        
+        del result
+        gc.collect()
+        tracemalloc.start()
+        try:
+            result = func()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        megabytes = peak / 2**20
+        
+        _results.append({'benchmark': request.node.name, 'rows': BENCH_ROWS,
+                         'seconds': round(seconds, 4), 'peak_mb': round(megabytes, 2),
+                         'budget_seconds': budget.seconds, 'budget_mb': budget.megabytes})
+        assert seconds <= budget.seconds, \
+            f"{request.node.name}: {seconds:.3f}s exceeds budget of {budget.seconds:.3f}s"
+        assert megabytes <= budget.megabytes, \
+            f"{request.node.name}: {megabytes:.1f} MB exceeds budget of {budget.megabytes:.1f} MB"
+        return result
+    
+    return run
+
+
+def pytest_terminal_summary(terminalreporter):
+    """Prints the measurements and optionally writes them to BENCH_REPORT."""
+    if not _results:
+        return
+    terminalreporter.section(f"benchmarks ({BENCH_ROWS:,} order lines)")
+    for row in _results:
+        terminalreporter.write_line(
+            f"{row['benchmark']:<45} {row['seconds']:>9.4f}s {row['peak_mb']:>9.1f} MB")
+    if BENCH_REPORT:
+        with open(BENCH_REPORT, 'w') as handle:
+            json.dump(_results, handle, indent=2)
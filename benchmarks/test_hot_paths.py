@@ -0,0 +1,343 @@
+"""
+File: test_hot_paths.py
+Description: Time and memory budgets for the data loading and forecasting hot paths.
+Dependencies: pytest, pandas, numpy, flask
+Author: Sample Team
+
+Run with: pytest benchmarks/ -q
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add parent directory to path to import from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.budgets import BENCH_ROWS, Budget
+from src.services.backtesting import Backtester
+from src.services.basket_index import CoPurchaseIndex
+from src.services.forecasting import GlobalModelBackend
+from src.models.data_loader import DataLoader
+from src.services.inventory_service import InventoryService
+from src.services.menu_engineering import MenuEngineeringEngine
+from src.services.rollup_cube import RollupCube
+from src.services.shift_optimizer import ShiftOptimizer
+from src.utils.helpers import aggregate_by_period, aggregate_by_period_fast, aggregate_chunks
+from src.utils.instrumentation import METRICS, traced
+from src.utils.timestamps import calendar_features
+
+
+@pytest.fixture(scope='module')
+def order_items(dataset_dir):
+    """fct_order_items loaded once for the in-memory benchmarks."""
+    return DataLoader(dataset_dir, use_cache=False).load_csv('fct_order_items.csv')
+
+
+@pytest.fixture(scope='module')
+def orders(dataset_dir):
+    """fct_orders for the channel dimension."""
+    return DataLoader(dataset_dir, use_cache=False).load_csv('fct_orders.csv')
+
+
+@pytest.fixture(scope='module')
+def daily_sales(order_items):
+    """Per-item daily quantities, the shape InventoryService forecasts on."""
+    return aggregate_chunks([order_items], 'created', 'quantity', group_by=['item_id']) \
+        .rename(columns={'created': 'date'})
+
+
+class TestLoaderBenchmarks:
+    """Budgets for DataLoader."""
+    
+    def test_load_csv_cold(self, dataset_dir, measure):
+        """Parsing fct_order_items from CSV with the schema applied."""
+        loader = DataLoader(dataset_dir, use_cache=False)
+        
+        df = measure(lambda: loader.load_csv('fct_order_items.csv'), Budget(10.0, 300))
+        
+        assert len(df) == BENCH_ROWS
+    
+    def test_load_csv_cached(self, dataset_dir, tmp_path, measure):
+        """Loading fct_order_items from a warm Arrow cache."""
+        pytest.importorskip('pyarrow')
+        loader = DataLoader(dataset_dir, cache_dir=str(tmp_path))
+        loader.load_csv('fct_order_items.csv')
+        
+        df = measure(lambda: loader.load_csv('fct_order_items.csv'), Budget(0.5, 100), repeat=3)
+        
+        assert len(df) == BENCH_ROWS
+    
+    def test_streamed_daily_aggregation(self, dataset_dir, measure):
+        """Streaming fct_order_items into per-item daily quantities."""
+        loader = DataLoader(dataset_dir, use_cache=False)
+        
+        def run():
+            chunks = loader.iter_csv('fct_order_items.csv', chunk_rows=200_000,
+                                     usecols=['item_id', 'created', 'quantity'])
+            return aggregate_chunks(chunks, 'created', 'quantity', group_by=['item_id'])
+        
+        daily = measure(run, Budget(6.0, 100))
+        
+        assert daily['quantity'].sum() > 0
+    
+    def test_merge_datasets(self, dataset_dir, order_items, measure):
+        """Joining order lines to dim_items."""
+        loader = DataLoader(dataset_dir, use_cache=False)
+        items = loader.load_csv('dim_items.csv')[['id', 'title']].rename(
+            columns={'id': 'item_id', 'title': 'item_title'})
+        
+        merged = measure(lambda: loader.merge_datasets(order_items, items, on='item_id'),
+                         Budget(0.5, 350))
+        
+        assert len(merged) == BENCH_ROWS
+    
+    def test_star_schema_enrich(self, dataset_dir, order_items, measure):
+        """Repeated item-title enrichment against an already indexed dim_items."""
+        schema = DataLoader(dataset_dir, use_cache=False).star_schema()
+        schema.dimension('dim_items')
+        
+        enriched = measure(lambda: schema.enrich(order_items, {'dim_items': ['title']}),
+                           Budget(0.2, 100), repeat=3)
+        
+        assert len(enriched) == BENCH_ROWS
+    
+    def test_sql_place_month_query(self, dataset_dir, tmp_path, measure):
+        """One place's order lines for one month, pushed down to the SQLite store."""
+        pytest.importorskip('sqlalchemy')
+        loader = DataLoader(dataset_dir, backend='sql', db_path=str(tmp_path / 'db.sqlite'))
+        loader.store.import_csv(os.path.join(dataset_dir, 'fct_order_items.csv'))
+        
+        rows = measure(lambda: loader.query('fct_order_items.csv', columns=['item_id', 'quantity'],
+                                            place_id=1, start_date='2023-03-01',
+                                            end_date='2023-03-31'),
+                       Budget(0.05, 10), repeat=3)
+        
+        assert 0 < len(rows) < BENCH_ROWS
+
+
+class TestForecastBenchmarks:
+    """Budgets for InventoryService."""
+    
+    def test_build_service(self, daily_sales, measure):
+        """Building the forecasting state from daily sales."""
+        service = measure(lambda: InventoryService(pd.DataFrame(), daily_sales),
+                          Budget(0.2, 60))
+        
+        assert len(service.demand_state) > 0
+    
+    def test_predict_demand_loop(self, daily_sales, measure):
+        """Per-item predict_demand over 1,000 items."""
+        service = InventoryService(pd.DataFrame(), daily_sales)
+        item_ids = service.demand_state.item_ids[:1000]
+        
+        result = measure(lambda: [service.predict_demand(i) for i in item_ids],
+                         Budget(0.0, 0, min_seconds=0.5, min_mb=16), repeat=3)
+        
+        assert len(result) == len(item_ids)
+    
+    def test_global_model_fit(self, daily_sales, tmp_path, measure):
+        """Training the gradient-boosting backend, then refitting from the model cache."""
+        def fit(cache_dir=None):
+            return GlobalModelBackend(cache_dir=cache_dir, max_workers=1).fit(daily_sales)
+        
+        trained = measure(fit, Budget(20.0, 1500, min_seconds=5.0, min_mb=200))
+        fit(str(tmp_path))
+        cached = fit(str(tmp_path))
+        
+        assert trained.trained and not cached.trained
+        np.testing.assert_array_equal(cached.forecasts['daily'], trained.forecasts['daily'])
+    
+    def test_recommendations_bulk(self, daily_sales, measure):
+        """Bulk recommendations for every item."""
+        service = InventoryService(pd.DataFrame(), daily_sales)
+        
+        result = measure(lambda: service.generate_recommendations_bulk('all'),
+                         Budget(0.05, 10), repeat=3)
+        
+        assert len(result) == len(service.demand_state)
+
+
+class TestBacktestBenchmarks:
+    """Budgets for Backtester."""
+    
+    def test_moving_average_backtest(self, order_items, measure):
+        """Eight weekly origins of predict_demand's three moving averages."""
+        def run():
+            backtester = Backtester.from_order_items(order_items, max_workers=1)
+            return backtester.run(origins=backtester.rolling_origins(n_origins=8))
+        
+        results = measure(run, Budget(3.0, 400))
+        
+        assert set(results['model']) == {'ma_7', 'ma_4', 'ma_3'}
+
+
+class TestMenuBenchmarks:
+    """Budgets for MenuEngineeringEngine."""
+    
+    def test_menu_rollups(self, order_items, measure):
+        """Building the per-place daily menu rollups from order lines."""
+        engine = measure(lambda: MenuEngineeringEngine(order_items), Budget(1.0, 250))
+        
+        assert len(engine.places) > 0
+    
+    def test_menu_analyze_all_places(self, order_items, measure):
+        """Classifying every place's menu over one quarter."""
+        engine = MenuEngineeringEngine(order_items)
+        
+        result = measure(lambda: engine.analyze('2023-04-01', '2023-06-30'),
+                         Budget(0.5, 100), repeat=3)
+        
+        assert set(result['category']) <= {'star', 'plowhorse', 'puzzle', 'dog'}
+
+
+class TestShiftBenchmarks:
+    """Budgets for ShiftOptimizer."""
+    
+    def test_plan_single_place(self, orders, measure):
+        """Request-time shift plan (exact solver) for one place on a mid-period day."""
+        optimizer = ShiftOptimizer(orders)
+        place = optimizer.places[0]
+        
+        plan = measure(lambda: optimizer.plan(place, '2023-06-15', solver='milp'),
+                       Budget(0.0, 20), repeat=3)
+        
+        assert plan['estimated_coverage'] == 1.0
+
+
+class TestCubeBenchmarks:
+    """Budgets for RollupCube."""
+    
+    def test_cube_build(self, order_items, orders, measure):
+        """Materialising the place x item x day x channel cube."""
+        cube = measure(lambda: RollupCube.from_order_items(order_items, orders),
+                       Budget(2.0, 400))
+        
+        assert cube.nbytes < order_items.memory_usage(deep=True).sum()
+    
+    def test_cube_monthly_channel_mix(self, order_items, orders, measure):
+        """Monthly revenue per place and channel from the cube."""
+        cube = RollupCube.from_order_items(order_items, orders)
+        
+        result = measure(lambda: cube.query(['place_id', 'channel'], 'M'),
+                         Budget(0.5, 100), repeat=3)
+        
+        assert np.isclose(result['quantity'].sum(), order_items['quantity'].sum())
+
+
+class TestBasketBenchmarks:
+    """Budgets for CoPurchaseIndex."""
+    
+    def test_build_index(self, order_items, measure):
+        """Building per-place co-purchase counts from every order line."""
+        index = measure(lambda: CoPurchaseIndex.from_order_items(order_items),
+                        Budget(2.0, 300))
+        
+        assert index.orders_indexed == order_items['order_id'].nunique()
+    
+    def test_bought_together(self, order_items, measure):
+        """Request-time "bought together" lookup for one item."""
+        index = CoPurchaseIndex.from_order_items(order_items)
+        place, item = order_items[['place_id', 'item_id']].iloc[0]
+        
+        result = measure(lambda: index.bought_together(place, item, k=10),
+                         Budget(0.0, 20), repeat=3)
+        
+        assert len(result) <= 10
+
+
+class TestHelperBenchmarks:
+    """Budgets for the aggregation helpers."""
+    
+    def test_aggregate_by_period(self, order_items, measure):
+        """Daily revenue with aggregate_by_period."""
+        frame = pd.DataFrame({'created': pd.to_datetime(order_items['created'], unit='s'),
+                              'price': order_items['price']})
+        
+        result = measure(lambda: aggregate_by_period(frame, 'created', 'price', 'D'),
+                         Budget(1.0, 200), repeat=3)
+        
+        assert np.isclose(result['price'].sum(), frame['price'].sum())
+    
+    def test_aggregate_by_period_fast(self, order_items, measure):
+        """Weekly quantity and revenue per place straight from UNIX seconds."""
+        result = measure(lambda: aggregate_by_period_fast(
+            order_items, 'created', ['quantity', 'price'], 'W', group_by=['place_id']),
+            Budget(0.2, 100), repeat=3)
+        
+        assert result['quantity'].sum() == order_items['quantity'].sum()
+    
+    def test_calendar_features(self, order_items, measure):
+        """Copenhagen hour/weekday/week/holiday features for every order line."""
+        result = measure(lambda: calendar_features(order_items['created']),
+                         Budget(0.5, 200), repeat=3)
+        
+        assert len(result) == len(order_items)
+
+
+class TestInstrumentationBenchmarks:
+    """Overhead of the span decorator, relative to an untraced call."""
+    
+    def test_traced_call_overhead(self):
+        """100,000 calls of a traced no-op, disabled and enabled, against an untraced one."""
+        def plain():
+            return None
+        
+        @traced('bench.noop')
+        def noop():
+            return None
+        
+        def loop(func):
+            started = time.perf_counter()
+            for _ in range(100_000):
+                func()
+            return time.perf_counter() - started
+        
+        # Interleaved rounds (best of 5), so a loaded machine slows every variant
+        # alike; disabled is the state METRICS_ENABLED=0 sets at import
+        enabled = METRICS.enabled
+        best = {'plain': float('inf'), 'disabled': float('inf'), 'enabled': float('inf')}
+        try:
+            for _ in range(5):
+                best['plain'] = min(best['plain'], loop(plain))
+                METRICS.enabled = False
+                best['disabled'] = min(best['disabled'], loop(noop))
+                METRICS.enabled = True
+                best['enabled'] = min(best['enabled'], loop(noop))
+        finally:
+            METRICS.enabled = enabled
+        
+        # Disabled costs one wrapper call and an attribute check (~5x a bare no-op)
+        assert best['disabled'] <= 10 * best['plain'], best
+        assert best['enabled'] <= 100 * best['plain'], best
+
+
+class TestApiBenchmarks:
+    """Budgets for the Flask routes."""
+    
+    def test_predict_route(self, order_items, measure):
+        """200 sequential POST /api/inventory/predict requests against a warm context."""
+        pytest.importorskip('flask')
+        from src.api.app_context import AppContext, ContextHolder
+        from src.api.routes import app
+        holder = ContextHolder(builder=lambda: AppContext.from_tables(
+            {'fct_order_items': order_items}), freeze=False)
+        holder.load()
+        item_ids = holder.get().inventory_service.demand_state.item_ids[:200].tolist()
+        original, app.extensions['app_context'] = app.extensions['app_context'], holder
+        client = app.test_client()
+        
+        def run():
+            return [client.post('/api/inventory/predict', json={'item_id': str(i)}).status_code
+                    for i in item_ids]
+        
+        try:
+            statuses = measure(run, Budget(0.0, 0, min_seconds=2.0, min_mb=32))
+        finally:
+            app.extensions['app_context'] = original
+        
+        assert set(statuses) == {200}
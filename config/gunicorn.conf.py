@@ -0,0 +1,46 @@
+"""
+File: gunicorn.conf.py
+Description: Gunicorn settings that share one warm application context across workers.
+Dependencies: gunicorn
+Author: Sample Team
+
+Run with: gunicorn -c config/gunicorn.conf.py src.api.routes:app
+
+The app is preloaded in the master, which builds the context before forking,
+so every worker starts warm and maps the same tables copy-on-write. To roll
+out a new data snapshot without losing the sharing, re-exec the master
+(kill -USR2 <master pid>, then kill -QUIT the old master once the new one is
+ready). Setting CONTEXT_WATCH_SECONDS instead lets each worker poll and
+hot-swap on its own, at the cost of one private copy of the data per worker.
+"""
+
+import os
+
+
+bind = os.environ.get('BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('WEB_CONCURRENCY', '4'))
+preload_app = True
+
+
+def _holder():
+    """Returns the ContextHolder of the preloaded app."""
+    from src.api.routes import app
+    return app.extensions['app_context']
+
+
+def when_ready(server):
+    """Builds the context in the master before the first worker forks."""
+    holder = _holder()
+    if not holder.ready:
+        holder.load()
+    server.log.info("Application context: %s", holder.status())
+
+
+def post_fork(server, worker):
+    """Finishes a failed master load in the worker and starts the optional watcher."""
+    holder = _holder()
+    if not holder.ready:
+        holder.load(background=True)
+    interval = os.environ.get('CONTEXT_WATCH_SECONDS')
+    if interval:
+        holder.watch(float(interval))
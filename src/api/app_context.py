@@ -0,0 +1,446 @@
+"""
+File: app_context.py
+Description: Long-lived application context holding loaded tables and forecasting state.
+Dependencies: pandas
+Author: Sample Team
+
+The API must never load CSVs or rebuild indexes inside a request. An AppContext
+is an immutable snapshot (tables, InventoryService with its demand state and
+expiry index, fitted models) built once per data snapshot. A ContextHolder owns
+the current snapshot and replaces it atomically: requests grab the reference
+once and keep using it, so a reload never mixes two snapshots in one response.
+
+Under gunicorn with preload_app (see config/gunicorn.conf.py) the context is
+built in the master before workers fork. The holder then calls gc.freeze() so
+the garbage collector never writes to the shared pages, and every worker
+serves the same physical memory copy-on-write.
+"""
+
+import gc
+import hashlib
+import logging
+import os
+import threading
+import time
+import pandas as pd
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from src.models.data_loader import DataLoader
+from src.services.inventory_service import InventoryService
+from src.services.menu_engineering import MenuEngineeringEngine
+from src.services.rollup_cube import RollupCube
+from src.services.shift_optimizer import ShiftOptimizer
+from src.utils.instrumentation import log_event
+
+
+DEFAULT_DATA_PATH = os.path.join('data', 'Inventory Management')
+DEFAULT_TABLES = ('dim_places', 'dim_items', 'fct_orders', 'fct_order_items',
+                  'fct_inventory_reports')
+
+logger = logging.getLogger(__name__)
+
+
+class ContextNotReadyError(RuntimeError):
+    """Raised when a request needs the context before it has been built."""
+
+
+def snapshot_version(data_path: str, tables: Iterable[str] = DEFAULT_TABLES) -> str:
+    """
+    Fingerprints a data snapshot from the size and mtime of its CSV files.
+    
+    Args:
+        data_path (str): Path to the data directory.
+        tables (Iterable[str]): Table names to include.
+    
+    Returns:
+        str: 16-character version string ('' when no table file exists).
+    """
+    parts = []
+    for name in tables:
+        path = os.path.join(data_path, f"{name}.csv")
+        if os.path.exists(path):
+            stat = os.stat(path)
+            parts.append(f"{name}:{stat.st_size}:{stat.st_mtime_ns}")
+    if not parts:
+        return ''
+    return hashlib.sha1('|'.join(parts).encode()).hexdigest()[:16]
+
+
+class AppContext:
+    """
+    Immutable snapshot of everything the API serves from.
+    
+    Attributes:
+        tables (Mapping[str, pd.DataFrame]): Loaded tables by name (read-only mapping).
+        inventory_service (InventoryService): Forecasting state over daily item sales.
+        menu_engine (MenuEngineeringEngine or None): Daily menu rollups per place
+            (None without priced order lines).
+        cube (RollupCube or None): Daily place x item x channel aggregates
+            (None without priced order lines).
+        shift_optimizer (ShiftOptimizer or None): Order timestamps per place
+            for shift planning (None without orders).
+        models (Mapping[str, Any]): Fitted models by name.
+        version (str): Data snapshot version.
+        built_at (float): UNIX time the snapshot finished building.
+        build_seconds (float): Time taken to build the snapshot.
+    
+    Methods:
+        build(data_path): Loads a snapshot from CSV files.
+        from_tables(tables): Builds a snapshot from frames already in memory.
+        resolve_item_id(item_id): Maps a request item id to a known item.
+        resolve_place_id(place_id, within): Maps a request place id to a known place.
+        describe(): Summary used by the health endpoint.
+    """
+    
+    def __init__(self, tables: Dict[str, pd.DataFrame], inventory_service: InventoryService,
+                 version: str, models: Optional[Dict[str, Any]] = None,
+                 build_seconds: float = 0.0,
+                 menu_engine: Optional[MenuEngineeringEngine] = None,
+                 cube: Optional[RollupCube] = None,
+                 shift_optimizer: Optional[ShiftOptimizer] = None):
+        """
+        Initialize the AppContext.
+        
+        Args:
+            tables (Dict[str, pd.DataFrame]): Loaded tables by name.
+            inventory_service (InventoryService): Forecasting service.
+            version (str): Data snapshot version.
+            models (Dict[str, Any], optional): Fitted models by name.
+            build_seconds (float): Time taken to build the snapshot.
+            menu_engine (MenuEngineeringEngine, optional): Menu-engineering rollups.
+            cube (RollupCube, optional): Materialised daily aggregates.
+            shift_optimizer (ShiftOptimizer, optional): Shift planning index.
+        """
+        self.tables = MappingProxyType(dict(tables))
+        self.inventory_service = inventory_service
+        self.menu_engine = menu_engine
+        self.cube = cube
+        self.shift_optimizer = shift_optimizer
+        self.models = MappingProxyType(dict(models or {}))
+        self.version = version
+        self.built_at = time.time()
+        self.build_seconds = build_seconds
+    
+    @classmethod
+    def build(cls, data_path: str, tables: Iterable[str] = DEFAULT_TABLES,
+              loader: Optional[DataLoader] = None) -> 'AppContext':
+        """
+        Loads a snapshot from the CSV files in data_path.
+        
+        Missing tables are skipped, so a partial download still serves what it can.
+        
+        Args:
+            data_path (str): Path to the data directory.
+            tables (Iterable[str]): Table names to load.
+            loader (DataLoader, optional): Loader to use (defaults to a cached loader).
+        
+        Returns:
+            AppContext: The warm snapshot.
+        """
+        tables = tuple(tables)
+        version = snapshot_version(data_path, tables)
+        loader = loader or DataLoader(data_path)
+        loaded = {}
+        for name in tables:
+            if os.path.exists(os.path.join(data_path, f"{name}.csv")):
+                loaded[name] = loader.load_csv(f"{name}.csv")
+        return cls.from_tables(loaded, version)
+    
+    @classmethod
+    def from_tables(cls, tables: Dict[str, pd.DataFrame], version: str = 'memory',
+                    models: Optional[Dict[str, Any]] = None) -> 'AppContext':
+        """
+        Builds the forecasting state for tables already in memory.
+        
+        Order lines (fct_order_items) are reduced to daily per-item quantities
+        and, once, to a RollupCube (with channels from fct_orders when loaded)
+        that also backs the menu-engineering rollups. Inventory reports feed the
+        expiry index, and order timestamps (fct_orders, or the distinct orders
+        of fct_order_items) the shift optimizer.
+        
+        Args:
+            tables (Dict[str, pd.DataFrame]): Tables by name.
+            version (str): Data snapshot version.
+            models (Dict[str, Any], optional): Fitted models by name.
+        
+        Returns:
+            AppContext: The warm snapshot.
+        """
+        start = time.perf_counter()
+        inventory = tables.get('fct_inventory_reports', pd.DataFrame())
+        order_items = tables.get('fct_order_items')
+        if order_items is not None and {'item_id', 'quantity', 'created'} <= set(order_items.columns):
+            service = InventoryService.from_sales_chunks(inventory, [order_items])
+        else:
+            service = InventoryService(inventory, pd.DataFrame({'item_id': [], 'date': [],
+                                                                'quantity': []}))
+        menu_engine, cube = None, None
+        columns = set(order_items.columns) if order_items is not None else set()
+        if {'place_id', 'item_id', 'order_id', 'quantity', 'price', 'created'} <= columns:
+            orders = tables.get('fct_orders')
+            dimensions = ('channel',) if 'channel' in columns or (
+                orders is not None and 'channel' in orders.columns) else ()
+            cube = RollupCube.from_order_items(order_items, orders, dimensions)
+            menu_engine = MenuEngineeringEngine.from_rollups(
+                cube.query(['place_id', 'item_id'], 'D', measures=('quantity', 'revenue', 'cost')))
+        elif {'place_id', 'item_id', 'quantity', 'price', 'created'} <= columns:
+            menu_engine = MenuEngineeringEngine(order_items)
+        
+        shift_optimizer = None
+        orders = tables.get('fct_orders')
+        if orders is not None and {'place_id', 'created'} <= set(orders.columns):
+            shift_optimizer = ShiftOptimizer(orders)
+        elif {'place_id', 'order_id', 'created'} <= columns:
+            shift_optimizer = ShiftOptimizer(order_items.drop_duplicates('order_id'))
+        return cls(tables, service, version, models, time.perf_counter() - start,
+                   menu_engine, cube, shift_optimizer)
+    
+    @property
+    def data_token(self) -> str:
+        """str: Changes whenever the data served changes (new snapshot or ingested sales)."""
+        return f"{self.version}:{self.inventory_service.demand_state.rows_ingested}"
+    
+    def resolve_place_id(self, place_id, within: Optional[Any] = None):
+        """
+        Matches a request place_id to a known place, accepting numeric strings.
+        
+        Args:
+            place_id: Place id from a request body.
+            within (optional): Container of known places (supports `in`);
+                defaults to the menu rollups.
+        
+        Returns:
+            The place id as stored in the container, or None if unknown.
+        """
+        engine = self.menu_engine if within is None else within
+        if engine is None:
+            return None
+        try:
+            if place_id in engine:
+                return place_id
+            numeric = int(place_id)
+        except (TypeError, ValueError):
+            return None
+        return numeric if numeric in engine else None
+    
+    def resolve_item_id(self, item_id):
+        """
+        Matches a request item_id to a known item, accepting numeric strings.
+        
+        Args:
+            item_id: Item id from a request body.
+        
+        Returns:
+            The item id as stored in the forecasting state, or None if unknown.
+        """
+        state = self.inventory_service.demand_state
+        try:
+            if item_id in state:
+                return item_id
+            numeric = int(item_id)
+        except (TypeError, ValueError):
+            return None
+        return numeric if numeric in state else None
+    
+    def describe(self) -> Dict[str, Any]:
+        """
+        Summarises the snapshot.
+        
+        Returns:
+            Dict[str, Any]: Version, build time, row counts and item count.
+        """
+        return {
+            'version': self.version,
+            'built_at': self.built_at,
+            'build_seconds': round(self.build_seconds, 3),
+            'tables': {name: len(df) for name, df in self.tables.items()},
+            'items': len(self.inventory_service.demand_state),
+        }
+
+
+class ContextHolder:
+    """
+    Owns the current AppContext and swaps in new snapshots atomically.
+    
+    Readers call get() once per request. Loads are serialised, run off the
+    request path (optionally in a background thread) and only replace the
+    current context once the new one is fully built; a failed load keeps
+    serving the previous snapshot.
+    
+    Attributes:
+        data_path (str): Data directory watched for new snapshots.
+        tables (tuple): Table names to load.
+        state (str): 'cold', 'loading', 'ready' or 'failed'.
+        error (str or None): Message of the last failed load.
+        freeze (bool): Whether to gc.freeze() after each load (copy-on-write friendly).
+    
+    Methods:
+        get(): Returns the current context.
+        load(): Builds a snapshot and swaps it in.
+        swap(context): Replaces the current context.
+        add_listener(callback): Runs a callback after every swap.
+        reload_if_stale(): Reloads when the data files changed.
+        watch(interval): Polls for new snapshots in a daemon thread.
+        status(): Readiness summary for the health endpoint.
+    """
+    
+    def __init__(self, data_path: str = DEFAULT_DATA_PATH,
+                 tables: Iterable[str] = DEFAULT_TABLES,
+                 builder: Optional[Callable[[], AppContext]] = None,
+                 freeze: bool = True):
+        """
+        Initialize the ContextHolder.
+        
+        Args:
+            data_path (str): Path to the data directory.
+            tables (Iterable[str]): Table names to load.
+            builder (Callable, optional): Builds a context; defaults to
+                AppContext.build(data_path, tables).
+            freeze (bool): Call gc.freeze() after each load.
+        """
+        self.data_path = data_path
+        self.tables = tuple(tables)
+        self.freeze = freeze
+        self.state = 'cold'
+        self.error = None
+        self._builder = builder or (lambda: AppContext.build(self.data_path, self.tables))
+        self._context: Optional[AppContext] = None
+        self._load_lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+        self._listeners: List[Callable[[AppContext], None]] = []
+    
+    @property
+    def ready(self) -> bool:
+        """bool: Whether a context is available."""
+        return self._context is not None
+    
+    def get(self) -> AppContext:
+        """
+        Returns the current context.
+        
+        Returns:
+            AppContext: The current snapshot.
+        
+        Raises:
+            ContextNotReadyError: If no snapshot has been built yet.
+        """
+        context = self._context
+        if context is None:
+            raise ContextNotReadyError(f"Application context is {self.state}")
+        return context
+    
+    def load(self, background: bool = False) -> Optional[AppContext]:
+        """
+        Builds a new snapshot and swaps it in.
+        
+        Args:
+            background (bool): Build in a daemon thread and return immediately.
+        
+        Returns:
+            AppContext or None: The new context (None when loading in the
+                background or when the build failed).
+        """
+        if background:
+            thread = threading.Thread(target=self.load, name='app-context-load', daemon=True)
+            thread.start()
+            return None
+        
+        with self._load_lock:
+            if self._context is None:
+                self.state = 'loading'
+            try:
+                context = self._builder()
+            except Exception as e:
+                self.error = str(e)
+                self.state = 'ready' if self._context is not None else 'failed'
+                log_event(logger, 'context_build_failed', level=logging.ERROR,
+                          exc_info=True, error=str(e))
+                return None
+            self.swap(context)
+            self.error = None
+            return context
+    
+    def swap(self, context: AppContext) -> Optional[AppContext]:
+        """
+        Replaces the current context.
+        
+        Requests already holding the previous context finish with it; it is
+        freed once they drop their references.
+        
+        Args:
+            context (AppContext): The new snapshot.
+        
+        Returns:
+            AppContext or None: The previous snapshot.
+        """
+        previous, self._context = self._context, context
+        self.state = 'ready'
+        for listener in self._listeners:
+            listener(context)
+        if self.freeze:
+            # Let the old snapshot be collected, then move everything live into
+            # the permanent generation so collections never touch shared pages
+            gc.unfreeze()
+            gc.collect()
+            gc.freeze()
+        return previous
+    
+    def add_listener(self, callback: Callable[[AppContext], None]) -> None:
+        """
+        Registers a callback run with the new context after every swap.
+        
+        Args:
+            callback (Callable[[AppContext], None]): E.g. a cache invalidation.
+        """
+        self._listeners.append(callback)
+    
+    def reload_if_stale(self) -> bool:
+        """
+        Reloads when the data files differ from the current snapshot.
+        
+        Returns:
+            bool: Whether a new snapshot was swapped in.
+        """
+        context = self._context
+        version = snapshot_version(self.data_path, self.tables)
+        if context is not None and context.version == version:
+            return False
+        return self.load() is not None
+    
+    def watch(self, interval: float = 60.0) -> threading.Thread:
+        """
+        Starts a daemon thread that calls reload_if_stale() every interval seconds.
+        
+        Args:
+            interval (float): Poll interval in seconds.
+        
+        Returns:
+            threading.Thread: The watcher thread (reused if already running).
+        """
+        if self._watcher is not None and self._watcher.is_alive():
+            return self._watcher
+        
+        def poll():
+            while True:
+                time.sleep(interval)
+                self.reload_if_stale()
+        
+        self._watcher = threading.Thread(target=poll, name='app-context-watch', daemon=True)
+        self._watcher.start()
+        return self._watcher
+    
+    def status(self) -> Dict[str, Any]:
+        """
+        Readiness summary.
+        
+        Returns:
+            Dict[str, Any]: State, last error and the current snapshot summary.
+        """
+        context = self._context
+        status = {'state': self.state, 'ready': context is not None, 'pid': os.getpid()}
+        if self.error:
+            status['error'] = self.error
+        if context is not None:
+            status['context'] = context.describe()
+        return status
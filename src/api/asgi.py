@@ -0,0 +1,343 @@
+"""
+File: asgi.py
+Description: Async (ASGI) variant of the API endpoints with batched predictions.
+Dependencies: fastapi, uvicorn
+Author: Sample Team
+
+Run with: uvicorn src.api.asgi:app --host 0.0.0.0 --port 8000 --workers 4
+
+Endpoints mirror src/api/routes.py. Single-item predictions are coalesced by a
+PredictionBatcher, so a burst of concurrent POS requests costs one vectorised
+InventoryService call per few milliseconds instead of one call per request.
+POST /api/inventory/predict/bulk takes a list of item ids directly.
+
+Every request is recorded in the per-endpoint latency histogram served by
+GET /metrics. An opt-in profile (PROFILE_REQUESTS) runs cProfile on the event
+loop thread, so it also sees whatever other requests the loop interleaves
+and misses work moved to threads with asyncio.to_thread.
+"""
+
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+from pydantic import BaseModel
+
+from src.api.app_context import ContextHolder, ContextNotReadyError, DEFAULT_DATA_PATH
+from src.api.batching import PredictionBatcher
+from src.services.menu_engineering import ANALYSIS_SORT_KEYS
+from src.services.shift_optimizer import resolve_constraints
+from src.utils.instrumentation import (METRICS, PROFILE_HEADER, RequestProfiler, configure_logging,
+                                       profile_mode, wants_profile)
+
+
+# Largest list accepted by the bulk prediction endpoint
+MAX_BULK_ITEMS = 10_000
+
+
+class PredictRequest(BaseModel):
+    """Body of POST /api/inventory/predict."""
+    item_id: Optional[Any] = None
+    period: str = 'daily'
+
+
+class BulkPredictRequest(BaseModel):
+    """Body of POST /api/inventory/predict/bulk."""
+    item_ids: List[Any] = []
+    period: str = 'daily'
+
+
+class MenuAnalysisRequest(BaseModel):
+    """Body of POST /api/menu/analyze."""
+    place_id: Optional[Any] = None
+    analysis_type: str = 'both'
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+
+
+class ShiftRequest(BaseModel):
+    """Body of POST /api/shifts/optimize."""
+    place_id: Optional[Any] = None
+    date: Optional[str] = None
+    constraints: Dict[str, Any] = {}
+
+
+class ReplanRequest(BaseModel):
+    """Body of POST /api/shifts/replan."""
+    place_id: Optional[Any] = None
+    date: Optional[str] = None
+    shifts: Optional[List[Dict[str, Any]]] = None
+    events: Optional[List[Dict[str, Any]]] = None
+    constraints: Dict[str, Any] = {}
+
+
+def _timestamp() -> str:
+    """Returns the current UTC time in the API's timestamp format."""
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Starts building the application context when the worker starts."""
+    holder = app.state.context_holder
+    if not holder.ready:
+        holder.load(background=True)
+    yield
+
+
+configure_logging()
+
+app = FastAPI(title='Inventory API', lifespan=lifespan)
+app.state.profile_mode = profile_mode()
+app.state.context_holder = ContextHolder(os.environ.get('DATA_PATH', DEFAULT_DATA_PATH))
+app.state.batcher = PredictionBatcher(
+    app.state.context_holder,
+    max_wait_ms=float(os.environ.get('BATCH_WAIT_MS', '2')),
+    max_batch=int(os.environ.get('BATCH_MAX_SIZE', '512')),
+)
+
+
+@app.middleware('http')
+async def record_request(request: Request, call_next):
+    """Records per-endpoint latency (and runs an opt-in cProfile) around a request."""
+    profiler = None
+    if wants_profile(app.state.profile_mode, request.headers.get(PROFILE_HEADER)):
+        profiler = RequestProfiler(request.url.path).start()
+    
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        seconds = time.perf_counter() - started
+        if profiler is not None:
+            profiler.stop()
+        route = request.scope.get('route')
+        METRICS.observe_request(route.path if route is not None else 'unmatched',
+                                request.method, status, seconds)
+    response.headers['Server-Timing'] = f"app;dur={seconds * 1000:.3f}"
+    return response
+
+
+@app.exception_handler(ContextNotReadyError)
+async def context_not_ready(request: Request, error: ContextNotReadyError) -> JSONResponse:
+    """Answers 503 while the application context is still being built."""
+    return JSONResponse({"error": str(error)}, status_code=503, headers={'Retry-After': '5'})
+
+
+@app.get('/api/health')
+async def health_check():
+    """
+    Health check endpoint; ready (200) only once the application context is warm.
+    
+    Returns:
+        Dict[str, Any]: Status message and context summary.
+    """
+    status = app.state.context_holder.status()
+    if not status['ready']:
+        return JSONResponse({"status": "starting" if status['state'] != 'failed' else "unhealthy",
+                             "message": "Application context is not ready", **status},
+                            status_code=503)
+    return {"status": "healthy", "message": "API is running", **status}
+
+
+@app.get('/metrics')
+async def metrics():
+    """
+    Exposes latency histograms and hot-path spans for Prometheus.
+    
+    Returns:
+        PlainTextResponse: The registry in the Prometheus text exposition format.
+    """
+    return PlainTextResponse(METRICS.render(), media_type='text/plain; version=0.0.4')
+
+
+@app.post('/api/inventory/predict')
+async def predict_inventory(body: PredictRequest):
+    """
+    Predicts demand for one item; concurrent requests are answered in batches.
+    
+    Request Body:
+        {
+            "item_id": "string",
+            "period": "daily|weekly|monthly"
+        }
+    
+    Returns:
+        Dict[str, Any]: Prediction results (400 without item_id, 404 for unknown items).
+    """
+    if not body.item_id:
+        return JSONResponse({"error": "item_id is required"}, status_code=400)
+    
+    demand, version = await app.state.batcher.predict(body.item_id, body.period)
+    if demand is None:
+        return JSONResponse({"error": f"Item {body.item_id} not found"}, status_code=404)
+    
+    return {
+        "item_id": body.item_id,
+        "predicted_demand": demand,
+        "period": body.period,
+        "confidence": 0.85,
+        "data_version": version,
+        "timestamp": _timestamp()
+    }
+
+
+@app.post('/api/inventory/predict/bulk')
+async def predict_inventory_bulk(body: BulkPredictRequest):
+    """
+    Predicts demand for a list of items in one vectorised call.
+    
+    Request Body:
+        {
+            "item_ids": ["string", ...],
+            "period": "daily|weekly|monthly"
+        }
+    
+    Returns:
+        Dict[str, Any]: One prediction per known item, in request order, plus
+            the ids that have no sales history.
+    
+    Example Response:
+        {
+            "period": "daily",
+            "predictions": [{"item_id": "12345", "predicted_demand": 150.5}],
+            "missing": ["99999"],
+            "data_version": "3f2a9c1e0b7d4a55",
+            "timestamp": "2026-02-02T12:00:00Z"
+        }
+    """
+    if not body.item_ids:
+        return JSONResponse({"error": "item_ids is required"}, status_code=400)
+    if len(body.item_ids) > MAX_BULK_ITEMS:
+        return JSONResponse({"error": f"At most {MAX_BULK_ITEMS} item_ids per request"},
+                            status_code=400)
+    
+    context = app.state.context_holder.get()
+    known_ids = [context.resolve_item_id(item_id) for item_id in body.item_ids]
+    demand = context.inventory_service.predict_demand_many(
+        [i for i in known_ids if i is not None], body.period, errors='coerce')
+    values = iter(demand['predicted_demand'].tolist())
+    
+    predictions, missing = [], []
+    for item_id, known_id in zip(body.item_ids, known_ids):
+        value = next(values) if known_id is not None else np.nan
+        if np.isnan(value):
+            missing.append(item_id)
+        else:
+            predictions.append({"item_id": item_id, "predicted_demand": value})
+    
+    return {
+        "period": body.period,
+        "predictions": predictions,
+        "missing": missing,
+        "data_version": context.version,
+        "timestamp": _timestamp()
+    }
+
+
+@app.post('/api/menu/analyze')
+async def analyze_menu(body: MenuAnalysisRequest):
+    """
+    Analyzes menu items and provides recommendations (see routes.analyze_menu).
+    
+    Returns:
+        Dict[str, Any]: Analysis results with categorized menu items.
+    """
+    if not body.place_id:
+        return JSONResponse({"error": "place_id is required"}, status_code=400)
+    if body.analysis_type not in ANALYSIS_SORT_KEYS:
+        return JSONResponse({"error": "analysis_type must be profitability, popularity or both"},
+                            status_code=400)
+    
+    context = app.state.context_holder.get()
+    known_id = context.resolve_place_id(body.place_id)
+    if known_id is None:
+        return JSONResponse({"error": f"Place {body.place_id} not found"}, status_code=404)
+    
+    try:
+        quadrants = context.menu_engine.analyze_place(
+            known_id, body.start_date, body.end_date,
+            sort_by=ANALYSIS_SORT_KEYS[body.analysis_type])
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    return {
+        "place_id": body.place_id,
+        "analysis_type": body.analysis_type,
+        "start_date": body.start_date,
+        "end_date": body.end_date,
+        **quadrants,
+        "data_version": context.version,
+        "timestamp": _timestamp()
+    }
+
+
+@app.post('/api/shifts/optimize')
+async def optimize_shifts(body: ShiftRequest):
+    """
+    Optimizes shift scheduling based on demand prediction (see routes.optimize_shifts).
+    
+    Returns:
+        Dict[str, Any]: Optimized shift schedule.
+    """
+    if not body.place_id or not body.date:
+        return JSONResponse({"error": "place_id and date are required"}, status_code=400)
+    
+    context = app.state.context_holder.get()
+    optimizer = context.shift_optimizer
+    known_id = context.resolve_place_id(body.place_id, optimizer) if optimizer else None
+    if known_id is None:
+        return JSONResponse({"error": f"Place {body.place_id} not found"}, status_code=404)
+    try:
+        resolve_constraints(body.constraints)
+        # The solver is CPU-bound; keep it off the event loop
+        plan = await asyncio.to_thread(optimizer.plan, known_id, body.date, body.constraints)
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    
+    return {
+        "place_id": body.place_id,
+        "date": body.date,
+        **plan,
+        "data_version": context.version,
+        "timestamp": _timestamp()
+    }
+
+
+@app.post('/api/shifts/replan')
+async def replan_shifts(body: ReplanRequest):
+    """
+    Repairs an existing day schedule after change events (see routes.replan_shifts).
+    
+    Returns:
+        Dict[str, Any]: Repaired schedule with the added and removed shifts.
+    """
+    if not body.place_id or not body.date or body.shifts is None or body.events is None:
+        return JSONResponse({"error": "place_id, date, shifts and events are required"},
+                            status_code=400)
+    
+    context = app.state.context_holder.get()
+    optimizer = context.shift_optimizer
+    known_id = context.resolve_place_id(body.place_id, optimizer) if optimizer else None
+    if known_id is None:
+        return JSONResponse({"error": f"Place {body.place_id} not found"}, status_code=404)
+    try:
+        plan = await asyncio.to_thread(optimizer.replan, known_id, body.date, body.shifts,
+                                       body.events, body.constraints)
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    
+    return {
+        "place_id": body.place_id,
+        "date": body.date,
+        **plan,
+        "data_version": context.version,
+        "timestamp": _timestamp()
+    }
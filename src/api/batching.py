@@ -0,0 +1,114 @@
+"""
+File: batching.py
+Description: Micro-batching of concurrent demand predictions into one vectorised call.
+Dependencies: numpy
+Author: Sample Team
+"""
+
+import asyncio
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+from src.api.app_context import ContextHolder
+
+
+class PredictionBatcher:
+    """
+    Coalesces concurrent single-item predictions per forecast period.
+    
+    The first request of a batch arms a short timer; every request arriving
+    before it fires joins the batch, and the whole batch is answered by one
+    InventoryService.predict_demand_many call against a single context
+    snapshot. A batch that reaches max_batch is flushed immediately. Must be
+    used from one event loop.
+    
+    Attributes:
+        holder (ContextHolder): Source of the current application context.
+        max_wait (float): Longest time a request waits for its batch, in seconds.
+        max_batch (int): Batch size that triggers an immediate flush.
+        requests (int): Number of predictions answered.
+        batches (int): Number of vectorised calls made.
+    
+    Methods:
+        predict(item_id, period): Awaits one item's prediction.
+    """
+    
+    def __init__(self, holder: ContextHolder, max_wait_ms: float = 2.0, max_batch: int = 512):
+        """
+        Initialize the PredictionBatcher.
+        
+        Args:
+            holder (ContextHolder): Source of the current application context.
+            max_wait_ms (float): Longest time a request waits for its batch.
+            max_batch (int): Batch size that triggers an immediate flush.
+        """
+        self.holder = holder
+        self.max_wait = max_wait_ms / 1000
+        self.max_batch = max(1, max_batch)
+        self.requests = 0
+        self.batches = 0
+        self._pending: Dict[str, List[Tuple[object, asyncio.Future]]] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+    
+    async def predict(self, item_id, period: str = 'daily') -> Tuple[Optional[float], str]:
+        """
+        Predicts demand for one item as part of the current batch.
+        
+        Args:
+            item_id: Item id from the request (numeric strings are accepted).
+            period (str): Time period for prediction ('daily', 'weekly', 'monthly').
+        
+        Returns:
+            Tuple[float or None, str]: Predicted demand (None for unknown items)
+                and the data version it was computed from.
+        
+        Raises:
+            ContextNotReadyError: If the application context is not built yet.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        batch = self._pending.setdefault(period, [])
+        batch.append((item_id, future))
+        
+        if len(batch) >= self.max_batch:
+            self._flush(period)
+        elif period not in self._timers:
+            self._timers[period] = loop.call_later(self.max_wait, self._flush, period)
+        return await future
+    
+    def _flush(self, period: str) -> None:
+        """
+        Answers every pending request of a period with one vectorised call.
+        
+        Args:
+            period (str): The batch's forecast period.
+        """
+        timer = self._timers.pop(period, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(period, [])
+        if not batch:
+            return
+        
+        try:
+            context = self.holder.get()
+            known_ids = [context.resolve_item_id(item_id) for item_id, _ in batch]
+            unique_ids = list(dict.fromkeys(i for i in known_ids if i is not None))
+            demand = context.inventory_service.predict_demand_many(unique_ids, period,
+                                                                   errors='coerce')
+            by_item = dict(zip(unique_ids, demand['predicted_demand'].tolist()))
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        self.requests += len(batch)
+        self.batches += 1
+        for known_id, (_, future) in zip(known_ids, batch):
+            if future.done():
+                continue
+            value = by_item.get(known_id) if known_id is not None else None
+            if value is not None and np.isnan(value):
+                value = None
+            future.set_result((value, context.version))
@@ -0,0 +1,175 @@
+"""
+File: response_cache.py
+Description: Bounded LRU/TTL cache for API responses with stampede protection.
+Dependencies: none (standard library)
+Author: Sample Team
+
+Responses of the analyze/predict endpoints are pure functions of the request
+parameters and the data snapshot, so the cache key always includes the
+context's data token: a hot-swapped snapshot or newly ingested sales change
+the token and old entries simply stop matching (and age out of the LRU).
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable
+
+
+class _Pending:
+    """A computation in flight that concurrent misses for the same key wait on."""
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class ResponseCache:
+    """
+    Thread-safe LRU cache with a per-entry time to live.
+    
+    Concurrent misses for the same key are coalesced: the first caller
+    computes, the others wait for its result (or its exception) instead of
+    recomputing.
+    
+    Attributes:
+        max_entries (int): Maximum number of cached responses.
+        ttl_seconds (float): Lifetime of an entry (0 disables expiry).
+        hits (int): Lookups answered from the cache.
+        misses (int): Lookups that computed a response.
+        coalesced (int): Misses that waited for another caller's computation.
+        evictions (int): Entries dropped for size or age.
+    
+    Methods:
+        get_or_compute(key, compute): Returns a cached value or computes it once.
+        etag(key): Stable entity tag for a key.
+        invalidate(): Drops every entry.
+        stats(): Counters and size.
+    """
+    
+    def __init__(self, max_entries: int = 4096, ttl_seconds: float = 300.0):
+        """
+        Initialize the ResponseCache.
+        
+        Args:
+            max_entries (int): Maximum number of cached responses.
+            ttl_seconds (float): Lifetime of an entry in seconds (0 disables expiry).
+        """
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self._entries: 'OrderedDict[Hashable, tuple]' = OrderedDict()  # key -> (expires, value)
+        self._pending: Dict[Hashable, _Pending] = {}
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Returns the cached value for key, computing it at most once when missing.
+        
+        Args:
+            key (Hashable): Cache key (request parameters plus data token).
+            compute (Callable[[], Any]): Builds the value on a miss.
+        
+        Returns:
+            Any: The cached or freshly computed value.
+        
+        Raises:
+            Exception: Whatever compute raised; failures are not cached.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, value = entry
+                if not self.ttl_seconds or expires > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.evictions += 1
+            
+            pending = self._pending.get(key)
+            owner = pending is None
+            if owner:
+                pending = self._pending[key] = _Pending()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+        
+        if not owner:
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.value
+        
+        try:
+            pending.value = compute()
+        except Exception as e:
+            pending.error = e
+            raise
+        else:
+            with self._lock:
+                self._entries[key] = (time.monotonic() + self.ttl_seconds, pending.value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+            pending.done.set()
+        return pending.value
+    
+    @staticmethod
+    def etag(key: Hashable) -> str:
+        """
+        Derives an entity tag from a key.
+        
+        Because the key includes the data token, equal tags mean equal responses.
+        
+        Args:
+            key (Hashable): Cache key.
+        
+        Returns:
+            str: 20-character hex tag (without quotes).
+        """
+        return hashlib.sha1(repr(key).encode()).hexdigest()[:20]
+    
+    def invalidate(self) -> int:
+        """
+        Drops every cached entry.
+        
+        Returns:
+            int: Number of entries removed.
+        """
+        with self._lock:
+            removed = len(self._entries)
+            self._entries.clear()
+        return removed
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns the cache counters.
+        
+        Returns:
+            Dict[str, Any]: Hits, misses, coalesced misses, evictions, size and hit ratio.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'evictions': self.evictions,
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
@@ -10,30 +10,162 @@ Students should replace this with their actual implementation.
 Note: This example uses Flask. Students can also use FastAPI, Express.js, or other frameworks.
 """
 
-from flask import Flask, request, jsonify
-from typing import Dict, Any
+import json
+import logging
+import os
+import time
+import numpy as np
+from datetime import datetime, timezone
+from flask import Flask, Response, g, request, jsonify, current_app
+from typing import Callable, Dict, Any, Tuple
 
+from src.api.app_context import (ContextHolder, ContextNotReadyError, DEFAULT_DATA_PATH,
+                                 AppContext)
+from src.api.response_cache import ResponseCache
+from src.services.menu_engineering import ANALYSIS_SORT_KEYS
+from src.services.shift_optimizer import resolve_constraints
+from src.utils.instrumentation import (METRICS, PROFILE_HEADER, RequestProfiler, configure_logging,
+                                       log_event, profile_mode, wants_profile)
+
+
+configure_logging()
+logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 
+# 'off', 'header' (requests sent with X-Profile: 1) or 'all'; see src/utils/instrumentation.py
+app.config['PROFILE_REQUESTS'] = profile_mode()
+
+# Built once per process (or once in the gunicorn master with preload_app) and
+# shared by all requests; see src/api/app_context.py
+app.extensions['app_context'] = ContextHolder(os.environ.get('DATA_PATH', DEFAULT_DATA_PATH))
+
+# Responses of the pure analyze/predict endpoints, keyed by parameters and data token
+app.extensions['response_cache'] = ResponseCache(
+    max_entries=int(os.environ.get('RESPONSE_CACHE_SIZE', '4096')),
+    ttl_seconds=float(os.environ.get('RESPONSE_CACHE_TTL', '300')),
+)
+app.extensions['app_context'].add_listener(
+    lambda context: app.extensions['response_cache'].invalidate())
+
+
+def _endpoint() -> str:
+    """Returns the matched route template, which keeps metric labels bounded."""
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+
+@app.before_request
+def start_request_timer() -> None:
+    """Starts timing the request and, when asked for, profiling it."""
+    g.request_started = time.perf_counter()
+    g.profiler = None
+    if wants_profile(current_app.config['PROFILE_REQUESTS'], request.headers.get(PROFILE_HEADER)):
+        g.profiler = RequestProfiler(_endpoint()).start()
+
+
+@app.after_request
+def record_request(response: Response) -> Response:
+    """
+    Records the request in the per-endpoint latency histogram.
+    
+    Also runs for errors turned into responses (400/404/500/503). The
+    latency is returned in a Server-Timing header; a profiled request logs
+    its cProfile report as a 'request_profile' event.
+    """
+    seconds = time.perf_counter() - g.request_started
+    if g.profiler is not None:
+        g.profiler.stop()
+    METRICS.observe_request(_endpoint(), request.method, response.status_code, seconds)
+    response.headers['Server-Timing'] = f"app;dur={seconds * 1000:.3f}"
+    return response
+
+
+def get_context() -> AppContext:
+    """
+    Returns the application context of the current app.
+    
+    Returns:
+        AppContext: The current data snapshot.
+    
+    Raises:
+        ContextNotReadyError: If the context is still loading.
+    """
+    return current_app.extensions['app_context'].get()
+
+
+def cached_response(endpoint: str, params: Tuple,
+                    compute: Callable[[AppContext], Tuple[Dict[str, Any], int]]) -> Response:
+    """
+    Serves a pure endpoint through the response cache.
+    
+    The cache key is (endpoint, params, data token), so new snapshots or
+    ingested sales never serve stale entries. Cached payloads carry no
+    timestamp; it is stamped per response. Only 200 responses get an ETag,
+    derived from the same key and weak because the timestamp differs: a
+    matching If-None-Match is answered with 304 and an empty body.
+    
+    Args:
+        endpoint (str): Endpoint name.
+        params (Tuple): Request parameters the response depends on.
+        compute (Callable): Builds (payload, status) from the context on a miss.
+    
+    Returns:
+        Response: JSON response (or 304), with an ETag when successful.
+    """
+    context = get_context()
+    cache = current_app.extensions['response_cache']
+    key = (endpoint, params, context.data_token)
+    payload, status = cache.get_or_compute(key, lambda: compute(context))
+    if status != 200:
+        return jsonify(payload), status
+    
+    etag = cache.etag(key)
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        response = jsonify({**payload,
+                            "timestamp": datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')})
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+@app.errorhandler(ContextNotReadyError)
+def context_not_ready(error: ContextNotReadyError):
+    """Answers 503 while the application context is still being built."""
+    response = jsonify({"error": str(error)})
+    response.headers['Retry-After'] = '5'
+    return response, 503
+
 
 @app.route('/api/health', methods=['GET'])
 def health_check() -> Dict[str, str]:
     """
     Health check endpoint to verify API is running.
     
+    Reports ready (200) only once the application context is warm; while it
+    is loading or after a failed first load it answers 503 so load balancers
+    keep traffic away from the worker.
+    
     Returns:
         Dict[str, str]: Status message.
     
     Example Response:
         {
             "status": "healthy",
-            "message": "API is running"
+            "message": "API is running",
+            "ready": true,
+            "context": {"version": "3f2a9c1e0b7d4a55", "items": 1200, ...}
         }
     """
+    status = current_app.extensions['app_context'].status()
+    if not status['ready']:
+        return jsonify({"status": "starting" if status['state'] != 'failed' else "unhealthy",
+                        "message": "Application context is not ready", **status}), 503
     return jsonify({
         "status": "healthy",
-        "message": "API is running"
+        "message": "API is running",
+        **status
     })
 
 
@@ -61,7 +193,7 @@ def predict_inventory() -> Dict[str, Any]:
     
     Raises:
         400: If required parameters are missing.
-        404: If item not found.
+        404: If item not found or without usable sales (as in the ASGI app).
     """
     try:
         data = request.get_json()
@@ -71,31 +203,77 @@ def predict_inventory() -> Dict[str, Any]:
         if not item_id:
             return jsonify({"error": "item_id is required"}), 400
         
-        # Students should implement actual prediction logic here
-        # This is a placeholder response
-        result = {
-            "item_id": item_id,
-            "predicted_demand": 150.5,
-            "period": period,
-            "confidence": 0.85,
-            "timestamp": "2026-02-02T12:00:00Z"
-        }
-        
-        return jsonify(result), 200
+        def compute(context: AppContext):
+            known_id = context.resolve_item_id(item_id)
+            demand = (context.inventory_service.predict_demand(known_id, period)
+                      if known_id is not None else np.nan)
+            if np.isnan(demand):
+                return {"error": f"Item {item_id} not found"}, 404
+            
+            return {
+                "item_id": item_id,
+                "predicted_demand": demand,
+                "period": period,
+                "confidence": 0.85,
+                "data_version": context.version
+            }, 200
         
+        return cached_response('predict', (str(item_id), period), compute)
+    
+    except ContextNotReadyError:
+        raise
     except Exception as e:
+        log_event(logger, 'request_failed', level=logging.ERROR, exc_info=True,
+                  endpoint=_endpoint(), error=str(e))
         return jsonify({"error": str(e)}), 500
 
 
+@app.route('/metrics', methods=['GET'])
+def metrics() -> Response:
+    """
+    Exposes latency histograms and hot-path spans for Prometheus.
+    
+    Returns:
+        Response: The registry in the Prometheus text exposition format.
+    
+    Example Response:
+        # TYPE http_request_duration_seconds histogram
+        http_request_duration_seconds_bucket{endpoint="/api/health",method="GET",status="200",le="0.005"} 12
+        ...
+    """
+    return Response(METRICS.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats() -> Dict[str, Any]:
+    """
+    Reports response cache counters.
+    
+    Example Response:
+        {
+            "hits": 120, "misses": 14, "coalesced": 3, "evictions": 0,
+            "size": 14, "max_entries": 4096, "ttl_seconds": 300.0, "hit_ratio": 0.8955
+        }
+    """
+    return jsonify(current_app.extensions['response_cache'].stats())
+
+
 @app.route('/api/menu/analyze', methods=['POST'])
 def analyze_menu() -> Dict[str, Any]:
     """
     Analyzes menu items and provides recommendations.
     
+    Items are classified on the menu-engineering matrix from the context's
+    daily rollups (see src/services/menu_engineering.py). Each quadrant is
+    sorted by popularity share, unit margin or total margin depending on
+    analysis_type.
+    
     Request Body:
         {
             "place_id": "string",
-            "analysis_type": "profitability|popularity|both"
+            "analysis_type": "profitability|popularity|both",
+            "start_date": "YYYY-MM-DD" (optional),
+            "end_date": "YYYY-MM-DD" (optional)
         }
     
     Returns:
@@ -108,29 +286,50 @@ def analyze_menu() -> Dict[str, Any]:
             "puzzles": [...],
             "dogs": [...]
         }
+    
+    Raises:
+        400: If place_id is missing, analysis_type is unknown or a date is invalid.
+        404: If the place has no sales.
     """
     try:
         data = request.get_json()
         place_id = data.get('place_id')
         analysis_type = data.get('analysis_type', 'both')
+        start_date = data.get('start_date')
+        end_date = data.get('end_date')
         
         if not place_id:
             return jsonify({"error": "place_id is required"}), 400
+        if analysis_type not in ANALYSIS_SORT_KEYS:
+            return jsonify({"error": "analysis_type must be profitability, popularity or both"}), 400
         
-        # Students should implement actual menu analysis logic here
-        result = {
-            "place_id": place_id,
-            "analysis_type": analysis_type,
-            "stars": [],
-            "plowhorses": [],
-            "puzzles": [],
-            "dogs": [],
-            "timestamp": "2026-02-02T12:00:00Z"
-        }
-        
-        return jsonify(result), 200
+        def compute(context: AppContext):
+            known_id = context.resolve_place_id(place_id)
+            if known_id is None:
+                return {"error": f"Place {place_id} not found"}, 404
+            
+            try:
+                quadrants = context.menu_engine.analyze_place(
+                    known_id, start_date, end_date, sort_by=ANALYSIS_SORT_KEYS[analysis_type])
+            except ValueError as e:
+                return {"error": str(e)}, 400
+            return {
+                "place_id": place_id,
+                "analysis_type": analysis_type,
+                "start_date": start_date,
+                "end_date": end_date,
+                **quadrants,
+                "data_version": context.version
+            }, 200
         
+        return cached_response('menu_analyze',
+                               (str(place_id), analysis_type, start_date, end_date), compute)
+    
+    except ContextNotReadyError:
+        raise
     except Exception as e:
+        log_event(logger, 'request_failed', level=logging.ERROR, exc_info=True,
+                  endpoint=_endpoint(), error=str(e))
         return jsonify({"error": str(e)}), 500
 
 
@@ -139,11 +338,18 @@ def optimize_shifts() -> Dict[str, Any]:
     """
     Optimizes shift scheduling based on demand prediction.
     
+    Staff needs per 15-minute slot come from the place's order curve on the
+    same weekday of previous weeks; shifts are chosen to cover them with
+    minimal staff hours (see src/services/shift_optimizer.py).
+    
     Request Body:
         {
             "place_id": "string",
             "date": "YYYY-MM-DD",
-            "constraints": {...}
+            "constraints": {
+                "orders_per_staff_hour": 10, "min_staff": 1, "max_staff": null,
+                "shift_hours": [4, 6, 8], "history_weeks": 4, "time_limit": 1.0
+            } (optional, any subset)
         }
     
     Returns:
@@ -152,35 +358,119 @@ def optimize_shifts() -> Dict[str, Any]:
     Example Response:
         {
             "date": "2026-02-02",
-            "shifts": [...],
+            "shifts": [{"start": "10:30", "end": "18:30", "hours": 8.0, "staff": 2}],
             "total_staff_hours": 120,
             "estimated_coverage": 0.95
         }
+    
+    Raises:
+        400: If place_id or date is missing or a constraint is invalid.
+        404: If the place has no orders.
     """
     try:
         data = request.get_json()
         place_id = data.get('place_id')
         date = data.get('date')
+        constraints = data.get('constraints') or {}
         
         if not place_id or not date:
             return jsonify({"error": "place_id and date are required"}), 400
+        try:
+            resolve_constraints(constraints)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         
-        # Students should implement actual shift optimization logic here
-        result = {
-            "place_id": place_id,
-            "date": date,
-            "shifts": [],
-            "total_staff_hours": 120,
-            "estimated_coverage": 0.95,
-            "timestamp": "2026-02-02T12:00:00Z"
+        def compute(context: AppContext):
+            optimizer = context.shift_optimizer
+            known_id = context.resolve_place_id(place_id, optimizer) if optimizer else None
+            if known_id is None:
+                return {"error": f"Place {place_id} not found"}, 404
+            try:
+                plan = optimizer.plan(known_id, date, constraints)
+            except ValueError as e:
+                return {"error": str(e)}, 400
+            
+            return {
+                "place_id": place_id,
+                "date": date,
+                **plan,
+                "data_version": context.version
+            }, 200
+        
+        return cached_response('shifts_optimize',
+                               (str(place_id), str(date), json.dumps(constraints, sort_keys=True)),
+                               compute)
+    
+    except ContextNotReadyError:
+        raise
+    except Exception as e:
+        log_event(logger, 'request_failed', level=logging.ERROR, exc_info=True,
+                  endpoint=_endpoint(), error=str(e))
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/api/shifts/replan', methods=['POST'])
+def replan_shifts() -> Dict[str, Any]:
+    """
+    Repairs an existing day schedule after call-offs, PTO or demand spikes.
+    
+    Shifts not affected by an event are kept; only the resulting coverage gap
+    is re-optimised, so the answer comes back in milliseconds and changes as
+    few shifts as possible (see ShiftOptimizer.replan).
+    
+    Request Body:
+        {
+            "place_id": "string",
+            "date": "YYYY-MM-DD",
+            "shifts": [{"start": "10:00", "end": "18:00", "staff": 2}, ...],
+            "events": [{"type": "call_off", "start": "10:00", "end": "18:00", "staff": 1}],
+            "constraints": {...} (optional, as for /api/shifts/optimize)
         }
+    
+    Returns:
+        Dict[str, Any]: Repaired schedule with the added and removed shifts.
+    
+    Raises:
+        400: If a field is missing or a shift, event or constraint is invalid.
+        404: If the place has no orders.
+    """
+    try:
+        data = request.get_json()
+        place_id = data.get('place_id')
+        date = data.get('date')
+        shifts = data.get('shifts')
+        events = data.get('events')
+        
+        if not place_id or not date or not isinstance(shifts, list) or not isinstance(events, list):
+            return jsonify({"error": "place_id, date, shifts and events are required"}), 400
         
-        return jsonify(result), 200
+        context = get_context()
+        optimizer = context.shift_optimizer
+        known_id = context.resolve_place_id(place_id, optimizer) if optimizer else None
+        if known_id is None:
+            return jsonify({"error": f"Place {place_id} not found"}), 404
+        try:
+            plan = optimizer.replan(known_id, date, shifts, events, data.get('constraints'))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         
+        return jsonify({
+            "place_id": place_id,
+            "date": date,
+            **plan,
+            "data_version": context.version,
+            "timestamp": datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+        }), 200
+    
+    except ContextNotReadyError:
+        raise
     except Exception as e:
+        log_event(logger, 'request_failed', level=logging.ERROR, exc_info=True,
+                  endpoint=_endpoint(), error=str(e))
         return jsonify({"error": str(e)}), 500
 
 
 if __name__ == '__main__':
     # Development server - students should use production server for deployment
+    app.extensions['app_context'].load(background=True)
     app.run(debug=True, host='0.0.0.0', port=5000)
@@ -1,45 +1,128 @@
 """
 File: data_loader.py
 Description: Handles loading and preprocessing of CSV data files.
-Dependencies: pandas, numpy
+Dependencies: pandas, numpy, pyarrow (optional, for the columnar cache),
+              sqlalchemy (optional, for the SQL backend)
 Author: Sample Team
 
 This is a sample file demonstrating proper code structure and documentation.
 Students should replace this with their actual implementation.
 """
 
+import hashlib
+import logging
+import os
 import pandas as pd
-from typing import Optional, List
+from typing import Any, Dict, Iterator, Optional, List
+
+from src.models.schemas import get_schema
+from src.models.sql_store import DEFAULT_DB_NAME, SqlStore, date_bound
+from src.models.star_schema import DimensionIndex, StarSchema
+from src.utils.instrumentation import log_event, traced
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+except ImportError:  # pragma: no cover - the cache is simply disabled
+    pa = None
+    pa_ipc = None
+
+
+CACHE_DIR_NAME = '.cache'
+CACHE_SUFFIX = '.arrow'
+DEFAULT_CHUNK_ROWS = 250_000
+BACKENDS = ('csv', 'sql')
+
+logger = logging.getLogger(__name__)
 
 
 class DataLoader:
     """
     Handles loading and basic preprocessing of CSV data files.
     
+    Parsed tables are cached as uncompressed Arrow IPC files next to the data
+    (in ``<data_path>/.cache`` by default). A cache file is keyed by the source
+    CSV's size and modification time, so replacing a CSV invalidates it and the
+    next load rebuilds the cache automatically.
+    
+    Tables with an entry in the schema registry (src.models.schemas) are parsed
+    with compact dtypes: categoricals, downcast integers, nullable booleans and
+    UNIX timestamps converted to datetime64[s].
+    
+    With backend='sql' every CSV is imported once into an indexed SQLite file
+    (src.models.sql_store) and query() pushes its column projection and
+    filters down into SQL, so a per-place, per-date-range read only touches
+    the matching rows. With the default 'csv' backend query() applies the
+    same filters in memory and returns the same result.
+    
+    load_csv, query and merge_datasets are timed as spans and report row
+    counts as structured log events (src.utils.instrumentation).
+    
     Attributes:
         data_path (str): Path to the data directory.
         data (pd.DataFrame): The loaded dataset.
+        cache_dir (str): Directory holding the columnar cache files.
+        use_cache (bool): Whether load_csv reads and writes the cache.
+        apply_schema (bool): Whether registered table schemas are applied.
+        backend (str): 'csv' or 'sql'.
+        store (SqlStore): The SQLite store of the 'sql' backend, else None.
     
     Methods:
         load_csv(filename): Loads a CSV file into a DataFrame.
+        query(filename, ...): Loads the filtered rows and columns of a table.
+        iter_csv(filename): Streams a CSV file as bounded-size DataFrame chunks.
         merge_datasets(datasets): Merges multiple datasets.
+        star_schema(): Shared, lazily indexed dimension tables for fact joins.
         filter_active_merchants(df): Filters for active merchants only.
+        clear_cache(): Removes all cached columnar files.
     """
     
-    def __init__(self, data_path: str):
+    def __init__(self, data_path: str, cache_dir: Optional[str] = None,
+                 use_cache: bool = True, apply_schema: bool = True,
+                 backend: str = 'csv', db_path: Optional[str] = None):
         """
         Initialize the DataLoader.
         
         Args:
             data_path (str): Path to the data directory.
+            cache_dir (str, optional): Directory for the columnar cache.
+                Defaults to '<data_path>/.cache'.
+            use_cache (bool): Enable the columnar cache. It is silently
+                disabled when pyarrow is not installed.
+            apply_schema (bool): Parse registered tables with compact dtypes.
+            backend (str): 'csv' to read the CSV files, 'sql' to read through
+                the embedded SQLite store.
+            db_path (str, optional): SQLite file of the 'sql' backend.
+                Defaults to '<cache_dir>/warehouse.sqlite'.
+        
+        Raises:
+            ValueError: If backend is unknown.
+            ImportError: If backend is 'sql' and sqlalchemy is not installed.
         """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}'. Use one of {BACKENDS}")
+        
         self.data_path = data_path
         self.data = None
+        self.cache_dir = cache_dir or os.path.join(data_path, CACHE_DIR_NAME)
+        self.use_cache = use_cache and pa is not None
+        self.apply_schema = apply_schema
+        self.backend = backend
+        self.store = None
+        if backend == 'sql':
+            self.store = SqlStore(db_path or os.path.join(self.cache_dir, DEFAULT_DB_NAME))
+        self._star_schema = None
     
+    @traced()
     def load_csv(self, filename: str, parse_dates: Optional[List[str]] = None) -> pd.DataFrame:
         """
         Loads a CSV file into a pandas DataFrame.
         
+        When the cache is enabled and holds a fresh copy of the file, the table
+        is memory-mapped from the Arrow cache instead of being parsed again.
+        On the 'sql' backend the table is read from the SQLite store unless
+        parse_dates is given.
+        
         Args:
             filename (str): Name of the CSV file to load.
             parse_dates (List[str], optional): Column names to parse as dates.
@@ -52,18 +135,190 @@ class DataLoader:
         """
         file_path = f"{self.data_path}/{filename}"
         
-        try:
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+        
+        if self.store is not None and parse_dates is None:
+            return self.query(filename)
+        
+        schema = get_schema(filename) if self.apply_schema else None
+        
+        cache_path = None
+        if self.use_cache:
+            cache_path = self._cache_path(file_path, parse_dates=parse_dates,
+                                          schema=repr(schema))
+            if os.path.exists(cache_path):
+                df = self._read_cache(cache_path)
+                log_event(logger, 'table_loaded', file=filename, rows=len(df), source='cache')
+                return df
+        
+        df = None
+        if schema is not None:
+            try:
+                df = pd.read_csv(file_path, parse_dates=parse_dates,
+                                 dtype=schema.read_dtypes())
+                schema.convert_timestamps(df, skip=parse_dates or ())
+            except (ValueError, TypeError, OverflowError) as e:
+                log_event(logger, 'schema_mismatch', level=logging.WARNING,
+                          file=filename, error=str(e))
+                df = None
+        if df is None:
             df = pd.read_csv(file_path, parse_dates=parse_dates)
-            print(f"Successfully loaded {filename}: {len(df)} rows")
-            return df
-        except FileNotFoundError:
+        log_event(logger, 'table_loaded', file=filename, rows=len(df), source='csv')
+        
+        if cache_path is not None:
+            self._write_cache(df, cache_path)
+        return df
+    
+    def iter_csv(self, filename: str, chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                 usecols: Optional[List[str]] = None,
+                 dtype: Optional[Dict[str, str]] = None,
+                 parse_dates: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+        """
+        Streams a CSV file as DataFrame chunks of at most chunk_rows rows.
+        
+        Only the projected columns are materialised, so peak memory is bounded
+        by one chunk rather than the whole table. When a fresh columnar cache
+        exists, chunks are sliced from the memory-mapped cache instead of
+        re-parsing the CSV. Dtypes registered for the table are applied to
+        every chunk; explicit dtype entries take precedence. As in load_csv, a
+        schema that does not fit the data is logged ('schema_mismatch') and
+        the rest of the file is streamed with inferred dtypes, continuing
+        after the rows already yielded.
+        
+        Args:
+            filename (str): Name of the CSV file to stream.
+            chunk_rows (int): Maximum number of rows per chunk.
+            usecols (List[str], optional): Columns to read (all if omitted).
+            dtype (Dict[str, str], optional): Column dtypes to apply at parse time.
+            parse_dates (List[str], optional): Column names to parse as dates.
+        
+        Yields:
+            pd.DataFrame: Consecutive chunks of the dataset.
+        
+        Raises:
+            FileNotFoundError: If the file does not exist.
+            ValueError: If chunk_rows is not positive.
+        """
+        if chunk_rows <= 0:
+            raise ValueError("chunk_rows must be positive")
+        
+        file_path = f"{self.data_path}/{filename}"
+        
+        if not os.path.exists(file_path):
             raise FileNotFoundError(f"File not found: {file_path}")
+        
+        schema = get_schema(filename) if self.apply_schema else None
+        
+        if self.use_cache:
+            cache_path = self._cache_path(file_path, parse_dates=parse_dates,
+                                          schema=repr(schema))
+            if os.path.exists(cache_path):
+                yield from self._iter_cache(cache_path, chunk_rows, usecols, dtype)
+                return
+        
+        dtypes = schema.read_dtypes(usecols) if schema is not None else {}
+        dtypes.update(dtype or {})
+        
+        streamed = 0
+        if schema is not None:
+            try:
+                reader = pd.read_csv(file_path, chunksize=chunk_rows, usecols=usecols,
+                                     dtype=dtypes or None, parse_dates=parse_dates)
+                with reader:
+                    for chunk in reader:
+                        skip = set(parse_dates or ()) | set(dtype or ())
+                        schema.convert_timestamps(chunk, skip=skip)
+                        streamed += len(chunk)
+                        yield chunk
+                return
+            except (ValueError, TypeError, OverflowError) as e:
+                log_event(logger, 'schema_mismatch', level=logging.WARNING,
+                          file=filename, error=str(e), rows_streamed=streamed)
+        
+        # Untyped (re-)read, resuming after the rows already yielded
+        reader = pd.read_csv(file_path, chunksize=chunk_rows, usecols=usecols,
+                             dtype=dtype or None, parse_dates=parse_dates,
+                             skiprows=range(1, streamed + 1) if streamed else None)
+        with reader:
+            for chunk in reader:
+                chunk.index = chunk.index + streamed
+                yield chunk
     
+    @traced()
+    def query(self, filename: str, columns: Optional[List[str]] = None,
+              place_id: Any = None, start_date: Any = None, end_date: Any = None,
+              date_column: str = 'created', active_only: bool = False,
+              filters: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+        """
+        Loads the rows of a table that match the given filters.
+        
+        The filters mirror the loader and helper filters: place_id selects one
+        or more places, start_date/end_date the inclusive range of
+        helpers.filter_by_date_range and active_only the rows kept by
+        filter_active_merchants. On the 'sql' backend they are compiled into
+        one SELECT of only the requested columns (importing the CSV first if
+        it is new or changed); on the 'csv' backend the loaded table is
+        filtered in memory.
+        
+        Args:
+            filename (str): Name of the CSV file, e.g. 'fct_orders.csv'.
+            columns (List[str], optional): Columns to return (all if omitted).
+            place_id (optional): Place id or list of place ids.
+            start_date (optional): Inclusive lower bound, e.g. '2023-01-01'.
+            end_date (optional): Inclusive upper bound.
+            date_column (str): Column the date range applies to.
+            active_only (bool): Keep rows with a NULL termination_date only.
+            filters (Dict[str, Any], optional): Further column to value(s)
+                conditions; None means NULL and a list means any of.
+        
+        Returns:
+            pd.DataFrame: The matching rows with a fresh RangeIndex.
+        
+        Raises:
+            FileNotFoundError: If the file does not exist.
+            ValueError: If a column does not exist.
+        """
+        file_path = f"{self.data_path}/{filename}"
+        
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+        
+        conditions = dict(filters or {})
+        if place_id is not None:
+            conditions['place_id'] = place_id
+        if active_only:
+            conditions['termination_date'] = None
+        ranged = start_date is not None or end_date is not None
+        
+        if self.store is not None:
+            schema = get_schema(filename) if self.apply_schema else None
+            # Same-named files in different folders must not share a table
+            relative = os.path.relpath(file_path, self.data_path).replace(os.sep, '/')
+            table = os.path.splitext(relative)[0]
+            self.store.import_csv(file_path, table, schema)
+            df = self.store.query(table, columns, conditions,
+                                  date_column if ranged else None,
+                                  start_date, end_date, schema)
+        else:
+            df = self._filter(self.load_csv(filename), columns, conditions,
+                              date_column if ranged else None, start_date, end_date)
+        log_event(logger, 'table_queried', file=filename, rows=len(df), backend=self.backend)
+        return df
+    
+    @traced()
     def merge_datasets(self, left_df: pd.DataFrame, right_df: pd.DataFrame, 
                       on: str, how: str = 'inner') -> pd.DataFrame:
         """
         Merges two datasets on a common key.
         
+        Left and inner joins against a right side with unique keys and no
+        other shared columns (the fact-to-dimension case) gather the right
+        columns by row position instead of hash-joining and copying both
+        sides; the result matches pd.merge. Anything else, including keys of
+        different dtypes that are not both numeric (e.g. strings against
+        integers, which pd.merge rejects), uses pd.merge.
+        
         Args:
             left_df (pd.DataFrame): Left dataset.
             right_df (pd.DataFrame): Right dataset.
@@ -73,14 +328,41 @@ class DataLoader:
         Returns:
             pd.DataFrame: Merged dataset.
         """
-        merged_df = pd.merge(left_df, right_df, on=on, how=how)
-        print(f"Merged datasets: {len(merged_df)} rows")
+        shared = set(left_df.columns) & set(right_df.columns)
+        left_key, right_key = left_df[on].dtype, right_df[on].dtype
+        comparable = left_key == right_key or all(
+            pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+            for dtype in (left_key, right_key))
+        if how in ('left', 'inner') and shared == {on} and comparable \
+                and right_df[on].is_unique:
+            dimension = DimensionIndex(right_df, key=on)
+            merged_df = dimension.attach(left_df, on, prefix='', how=how).reset_index(drop=True)
+        else:
+            merged_df = pd.merge(left_df, right_df, on=on, how=how)
+        log_event(logger, 'datasets_merged', on=on, how=how, rows=len(merged_df))
         return merged_df
     
+    def star_schema(self) -> StarSchema:
+        """
+        Returns the loader's star schema, creating it on first use.
+        
+        Dimension tables are loaded through this loader and indexed the first
+        time a join needs them, then reused by every later join.
+        
+        Returns:
+            StarSchema: The shared schema.
+        """
+        if self._star_schema is None:
+            self._star_schema = StarSchema(loader=self)
+        return self._star_schema
+    
     def filter_active_merchants(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Filters DataFrame to include only active merchants.
         
+        To read only the active rows in the first place, use
+        query('dim_places.csv', active_only=True).
+        
         Args:
             df (pd.DataFrame): DataFrame containing merchant data with 'termination_date' column.
         
@@ -89,5 +371,165 @@ class DataLoader:
         """
         # Active merchants have NULL termination_date
         active_df = df[df['termination_date'].isnull()]
-        print(f"Active merchants: {len(active_df)} out of {len(df)}")
+        log_event(logger, 'active_merchants', active=len(active_df), total=len(df))
         return active_df
+    
+    def clear_cache(self) -> int:
+        """
+        Removes all cached columnar files.
+        
+        Returns:
+            int: Number of cache files removed.
+        """
+        if not os.path.isdir(self.cache_dir):
+            return 0
+        
+        removed = 0
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(CACHE_SUFFIX):
+                os.remove(os.path.join(self.cache_dir, name))
+                removed += 1
+        return removed
+    
+    def _filter(self, df: pd.DataFrame, columns: Optional[List[str]],
+                conditions: Dict[str, Any], date_column: Optional[str],
+                start_date: Any, end_date: Any) -> pd.DataFrame:
+        """
+        Applies query() filters and projection to a loaded table in memory.
+        
+        Args:
+            df (pd.DataFrame): The loaded table.
+            columns (List[str], optional): Columns to return (all if omitted).
+            conditions (Dict[str, Any]): Column to required value(s).
+            date_column (str, optional): Column the date range applies to.
+            start_date: Inclusive lower bound.
+            end_date: Inclusive upper bound.
+        
+        Returns:
+            pd.DataFrame: The matching rows with a fresh RangeIndex.
+        
+        Raises:
+            ValueError: If a column does not exist.
+        """
+        referenced = list(columns or []) + list(conditions)
+        if date_column is not None:
+            referenced.append(date_column)
+        missing = [c for c in referenced if c not in df.columns]
+        if missing:
+            raise ValueError(f"Table has no column(s) {missing}")
+        
+        mask = pd.Series(True, index=df.index)
+        for name, value in conditions.items():
+            if value is None:
+                mask &= df[name].isna()
+            elif pd.api.types.is_list_like(value):
+                mask &= df[name].isin(list(value))
+            else:
+                mask &= df[name] == value
+        if date_column is not None:
+            dates = df[date_column]
+            numeric = not pd.api.types.is_datetime64_any_dtype(dates)
+            if start_date is not None:
+                mask &= dates >= date_bound(start_date, numeric)
+            if end_date is not None:
+                mask &= dates <= date_bound(end_date, numeric)
+        
+        df = df.loc[mask.fillna(False).to_numpy(dtype=bool)]
+        if columns:
+            df = df[list(columns)]
+        return df.reset_index(drop=True)
+    
+    def _cache_path(self, file_path: str, **options) -> str:
+        """
+        Builds the cache file path for a source file.
+        
+        The name is '<table>-<source>-<version>': <source> digests the file's
+        path relative to data_path and the load options, <version> its size
+        and mtime. Same-named tables in different folders, or one table loaded
+        with different options, get separate entries; a changed file gets a
+        new version and _write_cache drops the old one.
+        
+        Args:
+            file_path (str): Path to the source CSV.
+            **options: Load options that affect the parsed result.
+        
+        Returns:
+            str: Path of the cache file for the current source version.
+        """
+        relative = os.path.relpath(file_path, self.data_path).replace(os.sep, '/')
+        source = repr((relative, sorted(options.items())))
+        source_digest = hashlib.sha1(source.encode('utf-8')).hexdigest()[:12]
+        stat = os.stat(file_path)
+        version = repr((stat.st_size, stat.st_mtime_ns))
+        version_digest = hashlib.sha1(version.encode('utf-8')).hexdigest()[:16]
+        table = os.path.splitext(os.path.basename(file_path))[0]
+        return os.path.join(self.cache_dir,
+                            f"{table}-{source_digest}-{version_digest}{CACHE_SUFFIX}")
+    
+    def _read_cache(self, cache_path: str) -> pd.DataFrame:
+        """
+        Reads a cached table by memory-mapping its Arrow IPC file.
+        
+        Args:
+            cache_path (str): Path of the cache file.
+        
+        Returns:
+            pd.DataFrame: The cached dataset.
+        """
+        with pa.memory_map(cache_path, 'r') as source:
+            table = pa_ipc.open_file(source).read_all()
+        return table.to_pandas()
+    
+    def _iter_cache(self, cache_path: str, chunk_rows: int,
+                    usecols: Optional[List[str]],
+                    dtype: Optional[Dict[str, str]]) -> Iterator[pd.DataFrame]:
+        """
+        Yields zero-copy slices of a memory-mapped cache file as DataFrames.
+        
+        Args:
+            cache_path (str): Path of the cache file.
+            chunk_rows (int): Maximum number of rows per chunk.
+            usecols (List[str], optional): Columns to project.
+            dtype (Dict[str, str], optional): Column dtypes to apply per chunk.
+        
+        Yields:
+            pd.DataFrame: Consecutive chunks of the cached dataset.
+        """
+        with pa.memory_map(cache_path, 'r') as source:
+            table = pa_ipc.open_file(source).read_all()
+            if usecols is not None:
+                wanted = set(usecols)
+                table = table.select([c for c in table.column_names if c in wanted])
+            for offset in range(0, table.num_rows, chunk_rows):
+                chunk = table.slice(offset, chunk_rows).to_pandas()
+                chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+                yield chunk.astype(dtype) if dtype else chunk
+    
+    def _write_cache(self, df: pd.DataFrame, cache_path: str) -> None:
+        """
+        Writes a table to the cache and drops older versions of the same entry.
+        
+        Only files with the same table, source path and load options (the
+        '<table>-<source>-' prefix) are removed.
+        
+        The file is written to a temporary name and then renamed, so a reader
+        never sees a partially written cache file.
+        
+        Args:
+            df (pd.DataFrame): The parsed dataset.
+            cache_path (str): Path of the cache file to create.
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with pa_ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, cache_path)
+        
+        prefix = os.path.basename(cache_path).rsplit('-', 1)[0] + '-'  # '<table>-<source>-'
+        for name in os.listdir(self.cache_dir):
+            stale = os.path.join(self.cache_dir, name)
+            if name.startswith(prefix) and name.endswith(CACHE_SUFFIX) and stale != cache_path:
+                os.remove(stale)
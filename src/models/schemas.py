@@ -0,0 +1,216 @@
+"""
+File: schemas.py
+Description: Per-table schema registry with compact column dtypes for the dim_/fct_ tables.
+Dependencies: pandas
+Author: Sample Team
+
+Every table in the data release is keyed by its file name without extension
+(e.g. 'fct_orders'). A schema declares which columns are categorical, which
+integers can be downcast, which 0/1/NULL flags are nullable booleans and which
+columns hold UNIX timestamps. DataLoader passes the dtypes to pd.read_csv so
+they are applied while parsing instead of converting inferred columns later.
+"""
+
+import pandas as pd
+from typing import Dict, Iterable, Optional
+
+
+class TableSchema:
+    """
+    Declares compact dtypes for the columns of one table.
+    
+    Columns that are not mentioned keep pandas' inferred dtype, so a schema only
+    needs to list the columns worth shrinking.
+    
+    Attributes:
+        name (str): Table name, e.g. 'fct_orders'.
+        categories (tuple): Low-cardinality string columns stored as 'category'.
+        integers (Dict[str, str]): Integer columns and their (nullable) dtype.
+        booleans (tuple): 0/1/NULL flag columns stored as nullable 'boolean'.
+        floats (Dict[str, str]): Float columns and their dtype.
+        timestamps (tuple): UNIX-second columns converted to datetime64[s].
+    
+    Methods:
+        read_dtypes(columns): Returns the dtype mapping for pd.read_csv.
+        convert_timestamps(df): Converts timestamp columns in place.
+    """
+    
+    def __init__(self, name: str, categories: Iterable[str] = (),
+                 integers: Optional[Dict[str, str]] = None,
+                 booleans: Iterable[str] = (),
+                 floats: Optional[Dict[str, str]] = None,
+                 timestamps: Iterable[str] = ()):
+        """
+        Initialize a TableSchema.
+        
+        Args:
+            name (str): Table name, e.g. 'fct_orders'.
+            categories (Iterable[str]): Columns stored as 'category'.
+            integers (Dict[str, str], optional): Integer columns and their dtype.
+            booleans (Iterable[str]): Flag columns stored as nullable 'boolean'.
+            floats (Dict[str, str], optional): Float columns and their dtype.
+            timestamps (Iterable[str]): UNIX-second columns converted to datetimes.
+        """
+        self.name = name
+        self.categories = tuple(categories)
+        self.integers = dict(integers or {})
+        self.booleans = tuple(booleans)
+        self.floats = dict(floats or {})
+        self.timestamps = tuple(timestamps)
+    
+    def read_dtypes(self, columns: Optional[Iterable[str]] = None) -> Dict[str, str]:
+        """
+        Returns the dtype mapping to pass to pd.read_csv.
+        
+        Timestamps are read as nullable 'Int64' so that missing values do not
+        force the column to float64.
+        
+        Args:
+            columns (Iterable[str], optional): Restrict the mapping to these columns.
+        
+        Returns:
+            Dict[str, str]: Column name to dtype.
+        """
+        dtypes = {column: 'category' for column in self.categories}
+        dtypes.update(self.integers)
+        dtypes.update({column: 'boolean' for column in self.booleans})
+        dtypes.update(self.floats)
+        dtypes.update({column: 'Int64' for column in self.timestamps})
+        
+        if columns is not None:
+            wanted = set(columns)
+            dtypes = {c: t for c, t in dtypes.items() if c in wanted}
+        return dtypes
+    
+    def convert_timestamps(self, df: pd.DataFrame,
+                           skip: Iterable[str] = ()) -> pd.DataFrame:
+        """
+        Converts the declared UNIX timestamp columns to datetime64[s] in place.
+        
+        Args:
+            df (pd.DataFrame): DataFrame read with read_dtypes().
+            skip (Iterable[str]): Columns to leave untouched.
+        
+        Returns:
+            pd.DataFrame: The same DataFrame, for chaining.
+        """
+        skipped = set(skip)
+        for column in self.timestamps:
+            if column in df.columns and column not in skipped \
+                    and pd.api.types.is_integer_dtype(df[column]):
+                df[column] = df[column].astype('datetime64[s]')
+        return df
+    
+    def __repr__(self) -> str:
+        return (f"TableSchema(name={self.name!r}, categories={self.categories!r}, "
+                f"integers={self.integers!r}, booleans={self.booleans!r}, "
+                f"floats={self.floats!r}, timestamps={self.timestamps!r})")
+
+
+SCHEMAS: Dict[str, TableSchema] = {}
+
+
+def register_schema(schema: TableSchema) -> TableSchema:
+    """
+    Adds or replaces a table schema in the registry.
+    
+    Args:
+        schema (TableSchema): The schema to register.
+    
+    Returns:
+        TableSchema: The registered schema.
+    """
+    SCHEMAS[schema.name] = schema
+    return schema
+
+
+def get_schema(table: str) -> Optional[TableSchema]:
+    """
+    Looks up the schema for a table name or CSV file name.
+    
+    Args:
+        table (str): Table name ('fct_orders') or file name ('fct_orders.csv').
+    
+    Returns:
+        TableSchema or None: The registered schema, if any.
+    """
+    name = table.rsplit('/', 1)[-1]
+    if name.endswith('.csv'):
+        name = name[:-len('.csv')]
+    return SCHEMAS.get(name)
+
+
+register_schema(TableSchema(
+    'dim_places',
+    integers={'id': 'int64', 'onboarded_by': 'Int64', 'area_id': 'Int64',
+              'cuisine_id': 'Int64', 'chain_id': 'Int64'},
+    booleans=('bankrupt', 'duplicate', 'transferred_contract', 'seasonal', 'dormant'),
+    timestamps=('created', 'updated', 'contract_start', 'termination_date'),
+))
+
+register_schema(TableSchema(
+    'dim_items',
+    categories=('unit', 'type', 'status'),
+    integers={'id': 'int64', 'place_id': 'Int32', 'stock_category_id': 'Int64'},
+    floats={'quantity': 'float32', 'threshold': 'float32'},
+    timestamps=('created', 'updated'),
+))
+
+register_schema(TableSchema(
+    'dim_menu_items',
+    categories=('status', 'type'),
+    integers={'id': 'int64', 'place_id': 'Int32', 'section_id': 'Int64'},
+    timestamps=('created', 'updated'),
+))
+
+register_schema(TableSchema(
+    'dim_bill_of_materials',
+    categories=('unit',),
+    integers={'id': 'int64', 'parent_sku_id': 'Int64', 'sku_id': 'Int64',
+              'menu_item_id': 'Int64', 'item_id': 'Int64'},
+    timestamps=('created', 'updated'),
+))
+
+register_schema(TableSchema(
+    'dim_taxonomy_terms',
+    categories=('vocabulary',),
+    integers={'id': 'int64'},
+    timestamps=('created', 'updated'),
+))
+
+register_schema(TableSchema(
+    'dim_users',
+    categories=('type',),
+    integers={'id': 'int64', 'place_id': 'Int32'},
+    timestamps=('created', 'updated'),
+))
+
+register_schema(TableSchema(
+    'fct_orders',
+    categories=('type', 'channel', 'platform', 'status', 'payment_method', 'source'),
+    integers={'id': 'int64', 'place_id': 'Int32', 'user_id': 'Int64',
+              'customer_id': 'Int64', 'table_id': 'Int64'},
+    timestamps=('created', 'updated', 'promise_time', 'pickup_time'),
+))
+
+register_schema(TableSchema(
+    'fct_order_items',
+    categories=('status',),
+    integers={'id': 'int64', 'order_id': 'Int64', 'item_id': 'Int64',
+              'menu_item_id': 'Int64', 'place_id': 'Int32'},
+    timestamps=('created', 'updated'),
+))
+
+register_schema(TableSchema(
+    'fct_inventory_reports',
+    integers={'id': 'int64', 'item_id': 'Int64', 'location_id': 'Int32',
+              'place_id': 'Int32'},
+    timestamps=('report_date', 'expiration_date', 'created', 'updated'),
+))
+
+register_schema(TableSchema(
+    'fct_payments',
+    categories=('type', 'status'),
+    integers={'id': 'int64', 'place_id': 'Int32', 'order_id': 'Int64'},
+    timestamps=('created', 'updated'),
+))
@@ -0,0 +1,408 @@
+"""
+File: sql_store.py
+Description: Embedded SQLite copy of the CSV releases with pushed-down filters.
+Dependencies: pandas, numpy, sqlalchemy (optional, for the SQL backend)
+Author: Sample Team
+
+Reading one place's orders for one month from the CSV release parses every row
+of the file. Here each CSV is imported once into an indexed SQLite file (no
+server), and the loader's filters (place ids, a date range, active merchants,
+equality on any column) are compiled into the WHERE clause of a SELECT over
+the requested columns only, so such a read touches just the matching index
+range. Like the columnar cache, an import is keyed by the source file's size
+and mtime, and a replaced CSV is re-imported on its next read.
+"""
+
+import logging
+import os
+import threading
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.models.schemas import TableSchema
+from src.utils.instrumentation import log_event
+
+try:
+    import sqlalchemy as sa
+except ImportError:  # pragma: no cover - the SQL backend is unavailable
+    sa = None
+
+
+DEFAULT_DB_NAME = 'warehouse.sqlite'
+IMPORT_CHUNK_ROWS = 100_000
+IMPORTS_TABLE = '_imports'
+
+# Columns indexed on import when a table has them
+INDEX_COLUMNS = ('id', 'place_id', 'item_id', 'order_id', 'created', 'termination_date')
+# Column pairs indexed together for per-place, per-date-range reads
+COMPOSITE_INDEXES = (('place_id', 'created'),)
+
+logger = logging.getLogger(__name__)
+
+
+def date_bound(value: Any, numeric: bool) -> Any:
+    """
+    Converts a date range bound to the representation of the stored column.
+    
+    Bounds follow helpers.filter_by_date_range: a 'YYYY-MM-DD' string means
+    midnight (UTC) of that day, and both ends are inclusive.
+    
+    Args:
+        value: Date string, datetime or pd.Timestamp.
+        numeric (bool): Whether the column holds UNIX seconds.
+    
+    Returns:
+        int or pd.Timestamp: UNIX seconds, or the timestamp itself.
+    """
+    timestamp = pd.Timestamp(value)
+    if numeric:
+        return int(timestamp.timestamp())
+    return timestamp
+
+
+def _scalar(value: Any) -> Any:
+    """Unwraps numpy scalars, which sqlite3 cannot bind."""
+    return value.item() if isinstance(value, np.generic) else value
+
+
+class SqlStore:
+    """
+    Indexed SQLite file holding imported CSV tables.
+    
+    Every table gets single-column indexes on the INDEX_COLUMNS it has and a
+    composite (place_id, created) index, so place and date predicates are
+    answered from an index range. Imports run in one transaction: readers
+    keep seeing the previous import until the new one is committed.
+    
+    Attributes:
+        path (str): Path of the SQLite file.
+        engine (sqlalchemy.engine.Engine): Engine bound to the file.
+        chunk_rows (int): CSV rows parsed and inserted per batch on import.
+    
+    Methods:
+        import_csv(file_path, table, schema): Imports a CSV unless already current.
+        is_current(table, file_path): Whether the import matches the source file.
+        select(table, ...): Compiles columns and filters into a SELECT statement.
+        query(table, ...): Runs the compiled SELECT and returns a DataFrame.
+        explain(statement): SQLite's query plan for a compiled SELECT.
+        tables(): Names of the imported tables.
+    """
+    
+    def __init__(self, path: str, chunk_rows: int = IMPORT_CHUNK_ROWS):
+        """
+        Initialize a SqlStore, creating the database file on first use.
+        
+        Args:
+            path (str): Path of the SQLite file.
+            chunk_rows (int): CSV rows parsed and inserted per batch on import.
+        
+        Raises:
+            ImportError: If sqlalchemy is not installed.
+        """
+        if sa is None:
+            raise ImportError("The SQL backend requires sqlalchemy")
+        
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.engine = sa.create_engine(f"sqlite:///{path}")
+        self.chunk_rows = chunk_rows
+        self._lock = threading.Lock()
+        self._reflected = {}
+        self._categories = {}
+        
+        metadata = sa.MetaData()
+        self._imports = sa.Table(
+            IMPORTS_TABLE, metadata,
+            sa.Column('table_name', sa.String, primary_key=True),
+            sa.Column('size', sa.Integer),
+            sa.Column('mtime_ns', sa.Integer),
+            sa.Column('rows', sa.Integer),
+        )
+        metadata.create_all(self.engine)
+    
+    def is_current(self, table: str, file_path: str) -> bool:
+        """
+        Checks whether a table was imported from the current version of a file.
+        
+        Args:
+            table (str): Table name.
+            file_path (str): Path to the source CSV.
+        
+        Returns:
+            bool: True if size and mtime match the recorded import.
+        """
+        stat = os.stat(file_path)
+        statement = sa.select(self._imports.c.size, self._imports.c.mtime_ns).where(
+            self._imports.c.table_name == table)
+        with self.engine.connect() as connection:
+            recorded = connection.execute(statement).first()
+        return recorded is not None and tuple(recorded) == (stat.st_size, stat.st_mtime_ns)
+    
+    def import_csv(self, file_path: str, table: Optional[str] = None,
+                   schema: Optional[TableSchema] = None) -> bool:
+        """
+        Imports a CSV file into the database unless the import is current.
+        
+        Rows are parsed with the schema's dtypes (timestamps stay UNIX seconds)
+        and inserted in batches of chunk_rows, then the table is indexed.
+        
+        Args:
+            file_path (str): Path to the source CSV.
+            table (str, optional): Table name. Defaults to the file's base name.
+            schema (TableSchema, optional): Dtypes used while parsing.
+        
+        Returns:
+            bool: True if the file was imported, False if it was already current.
+        """
+        table = table or os.path.splitext(os.path.basename(file_path))[0]
+        with self._lock:
+            if self.is_current(table, file_path):
+                return False
+            
+            dtypes = schema.read_dtypes() if schema is not None else None
+            try:
+                rows = self._import(file_path, table, dtypes)
+            except (ValueError, TypeError, OverflowError) as e:
+                if dtypes is None:
+                    raise
+                log_event(logger, 'schema_mismatch', level=logging.WARNING,
+                          table=table, error=str(e))
+                rows = self._import(file_path, table, None)
+            self._reflected.pop(table, None)
+            self._categories.pop(table, None)
+        log_event(logger, 'table_imported', table=table, rows=rows, database=self.path)
+        return True
+    
+    def select(self, table: str, columns: Optional[Iterable[str]] = None,
+               filters: Optional[Dict[str, Any]] = None,
+               date_column: Optional[str] = None, start_date: Any = None,
+               end_date: Any = None):
+        """
+        Compiles a projection and filters into a SELECT statement.
+        
+        A filter value of None becomes IS NULL, a list-like becomes IN and
+        anything else an equality test. Rows come back in CSV order.
+        
+        Args:
+            table (str): Table name.
+            columns (Iterable[str], optional): Columns to select (all if omitted).
+            filters (Dict[str, Any], optional): Column to required value(s).
+            date_column (str, optional): Column the date range applies to.
+            start_date: Inclusive lower bound, e.g. '2023-01-01'.
+            end_date: Inclusive upper bound.
+        
+        Returns:
+            sqlalchemy.Select: The compiled statement.
+        
+        Raises:
+            ValueError: If the table is not imported or a column does not exist.
+        """
+        source = self._table(table)
+        referenced = list(columns or []) + list(filters or {})
+        if date_column is not None:
+            referenced.append(date_column)
+        missing = [c for c in referenced if c not in source.c]
+        if missing:
+            raise ValueError(f"Table {table} has no column(s) {missing}")
+        
+        statement = sa.select(*[source.c[c] for c in columns]) if columns else sa.select(source)
+        for name, value in (filters or {}).items():
+            column = source.c[name]
+            if value is None:
+                statement = statement.where(column.is_(None))
+            elif pd.api.types.is_list_like(value):
+                statement = statement.where(column.in_([_scalar(v) for v in value]))
+            else:
+                statement = statement.where(column == _scalar(value))
+        
+        if date_column is not None:
+            column = source.c[date_column]
+            numeric = isinstance(column.type, (sa.Integer, sa.Float, sa.Numeric))
+            if start_date is not None:
+                bound = date_bound(start_date, numeric)
+                statement = statement.where(column >= (bound if numeric else str(bound)))
+            if end_date is not None:
+                bound = date_bound(end_date, numeric)
+                statement = statement.where(column <= (bound if numeric else str(bound)))
+        # Index scans return rows in key order; keep the CSV's row order instead
+        return statement.order_by(sa.literal_column(f'"{table}".rowid'))
+    
+    def query(self, table: str, columns: Optional[Iterable[str]] = None,
+              filters: Optional[Dict[str, Any]] = None,
+              date_column: Optional[str] = None, start_date: Any = None,
+              end_date: Any = None, schema: Optional[TableSchema] = None) -> pd.DataFrame:
+        """
+        Runs a pushed-down SELECT and returns the matching rows.
+        
+        With a schema the result gets the same dtypes as DataLoader.load_csv:
+        compact integers, categoricals and datetime64[s] timestamps. A
+        categorical column carries every category of the imported table, not
+        only those in the matching rows, and an empty result keeps the dtypes
+        of the stored columns.
+        
+        Args:
+            table (str): Table name.
+            columns (Iterable[str], optional): Columns to select (all if omitted).
+            filters (Dict[str, Any], optional): Column to required value(s).
+            date_column (str, optional): Column the date range applies to.
+            start_date: Inclusive lower bound, e.g. '2023-01-01'.
+            end_date: Inclusive upper bound.
+            schema (TableSchema, optional): Dtypes applied to the result.
+        
+        Returns:
+            pd.DataFrame: Matching rows in CSV order.
+        """
+        columns = list(columns) if columns is not None else None
+        statement = self.select(table, columns, filters, date_column, start_date, end_date)
+        with self.engine.connect() as connection:
+            df = pd.read_sql(statement, connection)
+        if df.empty:
+            df = df.astype(self._stored_dtypes(table, df.columns))
+        
+        if schema is not None:
+            dtypes = schema.read_dtypes(df.columns)
+            for column in schema.categories:
+                if column in dtypes:
+                    dtypes[column] = self._category_dtype(table, column)
+            skip = []
+            for column, dtype in dtypes.items():
+                try:
+                    df[column] = df[column].astype(dtype)
+                except (ValueError, TypeError, OverflowError) as e:
+                    log_event(logger, 'schema_mismatch', level=logging.WARNING,
+                              table=table, column=column, error=str(e))
+                    skip.append(column)
+            schema.convert_timestamps(df, skip)
+        return df
+    
+    def explain(self, statement) -> List[str]:
+        """
+        Returns SQLite's query plan for a statement from select().
+        
+        Args:
+            statement (sqlalchemy.Select): The statement to explain.
+        
+        Returns:
+            List[str]: One line per plan step, e.g. 'SEARCH t USING INDEX ...'.
+        """
+        compiled = statement.compile(self.engine, compile_kwargs={'literal_binds': True})
+        with self.engine.connect() as connection:
+            plan = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}").fetchall()
+        return [row[-1] for row in plan]
+    
+    def tables(self) -> List[str]:
+        """
+        Returns the names of the imported tables.
+        
+        Returns:
+            List[str]: Table names in import order.
+        """
+        with self.engine.connect() as connection:
+            rows = connection.execute(sa.select(self._imports.c.table_name)).fetchall()
+        return [row[0] for row in rows]
+    
+    def _import(self, file_path: str, table: str,
+                dtypes: Optional[Dict[str, str]]) -> int:
+        """
+        Replaces a table with the contents of a CSV file in one transaction.
+        
+        Args:
+            file_path (str): Path to the source CSV.
+            table (str): Table name.
+            dtypes (Dict[str, str], optional): Dtypes passed to pd.read_csv.
+        
+        Returns:
+            int: Number of rows imported.
+        """
+        stat = os.stat(file_path)
+        rows = 0
+        columns = []
+        with self.engine.begin() as connection:
+            connection.exec_driver_sql(f'DROP TABLE IF EXISTS "{table}"')
+            reader = pd.read_csv(file_path, chunksize=self.chunk_rows, dtype=dtypes)
+            with reader:
+                for chunk in reader:
+                    chunk.to_sql(table, connection, if_exists='append', index=False)
+                    rows += len(chunk)
+                    columns = list(chunk.columns)
+            
+            indexes = [(c,) for c in INDEX_COLUMNS if c in columns]
+            indexes += [pair for pair in COMPOSITE_INDEXES if set(pair) <= set(columns)]
+            for indexed in indexes:
+                name = f"ix_{table}_{'_'.join(indexed)}"
+                quoted = ', '.join(f'"{c}"' for c in indexed)
+                connection.exec_driver_sql(f'CREATE INDEX "{name}" ON "{table}" ({quoted})')
+            
+            connection.execute(self._imports.delete().where(
+                self._imports.c.table_name == table))
+            connection.execute(self._imports.insert().values(
+                table_name=table, size=stat.st_size, mtime_ns=stat.st_mtime_ns, rows=rows))
+        return rows
+    
+    def _category_dtype(self, table: str, column: str) -> pd.CategoricalDtype:
+        """
+        Returns the categorical dtype of a column over the whole imported table.
+        
+        Args:
+            table (str): Table name.
+            column (str): Column name.
+        
+        Returns:
+            pd.CategoricalDtype: The column's sorted distinct non-null values.
+        """
+        source = self._table(table)
+        with self._lock:
+            cached = self._categories.setdefault(table, {})
+            if column not in cached:
+                statement = sa.select(source.c[column]).distinct() \
+                    .where(source.c[column].is_not(None))
+                with self.engine.connect() as connection:
+                    values = [row[0] for row in connection.execute(statement)]
+                cached[column] = pd.CategoricalDtype(pd.Index(values).sort_values())
+            return cached[column]
+    
+    def _stored_dtypes(self, table: str, columns: Iterable[str]) -> Dict[str, str]:
+        """
+        Returns the dtypes pd.read_sql gives the stored columns of a non-empty result.
+        
+        Args:
+            table (str): Table name.
+            columns (Iterable[str]): Result columns.
+        
+        Returns:
+            Dict[str, str]: Column name to dtype, for integer, real and boolean columns.
+        """
+        source = self._table(table)
+        dtypes = {}
+        for column in columns:
+            stored = source.c[column].type
+            if isinstance(stored, sa.Boolean):
+                dtypes[column] = 'bool'
+            elif isinstance(stored, sa.Integer):
+                dtypes[column] = 'int64'
+            elif isinstance(stored, (sa.Float, sa.Numeric)):
+                dtypes[column] = 'float64'
+        return dtypes
+    
+    def _table(self, table: str):
+        """
+        Returns the reflected table, reflecting it on first use.
+        
+        Args:
+            table (str): Table name.
+        
+        Returns:
+            sqlalchemy.Table: The table's column metadata.
+        
+        Raises:
+            ValueError: If the table has not been imported.
+        """
+        with self._lock:
+            if table not in self._reflected:
+                if not sa.inspect(self.engine).has_table(table):
+                    raise ValueError(f"Table {table} is not imported")
+                self._reflected[table] = sa.Table(table, sa.MetaData(),
+                                                  autoload_with=self.engine)
+            return self._reflected[table]
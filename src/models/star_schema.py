@@ -0,0 +1,330 @@
+"""
+File: star_schema.py
+Description: Keyed dimension lookups for enriching fact tables by gather instead of merge.
+Dependencies: pandas, numpy
+Author: Sample Team
+
+Every analysis joins fct_ tables to the same few dim_ tables. A pd.merge
+hash-joins both sides from scratch and copies every column each time, even
+when only a title is needed. Here each dimension is indexed once (id -> row
+position), a fact key column is turned into row positions with one lookup,
+and only the requested attributes are gathered with a vectorised take.
+"""
+
+import threading
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, Optional, Union
+
+
+# Fact column that references each dimension by default
+DIMENSION_KEYS = {
+    'dim_places': 'place_id',
+    'dim_items': 'item_id',
+    'dim_menu_items': 'menu_item_id',
+    'dim_taxonomy_terms': None,
+}
+
+# Largest id range (relative to the row count) served by a dense lookup array
+DENSE_RANGE_FACTOR = 4
+
+
+def attribute_prefix(on: str) -> str:
+    """
+    Derives the prefix for gathered attributes from a fact key column.
+    
+    Args:
+        on (str): Fact key column, e.g. 'item_id' or 'cuisine_id'.
+    
+    Returns:
+        str: 'item_' for 'item_id', '<on>_' for columns not ending in '_id'.
+    """
+    return on[:-len('id')] if on.endswith('_id') else f'{on}_'
+
+
+class DimensionIndex:
+    """
+    Maps dimension keys to row positions of a dimension table.
+    
+    Integer ids with a compact range (the usual case for the dim_ tables) are
+    resolved through a dense position array, so a lookup is one subtraction
+    and one gather per fact row. Other keys go through a hashed pd.Index that
+    is built once and reused for every lookup.
+    
+    Attributes:
+        table (pd.DataFrame): The dimension rows (not copied).
+        key (str): Name of the key column ('id').
+        name (str): Dimension name, used in error messages.
+    
+    Methods:
+        positions(keys): Row positions for fact keys (-1 when not found).
+        take(keys, columns): Dimension attributes aligned to fact keys.
+        attach(fact, on, columns): Fact frame with dimension attributes added.
+    """
+    
+    def __init__(self, table: pd.DataFrame, key: str = 'id', name: Optional[str] = None):
+        """
+        Indexes a dimension table.
+        
+        Args:
+            table (pd.DataFrame): Dimension rows with unique keys.
+            key (str): Name of the key column.
+            name (str, optional): Dimension name for error messages.
+        
+        Raises:
+            ValueError: If the key column is missing or not unique.
+        """
+        if key not in table.columns:
+            raise ValueError(f"Dimension {name or 'table'} has no key column '{key}'")
+        
+        self.table = table
+        self.key = key
+        self.name = name or key
+        self._index = pd.Index(table[key])
+        if not self._index.is_unique:
+            raise ValueError(f"Dimension {self.name} has duplicate keys in '{key}'")
+        
+        self._low = 0
+        self._lookup = None
+        keys = table[key]
+        if isinstance(keys.dtype, np.dtype) and keys.dtype.kind in 'iu' and len(keys):
+            raw = keys.to_numpy().astype(np.int64)
+            low, high = int(raw.min()), int(raw.max())
+            if high - low < DENSE_RANGE_FACTOR * len(raw) + 1024:
+                self._low = low
+                self._lookup = np.full(high - low + 1, -1, dtype=np.int64)
+                self._lookup[raw - low] = np.arange(len(raw))
+    
+    def __len__(self) -> int:
+        return len(self.table)
+    
+    def positions(self, keys: Union[pd.Series, np.ndarray]) -> np.ndarray:
+        """
+        Resolves fact keys to dimension row positions.
+        
+        Args:
+            keys (pd.Series | np.ndarray): Fact key values; missing values are allowed.
+        
+        Returns:
+            np.ndarray: int64 row position per key, -1 for missing or unknown keys.
+        """
+        keys = keys if isinstance(keys, pd.Series) else pd.Series(keys)
+        if self._lookup is None or keys.dtype.kind not in 'iu':
+            return self._index.get_indexer(keys)
+        
+        offsets = keys.to_numpy(dtype=np.int64, na_value=self._low - 1) - self._low
+        inside = (offsets >= 0) & (offsets < len(self._lookup))
+        if inside.all():
+            return self._lookup[offsets]
+        positions = np.full(len(offsets), -1, dtype=np.int64)
+        positions[inside] = self._lookup[offsets[inside]]
+        return positions
+    
+    def take(self, keys: Union[pd.Series, np.ndarray], columns: Optional[Iterable[str]] = None,
+             positions: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """
+        Gathers dimension attributes for each fact key.
+        
+        Unknown keys get missing values; integer columns then become float, as
+        they would in a left pd.merge.
+        
+        Args:
+            keys (pd.Series | np.ndarray): Fact key values.
+            columns (Iterable[str], optional): Attributes to gather (all non-key
+                columns by default).
+            positions (np.ndarray, optional): Precomputed positions for keys.
+        
+        Returns:
+            pd.DataFrame: One row per key, indexed like keys when it is a Series.
+        """
+        if positions is None:
+            positions = self.positions(keys)
+        columns = self._columns(columns)
+        index = keys.index if isinstance(keys, pd.Series) else None
+        fill = not len(positions) or bool((positions < 0).any())
+        
+        gathered = {column: self.table[column].array.take(positions, allow_fill=fill)
+                    for column in columns}
+        return pd.DataFrame(gathered, index=index, copy=False)
+    
+    def attach(self, fact: pd.DataFrame, on: str, columns: Optional[Iterable[str]] = None,
+               prefix: Optional[str] = None, how: str = 'left') -> pd.DataFrame:
+        """
+        Returns the fact rows with dimension attributes added.
+        
+        The fact frame is not modified and its existing columns are not copied.
+        
+        Args:
+            fact (pd.DataFrame): Fact rows.
+            on (str): Fact column holding the dimension key.
+            columns (Iterable[str], optional): Attributes to attach (all by default).
+            prefix (str, optional): Prefix for the attached columns. Defaults to
+                the key's stem ('item_' for 'item_id'); pass '' to keep names.
+            how (str): 'left' keeps every fact row, 'inner' drops rows whose key
+                is not in the dimension.
+        
+        Returns:
+            pd.DataFrame: Enriched fact rows.
+        
+        Raises:
+            ValueError: If how is not 'left' or 'inner'.
+        """
+        if how not in ('left', 'inner'):
+            raise ValueError(f"Unsupported join type '{how}'. Use 'left' or 'inner'")
+        
+        positions = self.positions(fact[on])
+        if how == 'inner' and (positions < 0).any():
+            found = positions >= 0
+            fact, positions = fact[found], positions[found]
+        
+        prefix = attribute_prefix(on) if prefix is None else prefix
+        attributes = self.take(fact[on], columns, positions=positions)
+        result = fact.copy(deep=False)
+        for column in attributes.columns:
+            result[f'{prefix}{column}'] = attributes[column]
+        return result
+    
+    def _columns(self, columns: Optional[Iterable[str]]) -> list:
+        """
+        Validates requested attribute names.
+        
+        Args:
+            columns (Iterable[str], optional): Requested attributes.
+        
+        Returns:
+            list: Attribute names (all non-key columns if none were requested).
+        
+        Raises:
+            ValueError: If an attribute does not exist.
+        """
+        if columns is None:
+            return [column for column in self.table.columns if column != self.key]
+        columns = [columns] if isinstance(columns, str) else list(columns)
+        missing = [column for column in columns if column not in self.table.columns]
+        if missing:
+            raise ValueError(f"Dimension {self.name} has no column(s) {missing}")
+        return columns
+
+
+class StarSchema:
+    """
+    Lazily indexed dimension tables shared by every fact-to-dimension join.
+    
+    A dimension is loaded and indexed on first use and kept for the lifetime
+    of the schema, so repeated joins only pay for the key lookup and the
+    gather of the requested attributes.
+    
+    Attributes:
+        loader: DataLoader used to load dimensions that were not supplied.
+        key (str): Key column of every dimension table.
+    
+    Methods:
+        dimension(name): The DimensionIndex of a dimension table.
+        lookup(fact, dimension, column): One attribute aligned to the fact rows.
+        enrich(fact, dimensions): Fact frame with attributes of several dimensions.
+    """
+    
+    def __init__(self, loader=None, tables: Optional[Dict[str, pd.DataFrame]] = None,
+                 key: str = 'id'):
+        """
+        Initialize the schema.
+        
+        Args:
+            loader (DataLoader, optional): Loads '<name>.csv' for dimensions
+                missing from tables.
+            tables (Dict[str, pd.DataFrame], optional): Preloaded dimension tables.
+            key (str): Key column of the dimension tables.
+        """
+        self.loader = loader
+        self.key = key
+        self._tables = dict(tables or {})
+        self._indexes: Dict[str, DimensionIndex] = {}
+        self._lock = threading.Lock()
+    
+    def __contains__(self, name: str) -> bool:
+        return name in self._indexes
+    
+    def dimension(self, name: str) -> DimensionIndex:
+        """
+        Returns the index of a dimension table, building it on first use.
+        
+        Args:
+            name (str): Dimension table name, e.g. 'dim_items'.
+        
+        Returns:
+            DimensionIndex: The dimension's index.
+        
+        Raises:
+            ValueError: If the table was not supplied and there is no loader.
+        """
+        index = self._indexes.get(name)
+        if index is not None:
+            return index
+        
+        with self._lock:
+            if name not in self._indexes:
+                table = self._tables.pop(name, None)
+                if table is None:
+                    if self.loader is None:
+                        raise ValueError(f"Dimension {name} is not loaded")
+                    table = self.loader.load_csv(f'{name}.csv')
+                self._indexes[name] = DimensionIndex(table, key=self.key, name=name)
+            return self._indexes[name]
+    
+    def lookup(self, fact: pd.DataFrame, dimension: str, column: str,
+               on: Optional[str] = None) -> pd.Series:
+        """
+        Gathers a single dimension attribute for every fact row.
+        
+        Args:
+            fact (pd.DataFrame): Fact rows.
+            dimension (str): Dimension table name.
+            column (str): Attribute to gather.
+            on (str, optional): Fact key column (DIMENSION_KEYS default).
+        
+        Returns:
+            pd.Series: The attribute, indexed like fact.
+        """
+        keys = fact[self._fact_key(dimension, on)]
+        return self.dimension(dimension).take(keys, [column])[column]
+    
+    def enrich(self, fact: pd.DataFrame, dimensions: Dict[str, Iterable[str]],
+               on: Optional[Dict[str, str]] = None, how: str = 'left') -> pd.DataFrame:
+        """
+        Attaches attributes of several dimensions to the fact rows.
+        
+        Args:
+            fact (pd.DataFrame): Fact rows.
+            dimensions (Dict[str, Iterable[str]]): Attributes to attach per
+                dimension, e.g. {'dim_items': ['title'], 'dim_places': ['title']}.
+            on (Dict[str, str], optional): Fact key column per dimension where it
+                differs from DIMENSION_KEYS (required for dim_taxonomy_terms).
+            how (str): 'left' or 'inner', applied to every dimension.
+        
+        Returns:
+            pd.DataFrame: Fact rows with '<key stem>_<attribute>' columns added.
+        """
+        on = on or {}
+        for name, columns in dimensions.items():
+            fact = self.dimension(name).attach(fact, self._fact_key(name, on.get(name)),
+                                               columns, how=how)
+        return fact
+    
+    def _fact_key(self, dimension: str, on: Optional[str]) -> str:
+        """
+        Resolves the fact key column for a dimension.
+        
+        Args:
+            dimension (str): Dimension table name.
+            on (str, optional): Explicit fact key column.
+        
+        Returns:
+            str: Fact key column.
+        
+        Raises:
+            ValueError: If no key column is known for the dimension.
+        """
+        on = on or DIMENSION_KEYS.get(dimension)
+        if on is None:
+            raise ValueError(f"No fact key column for {dimension}; pass it explicitly")
+        return on
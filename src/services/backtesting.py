@@ -0,0 +1,510 @@
+"""
+File: backtesting.py
+Description: Rolling-origin backtests of demand forecasters for accuracy, inventory cost and runtime.
+Dependencies: pandas, numpy, scikit-learn
+Author: Sample Team
+
+Order lines are reduced once to daily quantities per place and item. Every
+forecaster is then replayed over rolling origins. At each origin it sees only
+the days up to and including the origin and is scored against the following
+days. Each place's history is held as one cumulative-sum array sorted by
+(item, day), so both the window means and the realised demand at any origin
+are two binary searches per item rather than a re-slice of raw sales. Places
+and slices of origins run as separate PlaceRunner units.
+"""
+
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from typing import Callable, Iterable, List, Optional, Union
+
+from src.services.forecasting import FORECAST_HORIZONS, GlobalModelBackend, day_numbers
+from src.services.inventory_service import InventoryService, demand_window
+from src.services.place_runner import PlaceRunner
+from src.utils.helpers import aggregate_chunks
+
+
+# Moving averages InventoryService.predict_demand uses per period
+DEFAULT_FORECASTERS = tuple(f'ma_{demand_window(period)}' for period in FORECAST_HORIZONS)
+
+_DAY_SECONDS = 86400
+
+
+class DailyHistory:
+    """
+    One place's daily sales, sorted by item and day, with running totals.
+    
+    Attributes:
+        item_ids (np.ndarray): Items, one per code.
+        codes (np.ndarray): Item code of every row.
+        days (np.ndarray): Day number of every row (days since 1970-01-01).
+        quantities (np.ndarray): Quantity of every row.
+        starts (np.ndarray): First row of each item.
+        ends (np.ndarray): Row after the last row of each item.
+    
+    Methods:
+        rows_until(day): Row after each item's last row on or before day.
+        total(low, high): Sum over each item's rows in [low, high).
+        frame_until(day): Rows up to day as a daily sales frame.
+    """
+    
+    def __init__(self, sales: pd.DataFrame, item_column: str = 'item_id',
+                 date_column: str = 'date', quantity_column: str = 'quantity'):
+        """
+        Builds the history.
+        
+        Args:
+            sales (pd.DataFrame): Daily sales of one place.
+            item_column (str): Name of the item identifier column.
+            date_column (str): Name of the date column (dates or UNIX seconds).
+            quantity_column (str): Name of the sold quantity column.
+        """
+        codes, item_ids = pd.factorize(sales[item_column], sort=True)
+        days = day_numbers(sales[date_column])
+        valid = (codes >= 0) & (days >= 0)
+        order = np.lexsort((days[valid], codes[valid]))
+        
+        self.item_ids = np.asarray(item_ids, dtype=object)
+        self.codes = codes[valid][order]
+        self.days = days[valid][order]
+        self.quantities = sales[quantity_column].to_numpy(
+            dtype='float64', na_value=0.0)[valid][order]
+        self._cumulative = np.concatenate(([0.0], np.cumsum(self.quantities)))
+        self._keys = self.codes * (1 << 32) + self.days
+        
+        counts = np.bincount(self.codes, minlength=len(self.item_ids))
+        self.ends = np.cumsum(counts)
+        self.starts = self.ends - counts
+    
+    def __len__(self) -> int:
+        return len(self.days)
+    
+    @property
+    def last_day(self) -> int:
+        """int: Latest day with sales (-1 without rows)."""
+        return int(self.days.max()) if len(self.days) else -1
+    
+    def rows_until(self, day: int) -> np.ndarray:
+        """
+        Finds, per item, the row after its last row on or before day.
+        
+        Args:
+            day (int): Day number.
+        
+        Returns:
+            np.ndarray: Row offsets; equal to starts for items without history.
+        """
+        targets = np.arange(len(self.item_ids), dtype=np.int64) * (1 << 32) + day
+        return np.searchsorted(self._keys, targets, side='right')
+    
+    def total(self, low: np.ndarray, high: np.ndarray) -> np.ndarray:
+        """
+        Sums the quantities of rows [low, high) per item.
+        
+        Args:
+            low (np.ndarray): First row per item.
+            high (np.ndarray): Row after the last one per item.
+        
+        Returns:
+            np.ndarray: Sum per item.
+        """
+        return self._cumulative[high] - self._cumulative[low]
+    
+    def frame_until(self, day: int) -> pd.DataFrame:
+        """
+        Returns the rows on or before day as a daily sales frame.
+        
+        Args:
+            day (int): Day number.
+        
+        Returns:
+            pd.DataFrame: 'item_id', 'date' (UNIX seconds) and 'quantity'.
+        """
+        keep = self.days <= day
+        return pd.DataFrame({'item_id': self.item_ids[self.codes[keep]],
+                             'date': self.days[keep] * _DAY_SECONDS,
+                             'quantity': self.quantities[keep]})
+
+
+class MovingAverage:
+    """
+    Mean of each item's last `window` sales rows, as in predict_demand.
+    
+    Attributes:
+        window (int): Number of most recent sales rows.
+        name (str): 'ma_<window>'.
+    """
+    
+    def __init__(self, window: int):
+        """
+        Args:
+            window (int): Number of most recent sales rows.
+        """
+        self.window = window
+        self.name = f'ma_{window}'
+    
+    def __call__(self, history: DailyHistory, origin: int) -> np.ndarray:
+        """Forecasts mean daily demand for every item of history at origin."""
+        ends = history.rows_until(origin)
+        lows = np.maximum(history.starts, ends - self.window)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return history.total(lows, ends) / (ends - lows)
+
+
+class DailyMean:
+    """
+    Mean daily quantity over the last `days` calendar days, zeros included.
+    
+    Attributes:
+        days (int): Window in calendar days.
+        name (str): 'mean_<days>d'.
+    """
+    
+    def __init__(self, days: int):
+        """
+        Args:
+            days (int): Window in calendar days.
+        """
+        self.days = days
+        self.name = f'mean_{days}d'
+    
+    def __call__(self, history: DailyHistory, origin: int) -> np.ndarray:
+        """Forecasts mean daily demand for every item of history at origin."""
+        ends = history.rows_until(origin)
+        lows = history.rows_until(origin - self.days)
+        forecast = history.total(lows, ends) / self.days
+        forecast[ends == history.starts] = np.nan
+        return forecast
+
+
+class ModelForecaster:
+    """
+    GlobalModelBackend refitted on the history up to every origin.
+    
+    Attributes:
+        model (str): 'gbm' or 'linear'.
+        params (dict): Estimator hyperparameters.
+        name (str): The model name.
+    """
+    
+    def __init__(self, model: str, params: Optional[dict] = None):
+        """
+        Args:
+            model (str): 'gbm' or 'linear'.
+            params (dict, optional): Hyperparameters overriding DEFAULT_PARAMS.
+        """
+        self.model = model
+        self.params = params
+        self.name = model
+    
+    def __call__(self, history: DailyHistory, origin: int) -> np.ndarray:
+        """Forecasts mean daily demand for every item of history at origin."""
+        backend = GlobalModelBackend(self.model, self.params, periods=('daily',),
+                                     max_workers=1)
+        backend.fit(history.frame_until(origin))
+        return backend.predict(history.item_ids, 'daily')
+
+
+def resolve_forecaster(spec: Union[str, Callable]) -> Callable:
+    """
+    Turns a forecaster name into a forecaster.
+    
+    Names are 'ma_<rows>' (predict_demand's moving average), 'mean_<days>d'
+    (calendar-day mean) and 'gbm' / 'linear' (GlobalModelBackend). Callables
+    are returned as-is; they are called as forecaster(history, origin_day) and
+    return the mean daily demand per history.item_ids (NaN where they cannot
+    forecast) and should have a name attribute.
+    
+    Args:
+        spec (str | Callable): Forecaster name or forecaster.
+    
+    Returns:
+        Callable: The forecaster.
+    
+    Raises:
+        ValueError: If the name is not recognised.
+    """
+    if callable(spec):
+        return spec
+    if spec in ('gbm', 'linear'):
+        return ModelForecaster(spec)
+    if spec.startswith('ma_') and spec[3:].isdigit():
+        return MovingAverage(int(spec[3:]))
+    if spec.startswith('mean_') and spec.endswith('d') and spec[5:-1].isdigit():
+        return DailyMean(int(spec[5:-1]))
+    raise ValueError(f"Unknown forecaster '{spec}'. Use ma_<rows>, mean_<days>d, gbm or linear")
+
+
+def backtest_place(place_id, sales: pd.DataFrame, inventory: pd.DataFrame,
+                   forecasters: List, origins: List[int], horizon_days: int = 7,
+                   lead_time_days: int = 3, waste_cost: float = 1.0,
+                   stockout_cost: float = 3.0, trace_memory: bool = False) -> pd.DataFrame:
+    """
+    PlaceRunner task: scores every forecaster at every origin for one place.
+    
+    At each origin an item is scored if it sold on or before the origin. The
+    forecast (mean daily demand) is compared with the mean daily demand of the
+    next horizon_days days. The reorder point calculate_reorder_point would set
+    from the forecast is held as stock against the next lead_time_days days of
+    demand. Leftover units count as waste and unmet units as stockouts.
+    
+    Args:
+        place_id: The place.
+        sales (pd.DataFrame): The place's daily sales.
+        inventory (pd.DataFrame): Unused; part of the PlaceRunner task signature.
+        forecasters (List): Forecaster names or picklable callables.
+        origins (List[int]): Origin day numbers.
+        horizon_days (int): Days scored after each origin.
+        lead_time_days (int): Supplier lead time of the reorder decision.
+        waste_cost (float): Cost per unsold unit.
+        stockout_cost (float): Cost per unit of unmet demand.
+        trace_memory (bool): Also measure each forecaster's peak memory in a
+            separate traced run (peak_mb is NaN otherwise).
+    
+    Returns:
+        pd.DataFrame: One row per (origin, model, item) with forecast, actual,
+            abs_error, waste, stockout, cost and the model's seconds and
+            peak_mb at that origin.
+    """
+    history = DailyHistory(sales)
+    forecasters = [resolve_forecaster(spec) for spec in forecasters]
+    names = [getattr(forecaster, 'name', str(forecaster)) for forecaster in forecasters]
+    
+    # Collected as flat arrays per (origin, model) run and framed once at the end
+    runs, items, forecasts, actuals, lead_demands = [], [], [], [], []
+    for origin in origins:
+        start = history.rows_until(origin)
+        known = np.flatnonzero(start > history.starts)
+        if len(known) == 0:
+            continue
+        horizon_end = history.rows_until(origin + horizon_days)
+        lead_end = history.rows_until(origin + lead_time_days)
+        actual = history.total(start, horizon_end)[known] / horizon_days
+        lead_demand = history.total(start, lead_end)[known]
+        
+        for model, forecaster in enumerate(forecasters):
+            forecast, seconds, peak_mb = _timed(forecaster, history, origin, trace_memory)
+            runs.append((origin, model, len(known), seconds, peak_mb))
+            items.append(known)
+            forecasts.append(forecast[known])
+            actuals.append(actual)
+            lead_demands.append(lead_demand)
+    
+    if not runs:
+        return pd.DataFrame(columns=['origin', 'model', 'item_id', 'forecast', 'actual',
+                                     'abs_error', 'waste', 'stockout', 'cost',
+                                     'seconds', 'peak_mb'])
+    
+    origin_days, models, sizes, seconds, peak_mb = (np.array(column) for column in zip(*runs))
+    forecast = np.round(np.concatenate(forecasts), 2)
+    actual = np.concatenate(actuals)
+    lead_demand = np.concatenate(lead_demands)
+    stock = InventoryService._reorder_points(forecast, lead_time_days).to_numpy(
+        dtype='float64', na_value=np.nan)
+    waste = np.maximum(stock - lead_demand, 0.0)
+    stockout = np.maximum(lead_demand - stock, 0.0)
+    return pd.DataFrame({
+        'origin': np.repeat(origin_days * _DAY_SECONDS, sizes).astype('datetime64[s]'),
+        'model': np.asarray(names, dtype=object)[np.repeat(models, sizes)],
+        'item_id': history.item_ids[np.concatenate(items)],
+        'forecast': forecast,
+        'actual': actual,
+        'abs_error': np.abs(forecast - actual),
+        'waste': waste,
+        'stockout': stockout,
+        'cost': waste * waste_cost + stockout * stockout_cost,
+        'seconds': np.repeat(seconds, sizes),
+        'peak_mb': np.repeat(peak_mb, sizes),
+    })
+
+
+class Backtester:
+    """
+    Replays history over rolling origins and compares forecasters.
+    
+    The daily aggregate is computed once (or passed in) and shared with the
+    worker processes as memory-mapped columns; each worker scores one place
+    over one slice of the origins.
+    
+    Attributes:
+        daily (pd.DataFrame): Daily quantities per place and item.
+        max_workers (int or None): Worker processes (CPU count by default).
+    
+    Methods:
+        from_order_items(order_items): Builds a backtester from order lines.
+        from_chunks(chunks): Builds a backtester from streamed order lines.
+        rolling_origins(n_origins, step_days, horizon_days): Default origins.
+        run(forecasters, origins): Per-item scores for every model and origin.
+        summarize(results, by): Error, cost and runtime per model.
+    """
+    
+    def __init__(self, daily: pd.DataFrame, max_workers: Optional[int] = None):
+        """
+        Initialize the Backtester.
+        
+        Args:
+            daily (pd.DataFrame): 'place_id', 'item_id', 'date' and 'quantity'
+                with one row per place, item and day.
+            max_workers (int, optional): Worker processes.
+        """
+        self.daily = daily
+        self.max_workers = max_workers
+    
+    @classmethod
+    def from_order_items(cls, order_items: pd.DataFrame, **kwargs) -> 'Backtester':
+        """
+        Builds a backtester from fct_order_items rows.
+        
+        Args:
+            order_items (pd.DataFrame): Order lines with 'place_id', 'item_id',
+                'created' and 'quantity'.
+            **kwargs: Backtester arguments.
+        
+        Returns:
+            Backtester: The backtester.
+        """
+        return cls.from_chunks([order_items], **kwargs)
+    
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[pd.DataFrame], **kwargs) -> 'Backtester':
+        """
+        Builds a backtester from a stream of order-line chunks.
+        
+        Args:
+            chunks (Iterable[pd.DataFrame]): Order-line chunks, e.g.
+                DataLoader.iter_csv('fct_order_items.csv').
+            **kwargs: Backtester arguments.
+        
+        Returns:
+            Backtester: The backtester.
+        """
+        daily = aggregate_chunks(chunks, 'created', 'quantity', group_by=['place_id', 'item_id'])
+        return cls(daily.rename(columns={'created': 'date'}), **kwargs)
+    
+    def rolling_origins(self, n_origins: int = 8, step_days: int = 7,
+                        horizon_days: int = 7) -> List[pd.Timestamp]:
+        """
+        Evenly spaced origins ending horizon_days before the last sales day.
+        
+        Args:
+            n_origins (int): Number of origins.
+            step_days (int): Days between origins.
+            horizon_days (int): Days scored after each origin.
+        
+        Returns:
+            List[pd.Timestamp]: Origins, oldest first.
+        """
+        if self.daily.empty:
+            return []
+        last = int(day_numbers(self.daily['date']).max()) - horizon_days
+        days = [last - step_days * i for i in range(n_origins)][::-1]
+        return [pd.Timestamp(day * _DAY_SECONDS, unit='s') for day in days]
+    
+    def run(self, forecasters: Iterable = DEFAULT_FORECASTERS,
+            origins: Optional[Iterable] = None, places: Optional[List] = None,
+            horizon_days: int = 7, lead_time_days: int = 3, waste_cost: float = 1.0,
+            stockout_cost: float = 3.0, origin_chunks: Optional[int] = None,
+            trace_memory: bool = False) -> pd.DataFrame:
+        """
+        Scores every forecaster for every item, place and origin.
+        
+        Args:
+            forecasters (Iterable): Forecaster names or picklable callables
+                (see resolve_forecaster).
+            origins (Iterable, optional): Origin dates (rolling_origins() by default).
+            places (List, optional): Places to evaluate (all by default).
+            horizon_days (int): Days scored after each origin.
+            lead_time_days (int): Supplier lead time of the reorder decision.
+            waste_cost (float): Cost per unsold unit.
+            stockout_cost (float): Cost per unit of unmet demand.
+            origin_chunks (int, optional): Slices the origins are split into,
+                each a separate unit of work (one per worker by default).
+            trace_memory (bool): Also measure peak_mb, in a second traced run
+                of every forecaster; tracing is slow, so seconds always comes
+                from the untraced run.
+        
+        Returns:
+            pd.DataFrame: backtest_place rows with 'place_id' first.
+        """
+        forecasters = list(forecasters)
+        for spec in forecasters:
+            resolve_forecaster(spec)
+        origins = self.rolling_origins(horizon_days=horizon_days) if origins is None else origins
+        origin_days = sorted({int(pd.Timestamp(origin).value // (_DAY_SECONDS * 10 ** 9))
+                              for origin in origins})
+        
+        with PlaceRunner(self.daily, max_workers=self.max_workers, batch_size=1) as runner:
+            chunks = max(1, min(origin_chunks or runner.max_workers, len(origin_days)))
+            variants = [{'origins': part.tolist()} for part in
+                        np.array_split(np.asarray(origin_days, dtype=np.int64), chunks)]
+            return runner.run(backtest_place, places, variants=variants,
+                              forecasters=forecasters, horizon_days=horizon_days,
+                              lead_time_days=lead_time_days, waste_cost=waste_cost,
+                              stockout_cost=stockout_cost, trace_memory=trace_memory)
+    
+    @staticmethod
+    def summarize(results: pd.DataFrame, by: Iterable[str] = ('model',)) -> pd.DataFrame:
+        """
+        Aggregates per-item scores into accuracy, cost and runtime.
+        
+        MAPE only counts item-origins with demand. seconds sums the forecaster
+        time over places and origins, and peak_mb is the largest peak seen
+        (NaN unless run() traced memory).
+        
+        Args:
+            results (pd.DataFrame): Output of run().
+            by (Iterable[str]): Grouping columns, e.g. ('model',) or
+                ('place_id', 'model').
+        
+        Returns:
+            pd.DataFrame: One row per group with items, mae, mape (%), bias,
+                waste, stockout, cost, seconds and peak_mb, lowest cost first.
+        """
+        by = list(by)
+        scored = results.assign(
+            error=results['forecast'] - results['actual'],
+            pct_error=(results['abs_error'] / results['actual'].where(results['actual'] > 0)) * 100,
+        )
+        # Timings repeat on every item row of a (place, origin, model) run
+        runs = results.drop_duplicates(['place_id', 'origin', 'model'])
+        summary = scored.groupby(by, sort=False).agg(
+            items=('item_id', 'size'), mae=('abs_error', 'mean'), mape=('pct_error', 'mean'),
+            bias=('error', 'mean'), waste=('waste', 'sum'), stockout=('stockout', 'sum'),
+            cost=('cost', 'sum'))
+        timing = runs.groupby(by, sort=False).agg(seconds=('seconds', 'sum'),
+                                                  peak_mb=('peak_mb', 'max'))
+        return summary.join(timing).sort_values('cost').reset_index()
+
+
+def _timed(forecaster: Callable, history: DailyHistory, origin: int,
+           trace_memory: bool = False):
+    """
+    Runs a forecaster and measures wall time and, optionally, peak memory.
+    
+    tracemalloc slows allocations down, so the time comes from an untraced
+    run and the peak from a second, traced one. Memory is only traced when
+    asked for and nothing else is tracing already (NaN otherwise).
+    
+    Args:
+        forecaster (Callable): The forecaster.
+        history (DailyHistory): The place's history.
+        origin (int): Origin day number.
+        trace_memory (bool): Measure the peak in a second, traced run.
+    
+    Returns:
+        Tuple[np.ndarray, float, float]: Forecast, seconds and peak MB.
+    """
+    started = time.perf_counter()
+    forecast = np.asarray(forecaster(history, origin), dtype='float64')
+    seconds = time.perf_counter() - started
+    
+    peak_mb = np.nan
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        try:
+            forecaster(history, origin)
+            peak_mb = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        finally:
+            tracemalloc.stop()
+    return forecast, seconds, peak_mb
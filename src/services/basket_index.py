@@ -0,0 +1,368 @@
+"""
+File: basket_index.py
+Description: Sparse per-place item co-purchase index over fct_order_items.
+Dependencies: pandas, numpy, scipy
+Author: Sample Team
+
+Every (place, item) pair gets a column code. A batch of order lines becomes a
+sparse order x code incidence matrix B (1 where the order contains the item),
+and B.T @ B counts, for every two items of the same place, the orders that
+contain both; the diagonal counts the orders containing each item. Orders
+never span places, so one matrix holds every place's co-purchase block and
+nothing across places. Batches are summed into the matrix, so the index is
+built from streamed chunks and updated with new orders without re-mining,
+and "bought together", confidence and lift are read off one sparse row.
+"""
+
+import os
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from typing import Dict, Iterable, Tuple
+
+
+# Ranking columns accepted by bought_together and top_pairs
+METRICS = ('count', 'confidence', 'lift')
+
+
+class CoPurchaseIndex:
+    """
+    Per-place item x item co-purchase counts.
+    
+    Order lines are de-duplicated per (order, item), so an order with two
+    burgers counts once for "burger". Counts are exact as long as all lines of
+    an order arrive in the same add() call; from_chunks carries an order split
+    across chunk boundaries over to the next chunk.
+    
+    Attributes:
+        counts (sparse.csr_matrix): Co-purchase counts between (place, item) codes;
+            the diagonal holds the orders containing each item.
+        place_orders (Dict): Orders seen per place.
+        orders_indexed (int): Orders folded into the index.
+    
+    Methods:
+        from_order_items(order_items): Builds an index from order lines.
+        from_chunks(chunks): Builds an index from a stream of order-line chunks.
+        add(order_items): Folds new orders into the index.
+        bought_together(place_id, item_id, k, metric): Top-k companions of an item.
+        pair(place_id, item_a, item_b): Support, confidence and lift of one pair.
+        top_pairs(place_id, k, metric): Strongest item pairs of a place.
+        save(path) / load(path): Persists the index as a .npz file.
+    """
+    
+    def __init__(self, place_column: str = 'place_id', item_column: str = 'item_id',
+                 order_column: str = 'order_id'):
+        """
+        Initialize an empty CoPurchaseIndex.
+        
+        Args:
+            place_column (str): Name of the place column.
+            item_column (str): Name of the item column.
+            order_column (str): Name of the order column.
+        """
+        self.place_column = place_column
+        self.item_column = item_column
+        self.order_column = order_column
+        self.counts = sparse.csr_matrix((0, 0), dtype=np.int64)
+        self._support = np.empty(0, dtype=np.int64)
+        self.place_orders: Dict = {}
+        self.orders_indexed = 0
+        self._place_ids = np.empty(0, dtype=object)
+        self._item_ids = np.empty(0, dtype=object)
+        self._codes: Dict[Tuple, int] = {}
+        self._place_codes: Dict = {}
+    
+    def __len__(self) -> int:
+        return len(self._codes)
+    
+    def __contains__(self, place_id) -> bool:
+        return place_id in self._place_codes
+    
+    @classmethod
+    def from_order_items(cls, order_items: pd.DataFrame, **columns) -> 'CoPurchaseIndex':
+        """
+        Builds an index from order lines.
+        
+        Args:
+            order_items (pd.DataFrame): fct_order_items rows.
+            **columns: place_column / item_column / order_column overrides.
+        
+        Returns:
+            CoPurchaseIndex: The populated index.
+        """
+        index = cls(**columns)
+        index.add(order_items)
+        return index
+    
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[pd.DataFrame], **columns) -> 'CoPurchaseIndex':
+        """
+        Builds an index from order-line chunks (e.g. DataLoader.iter_csv).
+        
+        Chunks must be ordered by order id, as fct_order_items is. The last
+        order of each chunk is held back and joined with the next chunk, so an
+        order split across a boundary still counts once.
+        
+        Args:
+            chunks (Iterable[pd.DataFrame]): Order-line chunks.
+            **columns: place_column / item_column / order_column overrides.
+        
+        Returns:
+            CoPurchaseIndex: The populated index.
+        """
+        index = cls(**columns)
+        carry = None
+        for chunk in chunks:
+            if carry is not None:
+                chunk = pd.concat([carry, chunk], ignore_index=True)
+            if chunk.empty:
+                continue
+            last = chunk[index.order_column].iloc[-1]
+            tail = (chunk[index.order_column] == last).to_numpy()
+            carry = chunk[tail]
+            index.add(chunk[~tail])
+        if carry is not None:
+            index.add(carry)
+        return index
+    
+    def add(self, order_items: pd.DataFrame) -> int:
+        """
+        Folds new orders into the index.
+        
+        Args:
+            order_items (pd.DataFrame): Order lines of complete orders.
+        
+        Returns:
+            int: Number of orders added.
+        """
+        lines = order_items[[self.order_column, self.place_column, self.item_column]].dropna()
+        lines = lines.drop_duplicates([self.order_column, self.item_column])
+        if lines.empty:
+            return 0
+        
+        codes = self._register(lines[self.place_column].to_numpy(),
+                               lines[self.item_column].to_numpy())
+        order_codes, orders = pd.factorize(lines[self.order_column])
+        incidence = sparse.csr_matrix(
+            (np.ones(len(codes), dtype=np.int64), (order_codes, codes)),
+            shape=(len(orders), len(self)))
+        
+        counts = self.counts
+        if counts.shape[0] < len(self):
+            counts = counts.copy()
+            counts.resize((len(self), len(self)))
+        self.counts = (counts + incidence.T @ incidence).tocsr()
+        self._support = self.counts.diagonal()
+        
+        first_lines = lines.drop_duplicates(self.order_column)
+        for place_id, orders_at_place in first_lines[self.place_column].value_counts().items():
+            self.place_orders[place_id] = self.place_orders.get(place_id, 0) + int(orders_at_place)
+        self.orders_indexed += len(orders)
+        return len(orders)
+    
+    def bought_together(self, place_id, item_id, k: int = 10,
+                        metric: str = 'lift', min_count: int = 1) -> pd.DataFrame:
+        """
+        Lists the items most often bought with an item at a place.
+        
+        Args:
+            place_id: The place.
+            item_id: The anchor item.
+            k (int): Number of companions to return.
+            metric (str): 'count', 'confidence' or 'lift' to rank by.
+            min_count (int): Minimum orders containing both items.
+        
+        Returns:
+            pd.DataFrame: item_id, count (orders with both), confidence
+                (P(item | anchor)) and lift, best first; empty for unknown items.
+        
+        Raises:
+            ValueError: If metric is unknown.
+        """
+        self._check_metric(metric)
+        code = self._codes.get((place_id, item_id))
+        if code is None:
+            return self._pairs_frame({self.item_column: []}, [], [], [])
+        
+        row = self.counts.getrow(code)
+        partners, together = row.indices, row.data
+        keep = (partners != code) & (together >= min_count)
+        partners, together = partners[keep], together[keep]
+        
+        confidence = together / self._support[code]
+        lift = confidence * self.place_orders[place_id] / self._support[partners]
+        frame = self._pairs_frame({self.item_column: self._item_ids[partners]}, together,
+                                  confidence, lift)
+        return self._rank(frame, metric, k)
+    
+    def pair(self, place_id, item_a, item_b) -> Dict[str, float]:
+        """
+        Association statistics of one item pair at a place.
+        
+        Args:
+            place_id: The place.
+            item_a: Antecedent item.
+            item_b: Consequent item.
+        
+        Returns:
+            Dict[str, float]: 'count' (orders with both), 'support' (share of the
+                place's orders), 'confidence' (P(b | a)) and 'lift'; zeros for
+                unknown items or places.
+        """
+        a, b = self._codes.get((place_id, item_a)), self._codes.get((place_id, item_b))
+        if a is None or b is None:
+            return {'count': 0, 'support': 0.0, 'confidence': 0.0, 'lift': 0.0}
+        together = int(self.counts[a, b])
+        orders = self.place_orders[place_id]
+        count_a, count_b = int(self._support[a]), int(self._support[b])
+        return {
+            'count': together,
+            'support': together / orders,
+            'confidence': together / count_a,
+            'lift': together * orders / (count_a * count_b),
+        }
+    
+    def top_pairs(self, place_id, k: int = 20, metric: str = 'lift',
+                  min_count: int = 2) -> pd.DataFrame:
+        """
+        Lists a place's strongest item pairs.
+        
+        Confidence is taken in the direction of the item bought less often
+        (the higher of the two conditional probabilities).
+        
+        Args:
+            place_id: The place.
+            k (int): Number of pairs to return.
+            metric (str): 'count', 'confidence' or 'lift' to rank by.
+            min_count (int): Minimum orders containing both items (filters noise).
+        
+        Returns:
+            pd.DataFrame: item_a, item_b, count, confidence and lift, best first.
+        
+        Raises:
+            ValueError: If metric is unknown.
+        """
+        self._check_metric(metric)
+        codes = self._place_codes.get(place_id)
+        if codes is None:
+            return self._pairs_frame({'item_a': [], 'item_b': []}, [], [], [])
+        
+        block = sparse.triu(self.counts[codes][:, codes], k=1).tocoo()
+        keep = block.data >= min_count
+        rows, columns, together = block.row[keep], block.col[keep], block.data[keep]
+        
+        diagonal = self._support[codes]
+        confidence = together / np.minimum(diagonal[rows], diagonal[columns])
+        lift = together * self.place_orders[place_id] / (diagonal[rows] * diagonal[columns])
+        items = self._item_ids[codes]
+        frame = self._pairs_frame({'item_a': items[rows], 'item_b': items[columns]}, together,
+                                  confidence, lift)
+        return self._rank(frame, metric, k)
+    
+    def save(self, path: str) -> None:
+        """
+        Writes the index to a .npz file.
+        
+        The file goes to exactly `path` (no suffix is added), through a
+        temporary name and a rename, like DemandState.save().
+        
+        Args:
+            path (str): Destination file path.
+        
+        Raises:
+            ValueError: If place or item ids cannot be stored without pickling.
+        """
+        places = np.asarray(self._place_ids.tolist())
+        items = np.asarray(self._item_ids.tolist())
+        order_places = np.asarray(list(self.place_orders))
+        if object in (places.dtype, items.dtype, order_places.dtype):
+            raise ValueError("Place and item ids must be ints or strings to save the index")
+        
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as handle:
+            np.savez(handle, places=places, items=items, data=self.counts.data,
+                     indices=self.counts.indices, indptr=self.counts.indptr,
+                     order_places=order_places,
+                     order_counts=np.asarray(list(self.place_orders.values()), dtype=np.int64),
+                     orders_indexed=self.orders_indexed,
+                     columns=np.asarray([self.place_column, self.item_column, self.order_column]))
+        os.replace(tmp_path, path)
+    
+    @classmethod
+    def load(cls, path: str) -> 'CoPurchaseIndex':
+        """
+        Restores an index written by save().
+        
+        Args:
+            path (str): Snapshot file path.
+        
+        Returns:
+            CoPurchaseIndex: The restored index.
+        """
+        with np.load(path, allow_pickle=False) as snapshot:
+            index = cls(*snapshot['columns'].tolist())
+            index._register(snapshot['places'].tolist(), snapshot['items'].tolist())
+            size = len(index)
+            index.counts = sparse.csr_matrix(
+                (snapshot['data'], snapshot['indices'], snapshot['indptr']), shape=(size, size))
+            index._support = index.counts.diagonal()
+            index.place_orders = dict(zip(snapshot['order_places'].tolist(),
+                                          snapshot['order_counts'].tolist()))
+            index.orders_indexed = int(snapshot['orders_indexed'])
+        return index
+    
+    def _register(self, places, items) -> np.ndarray:
+        """
+        Returns the code of each (place, item) pair, adding codes for new pairs.
+        
+        Args:
+            places (array-like): Place of each line.
+            items (array-like): Item of each line.
+        
+        Returns:
+            np.ndarray: Code per line.
+        """
+        keys = pd.MultiIndex.from_arrays([np.asarray(places, dtype=object),
+                                          np.asarray(items, dtype=object)])
+        if len(self):
+            codes = pd.MultiIndex.from_arrays([self._place_ids, self._item_ids]).get_indexer(keys)
+        else:
+            codes = np.full(len(keys), -1, dtype=np.int64)
+        new = codes < 0
+        if new.any():
+            added = keys[new].unique()
+            start = len(self)
+            codes[new] = start + added.get_indexer(keys[new])
+            added_places = np.asarray(added.get_level_values(0), dtype=object)
+            self._place_ids = np.concatenate([self._place_ids, added_places])
+            self._item_ids = np.concatenate([self._item_ids,
+                                             np.asarray(added.get_level_values(1), dtype=object)])
+            self._codes.update(zip(added.tolist(), range(start, len(self._place_ids))))
+            new_codes_by_place = pd.Series(added_places).groupby(added_places).indices
+            for place_id, positions in new_codes_by_place.items():
+                new_codes = start + np.asarray(positions, dtype=np.int64)
+                old_codes = self._place_codes.get(place_id, np.empty(0, dtype=np.int64))
+                self._place_codes[place_id] = np.concatenate([old_codes, new_codes])
+        return np.asarray(codes, dtype=np.int64)
+    
+    @staticmethod
+    def _pairs_frame(items: Dict[str, np.ndarray], together, confidence,
+                     lift) -> pd.DataFrame:
+        """Builds a result frame from item columns and pair statistics."""
+        data = {name: np.asarray(values, dtype=object).tolist() for name, values in items.items()}
+        data.update({'count': np.asarray(together, dtype=np.int64),
+                     'confidence': np.round(np.asarray(confidence, dtype=float), 4),
+                     'lift': np.round(np.asarray(lift, dtype=float), 4)})
+        return pd.DataFrame(data)
+    
+    @staticmethod
+    def _rank(frame: pd.DataFrame, metric: str, k: int) -> pd.DataFrame:
+        """Sorts by metric (then count) and keeps the top k rows."""
+        return frame.sort_values([metric, 'count'], ascending=False, kind='stable') \
+            .head(k).reset_index(drop=True)
+    
+    @staticmethod
+    def _check_metric(metric: str) -> None:
+        """Raises ValueError for an unknown ranking metric."""
+        if metric not in METRICS:
+            raise ValueError(f"metric must be one of {METRICS}")
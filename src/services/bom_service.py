@@ -0,0 +1,170 @@
+"""
+File: bom_service.py
+Description: Bill-of-materials explosion from menu-item demand to ingredient demand.
+Dependencies: pandas, numpy, scipy
+Author: Sample Team
+"""
+
+import logging
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from typing import Union
+
+from src.utils.instrumentation import log_event
+
+
+logger = logging.getLogger(__name__)
+
+
+class BomExplosionEngine:
+    """
+    Turns menu-item demand into raw ingredient demand via a sparse recipe matrix.
+    
+    dim_bill_of_materials lists, per parent (a menu item or a sub-recipe), the
+    components and quantities needed to make one unit. By default parents are
+    read from menu_item_id and components from item_id (raw dim_items), so
+    demand must be keyed by the same menu item ids. Multi-level recipes are
+    flattened once at construction into a sparse matrix with one row per parent
+    and one column per raw ingredient (a component that is never a parent).
+    Exploding demand is then a single sparse product: a mat-vec for one demand
+    vector, or one mat-mat for all places at once.
+    
+    Attributes:
+        parents (pd.Index): Parent ids (matrix rows).
+        ingredients (pd.Index): Raw ingredient ids (matrix columns).
+        matrix (sparse.csr_matrix): Units of each ingredient per unit of each parent.
+    
+    Methods:
+        explode(demand): Ingredient demand for one vector of parent demand.
+        explode_by_place(demand): Ingredient demand per place in one product.
+    """
+    
+    def __init__(self, bom: pd.DataFrame, parent_column: str = 'menu_item_id',
+                 component_column: str = 'item_id', quantity_column: str = 'quantity',
+                 max_depth: int = 16):
+        """
+        Builds and flattens the recipe matrix.
+        
+        Args:
+            bom (pd.DataFrame): Bill-of-materials rows (parent, component, quantity).
+            parent_column (str): Name of the parent (menu item / sub-recipe) column.
+            component_column (str): Name of the component column.
+            quantity_column (str): Component units needed per parent unit.
+            max_depth (int): Maximum recipe nesting depth.
+        
+        Raises:
+            ValueError: If the recipes are cyclic or nested deeper than max_depth.
+        """
+        bom = bom.dropna(subset=[parent_column, component_column])
+        nodes = pd.Index(pd.unique(pd.concat([bom[parent_column], bom[component_column]],
+                                             ignore_index=True)))
+        rows = nodes.get_indexer(bom[parent_column])
+        cols = nodes.get_indexer(bom[component_column])
+        quantities = bom[quantity_column].fillna(0).to_numpy(dtype='float64')
+        
+        # Direct requirements between all nodes; duplicate rows are summed
+        direct = sparse.csr_matrix((quantities, (rows, cols)), shape=(len(nodes), len(nodes)))
+        
+        is_parent = np.zeros(len(nodes), dtype=bool)
+        is_parent[rows] = True
+        parent_positions = np.flatnonzero(is_parent)
+        leaf_positions = np.flatnonzero(~is_parent)
+        
+        to_leaves = direct[:, leaf_positions]
+        to_parents = direct[:, parent_positions]
+        
+        # Expand sub-recipes level by level until only raw ingredients remain
+        flat = to_leaves[parent_positions]
+        pending = to_parents[parent_positions]
+        for _ in range(max_depth):
+            if pending.nnz == 0:
+                break
+            flat = flat + pending @ to_leaves[parent_positions]
+            pending = pending @ to_parents[parent_positions]
+            pending.eliminate_zeros()
+        else:
+            if pending.nnz:
+                raise ValueError("Bill of materials is cyclic or nested deeper than max_depth")
+        
+        self.parents = nodes[parent_positions]
+        self.ingredients = nodes[leaf_positions]
+        self.matrix = sparse.csr_matrix(flat)
+        self.matrix.sum_duplicates()
+    
+    def explode(self, demand: Union[pd.Series, dict]) -> pd.Series:
+        """
+        Converts one vector of parent demand into ingredient demand.
+        
+        Args:
+            demand (pd.Series | dict): Demand indexed by parent (menu item) id.
+                Ids without a recipe contribute nothing; a warning is logged
+                when no id has one.
+        
+        Returns:
+            pd.Series: Demand per ingredient id (only ingredients with demand).
+        """
+        demand = pd.Series(demand, dtype='float64')
+        positions = self.parents.get_indexer(demand.index)
+        known = positions >= 0
+        self._check_keys(known)
+        
+        vector = np.zeros(len(self.parents))
+        np.add.at(vector, positions[known], demand.to_numpy()[known])
+        
+        totals = self.matrix.T @ vector
+        used = np.flatnonzero(totals)
+        return pd.Series(totals[used], index=self.ingredients[used], name='quantity')
+    
+    def explode_by_place(self, demand: pd.DataFrame, place_column: str = 'place_id',
+                         item_column: str = 'item_id',
+                         quantity_column: str = 'quantity') -> pd.DataFrame:
+        """
+        Converts per-place menu-item demand into per-place ingredient demand.
+        
+        All places are handled by one sparse product of a (place x menu item)
+        demand matrix with the recipe matrix.
+        
+        Args:
+            demand (pd.DataFrame): Rows of place, menu item and demand quantity.
+            place_column (str): Name of the place column.
+            item_column (str): Name of the menu item column.
+            quantity_column (str): Name of the demand quantity column.
+        
+        Returns:
+            pd.DataFrame: Columns place_column, 'ingredient_id' and 'quantity',
+                sorted by place and ingredient.
+        """
+        positions = self.parents.get_indexer(demand[item_column])
+        known = positions >= 0
+        self._check_keys(known)
+        place_codes, places = pd.factorize(demand[place_column][known], sort=True)
+        
+        place_demand = sparse.csr_matrix(
+            (demand[quantity_column].to_numpy(dtype='float64')[known],
+             (place_codes, positions[known])),
+            shape=(len(places), len(self.parents)),
+        )
+        totals = (place_demand @ self.matrix).tocoo()
+        
+        result = pd.DataFrame({
+            place_column: places[totals.row],
+            'ingredient_id': self.ingredients[totals.col],
+            'quantity': totals.data,
+        })
+        result = result[result['quantity'] != 0]
+        return result.sort_values([place_column, 'ingredient_id'], ignore_index=True)
+    
+    def _check_keys(self, known: np.ndarray) -> None:
+        """
+        Warns when demand was given but none of its ids is a BOM parent.
+        
+        That usually means the demand and the recipes use different key spaces
+        (e.g. item ids against menu item ids) and the result would be empty.
+        
+        Args:
+            known (np.ndarray): Whether each demand id is a parent.
+        """
+        if len(known) and not known.any():
+            log_event(logger, 'bom_keys_unmatched', level=logging.WARNING,
+                      demand_ids=len(known), parents=len(self.parents))
@@ -0,0 +1,297 @@
+"""
+File: demand_state.py
+Description: Incremental per-item demand state for O(1) moving-average forecasts.
+Dependencies: pandas, numpy
+Author: Sample Team
+"""
+
+import os
+import numpy as np
+import pandas as pd
+from typing import Iterable, Optional
+
+
+# Largest moving-average window used by InventoryService (7 rows for 'daily')
+RING_SIZE = 7
+
+
+class DemandState:
+    """
+    Keeps the most recent sales quantities of every item in ring buffers.
+    
+    Moving averages only ever look at the last RING_SIZE rows of an item, so the
+    state stores exactly those rows per item. New sales are folded in with
+    ingest(), which touches only the rows of the affected items, and a forecast
+    is a read of at most RING_SIZE values. The state can be saved to and loaded
+    from a .npz snapshot so a restarted worker doesn't replay the full history.
+    
+    Attributes:
+        item_ids (np.ndarray): Known item ids, one per buffer row.
+        positions (dict): Maps item_id to its buffer row.
+        buffer (np.ndarray): (n_items, RING_SIZE) ring of recent quantities.
+        counts (np.ndarray): Number of sales rows ingested per item.
+        rows_ingested (int): Total number of sales rows folded into the state.
+        watermark (int or None): Latest sales timestamp seen (UNIX seconds).
+    
+    Methods:
+        from_sales(sales_data): Builds a state from a sales table.
+        ingest(new_sales): Folds new sales rows into the state.
+        recent(item_id, window): Returns an item's last window quantities.
+        window_means(positions, window): Averages the last rows of many items.
+        save(path): Writes a snapshot to disk.
+        load(path): Restores a snapshot from disk.
+    """
+    
+    def __init__(self, item_ids: Optional[Iterable] = None):
+        """
+        Initialize an empty DemandState.
+        
+        Args:
+            item_ids (Iterable, optional): Items to pre-register.
+        """
+        self.item_ids = np.empty(0, dtype=object)
+        self.positions = {}
+        self.buffer = np.full((0, RING_SIZE), np.nan)
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.rows_ingested = 0
+        self.watermark = None
+        if item_ids is not None:
+            self._register(pd.unique(pd.Series(list(item_ids), dtype=object)))
+    
+    def __contains__(self, item_id) -> bool:
+        return item_id in self.positions
+    
+    def __len__(self) -> int:
+        return len(self.positions)
+    
+    @classmethod
+    def from_sales(cls, sales_data: pd.DataFrame, item_column: str = 'item_id',
+                   quantity_column: str = 'quantity',
+                   time_column: str = 'date') -> 'DemandState':
+        """
+        Builds a state from a full sales table.
+        
+        Args:
+            sales_data (pd.DataFrame): Historical sales, oldest rows first per item.
+            item_column (str): Name of the item identifier column.
+            quantity_column (str): Name of the sold quantity column.
+            time_column (str): Name of the timestamp column used for the watermark.
+        
+        Returns:
+            DemandState: State holding each item's most recent rows.
+        """
+        state = cls()
+        state.ingest(sales_data, item_column, quantity_column, time_column)
+        return state
+    
+    def ingest(self, new_sales: pd.DataFrame, item_column: str = 'item_id',
+               quantity_column: str = 'quantity', time_column: str = 'date') -> int:
+        """
+        Folds new sales rows into the state.
+        
+        Rows must have the same granularity as the history (e.g. one row per
+        item and day) and are appended after the item's existing rows in the
+        order given. Only the buffers of items present in new_sales change.
+        
+        Args:
+            new_sales (pd.DataFrame): New sales rows.
+            item_column (str): Name of the item identifier column.
+            quantity_column (str): Name of the sold quantity column.
+            time_column (str): Name of the timestamp column used for the watermark.
+        
+        Returns:
+            int: Number of distinct items updated.
+        """
+        if new_sales.empty:
+            return 0
+        
+        codes, uniques = pd.factorize(new_sales[item_column], sort=False)
+        valid = codes >= 0
+        codes = codes[valid]
+        quantities = new_sales[quantity_column].to_numpy(dtype='float64', na_value=np.nan)[valid]
+        
+        positions = self._register(uniques)
+        rows = positions[codes]
+        
+        # Sequence number of each new row within its item, in input order
+        order = np.argsort(codes, kind='stable')
+        sorted_codes = codes[order]
+        per_item = np.bincount(codes, minlength=len(uniques))
+        firsts = np.cumsum(per_item) - per_item
+        seq = np.empty(len(codes), dtype=np.int64)
+        seq[order] = np.arange(len(codes)) - firsts[sorted_codes]
+        
+        # Only the last RING_SIZE new rows of an item can survive in its ring
+        keep = seq >= per_item[codes] - RING_SIZE
+        slots = (self.counts[rows[keep]] + seq[keep]) % RING_SIZE
+        self.buffer[rows[keep], slots] = quantities[keep]
+        
+        self.counts[positions] += per_item
+        self.rows_ingested += int(len(codes))
+        self._advance_watermark(new_sales, time_column)
+        return len(uniques)
+    
+    def recent(self, item_id, window: int = RING_SIZE) -> np.ndarray:
+        """
+        Returns an item's most recent quantities, oldest first.
+        
+        Args:
+            item_id: The unique identifier of the item.
+            window (int): Number of rows (at most RING_SIZE).
+        
+        Returns:
+            np.ndarray: Up to window quantities (empty for unknown items).
+        """
+        position = self.positions.get(item_id)
+        if position is None:
+            return np.empty(0, dtype='float64')
+        
+        count = int(min(window, RING_SIZE, self.counts[position]))
+        head = int(self.counts[position])
+        slots = np.arange(head - count, head) % RING_SIZE
+        return self.buffer[position, slots]
+    
+    def positions_of(self, item_ids: Iterable) -> np.ndarray:
+        """
+        Maps item ids to buffer rows.
+        
+        Args:
+            item_ids (Iterable): Item identifiers.
+        
+        Returns:
+            np.ndarray: Buffer rows, -1 for unknown items.
+        """
+        get = self.positions.get
+        return np.fromiter((get(item_id, -1) for item_id in item_ids), dtype=np.int64)
+    
+    def window_means(self, positions: np.ndarray, window: int) -> np.ndarray:
+        """
+        Averages the last `window` quantities of many items at once.
+        
+        Missing quantities are skipped like in pandas' mean(), and values are
+        summed oldest first so results match a mean over the raw rows.
+        
+        Args:
+            positions (np.ndarray): Valid buffer rows (>= 0).
+            window (int): Number of most recent rows (at most RING_SIZE).
+        
+        Returns:
+            np.ndarray: Mean of each item's window (NaN if it holds no values).
+        """
+        window = min(window, RING_SIZE)
+        heads = self.counts[positions]
+        lags = np.arange(window, 0, -1)
+        slots = (heads[:, None] - lags[None, :]) % RING_SIZE
+        values = self.buffer[positions[:, None], slots]
+        present = (lags[None, :] <= heads[:, None]) & ~np.isnan(values)
+        
+        totals = np.zeros(len(positions))
+        for column in range(window):
+            totals += np.where(present[:, column], values[:, column], 0.0)
+        counts = present.sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(counts > 0, totals / counts, np.nan)
+    
+    def save(self, path: str) -> None:
+        """
+        Writes a snapshot of the state to a .npz file.
+        
+        The snapshot goes to exactly `path` (no suffix is added). It is written
+        to a temporary name and then renamed, so a crash mid-write never leaves
+        a truncated snapshot for the next load().
+        
+        Args:
+            path (str): Destination file path.
+        
+        Raises:
+            ValueError: If item ids mix types and cannot be stored without pickling.
+        """
+        ids = self.item_ids.tolist()
+        if len({type(item_id) for item_id in ids}) > 1:
+            raise ValueError("Item ids must share one type (all int or all str) to snapshot")
+        item_ids = np.asarray(ids)
+        if item_ids.dtype == object:
+            raise ValueError("Item ids must be ints or strings to snapshot")
+        
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as handle:
+            np.savez(handle, item_ids=item_ids, buffer=self.buffer, counts=self.counts,
+                     rows_ingested=self.rows_ingested,
+                     watermark=-1 if self.watermark is None else self.watermark)
+        os.replace(tmp_path, path)
+    
+    @classmethod
+    def load(cls, path: str) -> 'DemandState':
+        """
+        Restores a state from a .npz snapshot written by save().
+        
+        Args:
+            path (str): Snapshot file path.
+        
+        Returns:
+            DemandState: The restored state.
+        """
+        with np.load(path, allow_pickle=False) as snapshot:
+            state = cls()
+            state.item_ids = np.asarray(snapshot['item_ids'].tolist(), dtype=object)
+            state.positions = {item_id: i for i, item_id in enumerate(state.item_ids.tolist())}
+            state.buffer = snapshot['buffer'].copy()
+            state.counts = snapshot['counts'].copy()
+            state.rows_ingested = int(snapshot['rows_ingested'])
+            watermark = int(snapshot['watermark'])
+            state.watermark = None if watermark < 0 else watermark
+        return state
+    
+    def _register(self, item_ids) -> np.ndarray:
+        """
+        Returns buffer rows for unique item ids, adding rows for new items.
+        
+        Args:
+            item_ids (array-like): Unique item identifiers.
+        
+        Returns:
+            np.ndarray: Buffer row of each item.
+        """
+        item_ids = np.asarray(item_ids, dtype=object)
+        if self.positions:
+            positions = self.positions_of(item_ids)
+        else:
+            positions = np.full(len(item_ids), -1, dtype=np.int64)
+        
+        missing = positions < 0
+        if missing.any():
+            new_ids = item_ids[missing]
+            start = len(self.item_ids)
+            positions[missing] = np.arange(start, start + len(new_ids))
+            self.positions.update(zip(new_ids.tolist(), range(start, start + len(new_ids))))
+            self.item_ids = np.concatenate([self.item_ids, new_ids])
+            self.buffer = np.vstack([self.buffer, np.full((len(new_ids), RING_SIZE), np.nan)])
+            self.counts = np.concatenate([self.counts, np.zeros(len(new_ids), dtype=np.int64)])
+        return positions
+    
+    def _advance_watermark(self, new_sales: pd.DataFrame, time_column: str) -> None:
+        """
+        Moves the watermark to the latest timestamp in new_sales.
+        
+        Numeric columns hold UNIX seconds; string dates are parsed. Values
+        that do not parse as dates leave the watermark unchanged.
+        
+        Args:
+            new_sales (pd.DataFrame): New sales rows.
+            time_column (str): Name of the timestamp column.
+        """
+        if time_column not in new_sales.columns:
+            return
+        
+        times = new_sales[time_column].dropna()
+        if times.empty:
+            return
+        if pd.api.types.is_numeric_dtype(times) and not pd.api.types.is_bool_dtype(times):
+            latest = int(times.max())
+        else:
+            if not pd.api.types.is_datetime64_any_dtype(times):
+                times = pd.to_datetime(times, errors='coerce').dropna()
+                if times.empty:
+                    return
+            latest = int(times.max().timestamp())
+        self.watermark = latest if self.watermark is None else max(self.watermark, latest)
@@ -0,0 +1,232 @@
+"""
+File: expiry_index.py
+Description: Per-place sorted index of inventory rows by absolute expiry date.
+Dependencies: pandas, numpy
+Author: Sample Team
+"""
+
+import numpy as np
+import pandas as pd
+from datetime import date
+from typing import Dict, Optional, Tuple, Union
+
+
+DateLike = Union[str, date, pd.Timestamp]
+
+
+def _to_day(value: DateLike) -> int:
+    """
+    Converts a date-like value to a day number (days since 1970-01-01).
+    
+    Args:
+        value (str | date | pd.Timestamp): The date.
+    
+    Returns:
+        int: Day number.
+    """
+    return int(pd.Timestamp(value).to_datetime64().astype('datetime64[D]').astype(np.int64))
+
+
+class ExpiryIndex:
+    """
+    Keeps inventory rows sorted by expiry date, one block per place.
+    
+    Expiry is stored as an absolute date, so days_until_expiration is derived
+    at query time and the index never goes stale at midnight. A threshold query
+    is a binary search on the place's sorted expiry days plus a slice of the k
+    matching rows, i.e. O(log n + k). Inventory report snapshots update only the
+    places they cover.
+    
+    Attributes:
+        place_column (str): Name of the place column ('place_id').
+        item_column (str): Name of the item column ('item_id').
+        expiry_column (str): Name of the absolute expiry date column.
+    
+    Methods:
+        expiring(days_threshold, place_id, today): Rows expiring within the threshold.
+        update(report): Applies an inventory report snapshot.
+        to_frame(): Returns all indexed rows.
+    """
+    
+    def __init__(self, inventory_data: pd.DataFrame, place_column: str = 'place_id',
+                 item_column: str = 'item_id', expiry_column: str = 'expiration_date',
+                 as_of: Optional[DateLike] = None):
+        """
+        Builds the index.
+        
+        Rows without an absolute expiry column fall back to the relative
+        'days_until_expiration' column, anchored at as_of (today by default).
+        Rows without any expiry information never expire and are not indexed.
+        
+        Args:
+            inventory_data (pd.DataFrame): Inventory rows.
+            place_column (str): Name of the place column; all rows form a single
+                place when the column is missing.
+            item_column (str): Name of the item column.
+            expiry_column (str): Name of the absolute expiry date column.
+            as_of (str | date, optional): Date that relative expiry counts from.
+        """
+        self.place_column = place_column
+        self.item_column = item_column
+        self.expiry_column = expiry_column
+        self._places: Dict[object, Tuple[np.ndarray, pd.DataFrame]] = {}
+        self._template = inventory_data.iloc[:0]
+        if inventory_data.empty:
+            return
+        
+        rows = self._with_expiry_days(inventory_data, as_of)
+        for place_id, place_rows in self._group_by_place(rows):
+            self._store(place_id, place_rows)
+    
+    def __len__(self) -> int:
+        return sum(len(days) for days, _ in self._places.values())
+    
+    @property
+    def places(self) -> list:
+        """list: Places that have indexed rows."""
+        return list(self._places)
+    
+    def expiring(self, days_threshold: int = 7, place_id=None,
+                 today: Optional[DateLike] = None) -> pd.DataFrame:
+        """
+        Returns rows expiring within days_threshold days, soonest first.
+        
+        Already expired rows (negative days) are included, matching a filter on
+        days_until_expiration <= days_threshold.
+        
+        Args:
+            days_threshold (int): Number of days before expiration to flag items.
+            place_id: Restrict the query to one place (all places if None).
+            today (str | date, optional): Reference date (defaults to today).
+        
+        Returns:
+            pd.DataFrame: Matching rows with an up-to-date days_until_expiration.
+        """
+        today_day = _to_day(today if today is not None else date.today())
+        cutoff = today_day + days_threshold
+        
+        if place_id is not None:
+            blocks = [self._places[place_id]] if place_id in self._places else []
+        else:
+            blocks = list(self._places.values())
+        
+        parts = []
+        for days, rows in blocks:
+            count = int(np.searchsorted(days, cutoff, side='right'))
+            if count:
+                part = rows.iloc[:count].copy()
+                part['days_until_expiration'] = days[:count] - today_day
+                parts.append(part)
+        
+        if not parts:
+            return self._empty()
+        if len(parts) == 1:
+            return parts[0]
+        return pd.concat(parts).sort_values('days_until_expiration', kind='stable')
+    
+    def update(self, report: pd.DataFrame, full_snapshot: bool = True,
+               as_of: Optional[DateLike] = None) -> int:
+        """
+        Applies an inventory report (e.g. from fct_inventory_reports).
+        
+        With full_snapshot=True the report replaces everything indexed for the
+        places it contains; otherwise its rows replace only the matching
+        (place, item) rows. Places absent from the report are untouched.
+        
+        Args:
+            report (pd.DataFrame): Inventory rows with expiry information.
+            full_snapshot (bool): Whether the report is complete for its places.
+            as_of (str | date, optional): Date that relative expiry counts from.
+        
+        Returns:
+            int: Number of places updated.
+        """
+        rows = self._with_expiry_days(report, as_of)
+        updated = 0
+        
+        if full_snapshot and self.place_column in report.columns:
+            # Places whose snapshot holds no expiring rows are cleared
+            for place_id in set(report[self.place_column]) - set(rows[self.place_column]):
+                updated += self._places.pop(place_id, None) is not None
+        
+        for place_id, place_rows in self._group_by_place(rows):
+            if not full_snapshot and place_id in self._places:
+                days, current = self._places[place_id]
+                current = current.assign(_expiry_day=days)
+                replaced = current[self.item_column].isin(place_rows[self.item_column])
+                place_rows = pd.concat([current[~replaced], place_rows])
+            self._store(place_id, place_rows)
+            updated += 1
+        
+        return updated
+    
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Returns all indexed rows, grouped by place and sorted by expiry.
+        
+        Returns:
+            pd.DataFrame: The indexed inventory rows.
+        """
+        frames = [rows for _, rows in self._places.values()]
+        return pd.concat(frames) if frames else self._empty()
+    
+    def _with_expiry_days(self, rows: pd.DataFrame,
+                          as_of: Optional[DateLike]) -> pd.DataFrame:
+        """
+        Adds the internal '_expiry_day' column and drops rows without expiry.
+        
+        Args:
+            rows (pd.DataFrame): Inventory rows.
+            as_of (str | date, optional): Date that relative expiry counts from.
+        
+        Returns:
+            pd.DataFrame: Rows with a non-null '_expiry_day'.
+        """
+        if self.expiry_column in rows.columns:
+            expiry = rows[self.expiry_column]
+            if pd.api.types.is_numeric_dtype(expiry):
+                expiry = pd.to_datetime(expiry, unit='s')
+            expiry_day = pd.to_datetime(expiry).dt.floor('D')
+            days = (expiry_day - pd.Timestamp(0)).dt.days
+        elif 'days_until_expiration' in rows.columns:
+            anchor = _to_day(as_of if as_of is not None else date.today())
+            days = anchor + rows['days_until_expiration']
+        else:
+            days = pd.Series(np.nan, index=rows.index)
+        
+        rows = rows.assign(_expiry_day=days)
+        return rows[rows['_expiry_day'].notna()]
+    
+    def _group_by_place(self, rows: pd.DataFrame):
+        """
+        Splits rows by place.
+        
+        Args:
+            rows (pd.DataFrame): Rows with an '_expiry_day' column.
+        
+        Returns:
+            Iterable: (place_id, rows) pairs.
+        """
+        if self.place_column not in rows.columns:
+            return [(None, rows)] if len(rows) else []
+        return rows.groupby(self.place_column, sort=False, dropna=False)
+    
+    def _store(self, place_id, rows: pd.DataFrame) -> None:
+        """
+        Sorts a place's rows by expiry and stores them with their day numbers.
+        
+        Args:
+            place_id: The place.
+            rows (pd.DataFrame): The place's rows with an '_expiry_day' column.
+        """
+        rows = rows.sort_values('_expiry_day', kind='stable')
+        days = rows['_expiry_day'].to_numpy(dtype=np.int64)
+        rows = rows.drop(columns='_expiry_day')
+        if len(rows):
+            self._places[place_id] = (days, rows)
+        else:
+            self._places.pop(place_id, None)
+    
+    def _empty(self) -> pd.DataFrame:
+        """Returns an empty frame with the inventory columns."""
+        return self._template.assign(days_until_expiration=pd.Series(dtype=np.int64))
@@ -0,0 +1,649 @@
+"""
+File: forecasting.py
+Description: Pluggable demand forecasting backends, including a global ML model over lag and calendar features.
+Dependencies: pandas, numpy, scikit-learn
+Author: Sample Team
+
+InventoryService forecasts with a moving average by default. A backend
+replaces it with a model that is fitted once, outside the request path:
+GlobalModelBackend builds lag, rolling-mean and calendar features for every
+item in one vectorised pass, trains one model per place (all items of the
+place share it) in parallel through PlaceRunner, and pickles the fitted
+models to an on-disk cache keyed by the place's data version and the
+hyperparameters. Refitting on unchanged data only loads the models, and the
+forecasts for all items are computed with one predict call per model and
+then served by lookup.
+"""
+
+import abc
+import hashlib
+import os
+import pickle
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import quote
+
+from sklearn.ensemble import HistGradientBoostingRegressor
+from sklearn.linear_model import Ridge
+
+from src.services.place_runner import PlaceRunner
+from src.utils.helpers import to_unix_seconds
+from src.utils.timestamps import calendar_features
+
+
+# Forecast horizon in days per period; forecasts are mean daily quantities
+FORECAST_HORIZONS = {'daily': 1, 'weekly': 7, 'monthly': 30}
+
+MODELS = ('gbm', 'linear')
+
+DEFAULT_PARAMS = {
+    'gbm': {'max_iter': 200, 'learning_rate': 0.1, 'max_leaf_nodes': 31,
+            'min_samples_leaf': 20},
+    'linear': {'alpha': 1.0},
+}
+
+DEFAULT_LAGS = (1, 2, 3, 7, 14)
+DEFAULT_WINDOWS = (7, 28)
+
+# Partition used when items cannot be mapped to places
+GLOBAL_PARTITION = -1
+
+_DAY_SECONDS = 86400
+
+
+def feature_columns(lags: Iterable[int] = DEFAULT_LAGS,
+                    windows: Iterable[int] = DEFAULT_WINDOWS) -> List[str]:
+    """
+    Lists the model inputs in the order they are fed to the estimators.
+    
+    Args:
+        lags (Iterable[int]): Lags in days (1 is the most recent day).
+        windows (Iterable[int]): Rolling-mean windows in days.
+    
+    Returns:
+        List[str]: Feature column names.
+    """
+    return ([f'lag_{lag}' for lag in lags] + [f'mean_{window}' for window in windows]
+            + ['age', 'weekday', 'month', 'is_holiday'])
+
+
+def build_features(sales: pd.DataFrame, lags: Iterable[int] = DEFAULT_LAGS,
+                   windows: Iterable[int] = DEFAULT_WINDOWS, history_days: int = 365,
+                   horizons: Iterable[int] = (1,), item_column: str = 'item_id',
+                   date_column: str = 'date',
+                   quantity_column: str = 'quantity') -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Builds lag and calendar features for every item and day in one pass.
+    
+    Sales are laid out as one dense daily series per item, from its first sale
+    (at most history_days back) to the last day in the data, with zeros on days
+    without sales. Each row is a forecast origin: features use that day and the
+    days before it, calendar features describe the next day, and 'target_<h>'
+    holds the mean daily quantity of the following h days.
+    
+    Args:
+        sales (pd.DataFrame): Daily sales per item.
+        lags (Iterable[int]): Lags in days.
+        windows (Iterable[int]): Rolling-mean windows in days.
+        history_days (int): Longest history kept per item.
+        horizons (Iterable[int]): Target horizons in days.
+        item_column (str): Name of the item identifier column.
+        date_column (str): Name of the date column (dates or UNIX seconds).
+        quantity_column (str): Name of the sold quantity column.
+    
+    Returns:
+        Tuple[pd.DataFrame, pd.DataFrame]: Training rows (features, targets
+            and 'item_id') and the latest origin of every item ('item_id' and
+            features), one row per item.
+    """
+    lags, windows, horizons = list(lags), list(windows), list(horizons)
+    columns = feature_columns(lags, windows)
+    valid = (sales[item_column].notna() & sales[date_column].notna()).to_numpy()
+    if not valid.any():
+        empty = pd.DataFrame({name: np.empty(0, dtype=np.float32) for name in columns})
+        return (empty.assign(item_id=np.empty(0, dtype=object),
+                             **{f'target_{h}': np.empty(0) for h in horizons}),
+                empty.assign(item_id=np.empty(0, dtype=object)))
+    
+    codes, item_ids = pd.factorize(sales[item_column][valid], sort=True)
+    days = day_numbers(sales[date_column][valid])
+    quantity = sales[quantity_column][valid].to_numpy(dtype='float64', na_value=0.0)
+    
+    last = int(days.max())
+    first = np.full(len(item_ids), last, dtype=np.int64)
+    np.minimum.at(first, codes, days)
+    first = np.maximum(first, last - history_days + 1)
+    keep = days >= first[codes]
+    codes, days, quantity = codes[keep], days[keep], quantity[keep]
+    
+    # Dense daily series per item, laid end to end
+    lengths = last - first + 1
+    starts = np.cumsum(lengths) - lengths
+    total = int(lengths.sum())
+    y = np.bincount(starts[codes] + days - first[codes], weights=quantity, minlength=total)
+    cumulative = np.concatenate(([0.0], np.cumsum(y)))
+    
+    series = np.repeat(np.arange(len(item_ids)), lengths)
+    position = np.arange(total)
+    segment_start = starts[series]
+    segment_end = segment_start + lengths[series] - 1
+    row_day = first[series] + (position - segment_start)
+    
+    features = {}
+    for lag in lags:
+        source = position - (lag - 1)
+        features[f'lag_{lag}'] = np.where(source >= segment_start, y[np.maximum(source, 0)], 0.0)
+    for window in windows:
+        low = np.maximum(position - window + 1, segment_start)
+        features[f'mean_{window}'] = (cumulative[position + 1] - cumulative[low]) / (position + 1 - low)
+    features['age'] = position - segment_start + 1
+    
+    # Calendar of the forecast day, computed once per distinct day
+    first_day = int(first.min())
+    calendar = calendar_features(pd.Series(np.arange(first_day + 1, last + 2) * _DAY_SECONDS),
+                                 tz='UTC')
+    offsets = row_day - first_day
+    features['weekday'] = calendar['weekday'].to_numpy()[offsets]
+    features['month'] = calendar['month'].to_numpy()[offsets]
+    features['is_holiday'] = calendar['is_holiday'].to_numpy()[offsets]
+    
+    panel = pd.DataFrame({name: features[name].astype(np.float32) for name in columns})
+    panel['item_id'] = np.asarray(item_ids, dtype=object)[series]
+    for horizon in horizons:
+        end = position + horizon
+        target = np.full(total, np.nan)
+        inside = end <= segment_end
+        target[inside] = (cumulative[end[inside] + 1] - cumulative[position[inside] + 1]) / horizon
+        panel[f'target_{horizon}'] = target
+    
+    latest = panel.loc[position == segment_end, ['item_id'] + columns].reset_index(drop=True)
+    return panel, latest
+
+
+def fit_place_models(place_id, features: pd.DataFrame, inventory: pd.DataFrame,
+                     model: str, params: dict, columns: List[str], horizons: Dict[str, int],
+                     path: Optional[str] = None, max_rows: int = 500_000,
+                     seed: int = 0) -> pd.DataFrame:
+    """
+    PlaceRunner task: fits one model per period on a place's feature rows.
+    
+    Args:
+        place_id: The place (or GLOBAL_PARTITION).
+        features (pd.DataFrame): The place's training rows from build_features.
+        inventory (pd.DataFrame): Unused; part of the PlaceRunner task signature.
+        model (str): 'gbm' or 'linear'.
+        params (dict): Estimator hyperparameters.
+        columns (List[str]): Feature columns.
+        horizons (Dict[str, int]): Horizon in days per period.
+        path (str, optional): Pickle destination; the fitted models are
+            returned in the frame when None.
+        max_rows (int): Most training rows per model (random sample above).
+        seed (int): Random seed for sampling and the estimator.
+    
+    Returns:
+        pd.DataFrame: One row per period with the training row count, plus a
+            'models' column holding the estimators when path is None.
+    """
+    rng = np.random.default_rng(seed)
+    fitted, rows = {}, []
+    for period, horizon in horizons.items():
+        target = features[f'target_{horizon}'].to_numpy()
+        usable = np.flatnonzero(~np.isnan(target))
+        if len(usable) == 0:
+            continue
+        if len(usable) > max_rows:
+            usable = np.sort(rng.choice(usable, max_rows, replace=False))
+        estimator = _estimator(model, params, seed)
+        estimator.fit(features[columns].to_numpy()[usable], target[usable])
+        fitted[period] = estimator
+        rows.append((period, len(usable)))
+    
+    result = pd.DataFrame(rows, columns=['period', 'rows'])
+    if path is None:
+        result['models'] = [fitted] * len(result)
+        return result
+    
+    temporary = f'{path}.{os.getpid()}.tmp'
+    with open(temporary, 'wb') as handle:
+        pickle.dump(fitted, handle, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporary, path)
+    return result
+
+
+class ForecastBackend(abc.ABC):
+    """
+    Interface for InventoryService forecasting backends.
+    
+    A backend is fitted once on the service's daily sales and then answers
+    forecasts for many items at a time. Items it cannot forecast get NaN, and
+    the service falls back to its moving average for them.
+    
+    Attributes:
+        name (str): Short backend name.
+        fitted (bool): Whether fit() has run.
+    
+    Methods:
+        fit(sales_data): Prepares the backend for serving.
+        predict(item_ids, period): Forecasts for many items.
+    """
+    
+    name = 'base'
+    fitted = False
+    
+    def fit(self, sales_data: pd.DataFrame) -> 'ForecastBackend':
+        """
+        Prepares the backend for serving.
+        
+        Args:
+            sales_data (pd.DataFrame): Daily sales per item.
+        
+        Returns:
+            ForecastBackend: self.
+        """
+        self.fitted = True
+        return self
+    
+    @abc.abstractmethod
+    def predict(self, item_ids: Iterable, period: str = 'daily') -> np.ndarray:
+        """
+        Forecasts mean daily demand for many items.
+        
+        Args:
+            item_ids (Iterable): Item identifiers.
+            period (str): Forecast period ('daily', 'weekly', 'monthly').
+        
+        Returns:
+            np.ndarray: float64 forecast per item, NaN where unavailable.
+        """
+
+
+class GlobalModelBackend(ForecastBackend):
+    """
+    Gradient-boosting or linear model shared by all items of a place.
+    
+    fit() builds the feature panel, loads cached models or trains the missing
+    ones in parallel across places, and forecasts every item's latest origin
+    with one predict call per model and period. predict() is then a lookup;
+    serving never trains.
+    
+    Attributes:
+        model (str): 'gbm' (HistGradientBoostingRegressor) or 'linear' (Ridge).
+        params (dict): Estimator hyperparameters (defaults merged in).
+        periods (tuple): Periods with a fitted model.
+        cache_dir (str or None): Directory of pickled models (no disk cache if None).
+        item_ids (np.ndarray): Items with a forecast.
+        forecasts (Dict[str, np.ndarray]): Forecast per period, aligned to item_ids.
+        trained (list): Places trained by the last fit() (GLOBAL_PARTITION for
+            items without a place).
+        loaded (list): Places loaded from the cache by the last fit().
+    
+    Methods:
+        fit(sales_data, item_places, data_version): Loads or trains the models.
+        predict(item_ids, period): Forecasts for many items.
+        cache_key(data_version): Cache key for a data version.
+    """
+    
+    name = 'global_model'
+    
+    def __init__(self, model: str = 'gbm', params: Optional[dict] = None,
+                 periods: Iterable[str] = ('daily', 'weekly'),
+                 lags: Iterable[int] = DEFAULT_LAGS, windows: Iterable[int] = DEFAULT_WINDOWS,
+                 history_days: int = 365, cache_dir: Optional[str] = None,
+                 max_workers: Optional[int] = None, max_rows: int = 500_000, seed: int = 0):
+        """
+        Initialize the backend.
+        
+        Args:
+            model (str): 'gbm' or 'linear'.
+            params (dict, optional): Hyperparameters overriding DEFAULT_PARAMS.
+            periods (Iterable[str]): Periods to fit (keys of FORECAST_HORIZONS).
+            lags (Iterable[int]): Lag features in days.
+            windows (Iterable[int]): Rolling-mean windows in days.
+            history_days (int): Longest history used per item.
+            cache_dir (str, optional): Directory for pickled models.
+            max_workers (int, optional): Training processes (CPU count by default).
+            max_rows (int): Most training rows per model.
+            seed (int): Random seed.
+        
+        Raises:
+            ValueError: If the model or a period is unknown.
+        """
+        if model not in MODELS:
+            raise ValueError(f"Unknown model '{model}'. Use one of {MODELS}")
+        periods = tuple(periods)
+        unknown = [period for period in periods if period not in FORECAST_HORIZONS]
+        if unknown:
+            raise ValueError(f"Unknown period(s) {unknown}. Use {tuple(FORECAST_HORIZONS)}")
+        
+        self.model = model
+        self.params = {**DEFAULT_PARAMS[model], **(params or {})}
+        self.periods = periods
+        self.lags = tuple(lags)
+        self.windows = tuple(windows)
+        self.history_days = history_days
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers
+        self.max_rows = max_rows
+        self.seed = seed
+        self.item_ids = np.empty(0, dtype=object)
+        self.forecasts: Dict[str, np.ndarray] = {}
+        self.trained: list = []
+        self.loaded: list = []
+        self._index = pd.Index([])
+    
+    def cache_key(self, data_version: str) -> str:
+        """
+        Digest of everything that shapes the fitted models and of a data version.
+        
+        Args:
+            data_version (str): Version of a partition's sales.
+        
+        Returns:
+            str: '<config>-<version>', 12 and 16 hex characters.
+        """
+        config = repr((self.model, sorted(self.params.items()), self.periods, self.lags,
+                       self.windows, self.history_days, self.max_rows, self.seed))
+        config_digest = hashlib.sha1(config.encode('utf-8')).hexdigest()[:12]
+        version_digest = hashlib.sha1(data_version.encode('utf-8')).hexdigest()[:16]
+        return f'{config_digest}-{version_digest}'
+    
+    def fit(self, sales_data: pd.DataFrame, item_places: Optional[pd.Series] = None,
+            data_version: Optional[str] = None, item_column: str = 'item_id',
+            date_column: str = 'date', quantity_column: str = 'quantity',
+            place_column: str = 'place_id') -> 'GlobalModelBackend':
+        """
+        Loads cached models or trains them, then forecasts every item.
+        
+        Items are partitioned by the sales' place column, else by item_places,
+        else all items share one model.
+        
+        Args:
+            sales_data (pd.DataFrame): Daily sales per item.
+            item_places (pd.Series, optional): place_id indexed by item_id
+                (e.g. dim_items.set_index('id')['place_id']).
+            data_version (str, optional): Version of the sales data; by default
+                a content hash per partition, so unchanged places are never
+                retrained.
+            item_column (str): Name of the item identifier column.
+            date_column (str): Name of the date column.
+            quantity_column (str): Name of the sold quantity column.
+            place_column (str): Name of the place column in sales_data.
+        
+        Returns:
+            GlobalModelBackend: self.
+        """
+        horizons = {period: FORECAST_HORIZONS[period] for period in self.periods}
+        panel, latest = build_features(sales_data, self.lags, self.windows, self.history_days,
+                                       sorted(set(horizons.values())), item_column,
+                                       date_column, quantity_column)
+        columns = feature_columns(self.lags, self.windows)
+        
+        places = self._item_places(sales_data, item_places, item_column, place_column)
+        labels = _partition_labels(places)
+        panel['place_id'] = _partitions(places, panel['item_id'])
+        latest_places = _partitions(places, latest['item_id'])
+        
+        # Per-place data versions decide which partitions need training
+        versions = self._data_versions(sales_data, places, data_version, item_column,
+                                       date_column, quantity_column)
+        models, paths = {}, {}
+        for place in pd.unique(panel['place_id']).tolist():
+            label = quote(str(labels[place]), safe='')
+            paths[place] = (os.path.join(self.cache_dir, f'forecast-{label}-'
+                                         f'{self.cache_key(versions.get(place, ""))}.pkl')
+                            if self.cache_dir else None)
+            if paths[place] and os.path.exists(paths[place]):
+                with open(paths[place], 'rb') as handle:
+                    models[place] = pickle.load(handle)
+        loaded = sorted(models)
+        trained = sorted(place for place in paths if place not in models)
+        models.update(self._train(panel, columns, horizons, paths, trained))
+        self._evict(paths, trained)
+        self.loaded = [labels[place] for place in loaded]
+        self.trained = [labels[place] for place in trained]
+        
+        # One batched predict per model and period over the latest origins
+        features = latest[columns].to_numpy()
+        self.forecasts = {period: np.full(len(latest), np.nan) for period in self.periods}
+        for place, fitted in models.items():
+            rows = np.flatnonzero(latest_places == place)
+            for period, estimator in fitted.items():
+                self.forecasts[period][rows] = np.maximum(estimator.predict(features[rows]), 0.0)
+        
+        self.item_ids = latest['item_id'].to_numpy()
+        self._index = pd.Index(self.item_ids)
+        self.fitted = True
+        return self
+    
+    def predict(self, item_ids: Iterable, period: str = 'daily') -> np.ndarray:
+        """
+        Forecasts mean daily demand for many items.
+        
+        Args:
+            item_ids (Iterable): Item identifiers.
+            period (str): Forecast period.
+        
+        Returns:
+            np.ndarray: float64 forecast per item, NaN for items or periods
+                without a model.
+        """
+        item_ids = np.asarray(list(item_ids), dtype=object)
+        result = np.full(len(item_ids), np.nan)
+        forecasts = self.forecasts.get(period)
+        if forecasts is None or len(item_ids) == 0:
+            return result
+        positions = self._index.get_indexer(item_ids)
+        found = positions >= 0
+        result[found] = forecasts[positions[found]]
+        return result
+    
+    def _train(self, panel: pd.DataFrame, columns: List[str], horizons: Dict[str, int],
+               paths: Dict, places: List) -> Dict:
+        """
+        Trains the models of the given partitions in parallel.
+        
+        Args:
+            panel (pd.DataFrame): Training rows with a place_id column.
+            columns (List[str]): Feature columns.
+            horizons (Dict[str, int]): Horizon per period.
+            paths (Dict): Cache path per partition (None without a cache).
+            places (List): Partitions to train.
+        
+        Returns:
+            Dict: Fitted models (period -> estimator) per partition.
+        """
+        if not places:
+            return {}
+        
+        with PlaceRunner(panel.drop(columns='item_id'), max_workers=self.max_workers,
+                         batch_size=1) as runner:
+            results = runner.run(_fit_cached_place, places, model=self.model,
+                                 params=self.params, columns=columns, horizons=horizons,
+                                 paths=paths, max_rows=self.max_rows, seed=self.seed)
+        return {place: self._collect(result, paths[place])
+                for place, result in results.groupby('place_id', sort=False)}
+    
+    def _evict(self, paths: Dict, places: List) -> None:
+        """
+        Removes the older cache files of freshly trained partitions.
+        
+        The data version changes with every new sales day, so each retrain
+        writes a new file. Only files of the same place and hyperparameters
+        (the 'forecast-<place>-<config>-' prefix) are removed.
+        
+        Args:
+            paths (Dict): Cache path per partition (None without a cache).
+            places (List): Partitions just trained.
+        """
+        if not self.cache_dir:
+            return
+        prefixes = {os.path.basename(paths[place]).rsplit('-', 1)[0] + '-': paths[place]
+                    for place in places}
+        for name in os.listdir(self.cache_dir):
+            stale = os.path.join(self.cache_dir, name)
+            current = prefixes.get(name.rsplit('-', 1)[0] + '-')
+            if current is not None and name.endswith('.pkl') and stale != current:
+                os.remove(stale)
+    
+    @staticmethod
+    def _collect(result: pd.DataFrame, path: Optional[str]) -> Dict:
+        """
+        Reads the fitted models of a partition back from a task result.
+        
+        Args:
+            result (pd.DataFrame): fit_place_models output for the partition.
+            path (str, optional): Where the task pickled the models.
+        
+        Returns:
+            Dict: period -> estimator.
+        """
+        if path is None:
+            return result['models'].iloc[0] if len(result) else {}
+        with open(path, 'rb') as handle:
+            return pickle.load(handle)
+    
+    @staticmethod
+    def _item_places(sales_data: pd.DataFrame, item_places: Optional[pd.Series],
+                     item_column: str, place_column: str) -> pd.Series:
+        """
+        Resolves the partition of every item.
+        
+        Args:
+            sales_data (pd.DataFrame): Daily sales per item.
+            item_places (pd.Series, optional): place_id indexed by item_id.
+            item_column (str): Name of the item identifier column.
+            place_column (str): Name of the place column in sales_data.
+        
+        Returns:
+            pd.Series: Place indexed by item_id (empty if unknown).
+        """
+        if place_column in sales_data.columns:
+            pairs = sales_data[[item_column, place_column]].dropna()
+            item_places = pairs.drop_duplicates(item_column).set_index(item_column)[place_column]
+        if item_places is None:
+            return pd.Series(dtype='float64')
+        return item_places[item_places.notna() & ~item_places.index.duplicated()]
+    
+    @staticmethod
+    def _data_versions(sales_data: pd.DataFrame, places: pd.Series,
+                       data_version: Optional[str], item_column: str, date_column: str,
+                       quantity_column: str) -> Dict:
+        """
+        Computes a data version per partition.
+        
+        Row hashes are summed per partition (order-independent), together with
+        the last sales day, which shifts every item's history window.
+        
+        Args:
+            sales_data (pd.DataFrame): Daily sales per item.
+            places (pd.Series): Place per item.
+            data_version (str, optional): Explicit version used for every partition.
+            item_column (str): Name of the item identifier column.
+            date_column (str): Name of the date column.
+            quantity_column (str): Name of the sold quantity column.
+        
+        Returns:
+            Dict: Version string per partition.
+        """
+        frame = sales_data[[item_column, date_column, quantity_column]]
+        partitions = _partitions(places, frame[item_column])
+        if data_version is not None:
+            return {place: data_version for place in pd.unique(partitions).tolist()}
+        
+        hashes = pd.util.hash_pandas_object(frame, index=False).to_numpy()
+        sums = pd.Series(hashes).groupby(partitions).sum()
+        last_day = str(frame[date_column].max())
+        return {place: f'{int(total)}:{last_day}' for place, total in sums.items()}
+
+
+def _fit_cached_place(place_id, features: pd.DataFrame, inventory: pd.DataFrame,
+                      paths: Dict, **kwargs) -> pd.DataFrame:
+    """
+    PlaceRunner task: fit_place_models with the partition's own cache path.
+    
+    Args:
+        place_id: The partition.
+        features (pd.DataFrame): The partition's training rows.
+        inventory (pd.DataFrame): Unused.
+        paths (Dict): Cache path per partition.
+        **kwargs: Remaining fit_place_models arguments.
+    
+    Returns:
+        pd.DataFrame: fit_place_models output.
+    """
+    return fit_place_models(place_id, features, inventory, path=paths[place_id], **kwargs)
+
+
+def _partitions(places: pd.Series, item_ids: pd.Series) -> np.ndarray:
+    """
+    Looks up the partition of each item, GLOBAL_PARTITION for unmapped items.
+    
+    Place ids of any type (int, string, ...) are factorized, so a partition is
+    the position of the item's place in the sorted distinct places.
+    
+    Args:
+        places (pd.Series): Place indexed by item_id.
+        item_ids (pd.Series): Items to look up.
+    
+    Returns:
+        np.ndarray: int64 partition per item.
+    """
+    codes, _ = pd.factorize(places, sort=True)
+    positions = places.index.get_indexer(item_ids)
+    # Position -1 (unmapped item) selects the appended GLOBAL_PARTITION
+    return np.append(codes, GLOBAL_PARTITION).astype('int64')[positions]
+
+
+def _partition_labels(places: pd.Series) -> Dict[int, object]:
+    """
+    Maps the partitions of _partitions() back to place ids.
+    
+    Args:
+        places (pd.Series): Place indexed by item_id.
+    
+    Returns:
+        Dict[int, object]: Place id per partition; GLOBAL_PARTITION maps to itself.
+    """
+    _, uniques = pd.factorize(places, sort=True)
+    labels = dict(enumerate(uniques.tolist()))
+    labels[GLOBAL_PARTITION] = GLOBAL_PARTITION
+    return labels
+
+
+def _estimator(model: str, params: dict, seed: int):
+    """
+    Creates an unfitted estimator.
+    
+    Args:
+        model (str): 'gbm' or 'linear'.
+        params (dict): Hyperparameters.
+        seed (int): Random seed (gbm only).
+    
+    Returns:
+        An sklearn regressor.
+    """
+    if model == 'gbm':
+        return HistGradientBoostingRegressor(random_state=seed, **params)
+    return Ridge(**params)
+
+
+def day_numbers(values: pd.Series) -> np.ndarray:
+    """
+    Converts dates or UNIX seconds to day numbers (days since 1970-01-01).
+    
+    Timezone-aware datetimes count by their local calendar day.
+    
+    Args:
+        values (pd.Series): Dates, datetimes or UNIX seconds.
+    
+    Returns:
+        np.ndarray: int64 day numbers, -1 for missing values.
+    """
+    if not pd.api.types.is_numeric_dtype(values.dtype):
+        if not pd.api.types.is_datetime64_any_dtype(values.dtype):
+            values = pd.to_datetime(values)
+        if values.dt.tz is not None:
+            values = values.dt.tz_localize(None)
+    seconds, valid = to_unix_seconds(values)
+    return np.where(valid, seconds // _DAY_SECONDS, -1)
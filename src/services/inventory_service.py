@@ -10,7 +10,26 @@ Students should replace this with their actual implementation.
 
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+from src.services.bom_service import BomExplosionEngine
+from src.services.demand_state import DemandState
+from src.services.expiry_index import DateLike, ExpiryIndex
+from src.utils.helpers import aggregate_chunks
+from src.utils.instrumentation import traced
+
+
+def demand_window(period: str) -> int:
+    """
+    Returns the moving-average window used for a forecast period.
+    
+    Args:
+        period (str): Time period for prediction ('daily', 'weekly', 'monthly').
+    
+    Returns:
+        int: Number of most recent sales rows averaged (7, 4 or 3).
+    """
+    return 7 if period == 'daily' else 4 if period == 'weekly' else 3
 
 
 class InventoryService:
@@ -20,33 +39,174 @@ class InventoryService:
     This service provides methods for analyzing inventory levels, predicting demand,
     and generating recommendations for stock optimization.
     
+    Forecasts read the most recent sales of each item from an incremental
+    DemandState, so they never rescan the sales table and new orders can be
+    folded in with ingest() without recomputing history. Assigning a new
+    sales_data frame rebuilds the state.
+    
+    An optional forecast_backend (see src.services.forecasting) replaces the
+    moving average. It is fitted once when the service is built; items it has
+    no forecast for, such as items first seen through ingest(), keep the
+    moving average.
+    
+    Public methods are timed as spans (src.utils.instrumentation.traced).
+    
     Attributes:
         inventory_data (pd.DataFrame): Current inventory dataset.
-        sales_data (pd.DataFrame): Historical sales dataset.
+        sales_data (pd.DataFrame): Historical sales dataset, including ingested rows.
+        demand_state (DemandState): Recent sales per item used for forecasting.
+        expiry_index (ExpiryIndex): Inventory rows sorted by expiry date per place.
+        forecast_backend (ForecastBackend or None): Model-based forecaster.
     
     Methods:
+        from_sales_chunks(inventory_data, sales_chunks): Builds the service from a sales stream.
+        from_state(inventory_data, path): Restores the service from a state snapshot.
+        ingest(new_sales): Folds new sales into the forecasting state.
+        save_state(path): Writes the forecasting state to disk.
+        update_inventory(report): Applies an inventory report to the expiry index.
         predict_demand(item_id, period): Predicts demand for a specific item.
         calculate_reorder_point(item_id): Calculates optimal reorder point.
-        identify_expiring_items(days_threshold): Identifies items near expiration.
+        identify_expiring_items(days_threshold, place_id): Identifies items near expiration.
+        predict_demand_many(item_ids, period): Predicts demand for many items at once.
+        calculate_reorder_points(item_ids): Calculates reorder points for many items.
+        generate_recommendations_bulk(item_ids): Recommendations for many items as a DataFrame.
+        predict_ingredient_demand(bom_engine, period): Explodes item forecasts into ingredients.
     """
     
-    def __init__(self, inventory_data: pd.DataFrame, sales_data: pd.DataFrame):
+    @traced()
+    def __init__(self, inventory_data: pd.DataFrame, sales_data: pd.DataFrame,
+                 forecast_backend=None):
         """
         Initialize the InventoryService.
         
         Args:
             inventory_data (pd.DataFrame): Current inventory dataset.
             sales_data (pd.DataFrame): Historical sales dataset.
+            forecast_backend (ForecastBackend, optional): Forecaster used instead
+                of the moving average; fitted on sales_data unless already fitted.
         """
         self.inventory_data = inventory_data
         self.sales_data = sales_data
+        self.forecast_backend = forecast_backend
+        if forecast_backend is not None and not forecast_backend.fitted:
+            forecast_backend.fit(sales_data)
+    
+    @property
+    def inventory_data(self) -> pd.DataFrame:
+        """pd.DataFrame: Inventory dataset the service was built with."""
+        return self._inventory_data
+    
+    @inventory_data.setter
+    def inventory_data(self, inventory_data: pd.DataFrame) -> None:
+        self._inventory_data = inventory_data
+        self.expiry_index = ExpiryIndex(inventory_data)
+    
+    @property
+    def sales_data(self) -> pd.DataFrame:
+        """pd.DataFrame: Historical sales dataset, including ingested rows."""
+        if self._pending_sales:
+            self._sales_data = pd.concat([self._sales_data] + self._pending_sales,
+                                         ignore_index=True)
+            self._pending_sales = []
+        return self._sales_data
+    
+    @sales_data.setter
+    def sales_data(self, sales_data: pd.DataFrame) -> None:
+        self._sales_data = sales_data
+        self._pending_sales = []
+        self.demand_state = DemandState.from_sales(sales_data)
+    
+    @classmethod
+    @traced()
+    def from_state(cls, inventory_data: pd.DataFrame, path: str) -> 'InventoryService':
+        """
+        Restores a service from a state snapshot written by save_state().
+        
+        The service starts without raw sales history; forecasts are served from
+        the snapshot and further orders can be added with ingest().
+        
+        Args:
+            inventory_data (pd.DataFrame): Current inventory dataset.
+            path (str): Snapshot file path.
+        
+        Returns:
+            InventoryService: Service backed by the restored state.
+        """
+        service = cls(inventory_data, pd.DataFrame({'item_id': [], 'date': [], 'quantity': []}))
+        service.demand_state = DemandState.load(path)
+        return service
+    
+    @traced()
+    def ingest(self, new_sales: pd.DataFrame) -> int:
+        """
+        Folds new sales rows into the forecasting state.
+        
+        Only the affected items' state is updated; the rows are also queued for
+        sales_data, which concatenates them the next time it is read.
+        
+        Args:
+            new_sales (pd.DataFrame): New rows with the same columns and
+                granularity as sales_data.
+        
+        Returns:
+            int: Number of distinct items updated.
+        """
+        updated = self.demand_state.ingest(new_sales)
+        if not new_sales.empty:
+            self._pending_sales.append(new_sales)
+        return updated
     
+    @traced()
+    def save_state(self, path: str) -> None:
+        """
+        Writes the forecasting state to disk (see DemandState.save).
+        
+        Args:
+            path (str): Destination file path.
+        """
+        self.demand_state.save(path)
+    
+    @classmethod
+    @traced()
+    def from_sales_chunks(cls, inventory_data: pd.DataFrame,
+                          sales_chunks: Iterable[pd.DataFrame],
+                          date_column: str = 'created',
+                          item_column: str = 'item_id',
+                          quantity_column: str = 'quantity',
+                          forecast_backend=None) -> 'InventoryService':
+        """
+        Builds the service from a stream of raw order-line chunks.
+        
+        The chunks (typically DataLoader.iter_csv over fct_order_items) are
+        reduced to one row per item and day, so the full order-line table is
+        never held in memory. Moving averages then run over daily quantities.
+        
+        Args:
+            inventory_data (pd.DataFrame): Current inventory dataset.
+            sales_chunks (Iterable[pd.DataFrame]): Order-line chunks.
+            date_column (str): Name of the timestamp column (dates or UNIX seconds).
+            item_column (str): Name of the item identifier column.
+            quantity_column (str): Name of the sold quantity column.
+            forecast_backend (ForecastBackend, optional): Forecaster fitted on
+                the daily sales.
+        
+        Returns:
+            InventoryService: Service backed by daily per-item sales.
+        """
+        daily = aggregate_chunks(sales_chunks, date_column, quantity_column,
+                                 group_by=[item_column])
+        daily = daily.rename(columns={item_column: 'item_id',
+                                      quantity_column: 'quantity',
+                                      date_column: 'date'})
+        return cls(inventory_data, daily, forecast_backend)
+    
+    @traced()
     def predict_demand(self, item_id: str, period: str = 'daily') -> float:
         """
         Predicts demand for a specific item based on historical data.
         
-        This is a simple moving average implementation. Students should implement
-        more sophisticated forecasting methods (ARIMA, Prophet, ML models).
+        This is a simple moving average implementation unless a forecast
+        backend is configured, which then answers for the items it knows.
         
         Args:
             item_id (str): The unique identifier of the item.
@@ -58,18 +218,22 @@ class InventoryService:
         Raises:
             ValueError: If item_id not found in sales data.
         """
-        # Filter sales data for the specific item
-        item_sales = self.sales_data[self.sales_data['item_id'] == item_id]
+        # Simple moving average (last 7 days for daily, etc.)
+        window = demand_window(period)
+        recent = self.demand_state.recent(item_id, window)
         
-        if item_sales.empty:
+        if len(recent) == 0:
             raise ValueError(f"No sales data found for item: {item_id}")
         
-        # Simple moving average (last 7 days for daily, etc.)
-        window = 7 if period == 'daily' else 4 if period == 'weekly' else 3
-        avg_demand = item_sales['quantity'].tail(window).mean()
+        recent = recent[~np.isnan(recent)]
+        avg_demand = recent.sum() / len(recent) if len(recent) else np.nan
+        if self.forecast_backend is not None:
+            forecast = self.forecast_backend.predict([item_id], period)[0]
+            avg_demand = avg_demand if np.isnan(forecast) else forecast
         
-        return round(avg_demand, 2)
+        return float(np.round(avg_demand, 2))
     
+    @traced()
     def calculate_reorder_point(self, item_id: str, lead_time_days: int = 3) -> int:
         """
         Calculates the optimal reorder point for an item.
@@ -92,23 +256,43 @@ class InventoryService:
         
         return int(np.ceil(reorder_point))
     
-    def identify_expiring_items(self, days_threshold: int = 7) -> pd.DataFrame:
+    @traced()
+    def identify_expiring_items(self, days_threshold: int = 7, place_id=None,
+                                today: Optional[DateLike] = None) -> pd.DataFrame:
         """
         Identifies items that are approaching expiration.
         
+        Served from the expiry index in O(log n + k); days_until_expiration is
+        recomputed from the absolute expiry date for the reference day.
+        
         Args:
             days_threshold (int): Number of days before expiration to flag items.
+            place_id: Restrict the result to one place (all places if None).
+            today (str | date, optional): Reference date (defaults to today).
         
         Returns:
             pd.DataFrame: DataFrame containing items near expiration with recommendations.
         """
-        # This is a placeholder - students should implement actual expiration logic
-        expiring = self.inventory_data[
-            self.inventory_data['days_until_expiration'] <= days_threshold
-        ]
+        return self.expiry_index.expiring(days_threshold, place_id, today)
+    
+    @traced()
+    def update_inventory(self, report: pd.DataFrame, full_snapshot: bool = True) -> int:
+        """
+        Applies an inventory report (e.g. fct_inventory_reports) to the expiry index.
+        
+        Only the places in the report are re-indexed. inventory_data keeps the
+        frame the service was built with.
         
-        return expiring.sort_values('days_until_expiration')
+        Args:
+            report (pd.DataFrame): Inventory rows with expiry information.
+            full_snapshot (bool): Whether the report is complete for its places.
+        
+        Returns:
+            int: Number of places updated.
+        """
+        return self.expiry_index.update(report, full_snapshot)
     
+    @traced()
     def generate_recommendations(self, item_id: str) -> Dict[str, any]:
         """
         Generates comprehensive inventory recommendations for an item.
@@ -129,3 +313,181 @@ class InventoryService:
         }
         
         return recommendations
+    
+    @traced()
+    def predict_demand_many(self, item_ids: Union[Iterable, str] = 'all',
+                            period: str = 'daily',
+                            errors: str = 'raise') -> pd.DataFrame:
+        """
+        Predicts demand for many items in one vectorised pass.
+        
+        Gives exactly the same numbers as calling predict_demand per item, but
+        reduces all moving-average windows in one vectorised pass over the
+        demand state and asks the forecast backend once for all items.
+        
+        Args:
+            item_ids (Iterable | str): Item identifiers, or 'all' for every item
+                with sales history.
+            period (str): Time period for prediction ('daily', 'weekly', 'monthly').
+            errors (str): 'raise' to fail on items without sales (like
+                predict_demand), 'coerce' to return NaN for them.
+        
+        Returns:
+            pd.DataFrame: Columns 'item_id' and 'predicted_demand', in the
+                order of item_ids.
+        
+        Raises:
+            ValueError: If an item has no sales data and errors='raise'.
+        """
+        item_ids, positions = self._resolve_items(item_ids, errors)
+        
+        demand = self._forecast(item_ids, positions, period)
+        
+        return pd.DataFrame({'item_id': item_ids, 'predicted_demand': np.round(demand, 2)})
+    
+    @traced()
+    def calculate_reorder_points(self, item_ids: Union[Iterable, str] = 'all',
+                                 lead_time_days: int = 3,
+                                 errors: str = 'raise') -> pd.DataFrame:
+        """
+        Calculates reorder points for many items at once.
+        
+        Args:
+            item_ids (Iterable | str): Item identifiers, or 'all'.
+            lead_time_days (int): Number of days for supplier delivery.
+            errors (str): 'raise' or 'coerce' (see predict_demand_many).
+        
+        Returns:
+            pd.DataFrame: Columns 'item_id' and 'reorder_point' (nullable Int64).
+        """
+        daily = self.predict_demand_many(item_ids, 'daily', errors)
+        return pd.DataFrame({
+            'item_id': daily['item_id'],
+            'reorder_point': self._reorder_points(daily['predicted_demand'], lead_time_days),
+        })
+    
+    @traced()
+    def generate_recommendations_bulk(self, item_ids: Union[Iterable, str] = 'all',
+                                      lead_time_days: int = 3,
+                                      errors: str = 'raise') -> pd.DataFrame:
+        """
+        Generates inventory recommendations for many items as one DataFrame.
+        
+        Each row holds the same fields as generate_recommendations returns for
+        that item, computed with two vectorised window reductions in total.
+        
+        Args:
+            item_ids (Iterable | str): Item identifiers, or 'all'.
+            lead_time_days (int): Number of days for supplier delivery.
+            errors (str): 'raise' or 'coerce' (see predict_demand_many).
+        
+        Returns:
+            pd.DataFrame: One row per item with demand, reorder point, status and action.
+        """
+        item_ids, positions = self._resolve_items(item_ids, errors)
+        
+        daily = np.round(self._forecast(item_ids, positions, 'daily'), 2)
+        weekly = self._forecast(item_ids, positions, 'weekly')
+        
+        return pd.DataFrame({
+            'item_id': item_ids,
+            'predicted_daily_demand': daily,
+            'predicted_weekly_demand': np.round(weekly, 2),
+            'reorder_point': self._reorder_points(daily, lead_time_days),
+            'status': 'optimal',
+            'action': 'monitor',
+        })
+    
+    @traced()
+    def predict_ingredient_demand(self, bom_engine: BomExplosionEngine,
+                                  period: str = 'daily') -> pd.Series:
+        """
+        Forecasts raw ingredient demand from the sold-item forecasts.
+        
+        Every item with sales history is forecast in one bulk pass and the
+        resulting demand vector is exploded through the bill of materials. The
+        recipes' parents must use the sales' item ids (the engine defaults to
+        menu_item_id parents); if none matches, the engine logs a warning and
+        the result is empty.
+        
+        Args:
+            bom_engine (BomExplosionEngine): Flattened recipes keyed by the sold item ids.
+            period (str): Time period for prediction ('daily', 'weekly', 'monthly').
+        
+        Returns:
+            pd.Series: Predicted demand per ingredient id.
+        """
+        demand = self.predict_demand_many('all', period).dropna()
+        return bom_engine.explode(demand.set_index('item_id')['predicted_demand'])
+    
+    def _forecast(self, item_ids: np.ndarray, positions: np.ndarray,
+                  period: str) -> np.ndarray:
+        """
+        Unrounded demand for resolved items, backend first, moving average otherwise.
+        
+        Args:
+            item_ids (np.ndarray): Item identifiers.
+            positions (np.ndarray): Demand-state positions (-1 if unknown).
+            period (str): Time period for prediction.
+        
+        Returns:
+            np.ndarray: Predicted demand per item (NaN for unknown items).
+        """
+        demand = np.full(len(positions), np.nan)
+        known = positions >= 0
+        demand[known] = self.demand_state.window_means(positions[known], demand_window(period))
+        if self.forecast_backend is not None:
+            forecast = self.forecast_backend.predict(item_ids, period)
+            served = known & ~np.isnan(forecast)
+            demand[served] = forecast[served]
+        return demand
+    
+    def _resolve_items(self, item_ids: Union[Iterable, str],
+                       errors: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Resolves a bulk item selection to ids and sales-index positions.
+        
+        Args:
+            item_ids (Iterable | str): Item identifiers, or 'all'.
+            errors (str): 'raise' or 'coerce'.
+        
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Item ids and their positions (-1 if unknown).
+        
+        Raises:
+            ValueError: If errors is invalid, or an item is unknown and errors='raise'.
+        """
+        if errors not in ('raise', 'coerce'):
+            raise ValueError("errors must be 'raise' or 'coerce'")
+        
+        if isinstance(item_ids, str) and item_ids == 'all':
+            state = self.demand_state
+            positions = np.flatnonzero(state.counts > 0)
+            return state.item_ids[positions], positions
+        
+        item_ids = np.asarray(list(item_ids), dtype=object)
+        positions = self.demand_state.positions_of(item_ids)
+        if len(positions):
+            positions[self.demand_state.counts[np.maximum(positions, 0)] == 0] = -1
+        
+        if errors == 'raise' and (positions < 0).any():
+            missing = item_ids[positions < 0][0]
+            raise ValueError(f"No sales data found for item: {missing}")
+        return item_ids, positions
+    
+    @staticmethod
+    def _reorder_points(daily_demand, lead_time_days: int) -> pd.array:
+        """
+        Vectorised reorder point formula shared by the bulk methods.
+        
+        Args:
+            daily_demand (array-like): Rounded daily demand per item.
+            lead_time_days (int): Number of days for supplier delivery.
+        
+        Returns:
+            pd.array: Reorder points as nullable Int64.
+        """
+        daily_demand = np.asarray(daily_demand, dtype='float64')
+        safety_stock = (daily_demand * lead_time_days) * 0.5
+        reorder_point = np.ceil((daily_demand * lead_time_days) + safety_stock)
+        return pd.array(reorder_point, dtype='Int64')
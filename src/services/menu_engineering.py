@@ -0,0 +1,260 @@
+"""
+File: menu_engineering.py
+Description: Vectorised menu-engineering matrix (stars, plowhorses, puzzles, dogs) for all places.
+Dependencies: pandas, numpy
+Author: Sample Team
+
+Classic Kasavana & Smith menu engineering: an item is popular when its share
+of the place's units sold is at least 70% of an equal share (0.7 / items on
+the menu), and profitable when its contribution margin per unit (price - cost)
+is at least the place's quantity-weighted average margin.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, List, Optional
+
+from src.utils.helpers import filter_by_date_range
+
+
+# Quadrant names, in the order used by the API response
+CATEGORIES = ('stars', 'plowhorses', 'puzzles', 'dogs')
+
+# Share of an equal split that counts as popular
+POPULARITY_FACTOR = 0.7
+
+# Column each quadrant is sorted by, per API analysis_type
+ANALYSIS_SORT_KEYS = {'popularity': 'popularity_share', 'profitability': 'unit_margin',
+                      'both': 'total_margin'}
+
+
+class MenuEngineeringEngine:
+    """
+    Classifies every menu item of every place from pre-aggregated daily rollups.
+    
+    Raw order lines are reduced once to one row per (place, item, day) holding
+    units, revenue and cost. Analysing any date window slices those rollups
+    with filter_by_date_range and classifies all places in one grouped pass,
+    so re-analysis never rescans raw order lines. New order lines are folded
+    in with add().
+    
+    Attributes:
+        rollups (pd.DataFrame): Columns place_id, item_id, date, quantity,
+            revenue and cost (one row per place, item and day).
+        place_column (str): Name of the place column.
+        item_column (str): Name of the item column.
+        places (list): Places with sales.
+    
+    Methods:
+        from_rollups(rollups): Builds the engine from existing daily rollups.
+        add(order_items): Folds new order lines into the rollups.
+        analyze(start_date, end_date, places): Classifies items for all (or some) places.
+        analyze_place(place_id, start_date, end_date): One place's quadrants as lists.
+    """
+    
+    def __init__(self, order_items: pd.DataFrame, place_column: str = 'place_id',
+                 item_column: str = 'item_id', quantity_column: str = 'quantity',
+                 price_column: str = 'price', cost_column: str = 'cost',
+                 date_column: str = 'created'):
+        """
+        Builds the daily rollups.
+        
+        Args:
+            order_items (pd.DataFrame): Order lines (fct_order_items).
+            place_column (str): Name of the place column.
+            item_column (str): Name of the item column.
+            quantity_column (str): Name of the units sold column.
+            price_column (str): Name of the unit price column.
+            cost_column (str): Name of the unit cost column (missing cost counts as 0).
+            date_column (str): Name of the timestamp column (datetimes or UNIX seconds).
+        """
+        self.place_column = place_column
+        self.item_column = item_column
+        self._columns = (quantity_column, price_column, cost_column, date_column)
+        self._set_rollups(self._rollup(order_items))
+    
+    @classmethod
+    def from_rollups(cls, rollups: pd.DataFrame, place_column: str = 'place_id',
+                     item_column: str = 'item_id') -> 'MenuEngineeringEngine':
+        """
+        Builds the engine from existing daily rollups (e.g. RollupCube.query).
+        
+        Args:
+            rollups (pd.DataFrame): Columns place, item, 'date', 'quantity',
+                'revenue' and 'cost', one row per place, item and day.
+            place_column (str): Name of the place column.
+            item_column (str): Name of the item column.
+        
+        Returns:
+            MenuEngineeringEngine: Engine over the given rollups.
+        """
+        engine = cls.__new__(cls)
+        engine.place_column = place_column
+        engine.item_column = item_column
+        engine._columns = ('quantity', 'price', 'cost', 'created')
+        engine._set_rollups(rollups[[place_column, item_column, 'date',
+                                     'quantity', 'revenue', 'cost']])
+        return engine
+    
+    def __contains__(self, place_id) -> bool:
+        return place_id in self._offsets
+    
+    @property
+    def places(self) -> list:
+        """list: Places with sales in the rollups."""
+        return list(self._offsets)
+    
+    def add(self, order_items: pd.DataFrame) -> int:
+        """
+        Folds new order lines into the daily rollups.
+        
+        Args:
+            order_items (pd.DataFrame): New order lines with the same columns.
+        
+        Returns:
+            int: Number of rollup rows after the update.
+        """
+        if order_items.empty:
+            return len(self.rollups)
+        keys = [self.place_column, self.item_column, 'date']
+        combined = pd.concat([self.rollups, self._rollup(order_items)], ignore_index=True)
+        self._set_rollups(combined.groupby(keys, sort=False, observed=True).sum().reset_index())
+        return len(self.rollups)
+    
+    def analyze(self, start_date: Optional[str] = None, end_date: Optional[str] = None,
+                places: Optional[Iterable] = None) -> pd.DataFrame:
+        """
+        Classifies the items of all places over a date window.
+        
+        Args:
+            start_date (str, optional): First day included ('YYYY-MM-DD').
+            end_date (str, optional): Last day included ('YYYY-MM-DD').
+            places (Iterable, optional): Restrict to these places.
+        
+        Returns:
+            pd.DataFrame: One row per (place, item) with quantity, revenue,
+                popularity_share, unit_margin, total_margin, the place's
+                popularity_threshold and margin_threshold, and category.
+        
+        Raises:
+            ValueError: If start_date or end_date is not a date.
+        """
+        for bound in (start_date, end_date):
+            if bound is None:
+                continue
+            try:
+                valid = not pd.isna(pd.Timestamp(bound))
+            except (ValueError, TypeError):
+                valid = False
+            if not valid:
+                raise ValueError(f"Invalid date: {bound!r}")
+        rollups = self.rollups
+        if places is not None:
+            # Rollups are sorted by place, so each place is one contiguous slice
+            ranges = [self._offsets[p] for p in places if p in self._offsets]
+            rollups = pd.concat([rollups.iloc[start:end] for start, end in ranges]) \
+                if ranges else rollups.iloc[:0]
+        if start_date is not None or end_date is not None:
+            rollups = filter_by_date_range(rollups, 'date',
+                                           start_date or rollups['date'].min(),
+                                           end_date or rollups['date'].max())
+        
+        items = (rollups.groupby([self.place_column, self.item_column], sort=True, observed=True)
+                 [['quantity', 'revenue', 'cost']].sum().reset_index())
+        items = items[items['quantity'] > 0]
+        margin = items['revenue'] - items['cost']
+        
+        by_place = items.groupby(self.place_column, sort=False, observed=True)
+        place_quantity = by_place['quantity'].transform('sum')
+        place_margin = margin.groupby(items[self.place_column], sort=False,
+                                      observed=True).transform('sum')
+        menu_size = by_place['quantity'].transform('size')
+        
+        share = items['quantity'] / place_quantity
+        unit_margin = margin / items['quantity']
+        popularity_threshold = POPULARITY_FACTOR / menu_size
+        margin_threshold = place_margin / place_quantity
+        
+        popular = (share >= popularity_threshold).to_numpy()
+        profitable = (unit_margin >= margin_threshold).to_numpy()
+        category = np.select([popular & profitable, popular, profitable],
+                             ['star', 'plowhorse', 'puzzle'], default='dog')
+        
+        return items.assign(
+            revenue=items['revenue'].round(2),
+            cost=items['cost'].round(2),
+            popularity_share=share.round(4),
+            unit_margin=unit_margin.round(2),
+            total_margin=margin.round(2),
+            popularity_threshold=popularity_threshold.round(4),
+            margin_threshold=margin_threshold.round(2),
+            category=category,
+        ).reset_index(drop=True)
+    
+    def analyze_place(self, place_id, start_date: Optional[str] = None,
+                      end_date: Optional[str] = None,
+                      sort_by: str = 'total_margin') -> Dict[str, List[dict]]:
+        """
+        Returns one place's items grouped by quadrant.
+        
+        Args:
+            place_id: The place.
+            start_date (str, optional): First day included ('YYYY-MM-DD').
+            end_date (str, optional): Last day included ('YYYY-MM-DD').
+            sort_by (str): Column each quadrant is sorted by (descending).
+        
+        Returns:
+            Dict[str, List[dict]]: 'stars', 'plowhorses', 'puzzles' and 'dogs'
+                lists of item records.
+        """
+        result = self.analyze(start_date, end_date, places=[place_id])
+        result = result.drop(columns=self.place_column).sort_values(
+            [sort_by, self.item_column], ascending=[False, True])
+        records = result.to_dict(orient='records')
+        grouped = {name: [] for name in CATEGORIES}
+        for record in records:
+            grouped[record['category'] + 's'].append(record)
+        return grouped
+    
+    def _set_rollups(self, rollups: pd.DataFrame) -> None:
+        """
+        Stores rollups sorted by place and date and records each place's rows.
+        
+        Args:
+            rollups (pd.DataFrame): Daily rollup rows.
+        """
+        self.rollups = rollups.sort_values([self.place_column, 'date'], kind='stable',
+                                           ignore_index=True)
+        places, starts = np.unique(self.rollups[self.place_column].to_numpy(), return_index=True)
+        ends = np.append(starts[1:], len(self.rollups))
+        self._offsets = {place: (int(start), int(end))
+                         for place, start, end in zip(places.tolist(), starts, ends)}
+    
+    def _rollup(self, order_items: pd.DataFrame) -> pd.DataFrame:
+        """
+        Reduces order lines to units, revenue and cost per place, item and day.
+        
+        Args:
+            order_items (pd.DataFrame): Order lines.
+        
+        Returns:
+            pd.DataFrame: Daily rollup rows.
+        """
+        quantity_column, price_column, cost_column, date_column = self._columns
+        dates = order_items[date_column]
+        if pd.api.types.is_numeric_dtype(dates):
+            dates = pd.to_datetime(dates, unit='s')
+        quantity = order_items[quantity_column].astype('float64')
+        cost = order_items[cost_column] if cost_column in order_items.columns else 0.0
+        
+        frame = pd.DataFrame({
+            self.place_column: order_items[self.place_column],
+            self.item_column: order_items[self.item_column],
+            'date': pd.to_datetime(dates).dt.floor('D'),
+            'quantity': quantity,
+            'revenue': quantity * order_items[price_column].astype('float64'),
+            'cost': quantity * pd.Series(cost, index=order_items.index).astype('float64').fillna(0),
+        })
+        frame = frame.dropna(subset=[self.place_column, self.item_column, 'date'])
+        keys = [self.place_column, self.item_column, 'date']
+        return frame.groupby(keys, sort=False, observed=True).sum().reset_index()
@@ -0,0 +1,369 @@
+"""
+File: place_runner.py
+Description: Runs per-place inventory work in parallel across a process pool.
+Dependencies: pandas, numpy
+Author: Sample Team
+
+Every table links to dim_places via place_id and forecasts for one place never
+look at another place's rows, so per-place work parallelises cleanly. The
+runner sorts the sales and inventory frames by place once. For a process
+pool it writes each column to a memory-mapped .npy buffer, once per runner and
+reused by every run() until close(); workers map those buffers and slice out
+their places, so no DataFrame is ever pickled to a worker. Inline runs slice
+the sorted frames directly and write no buffers.
+"""
+
+import os
+import shutil
+import tempfile
+import weakref
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.services.inventory_service import InventoryService
+
+
+# Prefer RAM-backed storage for the column buffers when available
+SHARED_DIR = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+
+class SharedColumns:
+    """
+    Stores a DataFrame's columns as memory-mapped .npy buffers.
+    
+    Numeric and datetime columns are written as-is; string, categorical and
+    object columns are dictionary-encoded, with only the (small) dictionary
+    travelling through pickle. Nullable integer/boolean columns with missing
+    values are stored as float64 with NaN.
+    
+    Attributes:
+        descriptor (dict): Picklable description used by workers to map the columns.
+    
+    Methods:
+        read(descriptor, start, end): Rebuilds a row range as a DataFrame.
+    """
+    
+    def __init__(self, df: pd.DataFrame, directory: str, name: str):
+        """
+        Writes the columns of df to directory.
+        
+        Args:
+            df (pd.DataFrame): The frame to share.
+            directory (str): Directory for the buffer files.
+            name (str): Prefix for the buffer files.
+        """
+        columns = []
+        for position, column in enumerate(df.columns):
+            values, dictionary = self._encode(df[column])
+            path = os.path.join(directory, f"{name}-{position}.npy")
+            np.save(path, values)
+            columns.append((column, path, dictionary))
+        self.descriptor = {'columns': columns, 'rows': len(df)}
+    
+    @staticmethod
+    def read(descriptor: dict, start: int = 0, end: Optional[int] = None) -> pd.DataFrame:
+        """
+        Rebuilds rows [start, end) of a shared frame.
+        
+        Args:
+            descriptor (dict): SharedColumns.descriptor.
+            start (int): First row.
+            end (int, optional): Row after the last one (defaults to all rows).
+        
+        Returns:
+            pd.DataFrame: The requested rows.
+        """
+        data = {}
+        for column, path, dictionary in descriptor['columns']:
+            values = np.load(path, mmap_mode='r')[start:end]
+            if dictionary is None:
+                data[column] = np.asarray(values)
+                continue
+            uniques, categorical = dictionary
+            restored = pd.Categorical.from_codes(np.asarray(values), uniques)
+            data[column] = restored if categorical else restored.to_numpy()
+        return pd.DataFrame(data)
+    
+    @staticmethod
+    def _encode(series: pd.Series) -> Tuple[np.ndarray, Optional[Tuple[pd.Index, bool]]]:
+        """
+        Converts a column to a plain NumPy array plus an optional dictionary.
+        
+        Args:
+            series (pd.Series): The column.
+        
+        Returns:
+            Tuple: Values (or codes) and, for encoded columns, the dictionary
+                plus whether the column was categorical.
+        """
+        dtype = series.dtype
+        if pd.api.types.is_datetime64_dtype(dtype) or (
+                isinstance(dtype, np.dtype) and dtype.kind in 'biuf'):
+            return series.to_numpy(), None
+        if pd.api.types.is_numeric_dtype(dtype) or pd.api.types.is_bool_dtype(dtype):
+            if series.isna().any():
+                return series.to_numpy(dtype='float64', na_value=np.nan), None
+            return series.to_numpy(dtype=dtype.numpy_dtype), None
+        
+        codes, uniques = pd.factorize(series, sort=False)
+        categorical = isinstance(dtype, pd.CategoricalDtype)
+        return codes.astype(np.int32), (pd.Index(np.asarray(uniques)), categorical)
+
+
+def _place_offsets(df: pd.DataFrame, place_column: str) -> Tuple[pd.DataFrame, Dict]:
+    """
+    Sorts a frame by place and returns each place's (start, end) rows.
+    
+    Args:
+        df (pd.DataFrame): Frame with a place column.
+        place_column (str): Name of the place column.
+    
+    Returns:
+        Tuple[pd.DataFrame, Dict]: Sorted frame and place -> (start, end).
+    """
+    df = df[df[place_column].notna()].sort_values(place_column, kind='stable')
+    places, starts = np.unique(df[place_column].to_numpy(), return_index=True)
+    ends = np.append(starts[1:], len(df))
+    offsets = {place: (int(start), int(end)) for place, start, end in zip(places.tolist(), starts, ends)}
+    return df.reset_index(drop=True), offsets
+
+
+def _read_rows(source, start: int, end: int) -> pd.DataFrame:
+    """
+    Returns rows [start, end) of a sorted frame or of its shared buffers.
+    
+    Args:
+        source (pd.DataFrame or dict): The frame (inline) or its
+            SharedColumns descriptor (worker processes).
+        start (int): First row.
+        end (int): Row after the last one.
+    
+    Returns:
+        pd.DataFrame: The rows with a fresh RangeIndex.
+    """
+    if isinstance(source, pd.DataFrame):
+        return source.iloc[start:end].reset_index(drop=True)
+    return SharedColumns.read(source, start, end)
+
+
+def _run_batch(task: Callable, batch: List, sales, inventory,
+               task_kwargs: dict) -> List[Tuple[object, pd.DataFrame]]:
+    """
+    Runs task for a batch of (place, variant) units, inline or in a worker.
+    
+    Args:
+        task (Callable): task(place_id, sales, inventory, **task_kwargs, **variant).
+        batch (List): ((place_id, variant index), sales range, inventory range,
+            variant kwargs) tuples.
+        sales (pd.DataFrame or dict): Sorted sales frame or its SharedColumns descriptor.
+        inventory (pd.DataFrame or dict, optional): Sorted inventory frame or
+            its SharedColumns descriptor.
+        task_kwargs (dict): Extra keyword arguments for task.
+    
+    Returns:
+        List[Tuple[object, pd.DataFrame]]: ((place_id, variant index), result) pairs.
+    """
+    results = []
+    for key, sales_range, inventory_range, variant in batch:
+        place_sales = _read_rows(sales, *sales_range)
+        place_inventory = (_read_rows(inventory, *inventory_range)
+                           if inventory is not None else pd.DataFrame())
+        results.append((key, task(key[0], place_sales, place_inventory,
+                                  **task_kwargs, **variant)))
+    return results
+
+
+def recommend_place(place_id, sales: pd.DataFrame, inventory: pd.DataFrame,
+                    lead_time_days: int = 3) -> pd.DataFrame:
+    """
+    Task computing bulk recommendations for every item sold at one place.
+    
+    Args:
+        place_id: The place.
+        sales (pd.DataFrame): The place's sales rows.
+        inventory (pd.DataFrame): The place's inventory rows.
+        lead_time_days (int): Number of days for supplier delivery.
+    
+    Returns:
+        pd.DataFrame: generate_recommendations_bulk output for the place.
+    """
+    service = InventoryService(inventory, sales)
+    return service.generate_recommendations_bulk('all', lead_time_days)
+
+
+class PlaceRunner:
+    """
+    Fans per-place work out to a process pool and merges the results.
+    
+    The shared column buffers of the pool path are written on the first pooled
+    run() and kept for later runs; release them with close() or by using the
+    runner as a context manager.
+    
+    Attributes:
+        place_column (str): Name of the place column.
+        max_workers (int): Number of worker processes (1 runs inline).
+        batch_size (int): Places handled per worker task.
+        places (list): Places with sales, in output order.
+    
+    Methods:
+        run(task, places): Runs a task for each place and concatenates the results.
+        generate_recommendations(): Bulk recommendations for every place.
+        close(): Removes the shared column buffers.
+    """
+    
+    def __init__(self, sales_data: pd.DataFrame,
+                 inventory_data: Optional[pd.DataFrame] = None,
+                 place_column: str = 'place_id', max_workers: Optional[int] = None,
+                 batch_size: int = 16,
+                 progress: Optional[Callable[[int, int], None]] = None):
+        """
+        Initialize the PlaceRunner.
+        
+        Args:
+            sales_data (pd.DataFrame): Sales with a place column.
+            inventory_data (pd.DataFrame, optional): Inventory with a place column.
+            place_column (str): Name of the place column.
+            max_workers (int, optional): Worker processes (defaults to the CPU count).
+            batch_size (int): Places per worker task.
+            progress (Callable, optional): Called as progress(done, total) in the
+                parent process whenever places (or place variants) finish.
+        """
+        self.place_column = place_column
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.batch_size = max(1, batch_size)
+        self.progress = progress
+        
+        self._sales, self._sales_offsets = _place_offsets(sales_data, place_column)
+        self._inventory, self._inventory_offsets = (None, {})
+        if inventory_data is not None and place_column in inventory_data.columns:
+            self._inventory, self._inventory_offsets = _place_offsets(inventory_data, place_column)
+        self.places = list(self._sales_offsets)
+        self._shared = None
+        self._cleanup = None
+    
+    def __enter__(self) -> 'PlaceRunner':
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+    
+    def close(self) -> None:
+        """Removes the shared column buffers; a later pooled run() writes them again."""
+        if self._cleanup is not None:
+            self._cleanup()
+        self._shared = None
+        self._cleanup = None
+    
+    def run(self, task: Callable, places: Optional[List] = None,
+            variants: Optional[List[dict]] = None, **task_kwargs) -> pd.DataFrame:
+        """
+        Runs task for each place and concatenates the results.
+        
+        The task must be a module-level function (so it can be sent to worker
+        processes) with signature task(place_id, sales, inventory, **kwargs)
+        returning a DataFrame. Output rows are ordered by place in the order of
+        `places`, independent of completion order.
+        
+        With variants, every place runs once per variant (e.g. per slice of
+        backtest origins) and each (place, variant) pair is a separate unit of
+        work, so a few large places still spread across the pool.
+        
+        Args:
+            task (Callable): Per-place task.
+            places (List, optional): Places to run (all places with sales by default).
+            variants (List[dict], optional): Extra keyword arguments per run of
+                a place; results follow the variant order within each place.
+            **task_kwargs: Extra keyword arguments for task.
+        
+        Returns:
+            pd.DataFrame: Task results with the place column first.
+        """
+        places = self.places if places is None else [p for p in places if p in self._sales_offsets]
+        variants = [{}] if variants is None else list(variants)
+        units = [((place, index), self._sales_offsets[place],
+                  self._inventory_offsets.get(place, (0, 0)), variant)
+                 for place in places for index, variant in enumerate(variants)]
+        batches = [units[i:i + self.batch_size] for i in range(0, len(units), self.batch_size)]
+        
+        if self.max_workers == 1 or len(batches) <= 1:
+            sales, inventory = self._sales, self._inventory
+        else:
+            sales, inventory = self._shared_columns()
+        results = self._execute(task, batches, sales, inventory, task_kwargs, len(units))
+        
+        frames = [results[(place, index)].assign(**{self.place_column: place})
+                  for place in places for index in range(len(variants))
+                  if (place, index) in results]
+        if not frames:
+            return pd.DataFrame(columns=[self.place_column])
+        merged = pd.concat(frames, ignore_index=True)
+        return merged[[self.place_column] + [c for c in merged.columns if c != self.place_column]]
+    
+    def generate_recommendations(self, places: Optional[List] = None,
+                                 lead_time_days: int = 3) -> pd.DataFrame:
+        """
+        Bulk inventory recommendations for every item at every place.
+        
+        Args:
+            places (List, optional): Places to run (all by default).
+            lead_time_days (int): Number of days for supplier delivery.
+        
+        Returns:
+            pd.DataFrame: One row per (place, item).
+        """
+        return self.run(recommend_place, places, lead_time_days=lead_time_days)
+    
+    def _shared_columns(self) -> Tuple[dict, Optional[dict]]:
+        """
+        Writes the sorted frames to shared buffers on first use.
+        
+        Returns:
+            Tuple[dict, dict or None]: Sales and inventory descriptors.
+        """
+        if self._shared is None:
+            directory = tempfile.mkdtemp(prefix='place-runner-', dir=SHARED_DIR)
+            # Also removes the buffers if the runner is dropped without close()
+            self._cleanup = weakref.finalize(self, shutil.rmtree, directory, True)
+            sales = SharedColumns(self._sales, directory, 'sales').descriptor
+            inventory = (SharedColumns(self._inventory, directory, 'inventory').descriptor
+                         if self._inventory is not None else None)
+            self._shared = (sales, inventory)
+        return self._shared
+    
+    def _execute(self, task: Callable, batches: List, sales, inventory,
+                 task_kwargs: dict, total: int) -> Dict[object, pd.DataFrame]:
+        """
+        Runs the batches inline or on the pool and reports progress.
+        
+        Args:
+            task (Callable): Per-place task.
+            batches (List): Batches of (place, variant) units.
+            sales (pd.DataFrame or dict): Sorted sales, or its shared descriptor.
+            inventory (pd.DataFrame or dict, optional): Sorted inventory, or its
+                shared descriptor.
+            task_kwargs (dict): Extra keyword arguments for task.
+            total (int): Number of units.
+        
+        Returns:
+            Dict[object, pd.DataFrame]: Result per (place, variant index).
+        """
+        results = {}
+        
+        def collect(batch_results):
+            results.update(batch_results)
+            if self.progress is not None:
+                self.progress(len(results), total)
+        
+        if self.max_workers == 1 or len(batches) <= 1:
+            for batch in batches:
+                collect(_run_batch(task, batch, sales, inventory, task_kwargs))
+            return results
+        
+        with ProcessPoolExecutor(max_workers=min(self.max_workers, len(batches))) as pool:
+            futures = [pool.submit(_run_batch, task, batch, sales, inventory, task_kwargs)
+                       for batch in batches]
+            for future in as_completed(futures):
+                collect(future.result())
+        return results
@@ -0,0 +1,280 @@
+"""
+File: rollup_cube.py
+Description: Materialised daily rollups (place x item x day x channel) for analytics queries.
+Dependencies: pandas, numpy
+Author: Sample Team
+
+Demand by period, menu quadrants, shift demand and channel mix all start from
+the same sums over order lines. The cube computes those sums once per
+(place, item, day, channel) and answers every later question from the
+aggregates, which are orders of magnitude smaller than the raw lines.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, Optional, Sequence
+
+from src.utils.helpers import filter_by_date_range
+
+
+MEASURES = ('quantity', 'revenue', 'cost', 'order_count')
+PERIODS = ('D', 'W', 'M')
+
+
+def period_start(dates: pd.Series, period: str) -> pd.Series:
+    """
+    Maps daily dates to the first day of their period.
+    
+    Weeks start on Monday (ISO weeks) and months on the 1st.
+    
+    Args:
+        dates (pd.Series): Day-floored datetimes.
+        period (str): 'D', 'W' or 'M'.
+    
+    Returns:
+        pd.Series: Period start dates.
+    
+    Raises:
+        ValueError: If period is not 'D', 'W' or 'M'.
+    """
+    if period not in PERIODS:
+        raise ValueError(f"period must be one of {PERIODS}")
+    if period == 'D':
+        return dates
+    days = dates.to_numpy().astype('datetime64[D]')
+    if period == 'W':
+        # 1970-01-01 was a Thursday, so day 0 is weekday 3
+        starts = days - ((days.astype(np.int64) + 3) % 7).astype('timedelta64[D]')
+    else:
+        starts = days.astype('datetime64[M]').astype('datetime64[D]')
+    return pd.Series(starts.astype('datetime64[s]'), index=dates.index, name=dates.name)
+
+
+class RollupCube:
+    """
+    Daily quantity, revenue, cost and order count per place, item, day and channel.
+    
+    Rows are kept sorted by date, so appending a new day is a concatenation
+    and only late data for days already in the cube is re-aggregated.
+    
+    order_count counts distinct orders per cell within each add() call, so it
+    is exact as long as an order's lines arrive in the same batch.
+    
+    Attributes:
+        data (pd.DataFrame): Cube rows (keys, 'date' and the measures).
+        dimensions (tuple): Order attributes kept as keys (default ('channel',)).
+        keys (list): All key columns: place_id, item_id, date and the dimensions.
+    
+    Methods:
+        from_order_items(order_items, orders): Builds a cube from order lines.
+        from_chunks(chunks, orders): Builds a cube from a stream of order lines.
+        add(order_items, orders): Folds new order lines into the cube.
+        query(by, period, start_date, end_date, **filters): Rolls the cube up.
+    """
+    
+    def __init__(self, dimensions: Sequence[str] = ('channel',),
+                 place_column: str = 'place_id', item_column: str = 'item_id'):
+        """
+        Initialize an empty RollupCube.
+        
+        Args:
+            dimensions (Sequence[str]): fct_orders attributes to key by
+                (e.g. ('channel', 'type', 'platform')).
+            place_column (str): Name of the place column.
+            item_column (str): Name of the item column.
+        """
+        self.dimensions = tuple(dimensions)
+        self.place_column = place_column
+        self.item_column = item_column
+        self.keys = [place_column, item_column, 'date'] + list(self.dimensions)
+        self.data = pd.DataFrame({key: [] for key in self.keys + list(MEASURES)})
+    
+    def __len__(self) -> int:
+        return len(self.data)
+    
+    @property
+    def nbytes(self) -> int:
+        """int: Memory held by the cube rows."""
+        return int(self.data.memory_usage(deep=True).sum())
+    
+    @classmethod
+    def from_order_items(cls, order_items: pd.DataFrame,
+                         orders: Optional[pd.DataFrame] = None,
+                         dimensions: Sequence[str] = ('channel',)) -> 'RollupCube':
+        """
+        Builds a cube from order lines.
+        
+        Args:
+            order_items (pd.DataFrame): fct_order_items rows.
+            orders (pd.DataFrame, optional): fct_orders rows supplying the
+                dimensions the order lines lack (joined on order_id).
+            dimensions (Sequence[str]): Order attributes to key by.
+        
+        Returns:
+            RollupCube: The populated cube.
+        """
+        cube = cls(dimensions)
+        cube.add(order_items, orders)
+        return cube
+    
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[pd.DataFrame],
+                    orders: Optional[pd.DataFrame] = None,
+                    dimensions: Sequence[str] = ('channel',)) -> 'RollupCube':
+        """
+        Builds a cube from a stream of order-line chunks (e.g. DataLoader.iter_csv).
+        
+        Args:
+            chunks (Iterable[pd.DataFrame]): Order-line chunks, oldest first.
+            orders (pd.DataFrame, optional): fct_orders rows for the dimensions.
+            dimensions (Sequence[str]): Order attributes to key by.
+        
+        Returns:
+            RollupCube: The populated cube.
+        """
+        cube = cls(dimensions)
+        for chunk in chunks:
+            cube.add(chunk, orders)
+        return cube
+    
+    def add(self, order_items: pd.DataFrame, orders: Optional[pd.DataFrame] = None) -> int:
+        """
+        Folds new order lines into the cube.
+        
+        Days after the cube's last day are appended; cells of days already in
+        the cube are summed with the new values.
+        
+        Args:
+            order_items (pd.DataFrame): New order lines.
+            orders (pd.DataFrame, optional): fct_orders rows for the dimensions.
+        
+        Returns:
+            int: Number of cube rows after the update.
+        """
+        if order_items.empty:
+            return len(self.data)
+        new = self._aggregate(order_items, orders)
+        if self.data.empty:
+            self.data = new.sort_values('date', kind='stable', ignore_index=True)
+            return len(self.data)
+        
+        # Only rows from the first new day onwards can overlap
+        first_day = new['date'].min()
+        split = int(np.searchsorted(self.data['date'].to_numpy(), first_day.to_datetime64(),
+                                    side='left'))
+        head, tail = self.data.iloc[:split], self.data.iloc[split:]
+        if not tail.empty:
+            new = (pd.concat([tail, new], ignore_index=True)
+                   .groupby(self.keys, sort=False, observed=True, dropna=False).sum()
+                   .reset_index())
+        new = new.sort_values('date', kind='stable')
+        self.data = pd.concat([head, new], ignore_index=True)
+        for name in self.dimensions:
+            # Batches may bring new categories; concat falls back to object
+            self.data[name] = self.data[name].astype('category')
+        return len(self.data)
+    
+    def query(self, by: Sequence[str] = (), period: str = 'D',
+              start_date: Optional[str] = None, end_date: Optional[str] = None,
+              measures: Sequence[str] = MEASURES, **filters) -> pd.DataFrame:
+        """
+        Rolls the cube up to the requested keys and period.
+        
+        Args:
+            by (Sequence[str]): Key columns to keep besides the period
+                (e.g. ['place_id'], ['place_id', 'channel']).
+            period (str): 'D', 'W' (weeks starting Monday) or 'M'.
+            start_date (str, optional): First day included ('YYYY-MM-DD').
+            end_date (str, optional): Last day included ('YYYY-MM-DD').
+            measures (Sequence[str]): Measures to sum.
+            **filters: Key column equality (scalar) or membership (list) filters,
+                e.g. place_id=12 or channel=['App', 'Kiosk'].
+        
+        Returns:
+            pd.DataFrame: by columns, 'date' (period start) and the measures,
+                sorted by keys and date.
+        
+        Raises:
+            ValueError: If a column is not a cube key or period is unknown.
+        """
+        unknown = (set(by) | set(filters)) - set(self.keys)
+        if unknown:
+            raise ValueError(f"Not cube keys: {sorted(unknown)}")
+        
+        data = self.data
+        for column, value in filters.items():
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            data = data[data[column].isin(list(values))]
+        if start_date is not None or end_date is not None:
+            data = filter_by_date_range(data, 'date', start_date or data['date'].min(),
+                                        end_date or data['date'].max())
+        
+        keys = [column for column in by if column != 'date']
+        frame = data[keys + list(measures)].assign(date=period_start(data['date'], period))
+        return (frame.groupby(keys + ['date'], sort=True, observed=True, dropna=False)
+                [list(measures)].sum().reset_index())
+    
+    def _aggregate(self, order_items: pd.DataFrame,
+                   orders: Optional[pd.DataFrame]) -> pd.DataFrame:
+        """
+        Reduces a batch of order lines to cube rows.
+        
+        Args:
+            order_items (pd.DataFrame): Order lines.
+            orders (pd.DataFrame, optional): fct_orders rows for the dimensions.
+        
+        Returns:
+            pd.DataFrame: One row per cube cell in the batch.
+        """
+        dates = order_items['created']
+        if pd.api.types.is_numeric_dtype(dates):
+            dates = pd.to_datetime(dates, unit='s')
+        quantity = order_items['quantity'].astype('float64')
+        cost = order_items['cost'] if 'cost' in order_items.columns else pd.Series(
+            0.0, index=order_items.index)
+        
+        frame = pd.DataFrame({
+            self.place_column: order_items[self.place_column],
+            self.item_column: order_items[self.item_column],
+            'date': pd.to_datetime(dates).dt.floor('D').astype('datetime64[s]'),
+            'order_id': order_items['order_id'],
+            'quantity': quantity,
+            'revenue': quantity * order_items['price'].astype('float64'),
+            'cost': quantity * cost.astype('float64').fillna(0),
+        })
+        for name, values in self._dimension_values(order_items, orders).items():
+            frame[name] = values
+        frame = frame.dropna(subset=[self.place_column, self.item_column, 'date'])
+        
+        grouped = frame.groupby(self.keys, sort=False, observed=True, dropna=False)
+        result = grouped[['quantity', 'revenue', 'cost']].sum()
+        result['order_count'] = grouped['order_id'].nunique().astype('int64')
+        return result.reset_index()
+    
+    def _dimension_values(self, order_items: pd.DataFrame,
+                          orders: Optional[pd.DataFrame]) -> Dict[str, pd.Series]:
+        """
+        Looks up each dimension on the order lines or, failing that, in fct_orders.
+        
+        Args:
+            order_items (pd.DataFrame): Order lines.
+            orders (pd.DataFrame, optional): fct_orders rows.
+        
+        Returns:
+            Dict[str, pd.Series]: Dimension values aligned with order_items
+                (categorical, with missing values for unmatched orders).
+        
+        Raises:
+            ValueError: If a dimension is missing from order_items and no orders are given.
+        """
+        values = {}
+        missing = [name for name in self.dimensions if name not in order_items.columns]
+        if missing and orders is None:
+            raise ValueError(f"orders are required for dimensions {missing}")
+        if missing:
+            lookup = orders.drop_duplicates('id').set_index('id')[missing]
+            joined = lookup.reindex(order_items['order_id'].to_numpy())
+        for name in self.dimensions:
+            column = order_items[name] if name not in missing else joined[name]
+            values[name] = pd.Categorical(np.asarray(column, dtype=object))
+        return values
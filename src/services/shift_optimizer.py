@@ -0,0 +1,701 @@
+"""
+File: shift_optimizer.py
+Description: Demand-curve driven shift planning per place and day.
+Dependencies: pandas, numpy, scipy (optional)
+Author: Sample Team
+
+Staffing follows the order flow: every 15-minute slot of a day needs enough
+staff for the orders expected in it, and staff work whole shifts of a few
+allowed lengths. The expected orders per slot are the average of the same
+weekday over the previous weeks (Europe/Copenhagen wall-clock time). Turning
+the per-slot requirement into shifts is a small covering problem: choose how
+many shifts start at each slot with each length so every slot is covered and
+total staff hours are minimal. It is solved exactly with scipy's milp (HiGHS)
+under a time limit, falling back to a greedy sweep when scipy is missing or
+the solver returns no solution in time.
+"""
+
+import time
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from src.services.place_runner import PlaceRunner
+from src.utils.timestamps import TIMEZONE, local_seconds
+
+try:
+    from scipy.optimize import Bounds, LinearConstraint, milp
+except ImportError:  # pragma: no cover - scipy is optional
+    milp = None
+
+
+SLOT_MINUTES = 15
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+
+# Planning defaults; a request's "constraints" object overrides any of them
+DEFAULT_CONSTRAINTS = {
+    'orders_per_staff_hour': 10.0,   # orders one person handles per hour
+    'min_staff': 1,                  # staff on duty while the place is open
+    'max_staff': None,               # cap on simultaneous staff (None: no cap)
+    'shift_hours': (4, 6, 8),        # allowed shift lengths
+    'history_weeks': 4,              # same-weekday weeks averaged into the curve
+    'time_limit': 1.0,               # seconds the exact solver may spend
+}
+
+SOLVERS = ('auto', 'milp', 'greedy')
+
+# Change events accepted by ShiftOptimizer.replan
+EVENT_TYPES = ('call_off', 'pto', 'demand_spike')
+
+
+def resolve_constraints(constraints: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Merges planning constraints with the defaults and validates them.
+    
+    Args:
+        constraints (Dict[str, Any], optional): Overrides of DEFAULT_CONSTRAINTS.
+    
+    Returns:
+        Dict[str, Any]: Complete, validated constraints.
+    
+    Raises:
+        ValueError: For unknown keys or out-of-range values.
+    """
+    constraints = dict(constraints or {})
+    unknown = set(constraints) - set(DEFAULT_CONSTRAINTS)
+    if unknown:
+        raise ValueError(f"Unknown constraints: {sorted(unknown)}")
+    resolved = {**DEFAULT_CONSTRAINTS, **constraints}
+    
+    try:
+        resolved['orders_per_staff_hour'] = float(resolved['orders_per_staff_hour'])
+        resolved['min_staff'] = int(resolved['min_staff'])
+        if resolved['max_staff'] is not None:
+            resolved['max_staff'] = int(resolved['max_staff'])
+        hours = resolved['shift_hours']
+        hours = [hours] if isinstance(hours, (int, float)) else list(hours)
+        resolved['shift_hours'] = tuple(sorted({float(h) for h in hours}))
+        resolved['history_weeks'] = int(resolved['history_weeks'])
+        resolved['time_limit'] = float(resolved['time_limit'])
+    except (TypeError, ValueError):
+        raise ValueError("constraints must be numbers (shift_hours a number or list)")
+    
+    if resolved['orders_per_staff_hour'] <= 0:
+        raise ValueError("orders_per_staff_hour must be positive")
+    if resolved['min_staff'] < 0 or (resolved['max_staff'] is not None
+                                     and resolved['max_staff'] < max(resolved['min_staff'], 1)):
+        raise ValueError("min_staff must be >= 0 and max_staff >= max(min_staff, 1)")
+    if not resolved['shift_hours'] or any(
+            h <= 0 or h > 24 or (h * 60) % SLOT_MINUTES for h in resolved['shift_hours']):
+        raise ValueError(f"shift_hours must be multiples of {SLOT_MINUTES} minutes up to 24 hours")
+    if resolved['history_weeks'] < 1 or resolved['time_limit'] <= 0:
+        raise ValueError("history_weeks and time_limit must be positive")
+    return resolved
+
+
+def staff_requirements(curve: np.ndarray, orders_per_staff_hour: float, min_staff: int = 1,
+                       max_staff: Optional[int] = None) -> np.ndarray:
+    """
+    Converts expected orders per slot into staff needed per slot.
+    
+    The place counts as open from its first to its last slot with expected
+    orders; min_staff applies inside that window.
+    
+    Args:
+        curve (np.ndarray): Expected orders per 15-minute slot.
+        orders_per_staff_hour (float): Orders one person handles per hour.
+        min_staff (int): Staff on duty while open.
+        max_staff (int, optional): Cap on simultaneous staff.
+    
+    Returns:
+        np.ndarray: int64 staff needed per slot.
+    """
+    per_slot = orders_per_staff_hour * SLOT_MINUTES / 60
+    required = np.ceil(np.round(curve / per_slot, 9)).astype(np.int64)
+    open_slots = np.flatnonzero(curve > 0)
+    if len(open_slots):
+        window = slice(open_slots[0], open_slots[-1] + 1)
+        required[window] = np.maximum(required[window], min_staff)
+    if max_staff is not None:
+        required = np.minimum(required, max_staff)
+    return required
+
+
+def candidate_shifts(required: np.ndarray, shift_slots: Iterable[int]) -> List[Tuple[int, int]]:
+    """
+    Lists the (start slot, length in slots) shifts worth considering.
+    
+    Shifts must fit within the day and overlap the staffed window.
+    
+    Args:
+        required (np.ndarray): Staff needed per slot.
+        shift_slots (Iterable[int]): Allowed shift lengths in slots.
+    
+    Returns:
+        List[Tuple[int, int]]: Candidate shifts.
+    """
+    staffed = np.flatnonzero(required > 0)
+    if not len(staffed):
+        return []
+    first, last = int(staffed[0]), int(staffed[-1])
+    candidates = []
+    for length in shift_slots:
+        latest = min(last, len(required) - length)
+        earliest = min(max(first - length + 1, 0), latest)
+        candidates.extend((start, length) for start in range(earliest, latest + 1))
+    return candidates
+
+
+def solve_shifts(required: np.ndarray, shift_slots: Iterable[int], solver: str = 'auto',
+                 time_limit: float = 1.0) -> Tuple[List[Tuple[int, int, int]], str]:
+    """
+    Chooses shifts covering every slot's requirement with minimal staff hours.
+    
+    Args:
+        required (np.ndarray): Staff needed per slot.
+        shift_slots (Iterable[int]): Allowed shift lengths in slots.
+        solver (str): 'milp' (exact, scipy/HiGHS), 'greedy' or 'auto' (milp
+            when available, greedy if it finds no solution in time).
+        time_limit (float): Seconds the exact solver may spend.
+    
+    Returns:
+        Tuple[List[Tuple[int, int, int]], str]: (start slot, length in slots,
+            staff) per chosen shift sorted by start, and the solver used.
+    
+    Raises:
+        ValueError: If solver is unknown, or 'milp' is requested without scipy.
+    """
+    if solver not in SOLVERS:
+        raise ValueError(f"solver must be one of {SOLVERS}")
+    if solver == 'milp' and milp is None:
+        raise ValueError("solver 'milp' requires scipy")
+    
+    candidates = candidate_shifts(required, sorted(set(shift_slots)))
+    if not candidates:
+        return [], 'none'
+    counts = None
+    if solver != 'greedy' and milp is not None:
+        counts = _solve_milp(required, candidates, time_limit)
+        used = 'milp'
+    if counts is None:
+        counts = _solve_greedy(required, candidates)
+        used = 'greedy'
+    shifts = [(start, length, int(count)) for (start, length), count in zip(candidates, counts)
+              if count > 0]
+    return sorted(shifts), used
+
+
+def _coverage_matrix(candidates: List[Tuple[int, int]], slots: int) -> np.ndarray:
+    """
+    Builds the slot x shift matrix with 1 where a shift covers a slot.
+    
+    Args:
+        candidates (List[Tuple[int, int]]): (start, length) shifts.
+        slots (int): Number of slots in the day.
+    
+    Returns:
+        np.ndarray: float64 matrix of shape (slots, len(candidates)).
+    """
+    starts = np.array([start for start, _ in candidates])
+    ends = starts + np.array([length for _, length in candidates])
+    slot = np.arange(slots)[:, None]
+    return ((slot >= starts) & (slot < ends)).astype(np.float64)
+
+
+def _solve_milp(required: np.ndarray, candidates: List[Tuple[int, int]],
+                time_limit: float) -> Optional[np.ndarray]:
+    """
+    Solves the covering problem exactly with scipy.optimize.milp.
+    
+    Args:
+        required (np.ndarray): Staff needed per slot.
+        candidates (List[Tuple[int, int]]): (start, length) shifts.
+        time_limit (float): Seconds HiGHS may spend.
+    
+    Returns:
+        np.ndarray or None: Staff per candidate, or None without a feasible solution.
+    """
+    coverage = _coverage_matrix(candidates, len(required))
+    rows = required > 0
+    # Minimise staff hours; the tiny per-shift term prefers fewer, longer shifts on ties
+    cost = np.array([length + 1e-3 for _, length in candidates])
+    result = milp(cost, integrality=np.ones(len(candidates)),
+                  bounds=Bounds(0, int(required.max())),
+                  constraints=LinearConstraint(coverage[rows], lb=required[rows], ub=np.inf),
+                  options={'time_limit': time_limit})
+    if result.x is None:
+        return None
+    return np.round(result.x).astype(np.int64)
+
+
+def _solve_greedy(required: np.ndarray, candidates: List[Tuple[int, int]]) -> np.ndarray:
+    """
+    Covers slots left to right, adding the shift that removes most deficit per hour.
+    
+    Args:
+        required (np.ndarray): Staff needed per slot.
+        candidates (List[Tuple[int, int]]): (start, length) shifts.
+    
+    Returns:
+        np.ndarray: Staff per candidate (always feasible).
+    """
+    index = {shift: position for position, shift in enumerate(candidates)}
+    lengths = sorted({length for _, length in candidates}, reverse=True)
+    counts = np.zeros(len(candidates), dtype=np.int64)
+    covered = np.zeros(len(required), dtype=np.int64)
+    for slot in range(len(required)):
+        while covered[slot] < required[slot]:
+            best, best_score = None, -1.0
+            for length in lengths:
+                start = min(slot, len(required) - length)
+                if (start, length) not in index:
+                    continue
+                deficit = np.maximum(required[start:start + length]
+                                     - covered[start:start + length], 0)
+                score = np.count_nonzero(deficit) / length
+                if score > best_score:
+                    best, best_score = (start, length), score
+            start, length = best
+            counts[index[best]] += 1
+            covered[start:start + length] += 1
+    return counts
+
+
+def _slot_label(slot: int) -> str:
+    """Formats a slot boundary as HH:MM (the end of the day is 24:00)."""
+    hours, minutes = divmod(slot * SLOT_MINUTES, 60)
+    return f"{hours:02d}:{minutes:02d}"
+
+
+def _parse_slot(label: str) -> int:
+    """
+    Parses an HH:MM slot boundary (00:00 to 24:00 in 15-minute steps).
+    
+    Raises:
+        ValueError: If the label is malformed or not on a slot boundary.
+    """
+    try:
+        hours, minutes = (int(part) for part in str(label).split(':'))
+    except ValueError:
+        raise ValueError(f"times must be HH:MM, got {label!r}")
+    slot, remainder = divmod(hours * 60 + minutes, SLOT_MINUTES)
+    if remainder or not 0 <= slot <= SLOTS_PER_DAY or not 0 <= minutes < 60:
+        raise ValueError(f"times must be {SLOT_MINUTES}-minute boundaries, got {label!r}")
+    return slot
+
+
+def _parse_window(record: Dict[str, Any]) -> Tuple[int, int]:
+    """
+    Reads the start/end slots of a shift or event record.
+    
+    Raises:
+        ValueError: If the record is not a dict or the window is missing,
+            malformed or empty.
+    """
+    if not isinstance(record, dict):
+        raise ValueError(f"shifts and events must be objects, got {record!r}")
+    start, end = _parse_slot(record.get('start')), _parse_slot(record.get('end'))
+    if end <= start:
+        raise ValueError(f"end must be after start in {record!r}")
+    return start, end
+
+
+def _parse_staff(record: Dict[str, Any]) -> int:
+    """
+    Reads the staff count of a shift or call-off record (1 when omitted).
+    
+    Raises:
+        ValueError: If staff is not a whole number of at least 1.
+    """
+    staff = record.get('staff', 1)
+    if isinstance(staff, bool) or not isinstance(staff, (int, float)) \
+            or not float(staff).is_integer() or staff < 1:
+        raise ValueError(f"staff must be a whole number of at least 1 in {record!r}")
+    return int(staff)
+
+
+def _parse_spike(record: Dict[str, Any]) -> Tuple[float, float]:
+    """
+    Reads the (factor, orders) of a demand_spike record.
+    
+    Raises:
+        ValueError: If neither is given or either is not a number >= 0.
+    """
+    if 'factor' not in record and 'orders' not in record:
+        raise ValueError(f"demand_spike needs 'orders' or 'factor' in {record!r}")
+    values = []
+    for key, default in (('factor', 1.0), ('orders', 0.0)):
+        value = record.get(key, default)
+        if isinstance(value, bool) or not isinstance(value, (int, float)) \
+                or not np.isfinite(value) or value < 0:
+            raise ValueError(f"{key} must be a number >= 0 in {record!r}")
+        values.append(float(value))
+    return values[0], values[1]
+
+
+class ShiftOptimizer:
+    """
+    Plans shifts for any place and day from historical order timestamps.
+    
+    Orders are reduced once to (local day, 15-minute slot) pairs sorted by
+    place and day, so building a demand curve only scans the requested place's
+    contiguous slice.
+    
+    Attributes:
+        place_column (str): Name of the place column.
+        tz (str): Timezone the day and slots are expressed in.
+        places (list): Places with orders.
+    
+    Methods:
+        demand_curve(place_id, date): Expected orders per 15-minute slot.
+        plan(place_id, date, constraints): Shift plan for one place and day.
+        replan(place_id, date, shifts, events): Minimal-diff repair after call-offs or spikes.
+        plan_many(date, places, constraints): Shift plans for several places as rows.
+    """
+    
+    def __init__(self, orders: pd.DataFrame, place_column: str = 'place_id',
+                 date_column: str = 'created', tz: str = TIMEZONE):
+        """
+        Indexes order timestamps by place.
+        
+        Args:
+            orders (pd.DataFrame): fct_orders rows (one row per order).
+            place_column (str): Name of the place column.
+            date_column (str): UNIX seconds or datetime column of the order time.
+            tz (str): Timezone the plans are made in.
+        """
+        self.place_column = place_column
+        self.tz = tz
+        seconds, valid = local_seconds(orders[date_column], tz)
+        place_ids = orders[place_column].to_numpy()
+        valid = valid & pd.notna(place_ids)
+        
+        days, within_day = np.divmod(seconds[valid], 86400)
+        place_ids = place_ids[valid]
+        order = np.lexsort((days, place_ids))
+        self._days = days[order].astype(np.int32)
+        self._slots = (within_day[order] // (SLOT_MINUTES * 60)).astype(np.int16)
+        places, starts = np.unique(place_ids[order], return_index=True)
+        ends = np.append(starts[1:], len(order))
+        self._offsets = {place: (int(start), int(end))
+                         for place, start, end in zip(places.tolist(), starts, ends)}
+    
+    def __contains__(self, place_id) -> bool:
+        return place_id in self._offsets
+    
+    @property
+    def places(self) -> list:
+        """list: Places with orders."""
+        return list(self._offsets)
+    
+    def demand_curve(self, place_id, date: str, history_weeks: int = 4) -> np.ndarray:
+        """
+        Averages the orders per slot over the same weekday of previous weeks.
+        
+        Only weeks on or after the place's first order count, so a new place
+        is not diluted by weeks it did not trade.
+        
+        Args:
+            place_id: The place.
+            date (str): Day to plan ('YYYY-MM-DD', local time).
+            history_weeks (int): Number of previous same-weekday days averaged.
+        
+        Returns:
+            np.ndarray: float64 expected orders per slot (zeros for unknown places).
+        """
+        curve = np.zeros(SLOTS_PER_DAY)
+        if place_id not in self._offsets:
+            return curve
+        target = self._day_number(date)
+        start, end = self._offsets[place_id]
+        days, slots = self._days[start:end], self._slots[start:end]
+        
+        lag = target - days
+        history = (lag > 0) & (lag <= 7 * history_weeks) & (lag % 7 == 0)
+        weeks = int(np.sum(target - 7 * np.arange(1, history_weeks + 1) >= days[0]))
+        if weeks:
+            curve += np.bincount(slots[history], minlength=SLOTS_PER_DAY)[:SLOTS_PER_DAY] / weeks
+        return curve
+    
+    def plan(self, place_id, date: str, constraints: Optional[Dict[str, Any]] = None,
+             solver: str = 'auto') -> Dict[str, Any]:
+        """
+        Plans one place's shifts for one day.
+        
+        Args:
+            place_id: The place.
+            date (str): Day to plan ('YYYY-MM-DD').
+            constraints (Dict[str, Any], optional): Overrides of DEFAULT_CONSTRAINTS.
+            solver (str): 'auto', 'milp' or 'greedy'.
+        
+        Returns:
+            Dict[str, Any]: 'shifts' (start, end, hours and staff per shift),
+                'total_staff_hours', 'estimated_coverage' (share of the demand's
+                staff slots covered), 'peak_staff', 'solver' and 'solve_ms'.
+        
+        Raises:
+            ValueError: For an invalid date, constraint or solver.
+        """
+        limits = resolve_constraints(constraints)
+        curve = self.demand_curve(place_id, date, limits['history_weeks'])
+        needed, required = self._requirements(curve, limits)
+        
+        started = time.perf_counter()
+        shifts, used = solve_shifts(required, self._shift_slots(limits), solver,
+                                    limits['time_limit'])
+        return self._summary(shifts, needed, used, time.perf_counter() - started)
+    
+    def replan(self, place_id, date: str, shifts: List[Dict[str, Any]],
+               events: List[Dict[str, Any]], constraints: Optional[Dict[str, Any]] = None,
+               solver: str = 'auto') -> Dict[str, Any]:
+        """
+        Repairs an existing day schedule after change events with a minimal diff.
+        
+        The current schedule is the warm start: every shift not named by an
+        event is kept as is. After applying the events, only the remaining
+        coverage gap (required minus still-scheduled staff) is solved, so the
+        candidate shifts and the solve time grow with the affected window, not
+        with the day or week. Other days of a week schedule are untouched.
+        
+        Events:
+            {"type": "call_off" | "pto", "start": "HH:MM", "end": "HH:MM", "staff": 1}
+                removes staff from the scheduled shift with that start and end.
+            {"type": "demand_spike", "start": "HH:MM", "end": "HH:MM",
+             "orders": 20 | "factor": 1.5}
+                adds orders (spread evenly) or scales the expected orders in the
+                window; at least one of them is required and both must be >= 0.
+        
+        'staff' of shifts and call-offs must be a whole number of at least 1.
+        
+        Args:
+            place_id: The place.
+            date (str): Day of the schedule ('YYYY-MM-DD').
+            shifts (List[Dict[str, Any]]): Current shifts ('start', 'end', 'staff'),
+                e.g. the 'shifts' of an earlier plan().
+            events (List[Dict[str, Any]]): Change events.
+            constraints (Dict[str, Any], optional): Overrides of DEFAULT_CONSTRAINTS.
+            solver (str): 'auto', 'milp' or 'greedy'.
+        
+        Returns:
+            Dict[str, Any]: plan() fields for the repaired schedule plus 'added'
+                and 'removed' shifts and the re-optimised 'window' (None when
+                the kept shifts still cover the demand).
+        
+        Raises:
+            ValueError: For an invalid date, constraint, shift or event, or a
+                call-off of more staff than the shift has.
+        """
+        limits = resolve_constraints(constraints)
+        curve = self.demand_curve(place_id, date, limits['history_weeks'])
+        
+        scheduled: Dict[Tuple[int, int], int] = {}
+        for shift in shifts:
+            start, end = _parse_window(shift)
+            scheduled[(start, end - start)] = (scheduled.get((start, end - start), 0)
+                                               + _parse_staff(shift))
+        
+        removed = []
+        for event in events:
+            start, end = _parse_window(event)
+            kind = event.get('type')
+            if kind not in EVENT_TYPES:
+                raise ValueError(f"event type must be one of {EVENT_TYPES}")
+            if kind == 'demand_spike':
+                factor, orders = _parse_spike(event)
+                curve[start:end] = curve[start:end] * factor + orders / (end - start)
+                continue
+            key, staff = (start, end - start), _parse_staff(event)
+            if scheduled.get(key, 0) < staff:
+                raise ValueError(f"No shift {event['start']}-{event['end']} with {staff} staff "
+                                 f"to remove")
+            scheduled[key] -= staff
+            removed.append((start, end - start, staff))
+        
+        needed, required = self._requirements(curve, limits)
+        covered = np.zeros(SLOTS_PER_DAY, dtype=np.int64)
+        for (start, length), staff in scheduled.items():
+            covered[start:start + length] += staff
+        gap = np.maximum(required - covered, 0)
+        
+        started = time.perf_counter()
+        added, used = solve_shifts(gap, self._shift_slots(limits), solver, limits['time_limit'])
+        for start, length, staff in added:
+            scheduled[(start, length)] = scheduled.get((start, length), 0) + staff
+        kept = sorted((start, length, staff) for (start, length), staff in scheduled.items()
+                      if staff > 0)
+        
+        result = self._summary(kept, needed, used, time.perf_counter() - started)
+        gap_slots = np.flatnonzero(gap)
+        result.update({
+            'added': self._shift_records(added),
+            'removed': self._shift_records(sorted(removed)),
+            'window': ({'start': _slot_label(gap_slots[0]), 'end': _slot_label(gap_slots[-1] + 1)}
+                       if len(gap_slots) else None),
+        })
+        return result
+    
+    def plan_many(self, date: str, places: Optional[Iterable] = None,
+                  constraints: Optional[Dict[str, Any]] = None,
+                  solver: str = 'auto') -> pd.DataFrame:
+        """
+        Plans several places' shifts for one day.
+        
+        Args:
+            date (str): Day to plan ('YYYY-MM-DD').
+            places (Iterable, optional): Places to plan (all places with orders by default).
+            constraints (Dict[str, Any], optional): Overrides of DEFAULT_CONSTRAINTS.
+            solver (str): 'auto', 'milp' or 'greedy'.
+        
+        Returns:
+            pd.DataFrame: One row per (place, shift) with start, end, hours,
+                staff, and the place's total_staff_hours and estimated_coverage.
+        """
+        frames = []
+        for place_id in (self.places if places is None else places):
+            shifts = plan_frame(self.plan(place_id, date, constraints, solver))
+            frames.append(shifts.assign(**{self.place_column: place_id}))
+        return _concat_plans(frames, self.place_column)
+    
+    @staticmethod
+    def _requirements(curve: np.ndarray, limits: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Staff needed per slot, uncapped and capped at max_staff.
+        
+        Args:
+            curve (np.ndarray): Expected orders per slot.
+            limits (Dict[str, Any]): Resolved constraints.
+        
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Needed and schedulable staff per slot.
+        """
+        needed = staff_requirements(curve, limits['orders_per_staff_hour'], limits['min_staff'])
+        if limits['max_staff'] is None:
+            return needed, needed
+        return needed, np.minimum(needed, limits['max_staff'])
+    
+    @staticmethod
+    def _shift_slots(limits: Dict[str, Any]) -> List[int]:
+        """Allowed shift lengths in slots."""
+        return [int(hours * 60) // SLOT_MINUTES for hours in limits['shift_hours']]
+    
+    @staticmethod
+    def _shift_records(shifts: List[Tuple[int, int, int]]) -> List[Dict[str, Any]]:
+        """Formats (start, length, staff) shifts for the API."""
+        return [{'start': _slot_label(start), 'end': _slot_label(start + length),
+                 'hours': length * SLOT_MINUTES / 60, 'staff': staff}
+                for start, length, staff in shifts]
+    
+    def _summary(self, shifts: List[Tuple[int, int, int]], needed: np.ndarray, solver: str,
+                 seconds: float) -> Dict[str, Any]:
+        """
+        Builds the plan response for a set of shifts.
+        
+        Args:
+            shifts (List[Tuple[int, int, int]]): (start, length, staff) shifts.
+            needed (np.ndarray): Uncapped staff needed per slot.
+            solver (str): Solver used.
+            seconds (float): Solve time.
+        
+        Returns:
+            Dict[str, Any]: Shifts, totals, coverage, peak staff, solver and solve time.
+        """
+        covered = np.zeros(SLOTS_PER_DAY, dtype=np.int64)
+        for start, length, staff in shifts:
+            covered[start:start + length] += staff
+        total_needed = int(needed.sum())
+        coverage = np.minimum(covered, needed).sum() / total_needed if total_needed else 1.0
+        return {
+            'shifts': self._shift_records(shifts),
+            'total_staff_hours': float(covered.sum() * SLOT_MINUTES / 60),
+            'estimated_coverage': round(float(coverage), 4),
+            'peak_staff': int(covered.max()),
+            'solver': solver,
+            'solve_ms': round(seconds * 1000, 2),
+        }
+    
+    @staticmethod
+    def _day_number(date: str) -> int:
+        """
+        Converts 'YYYY-MM-DD' to days since 1970-01-01.
+        
+        Raises:
+            ValueError: If the date cannot be parsed.
+        """
+        try:
+            return int(np.datetime64(str(date), 'D').astype(np.int64))
+        except ValueError:
+            raise ValueError(f"date must be YYYY-MM-DD, got {date!r}")
+
+
+def plan_frame(plan: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Flattens a plan into one row per shift.
+    
+    Args:
+        plan (Dict[str, Any]): ShiftOptimizer.plan output.
+    
+    Returns:
+        pd.DataFrame: start, end, hours, staff, total_staff_hours and estimated_coverage.
+    """
+    frame = pd.DataFrame(plan['shifts'], columns=['start', 'end', 'hours', 'staff'])
+    return frame.assign(total_staff_hours=plan['total_staff_hours'],
+                        estimated_coverage=plan['estimated_coverage'])
+
+
+def _concat_plans(frames: List[pd.DataFrame], place_column: str) -> pd.DataFrame:
+    """Concatenates per-place plan frames with the place column first."""
+    if not frames:
+        return pd.DataFrame(columns=[place_column, 'start', 'end', 'hours', 'staff',
+                                     'total_staff_hours', 'estimated_coverage'])
+    merged = pd.concat(frames, ignore_index=True)
+    return merged[[place_column] + [c for c in merged.columns if c != place_column]]
+
+
+def plan_place_shifts(place_id, sales: pd.DataFrame, inventory: pd.DataFrame, date: str,
+                      constraints: Optional[Dict[str, Any]] = None,
+                      solver: str = 'auto') -> pd.DataFrame:
+    """
+    PlaceRunner task planning one place's shifts from its orders.
+    
+    Args:
+        place_id: The place.
+        sales (pd.DataFrame): The place's orders (place_id and created).
+        inventory (pd.DataFrame): Unused.
+        date (str): Day to plan ('YYYY-MM-DD').
+        constraints (Dict[str, Any], optional): Overrides of DEFAULT_CONSTRAINTS.
+        solver (str): 'auto', 'milp' or 'greedy'.
+    
+    Returns:
+        pd.DataFrame: plan_frame output for the place.
+    """
+    return plan_frame(ShiftOptimizer(sales).plan(place_id, date, constraints, solver))
+
+
+def plan_active_places(loader, dim_places: pd.DataFrame, orders: pd.DataFrame, date: str,
+                       constraints: Optional[Dict[str, Any]] = None, solver: str = 'auto',
+                       max_workers: Optional[int] = None) -> pd.DataFrame:
+    """
+    Plans the day's shifts for every active place, in parallel.
+    
+    Args:
+        loader (DataLoader): Loader whose filter_active_merchants selects the places.
+        dim_places (pd.DataFrame): dim_places rows ('id' and 'termination_date').
+        orders (pd.DataFrame): fct_orders rows.
+        date (str): Day to plan ('YYYY-MM-DD').
+        constraints (Dict[str, Any], optional): Overrides of DEFAULT_CONSTRAINTS.
+        solver (str): 'auto', 'milp' or 'greedy'.
+        max_workers (int, optional): Worker processes (defaults to the CPU count).
+    
+    Returns:
+        pd.DataFrame: One row per (place, shift), as ShiftOptimizer.plan_many.
+    
+    Raises:
+        ValueError: For an invalid date, constraint or solver.
+    """
+    resolve_constraints(constraints)
+    ShiftOptimizer._day_number(date)
+    active = loader.filter_active_merchants(dim_places)['id']
+    orders = orders.loc[orders['place_id'].isin(active), ['place_id', 'created']]
+    with PlaceRunner(orders, max_workers=max_workers) as runner:
+        plans = runner.run(plan_place_shifts, date=date, constraints=constraints, solver=solver)
+    return plans if len(plans) else _concat_plans([], 'place_id')
@@ -1,16 +1,23 @@
 """
 File: helpers.py
 Description: Utility functions for data processing and common operations.
-Dependencies: pandas, datetime
+Dependencies: pandas, numpy, datetime
 Author: Sample Team
 
 This is a sample file demonstrating proper code structure and documentation.
 Students should replace this with their actual implementation.
 """
 
+import numpy as np
 import pandas as pd
 from datetime import datetime
-from typing import Union, List
+from typing import Callable, Dict, Iterable, Tuple, Union, List, Optional
+
+
+SECONDS_PER_BIN = {'h': 3600, 'D': 86400}
+
+# Aggregations supported by aggregate_by_period_fast
+FAST_AGGREGATIONS = ('sum', 'count', 'mean', 'min', 'max')
 
 
 def convert_unix_timestamp(timestamp: int) -> datetime:
@@ -37,6 +44,9 @@ def convert_timestamp_column(df: pd.DataFrame, column_name: str) -> pd.DataFrame
     """
     Converts a timestamp column from UNIX to datetime in a DataFrame.
     
+    The input is left unchanged; only the converted column is new memory (see
+    src.utils.timestamps for timezone-aware and multi-column conversion).
+    
     Args:
         df (pd.DataFrame): The DataFrame containing the timestamp column.
         column_name (str): Name of the column to convert.
@@ -44,7 +54,7 @@ def convert_timestamp_column(df: pd.DataFrame, column_name: str) -> pd.DataFrame
     Returns:
         pd.DataFrame: DataFrame with converted timestamp column.
     """
-    df = df.copy()
+    df = df.copy(deep=False)
     df[column_name] = pd.to_datetime(df[column_name], unit='s')
     return df
 
@@ -112,13 +122,85 @@ def categorize_performance(value: float, thresholds: dict) -> str:
         return 'excellent'
 
 
-def aggregate_by_period(df: pd.DataFrame, date_column: str, 
+def _to_datetime(values: pd.Series) -> pd.Series:
+    """
+    Parses a date column, treating numeric values as UNIX seconds.
+    
+    Args:
+        values (pd.Series): Date strings, datetimes or UNIX timestamps.
+    
+    Returns:
+        pd.Series: Parsed datetime values.
+    """
+    if pd.api.types.is_numeric_dtype(values):
+        return pd.to_datetime(values, unit='s')
+    return pd.to_datetime(values)
+
+
+def aggregate_chunks(chunks: Iterable[pd.DataFrame], date_column: str,
+                     value_column: str, group_by: Optional[List[str]] = None,
+                     period: str = 'D') -> pd.DataFrame:
+    """
+    Aggregates a stream of DataFrame chunks by time period and optional keys.
+    
+    Each chunk is reduced to daily partial sums that are merged into a running
+    total, so only one raw chunk plus the (small) daily aggregate is ever held
+    in memory. Use this with DataLoader.iter_csv to compute per-item or
+    per-place daily quantities over tables that do not fit in memory.
+    
+    Args:
+        chunks (Iterable[pd.DataFrame]): Chunks sharing the same columns.
+        date_column (str): Name of the date column (dates or UNIX seconds).
+        value_column (str): Name of the value column to sum.
+        group_by (List[str], optional): Key columns such as 'item_id' or 'place_id'.
+        period (str): Period for aggregation ('D' for daily, 'W' for weekly, 'M' for monthly).
+    
+    Returns:
+        pd.DataFrame: Aggregated DataFrame with the key columns, the date column
+            and the summed value column, sorted by keys and date.
+    
+    Example:
+        >>> chunks = loader.iter_csv('fct_order_items.csv',
+        ...                          usecols=['item_id', 'created', 'quantity'])
+        >>> aggregate_chunks(chunks, 'created', 'quantity', group_by=['item_id'])
+    """
+    keys = list(group_by or [])
+    running = None
+    
+    for chunk in chunks:
+        days = _to_datetime(chunk[date_column]).dt.floor('D')
+        partial = chunk[value_column].groupby(
+            [chunk[key] for key in keys] + [days.rename(date_column)]
+        ).sum()
+        running = partial if running is None else running.add(partial, fill_value=0)
+    
+    if running is None:
+        return pd.DataFrame(columns=keys + [date_column, value_column])
+    
+    daily = running.reset_index()
+    
+    if not keys:
+        return daily.set_index(date_column)[value_column].resample(period).sum().reset_index()
+    
+    if period == 'D':
+        return daily.sort_values(keys + [date_column], ignore_index=True)
+    
+    return (
+        daily.groupby(keys + [pd.Grouper(key=date_column, freq=period)])[value_column]
+        .sum()
+        .reset_index()
+    )
+
+
+def aggregate_by_period(df: Union[pd.DataFrame, Iterable[pd.DataFrame]], date_column: str, 
                        value_column: str, period: str = 'D') -> pd.DataFrame:
     """
     Aggregates data by time period (daily, weekly, monthly).
     
     Args:
-        df (pd.DataFrame): The DataFrame to aggregate.
+        df (pd.DataFrame | Iterable[pd.DataFrame]): The DataFrame to aggregate,
+            or a stream of chunks (e.g. from DataLoader.iter_csv) which is
+            reduced chunk by chunk via aggregate_chunks.
         date_column (str): Name of the date column.
         value_column (str): Name of the value column to aggregate.
         period (str): Period for aggregation ('D' for daily, 'W' for weekly, 'M' for monthly).
@@ -126,6 +208,9 @@ def aggregate_by_period(df: pd.DataFrame, date_column: str,
     Returns:
         pd.DataFrame: Aggregated DataFrame.
     """
+    if not isinstance(df, pd.DataFrame):
+        return aggregate_chunks(df, date_column, value_column, period=period)
+    
     df = df.copy()
     df[date_column] = pd.to_datetime(df[date_column])
     df.set_index(date_column, inplace=True)
@@ -135,6 +220,232 @@ def aggregate_by_period(df: pd.DataFrame, date_column: str,
     return aggregated
 
 
+def to_unix_seconds(values: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns timestamps as int64 UNIX seconds without parsing.
+    
+    Integer columns (the dataset's native format) are used as-is and
+    datetime64 columns are reinterpreted at second resolution.
+    
+    Args:
+        values (pd.Series): UNIX seconds or datetimes.
+    
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: int64 seconds and a validity mask
+            (False where the timestamp is missing).
+    
+    Raises:
+        TypeError: If the column is neither numeric nor datetime.
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        valid = values.notna().to_numpy()
+        seconds = values.to_numpy(dtype='datetime64[s]', na_value=np.datetime64(0, 's'))
+        return seconds.view(np.int64), valid
+    if pd.api.types.is_integer_dtype(values) and isinstance(values.dtype, np.dtype):
+        return values.to_numpy(dtype=np.int64, copy=False), np.ones(len(values), dtype=bool)
+    if pd.api.types.is_numeric_dtype(values):
+        floats = values.to_numpy(dtype='float64', na_value=np.nan)
+        valid = ~np.isnan(floats)
+        return np.where(valid, floats, 0).astype(np.int64), valid
+    raise TypeError(f"Column {values.name!r} must hold UNIX seconds or datetimes")
+
+
+def period_bins(seconds: np.ndarray, period: str) -> Tuple[np.ndarray, Callable]:
+    """
+    Bins UNIX seconds into periods with integer arithmetic.
+    
+    Args:
+        seconds (np.ndarray): int64 UNIX seconds (UTC).
+        period (str): 'h' (hourly), 'D' (daily), 'W' (weeks starting Monday)
+            or 'M' (calendar months).
+    
+    Returns:
+        Tuple[np.ndarray, Callable]: Bin number per timestamp, and a function
+            mapping bin numbers back to period-start datetime64[s] values.
+    
+    Raises:
+        ValueError: If period is not supported.
+    """
+    if period in SECONDS_PER_BIN:
+        width = SECONDS_PER_BIN[period]
+        return seconds // width, lambda bins: (bins * width).astype('datetime64[s]')
+    
+    days = seconds // 86400
+    if period == 'W':
+        # Day 0 (1970-01-01) was a Thursday: shift by 3 so bins start on Mondays
+        return (days + 3) // 7, lambda bins: (bins * 7 - 3).astype('datetime64[D]').astype(
+            'datetime64[s]')
+    if period == 'M':
+        # Convert each distinct day once and gather (the day range is small)
+        first_day = int(days.min()) if len(days) else 0
+        span = np.arange(first_day, int(days.max()) + 1 if len(days) else 0)
+        lookup = span.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+        return lookup[days - first_day], lambda bins: bins.astype('datetime64[M]').astype(
+            'datetime64[s]')
+    raise ValueError("period must be 'h', 'D', 'W' or 'M'")
+
+
+def aggregate_by_period_fast(df: pd.DataFrame, date_column: str,
+                             value_columns: Union[str, List[str]], period: str = 'D',
+                             group_by: Optional[List[str]] = None,
+                             aggs: Union[str, List[str]] = 'sum') -> pd.DataFrame:
+    """
+    Aggregates values by period and optional keys without copying or resampling.
+    
+    Timestamps are binned with integer arithmetic straight from int64 UNIX
+    seconds (datetime columns are reinterpreted, never parsed). Keys are
+    factorized, combined with the bin into one group code, and every
+    aggregation is a single bincount/ufunc pass over that code. The input
+    frame is only read.
+    
+    Unlike aggregate_by_period, periods without rows are not emitted, weeks
+    are labelled by their Monday and months by their first day.
+    
+    Args:
+        df (pd.DataFrame): The data (left unmodified).
+        date_column (str): UNIX seconds or datetime column.
+        value_columns (str | List[str]): Column(s) to aggregate.
+        period (str): 'h', 'D', 'W' or 'M'.
+        group_by (List[str], optional): Key columns such as 'place_id' or 'item_id'.
+        aggs (str | List[str]): Any of 'sum', 'count', 'mean', 'min', 'max'.
+    
+    Returns:
+        pd.DataFrame: Key columns, the period start (datetime64[s]) under
+            date_column, and one column per value and aggregation (named after
+            the value column for a single aggregation, else '<column>_<agg>'),
+            sorted by keys and period. Rows with missing keys or timestamps
+            are dropped; missing values are skipped.
+    
+    Raises:
+        ValueError: If an aggregation or period is not supported.
+    
+    Example:
+        >>> aggregate_by_period_fast(order_items, 'created', ['quantity', 'price'],
+        ...                          'W', group_by=['place_id'], aggs=['sum', 'mean'])
+    """
+    value_columns = [value_columns] if isinstance(value_columns, str) else list(value_columns)
+    aggs = [aggs] if isinstance(aggs, str) else list(aggs)
+    unknown = set(aggs) - set(FAST_AGGREGATIONS)
+    if unknown:
+        raise ValueError(f"Unsupported aggregations: {sorted(unknown)}")
+    keys = list(group_by or [])
+    
+    seconds, valid = to_unix_seconds(df[date_column])
+    bins, bin_start = period_bins(seconds, period)
+    
+    # Mixed-radix group code: key codes first, period bin last
+    codes = np.zeros(len(df), dtype=np.int64)
+    radices, uniques = [], []
+    for key in keys:
+        key_codes, key_uniques = _key_codes(df[key])
+        valid = valid & (key_codes >= 0)
+        codes = codes * len(key_uniques) + key_codes
+        radices.append(len(key_uniques))
+        uniques.append(key_uniques)
+    
+    first_bin = int(bins[valid].min()) if valid.any() else 0
+    bin_count = int(bins[valid].max()) - first_bin + 1 if valid.any() else 0
+    codes = codes * bin_count + (bins - first_bin)
+    subset = None if valid.all() else valid
+    if subset is not None:
+        codes = codes[subset]
+    
+    # Dense codes index bincount directly; sparse ones are compacted first
+    total = bin_count * int(np.prod(radices, dtype=np.int64))
+    if total <= max(2 * len(codes), 1 << 20):
+        group_ids, group_count = codes, total
+    else:
+        group_ids, group_codes = pd.factorize(codes, sort=True)
+        group_count = len(group_codes)
+    
+    sizes = np.bincount(group_ids, minlength=group_count)
+    present = np.flatnonzero(sizes)
+    group_codes = present if group_count == total else group_codes[present]
+    
+    result = {}
+    remainder = group_codes
+    remainder, bin_offsets = np.divmod(remainder, max(bin_count, 1))
+    for key, radix, key_uniques in zip(reversed(keys), reversed(radices), reversed(uniques)):
+        remainder, key_codes = np.divmod(remainder, radix)
+        result[key] = key_uniques.take(key_codes)
+    result = {key: result[key] for key in keys}
+    result[date_column] = bin_start(bin_offsets + first_bin)
+    
+    for column in value_columns:
+        series = df[column]
+        values = series.to_numpy(dtype='float64', na_value=np.nan)
+        if subset is not None:
+            values = values[subset]
+        for agg, output in _aggregate_groups(values, group_ids, group_count, aggs).items():
+            output = output[present]
+            if agg in ('sum', 'min', 'max') and pd.api.types.is_integer_dtype(series) \
+                    and not np.isnan(output).any():
+                output = output.astype(np.int64)
+            result[column if len(aggs) == 1 else f"{column}_{agg}"] = output
+    
+    return pd.DataFrame(result)
+
+
+def _key_codes(values: pd.Series) -> Tuple[np.ndarray, pd.Index]:
+    """
+    Encodes a key column as sorted integer codes (-1 for missing keys).
+    
+    Integer ids with a compact range (the usual case for place_id/item_id)
+    are offset by their minimum instead of hashed.
+    
+    Args:
+        values (pd.Series): Key column.
+    
+    Returns:
+        Tuple[np.ndarray, pd.Index]: Codes and the key value of each code.
+    """
+    if isinstance(values.dtype, np.dtype) and values.dtype.kind in 'iu' and len(values):
+        raw = values.to_numpy()
+        low, high = int(raw.min()), int(raw.max())
+        if high - low <= max(len(raw), 1 << 16):
+            return raw.astype(np.int64) - low, pd.Index(np.arange(low, high + 1, dtype=raw.dtype))
+    return pd.factorize(values, sort=True)
+
+
+def _aggregate_groups(values: np.ndarray, group_ids: np.ndarray, group_count: int,
+                      aggs: List[str]) -> Dict[str, np.ndarray]:
+    """
+    Computes NaN-skipping aggregations per group code.
+    
+    Args:
+        values (np.ndarray): float64 values.
+        group_ids (np.ndarray): Group code per value (0 <= id < group_count).
+        group_count (int): Number of group codes.
+        aggs (List[str]): Aggregations to compute.
+    
+    Returns:
+        Dict[str, np.ndarray]: One array of length group_count per aggregation.
+    """
+    present = ~np.isnan(values)
+    if not present.all():
+        values, group_ids = values[present], group_ids[present]
+    
+    outputs = {}
+    if {'sum', 'mean'} & set(aggs):
+        sums = np.bincount(group_ids, weights=values, minlength=group_count)
+    if {'count', 'mean'} & set(aggs):
+        counts = np.bincount(group_ids, minlength=group_count)
+    for agg in aggs:
+        if agg == 'sum':
+            outputs[agg] = sums
+        elif agg == 'count':
+            outputs[agg] = counts
+        elif agg == 'mean':
+            with np.errstate(invalid='ignore', divide='ignore'):
+                outputs[agg] = sums / counts
+        else:
+            ufunc = np.minimum if agg == 'min' else np.maximum
+            extreme = np.full(group_count, np.inf if agg == 'min' else -np.inf)
+            ufunc.at(extreme, group_ids, values)
+            outputs[agg] = np.where(np.isinf(extreme), np.nan, extreme)
+    return outputs
+
+
 def format_currency(amount: float, currency: str = 'DKK') -> str:
     """
     Formats a monetary value with currency symbol.
@@ -0,0 +1,540 @@
+"""
+File: instrumentation.py
+Description: Timing/memory spans, latency histograms, Prometheus export, request profiling and structured logs.
+Dependencies: none (standard library)
+Author: Sample Team
+
+Hot paths are wrapped with @traced (or a `with METRICS.span(...)` block); the
+API records every request in a per-endpoint latency histogram. All of it
+lands in one process-wide MetricsRegistry, rendered in the Prometheus text
+format by the /metrics endpoints. Under gunicorn each worker keeps its own
+registry, so scrape the workers individually.
+
+Instrumentation is on unless METRICS_ENABLED=0. When it is off a traced call
+costs one attribute check. Memory tracking (tracemalloc) is separate and
+opt-in with TRACE_MEMORY=1, because tracing every allocation slows Python
+down several times over. Per-request cProfile runs are opt-in as well, see
+profile_mode().
+"""
+
+import bisect
+import cProfile
+import functools
+import io
+import json
+import logging
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+# Latency buckets in seconds (upper bounds, Prometheus 'le')
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Peak memory buckets in bytes: 64 KiB to 4 GiB in steps of 4x
+MEMORY_BUCKETS = tuple(float(64 * 1024 * 4 ** i) for i in range(9))
+
+SPAN_SECONDS = 'app_span_duration_seconds'
+SPAN_PEAK_BYTES = 'app_span_peak_memory_bytes'
+REQUEST_SECONDS = 'http_request_duration_seconds'
+
+METRIC_HELP = {
+    SPAN_SECONDS: 'Wall time of instrumented functions and blocks.',
+    SPAN_PEAK_BYTES: 'Peak traced memory above the start of a span (TRACE_MEMORY=1).',
+    REQUEST_SECONDS: 'API request latency by endpoint, method and status.',
+}
+
+PROFILE_MODES = ('off', 'header', 'all')
+PROFILE_HEADER = 'X-Profile'
+PROFILE_LIMIT = 25
+
+LOG_FORMATS = ('json', 'text')
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram in the Prometheus sense.
+    
+    Attributes:
+        bounds (Tuple[float, ...]): Bucket upper bounds, ascending.
+        counts (List[int]): Observations per bucket; the last one is +Inf.
+        count (int): Number of observations.
+        sum (float): Sum of the observed values.
+    
+    Methods:
+        observe(value): Records one value.
+        cumulative(): Counts of observations <= each bound, then the total.
+    """
+    
+    def __init__(self, bounds: Tuple[float, ...] = LATENCY_BUCKETS):
+        """
+        Initialize a Histogram.
+        
+        Args:
+            bounds (Tuple[float, ...]): Bucket upper bounds, ascending.
+        """
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+    
+    def observe(self, value: float) -> None:
+        """
+        Records one value.
+        
+        Args:
+            value (float): The observed value.
+        """
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+    
+    def cumulative(self) -> List[int]:
+        """
+        Returns the cumulative bucket counts.
+        
+        Returns:
+            List[int]: Observations <= each bound, followed by the total (+Inf).
+        """
+        totals, running = [], 0
+        for count in self.counts:
+            running += count
+            totals.append(running)
+        return totals
+
+
+class _SpanFrame:
+    """An open span on one thread's span stack."""
+    
+    __slots__ = ('start_memory', 'peak_memory')
+    
+    def __init__(self, start_memory: int):
+        self.start_memory = start_memory
+        self.peak_memory = start_memory
+
+
+class MetricsRegistry:
+    """
+    Thread-safe store of histograms keyed by metric name and labels.
+    
+    Attributes:
+        enabled (bool): Whether spans and requests are recorded at all.
+        trace_memory (bool): Whether spans also record peak traced memory.
+    
+    Methods:
+        span(name, **fields): Context manager timing a block.
+        observe(metric, value, **labels): Records a value in a histogram.
+        observe_request(endpoint, method, status, seconds): Records one request.
+        histogram(metric, **labels): Returns one histogram, if recorded.
+        render(): All histograms in the Prometheus text format.
+        reset(): Drops every histogram.
+    """
+    
+    def __init__(self, enabled: bool = True, trace_memory: bool = False):
+        """
+        Initialize a MetricsRegistry.
+        
+        Args:
+            enabled (bool): Record spans and requests.
+            trace_memory (bool): Also record peak memory per span; starts
+                tracemalloc if it is not already tracing.
+        """
+        self.enabled = enabled
+        self.trace_memory = trace_memory
+        self._histograms: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], Histogram] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+    
+    @contextmanager
+    def span(self, name: str, **fields) -> Iterator[None]:
+        """
+        Times a block and records it under SPAN_SECONDS{span=name}.
+        
+        Spans nest: with trace_memory, an outer span's peak includes the peaks
+        of the spans inside it. At DEBUG level every span is also logged with
+        its duration and the given fields.
+        
+        Args:
+            name (str): Span name, e.g. 'DataLoader.load_csv'.
+            **fields: Extra fields for the debug log event.
+        
+        Yields:
+            None
+        """
+        if not self.enabled:
+            yield
+            return
+        
+        frame = self._enter_memory() if self.trace_memory else None
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._finish_span(name, started, frame, fields)
+    
+    def observe(self, metric: str, value: float,
+                buckets: Tuple[float, ...] = LATENCY_BUCKETS, **labels) -> None:
+        """
+        Records a value in the histogram of a metric and label set.
+        
+        Args:
+            metric (str): Metric name.
+            value (float): The observed value.
+            buckets (Tuple[float, ...]): Bucket bounds used if the histogram is new.
+            **labels: Label names and values.
+        """
+        self._observe((metric, tuple(sorted((k, str(v)) for k, v in labels.items()))),
+                      value, buckets)
+    
+    def observe_request(self, endpoint: str, method: str, status: int,
+                        seconds: float) -> None:
+        """
+        Records one API request in the per-endpoint latency histogram.
+        
+        Args:
+            endpoint (str): Route template, e.g. '/api/inventory/predict'.
+            method (str): HTTP method.
+            status (int): Response status code.
+            seconds (float): Request latency.
+        """
+        if self.enabled:
+            self.observe(REQUEST_SECONDS, seconds, endpoint=endpoint,
+                         method=method, status=status)
+    
+    def histogram(self, metric: str, **labels) -> Optional[Histogram]:
+        """
+        Returns the histogram of a metric and label set.
+        
+        Args:
+            metric (str): Metric name.
+            **labels: Label names and values.
+        
+        Returns:
+            Histogram or None: The histogram, if anything was recorded.
+        """
+        key = (metric, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        with self._lock:
+            return self._histograms.get(key)
+    
+    def render(self) -> str:
+        """
+        Renders all histograms in the Prometheus text exposition format.
+        
+        Returns:
+            str: The exposition text, ending with a newline.
+        """
+        with self._lock:
+            snapshot = [(metric, labels, list(h.bounds), h.cumulative(), h.sum)
+                        for (metric, labels), h in sorted(self._histograms.items())]
+        
+        lines, current = [], None
+        for metric, labels, bounds, cumulative, total in snapshot:
+            if metric != current:
+                current = metric
+                lines.append(f"# HELP {metric} {METRIC_HELP.get(metric, metric)}")
+                lines.append(f"# TYPE {metric} histogram")
+            for bound, count in zip(bounds + [float('inf')], cumulative):
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f"{metric}_bucket{_labels(labels + (('le', le),))} {count}")
+            lines.append(f"{metric}_sum{_labels(labels)} {repr(total)}")
+            lines.append(f"{metric}_count{_labels(labels)} {cumulative[-1]}")
+        return '\n'.join(lines) + '\n'
+    
+    def reset(self) -> None:
+        """Drops every histogram."""
+        with self._lock:
+            self._histograms.clear()
+    
+    def _observe(self, key: Tuple[str, Tuple[Tuple[str, str], ...]], value: float,
+                 buckets: Tuple[float, ...]) -> None:
+        """Records a value under a prebuilt (metric, sorted labels) key."""
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+    
+    def _finish_span(self, name: str, started: float, frame: Optional[_SpanFrame],
+                     fields: Dict[str, Any]) -> None:
+        """Records the duration (and peak memory) of a span that just ended."""
+        seconds = time.perf_counter() - started
+        labels = (('span', name),)
+        self._observe((SPAN_SECONDS, labels), seconds, LATENCY_BUCKETS)
+        peak = None
+        if frame is not None:
+            peak = self._exit_memory(frame)
+            self._observe((SPAN_PEAK_BYTES, labels), peak, MEMORY_BUCKETS)
+        if logger.isEnabledFor(logging.DEBUG):
+            log_event(logger, 'span', level=logging.DEBUG, span=name,
+                      seconds=round(seconds, 6), peak_bytes=peak, **fields)
+    
+    def _enter_memory(self) -> Optional[_SpanFrame]:
+        """Opens a memory frame on this thread's span stack."""
+        if not tracemalloc.is_tracing():
+            return None
+        stack = self._stack()
+        current, peak = tracemalloc.get_traced_memory()
+        if stack:
+            stack[-1].peak_memory = max(stack[-1].peak_memory, peak)
+        tracemalloc.reset_peak()
+        frame = _SpanFrame(current)
+        stack.append(frame)
+        return frame
+    
+    def _exit_memory(self, frame: _SpanFrame) -> int:
+        """Closes a memory frame and returns its peak above the start in bytes."""
+        stack = self._stack()
+        _, peak = tracemalloc.get_traced_memory()
+        frame.peak_memory = max(frame.peak_memory, peak)
+        if stack and stack[-1] is frame:
+            stack.pop()
+        if stack:
+            stack[-1].peak_memory = max(stack[-1].peak_memory, frame.peak_memory)
+        return frame.peak_memory - frame.start_memory
+    
+    def _stack(self) -> List[_SpanFrame]:
+        """Returns this thread's stack of open memory frames."""
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+
+def _labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    """Formats a label set as {a="1",b="2"}, escaping values."""
+    if not labels:
+        return ''
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+               for _, value in labels)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(labels, escaped)) + '}'
+
+
+METRICS = MetricsRegistry(enabled=os.environ.get('METRICS_ENABLED', '1') != '0',
+                          trace_memory=os.environ.get('TRACE_MEMORY', '0') == '1')
+
+
+def traced(name: Optional[str] = None) -> Callable:
+    """
+    Decorator recording every call of a function as a span in METRICS.
+    
+    Args:
+        name (str, optional): Span name. Defaults to the function's qualified
+            name, e.g. 'InventoryService.predict_demand'.
+    
+    Returns:
+        Callable: The decorator.
+    """
+    def decorate(func: Callable) -> Callable:
+        span_name = name or func.__qualname__
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not METRICS.enabled:
+                return func(*args, **kwargs)
+            # Same as `with METRICS.span(span_name)`, without the generator overhead
+            frame = METRICS._enter_memory() if METRICS.trace_memory else None
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                METRICS._finish_span(span_name, started, frame, {})
+        return wrapper
+    return decorate
+
+
+def profile_mode(value: Optional[str] = None) -> str:
+    """
+    Resolves the request profiling mode.
+    
+    'off' never profiles, 'header' profiles requests sent with an
+    'X-Profile: 1' header and 'all' profiles every request.
+    
+    Args:
+        value (str, optional): Mode; defaults to the PROFILE_REQUESTS
+            environment variable, else 'off'.
+    
+    Returns:
+        str: One of PROFILE_MODES.
+    
+    Raises:
+        ValueError: If the mode is unknown.
+    """
+    mode = (value or os.environ.get('PROFILE_REQUESTS') or 'off').lower()
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Unknown profile mode '{mode}'. Use one of {PROFILE_MODES}")
+    return mode
+
+
+def wants_profile(mode: str, header: Optional[str]) -> bool:
+    """
+    Decides whether to profile one request.
+    
+    Args:
+        mode (str): Profiling mode from profile_mode().
+        header (str, optional): Value of the request's X-Profile header.
+    
+    Returns:
+        bool: True if the request should run under cProfile.
+    """
+    if mode == 'all':
+        return True
+    return mode == 'header' and (header or '').strip().lower() in ('1', 'true', 'yes')
+
+
+class RequestProfiler:
+    """
+    cProfile run around one request.
+    
+    cProfile traces the calling thread only, so start() and stop() must run
+    on the thread that serves the request.
+    
+    Attributes:
+        endpoint (str): Endpoint being profiled.
+        profile (cProfile.Profile): The profiler.
+    
+    Methods:
+        start(): Starts collecting.
+        stop(limit): Stops, logs and returns the top functions.
+    """
+    
+    def __init__(self, endpoint: str):
+        """
+        Initialize a RequestProfiler.
+        
+        Args:
+            endpoint (str): Endpoint being profiled.
+        """
+        self.endpoint = endpoint
+        self.profile = cProfile.Profile()
+    
+    def start(self) -> 'RequestProfiler':
+        """
+        Starts collecting.
+        
+        Returns:
+            RequestProfiler: self, for chaining.
+        """
+        self.profile.enable()
+        return self
+    
+    def stop(self, limit: int = PROFILE_LIMIT) -> str:
+        """
+        Stops collecting and logs the top functions by cumulative time.
+        
+        Args:
+            limit (int): Number of functions to report.
+        
+        Returns:
+            str: The pstats report.
+        """
+        self.profile.disable()
+        buffer = io.StringIO()
+        pstats.Stats(self.profile, stream=buffer).sort_stats('cumulative').print_stats(limit)
+        report = buffer.getvalue()
+        log_event(logger, 'request_profile', endpoint=self.endpoint, profile=report)
+        return report
+
+
+def log_event(target: logging.Logger, event: str, level: int = logging.INFO,
+              exc_info: bool = False, **fields) -> None:
+    """
+    Logs an event name with structured fields.
+    
+    Fields are passed to the handler untouched (see StructuredFormatter) and
+    are not formatted at all when the level is disabled.
+    
+    Args:
+        target (logging.Logger): Logger to write to.
+        event (str): Event name, e.g. 'table_loaded'.
+        level (int): Logging level.
+        exc_info (bool): Attach the exception being handled.
+        **fields: Event fields.
+    """
+    if target.isEnabledFor(level):
+        target.log(level, event, exc_info=exc_info, extra={'fields': fields})
+
+
+class StructuredFormatter(logging.Formatter):
+    """
+    Formats records as one JSON object per line, or as 'event key=value' text.
+    
+    Attributes:
+        output (str): 'json' or 'text'.
+    """
+    
+    def __init__(self, output: str = 'json'):
+        """
+        Initialize a StructuredFormatter.
+        
+        Args:
+            output (str): 'json' or 'text'.
+        """
+        super().__init__()
+        self.output = output
+    
+    def format(self, record: logging.LogRecord) -> str:
+        """
+        Formats one record.
+        
+        Args:
+            record (logging.LogRecord): The record.
+        
+        Returns:
+            str: The formatted line.
+        """
+        fields = getattr(record, 'fields', {})
+        timestamp = datetime.fromtimestamp(record.created, timezone.utc).strftime(
+            '%Y-%m-%dT%H:%M:%S.%fZ')
+        entry = {'time': timestamp, 'level': record.levelname, 'logger': record.name,
+                 'event': record.getMessage(), **fields}
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        
+        if self.output == 'json':
+            return json.dumps(entry, default=str)
+        text = ' '.join(f"{k}={v}" for k, v in entry.items()
+                        if k not in ('time', 'level', 'logger', 'event', 'exception'))
+        line = f"{timestamp} {record.levelname} {record.name} {entry['event']} {text}".rstrip()
+        return line + ('\n' + entry['exception'] if 'exception' in entry else '')
+
+
+def configure_logging(level: Optional[str] = None, output: Optional[str] = None) -> logging.Logger:
+    """
+    Attaches a structured handler to the 'src' logger (once).
+    
+    Library modules only create loggers; entry points (the API apps) call
+    this. The root logger is left alone.
+    
+    Args:
+        level (str, optional): Level name; defaults to LOG_LEVEL, else 'INFO'.
+        output (str, optional): 'json' or 'text'; defaults to LOG_FORMAT, else 'json'.
+    
+    Returns:
+        logging.Logger: The configured 'src' logger.
+    
+    Raises:
+        ValueError: If output is unknown.
+    """
+    output = output or os.environ.get('LOG_FORMAT', 'json')
+    if output not in LOG_FORMATS:
+        raise ValueError(f"Unknown log format '{output}'. Use one of {LOG_FORMATS}")
+    
+    package_logger = logging.getLogger('src')
+    package_logger.setLevel((level or os.environ.get('LOG_LEVEL', 'INFO')).upper())
+    handler = next((h for h in package_logger.handlers
+                    if isinstance(h.formatter, StructuredFormatter)), None)
+    if handler is None:
+        handler = logging.StreamHandler()
+        package_logger.addHandler(handler)
+    handler.setFormatter(StructuredFormatter(output))
+    return package_logger
+
+
+logger = logging.getLogger(__name__)
@@ -0,0 +1,289 @@
+"""
+File: synthetic.py
+Description: Deterministic synthetic data shaped like the dim_/fct_ tables, for benchmarks and tests.
+Dependencies: pandas, numpy
+Author: Sample Team
+
+The real data release is downloaded separately, so data/ ships empty. This
+module generates dim_places, dim_items, fct_orders and fct_order_items with the
+same column names and value types (UNIX timestamps, DKK floats, categorical
+type/channel/platform strings) at any scale. Output depends only on the seed
+and sizes. Large fact tables are generated and written in chunks, so even 100M
+order lines never have to fit in memory; random values are drawn in fixed
+blocks of rows, so the chunk size does not change the data.
+"""
+
+import os
+import numpy as np
+import pandas as pd
+from typing import Callable, Dict, Iterator, Optional
+
+
+START_TIMESTAMP = 1672531200  # 2023-01-01 00:00:00 UTC
+DAY_SECONDS = 86400
+
+ORDER_TYPES = ['eat_in', 'takeaway', 'delivery']
+CHANNELS = ['App', 'Kiosk', 'Counter']
+PLATFORMS = ['', 'Wolt', 'JustEat']
+ITEM_TITLES = ['Burger', 'Fries', 'Soda', 'Salad', 'Coffee', 'Croissant', 'Pizza', 'Smoothie']
+
+# Share of orders per hour of day (lunch and dinner peaks)
+_HOUR_PROFILE = np.array([0, 0, 0, 0, 0, 0, 1, 2, 3, 3, 4, 8, 12, 9, 5, 4, 5, 8, 11, 9, 5, 3, 1, 1],
+                         dtype=float)
+_HOUR_PROFILE /= _HOUR_PROFILE.sum()
+
+# Rows per random block of the fact tables; chunks are cut from these blocks
+_BLOCK_ROWS = 65_536
+
+
+def _place_of_order(order_id: np.ndarray, places: int) -> np.ndarray:
+    """Deterministically scatters order ids over places (shared by both fact tables)."""
+    return (order_id * 2654435761 % places) + 1
+
+
+def _random_rows(draw: Callable, seed: int, stream: int, count: int, start: int,
+                 rows: int) -> Dict[str, np.ndarray]:
+    """
+    Draws the random columns of rows [start, start + rows) of a table.
+    
+    Each block of _BLOCK_ROWS rows has its own generator, seeded by (seed,
+    stream, block), so a row's values do not depend on how rows are chunked.
+    
+    Args:
+        draw (Callable): draw(rng, n) -> column name to n random values.
+        seed (int): Random seed.
+        stream (int): Table-specific stream number.
+        count (int): Total rows of the table.
+        start (int): First row.
+        rows (int): Number of rows.
+    
+    Returns:
+        Dict[str, np.ndarray]: Column name to values of the requested rows.
+    """
+    first, last = start // _BLOCK_ROWS, (start + rows - 1) // _BLOCK_ROWS
+    blocks = [draw(np.random.default_rng([seed, stream, block]),
+                   min(_BLOCK_ROWS, count - block * _BLOCK_ROWS))
+              for block in range(first, last + 1)]
+    offset = start - first * _BLOCK_ROWS
+    return {name: np.concatenate([block[name] for block in blocks])[offset:offset + rows]
+            for name in blocks[0]}
+
+
+def scaled_sizes(order_items: int) -> Dict[str, int]:
+    """
+    Derives consistent table sizes from the number of order lines.
+    
+    Args:
+        order_items (int): Number of fct_order_items rows.
+    
+    Returns:
+        Dict[str, int]: Row counts for each table.
+    """
+    orders = max(1, order_items // 3)
+    places = int(min(5_000, max(5, order_items // 20_000)))
+    items = int(min(200_000, max(20, places * 40)))
+    return {'dim_places': places, 'dim_items': items,
+            'fct_orders': orders, 'fct_order_items': order_items}
+
+
+def generate_places(count: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Generates dim_places rows.
+    
+    Args:
+        count (int): Number of places.
+        seed (int): Random seed.
+    
+    Returns:
+        pd.DataFrame: dim_places-shaped frame.
+    """
+    rng = np.random.default_rng([seed, 1])
+    contract_start = START_TIMESTAMP - rng.integers(0, 3 * 365, count) * DAY_SECONDS
+    churned = rng.random(count) < 0.15
+    termination = np.where(churned, START_TIMESTAMP + rng.integers(0, 365, count) * DAY_SECONDS, 0)
+    return pd.DataFrame({
+        'id': np.arange(1, count + 1),
+        'title': [f"Merchant {i}" for i in range(1, count + 1)],
+        'contract_start': contract_start,
+        'termination_date': pd.Series(termination, dtype='Int64').mask(~churned),
+        'bankrupt': (rng.random(count) < 0.02).astype(int),
+        'seasonal': (rng.random(count) < 0.1).astype(int),
+        'dormant': (rng.random(count) < 0.05).astype(int),
+    })
+
+
+def generate_items(count: int, places: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Generates dim_items rows spread over places.
+    
+    Args:
+        count (int): Number of items.
+        places (int): Number of places.
+        seed (int): Random seed.
+    
+    Returns:
+        pd.DataFrame: dim_items-shaped frame.
+    """
+    rng = np.random.default_rng([seed, 2])
+    price = np.round(rng.uniform(15, 150, count), 2)
+    return pd.DataFrame({
+        'id': np.arange(1, count + 1),
+        'place_id': (np.arange(count) % places) + 1,
+        'title': [f"{ITEM_TITLES[i % len(ITEM_TITLES)]} {i}" for i in range(count)],
+        'price': price,
+        'cost': np.round(price * rng.uniform(0.2, 0.6, count), 2),
+    })
+
+
+def iter_orders(count: int, places: int, days: int = 365, seed: int = 0,
+                chunk_rows: int = 1_000_000) -> Iterator[pd.DataFrame]:
+    """
+    Generates fct_orders rows in chunks.
+    
+    Args:
+        count (int): Number of orders.
+        places (int): Number of places.
+        days (int): Number of days the orders span.
+        seed (int): Random seed.
+        chunk_rows (int): Maximum rows per chunk (does not change the rows).
+    
+    Yields:
+        pd.DataFrame: fct_orders-shaped chunks in id order.
+    """
+    def draw(rng, n):
+        """Random columns of n consecutive orders."""
+        return {'hour': rng.choice(24, n, p=_HOUR_PROFILE), 'second': rng.integers(0, 3600, n),
+                'amount': rng.gamma(2.0, 80.0, n), 'type': rng.choice(3, n, p=[0.5, 0.3, 0.2]),
+                'channel': rng.integers(0, 3, n), 'platform': rng.choice(3, n, p=[0.7, 0.2, 0.1])}
+    
+    for start in range(0, count, chunk_rows):
+        rows = min(chunk_rows, count - start)
+        random = _random_rows(draw, seed, 3, count, start, rows)
+        # Orders are time-ordered; hour-of-day follows a lunch/dinner profile
+        order_id = np.arange(start + 1, start + rows + 1)
+        day = ((order_id - 1) * days) // max(count, 1)
+        created = START_TIMESTAMP + day * DAY_SECONDS + random['hour'] * 3600 + random['second']
+        yield pd.DataFrame({
+            'id': order_id,
+            'place_id': _place_of_order(order_id, places),
+            'created': created,
+            'total_amount': np.round(random['amount'], 2),
+            'type': np.asarray(ORDER_TYPES)[random['type']],
+            'channel': np.asarray(CHANNELS)[random['channel']],
+            'platform': np.asarray(PLATFORMS)[random['platform']],
+            'status': 'closed',
+        })
+
+
+def iter_order_items(count: int, orders: int, places: int, items: int, days: int = 365,
+                     seed: int = 0, chunk_rows: int = 1_000_000) -> Iterator[pd.DataFrame]:
+    """
+    Generates fct_order_items rows in chunks.
+    
+    Order lines reference orders in order, and each line sells an item of the
+    order's place (items are assigned to places round-robin, as in
+    generate_items), with a skewed popularity per place.
+    
+    Args:
+        count (int): Number of order lines.
+        orders (int): Number of orders.
+        places (int): Number of places.
+        items (int): Number of items.
+        days (int): Number of days the orders span.
+        seed (int): Random seed.
+        chunk_rows (int): Maximum rows per chunk (does not change the rows).
+    
+    Yields:
+        pd.DataFrame: fct_order_items-shaped chunks in id order.
+    """
+    items_per_place = max(1, items // places)
+    
+    def draw(rng, n):
+        """Random columns of n consecutive order lines."""
+        return {'rank': rng.zipf(1.6, n) - 1, 'second': rng.integers(8 * 3600, 22 * 3600, n),
+                'quantity': rng.choice([1, 1, 1, 2, 2, 3], n)}
+    
+    for start in range(0, count, chunk_rows):
+        rows = min(chunk_rows, count - start)
+        random = _random_rows(draw, seed, 4, count, start, rows)
+        order_id = (np.arange(start, start + rows) * orders) // max(count, 1) + 1
+        place_id = _place_of_order(order_id, places)
+        rank = np.minimum(random['rank'], items_per_place - 1)
+        item_id = rank * places + place_id
+        day = ((order_id - 1) * days) // max(orders, 1)
+        created = START_TIMESTAMP + day * DAY_SECONDS + random['second']
+        price = np.round(15 + (item_id % 97) * 1.4, 2)
+        yield pd.DataFrame({
+            'id': np.arange(start + 1, start + rows + 1),
+            'order_id': order_id,
+            'item_id': item_id,
+            'place_id': place_id,
+            'title': np.asarray(ITEM_TITLES)[item_id % len(ITEM_TITLES)],
+            'quantity': random['quantity'],
+            'price': price,
+            'cost': np.round(price * 0.35, 2),
+            'created': created,
+        })
+
+
+def generate_dataset(order_items: int = 10_000, seed: int = 0,
+                     days: int = 365) -> Dict[str, pd.DataFrame]:
+    """
+    Generates all tables in memory (use write_dataset for large scales).
+    
+    Args:
+        order_items (int): Number of fct_order_items rows.
+        seed (int): Random seed.
+        days (int): Number of days the orders span.
+    
+    Returns:
+        Dict[str, pd.DataFrame]: Table name to frame.
+    """
+    sizes = scaled_sizes(order_items)
+    places, items, orders = sizes['dim_places'], sizes['dim_items'], sizes['fct_orders']
+    return {
+        'dim_places': generate_places(places, seed),
+        'dim_items': generate_items(items, places, seed),
+        'fct_orders': pd.concat(iter_orders(orders, places, days, seed), ignore_index=True),
+        'fct_order_items': pd.concat(
+            iter_order_items(order_items, orders, places, items, days, seed), ignore_index=True),
+    }
+
+
+def write_dataset(directory: str, order_items: int = 10_000, seed: int = 0,
+                  days: int = 365, chunk_rows: int = 1_000_000,
+                  sizes: Optional[Dict[str, int]] = None) -> Dict[str, str]:
+    """
+    Writes all tables as CSV files, streaming the fact tables chunk by chunk.
+    
+    Args:
+        directory (str): Output directory (created if missing).
+        order_items (int): Number of fct_order_items rows.
+        seed (int): Random seed.
+        days (int): Number of days the orders span.
+        chunk_rows (int): Maximum rows generated per chunk.
+        sizes (Dict[str, int], optional): Override table sizes from scaled_sizes().
+    
+    Returns:
+        Dict[str, str]: Table name to CSV path.
+    """
+    os.makedirs(directory, exist_ok=True)
+    sizes = sizes or scaled_sizes(order_items)
+    places, items, orders = sizes['dim_places'], sizes['dim_items'], sizes['fct_orders']
+    
+    tables = {
+        'dim_places': iter([generate_places(places, seed)]),
+        'dim_items': iter([generate_items(items, places, seed)]),
+        'fct_orders': iter_orders(orders, places, days, seed, chunk_rows),
+        'fct_order_items': iter_order_items(sizes['fct_order_items'], orders, places, items,
+                                            days, seed, chunk_rows),
+    }
+    
+    paths = {}
+    for name, chunks in tables.items():
+        path = os.path.join(directory, f"{name}.csv")
+        for position, chunk in enumerate(chunks):
+            chunk.to_csv(path, mode='w' if position == 0 else 'a',
+                         header=position == 0, index=False)
+        paths[name] = path
+    return paths
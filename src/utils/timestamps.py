@@ -0,0 +1,282 @@
+"""
+File: timestamps.py
+Description: Vectorised UNIX timestamp conversion and Europe/Copenhagen calendar features.
+Dependencies: pandas, numpy
+Author: Sample Team
+
+All merchants in the data release are Danish, so hour-of-day, weekday and
+holiday features are derived from Europe/Copenhagen wall-clock time, not UTC
+or the server's local time. Timestamps are never converted row by row: the
+UTC offset comes from a cached table of quarter-hour offsets and every
+calendar attribute from a cached table with one row per local day, so a
+column of N timestamps costs a few array lookups regardless of N.
+"""
+
+import numpy as np
+import pandas as pd
+from datetime import date, timedelta
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+
+from src.models.schemas import SCHEMAS
+from src.utils.helpers import to_unix_seconds
+
+
+TIMEZONE = 'Europe/Copenhagen'
+
+# Columns produced by calendar_features
+CALENDAR_FEATURES = ('date', 'hour', 'weekday', 'week', 'month', 'is_weekend', 'is_holiday')
+
+# Granularity of the UTC offset table; every real DST transition falls on a quarter hour
+_OFFSET_STEP = 900
+_DAY_SECONDS = 86400
+
+
+def easter_sunday(year: int) -> date:
+    """
+    Computes Easter Sunday (Gregorian calendar, anonymous algorithm).
+    
+    Args:
+        year (int): The year.
+    
+    Returns:
+        date: Easter Sunday of that year.
+    """
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+@lru_cache(maxsize=None)
+def danish_holidays(year: int, observances: bool = True) -> Mapping[date, str]:
+    """
+    Lists the Danish public holidays of a year.
+    
+    Store Bededag was abolished from 2024. Observances are days that are not
+    public holidays but that most businesses treat as one (Constitution Day,
+    Christmas Eve and New Year's Eve).
+    
+    Args:
+        year (int): The year.
+        observances (bool): Include the observances.
+    
+    Returns:
+        Mapping[date, str]: Read-only mapping of holiday date to Danish name.
+    """
+    easter = easter_sunday(year)
+    movable = {-3: 'Skærtorsdag', -2: 'Langfredag', 0: 'Påskedag', 1: '2. påskedag',
+               39: 'Kristi himmelfartsdag', 49: 'Pinsedag', 50: '2. pinsedag'}
+    if year < 2024:
+        movable[26] = 'Store bededag'
+    
+    holidays = {date(year, 1, 1): 'Nytårsdag', date(year, 12, 25): 'Juledag',
+                date(year, 12, 26): '2. juledag'}
+    holidays.update({easter + timedelta(days=offset): name for offset, name in movable.items()})
+    if observances:
+        holidays.update({date(year, 6, 5): 'Grundlovsdag', date(year, 12, 24): 'Juleaftensdag',
+                         date(year, 12, 31): 'Nytårsaftensdag'})
+    return MappingProxyType(dict(sorted(holidays.items())))
+
+
+def local_seconds(values: pd.Series, tz: str = TIMEZONE) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Shifts UNIX timestamps to wall-clock seconds in a timezone.
+    
+    Args:
+        values (pd.Series): UNIX seconds or naive (UTC) datetimes.
+        tz (str): IANA timezone name.
+    
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: int64 local wall-clock seconds since
+            1970-01-01 00:00 and a validity mask (False for missing timestamps).
+    """
+    seconds, valid = to_unix_seconds(values)
+    if not valid.any():
+        return seconds, valid
+    steps = seconds // _OFFSET_STEP
+    first = int(steps[valid].min())
+    offsets = _utc_offsets(first, int(steps[valid].max()) - first + 1, tz)
+    # Invalid rows hold 0; clip them into the table, they are masked anyway
+    positions = np.clip(steps - first, 0, len(offsets) - 1)
+    return seconds + offsets[positions], valid
+
+
+def to_local_datetimes(values: pd.Series, tz: Optional[str] = TIMEZONE) -> pd.Series:
+    """
+    Converts UNIX seconds to timezone-aware datetimes in one vectorised pass.
+    
+    With tz=None an int64 or datetime64[s] column is returned as a naive UTC
+    datetime64[s] view of the same buffer (no copy).
+    
+    Args:
+        values (pd.Series): UNIX seconds or naive (UTC) datetimes.
+        tz (str, optional): IANA timezone name, or None for naive UTC.
+    
+    Returns:
+        pd.Series: datetime64[s, tz] (or datetime64[s]) values with the same index;
+            missing timestamps become NaT.
+    """
+    if pd.api.types.is_datetime64_any_dtype(values) and getattr(values.dtype, 'tz', None):
+        return values.dt.tz_convert(tz) if tz else values.dt.tz_convert('UTC').dt.tz_localize(None)
+    seconds, valid = to_unix_seconds(values)
+    stamps = seconds.view('datetime64[s]')
+    if not valid.all():
+        stamps = np.where(valid, stamps, np.datetime64('NaT', 's'))
+    converted = pd.Series(stamps, index=values.index, name=values.name, copy=False)
+    if tz:
+        converted = converted.dt.tz_localize('UTC').dt.tz_convert(tz)
+    return converted
+
+
+def convert_timestamp_columns(df: pd.DataFrame, columns: Optional[Iterable[str]] = None,
+                              tz: Optional[str] = TIMEZONE) -> pd.DataFrame:
+    """
+    Converts several UNIX timestamp columns of a DataFrame in place.
+    
+    Only the converted columns are replaced; the rest of the frame is not
+    copied (unlike helpers.convert_timestamp_column).
+    
+    Args:
+        df (pd.DataFrame): The DataFrame to update.
+        columns (Iterable[str], optional): Columns to convert. Defaults to every
+            column declared as a timestamp by a registered table schema.
+        tz (str, optional): IANA timezone name, or None for naive UTC.
+    
+    Returns:
+        pd.DataFrame: The same DataFrame, for chaining.
+    """
+    if columns is None:
+        declared = {column for schema in SCHEMAS.values() for column in schema.timestamps}
+        columns = [column for column in df.columns if column in declared]
+    for column in columns:
+        df[column] = to_local_datetimes(df[column], tz)
+    return df
+
+
+def calendar_features(values: pd.Series, tz: str = TIMEZONE,
+                      observances: bool = True) -> pd.DataFrame:
+    """
+    Derives local calendar features from timestamps.
+    
+    Args:
+        values (pd.Series): UNIX seconds or naive (UTC) datetimes.
+        tz (str): IANA timezone the features are expressed in.
+        observances (bool): Count Constitution Day, Christmas Eve and New
+            Year's Eve as holidays.
+    
+    Returns:
+        pd.DataFrame: One row per timestamp (same index) with 'date' (local
+            day, datetime64[s]), 'hour' (0-23), 'weekday' (Monday=0), ISO
+            'week', 'month', 'is_weekend' and 'is_holiday'. Missing timestamps
+            get NaT, -1 and False.
+    
+    Example:
+        >>> calendar_features(order_items['created']).head()
+    """
+    seconds, valid = local_seconds(values, tz)
+    days, within_day = np.divmod(seconds, _DAY_SECONDS)
+    
+    features = {}
+    if valid.any():
+        first = int(days[valid].min())
+        table = _day_table(first, int(days[valid].max()) - first + 1, observances)
+        positions = np.clip(days - first, 0, len(table['weekday']) - 1)
+        for name, column in table.items():
+            features[name] = column[positions]
+    else:
+        table = _day_table(0, 1, observances)
+        features = {name: column[np.zeros(len(days), dtype=np.int64)]
+                    for name, column in table.items()}
+    features['date'] = (days * _DAY_SECONDS).view('datetime64[s]')
+    features['hour'] = (within_day // 3600).astype(np.int8)
+    
+    if not valid.all():
+        for name, column in features.items():
+            if column.dtype == bool:
+                features[name] = column & valid
+            elif column.dtype.kind == 'M':
+                features[name] = np.where(valid, column, np.datetime64('NaT', 's'))
+            else:
+                features[name] = np.where(valid, column, -1).astype(column.dtype)
+    return pd.DataFrame({name: features[name] for name in CALENDAR_FEATURES}, index=values.index)
+
+
+def add_calendar_features(df: pd.DataFrame, column: str, tz: str = TIMEZONE,
+                          prefix: str = '', observances: bool = True) -> pd.DataFrame:
+    """
+    Adds the calendar feature columns of one timestamp column in place.
+    
+    Args:
+        df (pd.DataFrame): The DataFrame to update.
+        column (str): UNIX seconds or datetime column.
+        tz (str): IANA timezone the features are expressed in.
+        prefix (str): Prepended to each feature name (e.g. 'created_').
+        observances (bool): Count observances as holidays.
+    
+    Returns:
+        pd.DataFrame: The same DataFrame, for chaining.
+    """
+    for name, values in calendar_features(df[column], tz, observances).items():
+        df[prefix + name] = values
+    return df
+
+
+@lru_cache(maxsize=64)
+def _utc_offsets(first_step: int, step_count: int, tz: str) -> np.ndarray:
+    """
+    Tabulates a timezone's UTC offset per quarter hour.
+    
+    Args:
+        first_step (int): First quarter hour (UNIX seconds // 900).
+        step_count (int): Number of quarter hours.
+        tz (str): IANA timezone name.
+    
+    Returns:
+        np.ndarray: Read-only int64 offsets in seconds.
+    """
+    utc = (np.arange(first_step, first_step + step_count, dtype=np.int64)
+           * _OFFSET_STEP).view('datetime64[s]')
+    wall = (pd.DatetimeIndex(utc).tz_localize('UTC').tz_convert(tz).tz_localize(None)
+            .to_numpy().astype('datetime64[s]'))
+    offsets = wall.view(np.int64) - utc.view(np.int64)
+    offsets.flags.writeable = False
+    return offsets
+
+
+@lru_cache(maxsize=64)
+def _day_table(first_day: int, day_count: int, observances: bool) -> Dict[str, np.ndarray]:
+    """
+    Tabulates the calendar attributes of consecutive days.
+    
+    Args:
+        first_day (int): First day (days since 1970-01-01).
+        day_count (int): Number of days.
+        observances (bool): Count observances as holidays.
+    
+    Returns:
+        Dict[str, np.ndarray]: Read-only 'weekday', 'week', 'month',
+            'is_weekend' and 'is_holiday' arrays, one entry per day.
+    """
+    days = np.arange(first_day, first_day + day_count, dtype=np.int64).view('datetime64[D]')
+    index = pd.DatetimeIndex(days)
+    weekday = index.weekday.to_numpy().astype(np.int8)
+    holidays = np.array([day for year in range(index.year.min(), index.year.max() + 1)
+                         for day in danish_holidays(year, observances)], dtype='datetime64[D]')
+    table = {
+        'weekday': weekday,
+        'week': index.isocalendar()['week'].to_numpy().astype(np.int8),
+        'month': index.month.to_numpy().astype(np.int8),
+        'is_weekend': weekday >= 5,
+        'is_holiday': np.isin(days, holidays),
+    }
+    for column in table.values():
+        column.flags.writeable = False
+    return table
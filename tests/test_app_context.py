@@ -0,0 +1,138 @@
+"""
+File: test_app_context.py
+Description: Unit tests for the long-lived application context and its API wiring.
+Dependencies: pytest, pandas, flask
+
+Run tests with: pytest tests/
+"""
+
+import pytest
+import pandas as pd
+import sys
+import os
+import threading
+
+# Add parent directory to path to import from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.api.app_context import AppContext, ContextHolder, ContextNotReadyError, snapshot_version
+from src.utils.synthetic import write_dataset
+
+
+def _order_items(quantity=2):
+    """Builds order lines for two items on consecutive days."""
+    return pd.DataFrame({
+        'item_id': [1, 1, 2, 2],
+        'quantity': [quantity, quantity, 5, 7],
+        'created': [1700000000, 1700086400, 1700000000, 1700086400],
+    })
+
+
+class TestAppContext:
+    """Test suite for AppContext and ContextHolder."""
+    
+    def test_from_tables_builds_forecasting_state(self):
+        """Test that order lines become daily per-item demand."""
+        context = AppContext.from_tables({'fct_order_items': _order_items()}, version='v1')
+        
+        assert context.inventory_service.predict_demand(2) == 6.0
+        assert context.describe()['items'] == 2
+        with pytest.raises(TypeError):
+            context.tables['other'] = pd.DataFrame()
+    
+    def test_build_from_csv_and_detect_new_snapshot(self, tmp_path):
+        """Test loading from CSV files and reloading only when they change."""
+        write_dataset(str(tmp_path), 2_000)
+        holder = ContextHolder(str(tmp_path), freeze=False)
+        
+        holder.load()
+        first = holder.get()
+        
+        assert first.version == snapshot_version(str(tmp_path))
+        assert first.tables['fct_order_items'].shape[0] == 2_000
+        assert holder.reload_if_stale() is False
+        
+        write_dataset(str(tmp_path), 3_000)
+        assert holder.reload_if_stale() is True
+        assert holder.get().tables['fct_order_items'].shape[0] == 3_000
+        # A request holding the old snapshot still sees consistent data
+        assert first.tables['fct_order_items'].shape[0] == 2_000
+    
+    def test_failed_reload_keeps_serving(self):
+        """Test that a failing build leaves the previous snapshot in place."""
+        contexts = [AppContext.from_tables({'fct_order_items': _order_items()})]
+        
+        def builder():
+            if not contexts:
+                raise OSError("snapshot missing")
+            return contexts.pop()
+        
+        holder = ContextHolder(builder=builder, freeze=False)
+        with pytest.raises(ContextNotReadyError):
+            holder.get()
+        
+        served = holder.load()
+        assert holder.load() is None
+        
+        assert holder.get() is served
+        assert holder.status()['error'] == "snapshot missing"
+        assert holder.status()['state'] == 'ready'
+    
+    def test_background_load(self):
+        """Test that a background load reports loading, then ready."""
+        release = threading.Event()
+        
+        def builder():
+            release.wait(5)
+            return AppContext.from_tables({'fct_order_items': _order_items()})
+        
+        holder = ContextHolder(builder=builder, freeze=False)
+        holder.load(background=True)
+        
+        assert not holder.ready
+        release.set()
+        holder._load_lock.acquire(timeout=5)
+        holder._load_lock.release()
+        assert holder.ready
+
+
+class TestContextRoutes:
+    """Test suite for the API endpoints backed by the context."""
+    
+    @pytest.fixture
+    def client(self):
+        """Flask test client with a swappable context holder."""
+        from src.api.routes import app
+        original = app.extensions['app_context']
+        holder = ContextHolder(builder=lambda: AppContext.from_tables(
+            {'fct_order_items': _order_items()}, version='v1'), freeze=False)
+        app.extensions['app_context'] = holder
+        yield app.test_client(), holder
+        app.extensions['app_context'] = original
+    
+    def test_health_reports_readiness(self, client):
+        """Test that health is 503 until the context is warm."""
+        client, holder = client
+        
+        assert client.get('/api/health').status_code == 503
+        holder.load()
+        response = client.get('/api/health')
+        
+        assert response.status_code == 200
+        assert response.get_json()['context']['version'] == 'v1'
+    
+    def test_predict_uses_context(self, client):
+        """Test that predictions come from the context and follow hot swaps."""
+        client, holder = client
+        
+        assert client.post('/api/inventory/predict', json={'item_id': '1'}).status_code == 503
+        holder.load()
+        
+        response = client.post('/api/inventory/predict', json={'item_id': '1'})
+        assert response.get_json()['predicted_demand'] == 2.0
+        assert client.post('/api/inventory/predict', json={'item_id': '9'}).status_code == 404
+        
+        holder.swap(AppContext.from_tables({'fct_order_items': _order_items(4)}, version='v2'))
+        response = client.post('/api/inventory/predict', json={'item_id': '1'})
+        assert response.get_json()['predicted_demand'] == 4.0
+        assert response.get_json()['data_version'] == 'v2'
@@ -0,0 +1,159 @@
+"""
+File: test_asgi.py
+Description: Unit tests for the async API and prediction micro-batching.
+Dependencies: pytest, pandas, fastapi, httpx
+
+Run tests with: pytest tests/
+"""
+
+import asyncio
+import pytest
+import numpy as np
+import pandas as pd
+import sys
+import os
+
+# Add parent directory to path to import from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+pytest.importorskip('fastapi')
+httpx = pytest.importorskip('httpx')
+
+from src.api.app_context import AppContext, ContextHolder
+from src.api.asgi import app
+from src.api.batching import PredictionBatcher
+
+
+def _holder():
+    """Builds a warm holder over three items with known daily averages."""
+    sales = pd.DataFrame({
+        'item_id': [1, 1, 2, 2, 3],
+        'quantity': [2, 4, 5, 7, 1],
+        'created': [1700000000, 1700086400, 1700000000, 1700086400, 1700000000],
+    })
+    holder = ContextHolder(builder=lambda: AppContext.from_tables(
+        {'fct_order_items': sales}, version='v1'), freeze=False)
+    holder.load()
+    return holder
+
+
+@pytest.fixture
+def client():
+    """Async client for the ASGI app with a fresh holder and batcher."""
+    original = app.state.context_holder, app.state.batcher
+    app.state.context_holder = _holder()
+    app.state.batcher = PredictionBatcher(app.state.context_holder, max_wait_ms=5)
+    yield httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://test')
+    app.state.context_holder, app.state.batcher = original
+
+
+class TestPredictionBatcher:
+    """Test suite for PredictionBatcher."""
+    
+    def test_concurrent_requests_share_one_call(self):
+        """Test that concurrent predictions are answered by one vectorised call."""
+        batcher = PredictionBatcher(_holder(), max_wait_ms=5)
+        
+        async def burst():
+            return await asyncio.gather(*(batcher.predict(i % 4) for i in range(40)))
+        
+        results = asyncio.run(burst())
+        
+        assert batcher.batches == 1
+        assert batcher.requests == 40
+        assert results[1] == (3.0, 'v1')
+        assert results[2] == (6.0, 'v1')
+        assert results[0] == (None, 'v1')
+    
+    def test_full_batch_flushes_immediately(self):
+        """Test that max_batch splits a burst and periods are batched separately."""
+        batcher = PredictionBatcher(_holder(), max_wait_ms=1000, max_batch=10)
+        
+        async def burst():
+            return await asyncio.wait_for(asyncio.gather(
+                *(batcher.predict(1, 'daily') for _ in range(20))), timeout=1)
+        
+        results = asyncio.run(burst())
+        
+        assert batcher.batches == 2
+        assert set(results) == {(3.0, 'v1')}
+
+
+class TestAsgiRoutes:
+    """Test suite for the ASGI endpoints."""
+    
+    def test_predict_and_bulk(self, client):
+        """Test single and bulk predictions, including unknown items."""
+        async def run():
+            async with client:
+                single = await client.post('/api/inventory/predict', json={'item_id': '2'})
+                unknown = await client.post('/api/inventory/predict', json={'item_id': '9'})
+                missing = await client.post('/api/inventory/predict', json={})
+                bulk = await client.post('/api/inventory/predict/bulk',
+                                         json={'item_ids': ['1', 2, 'x'], 'period': 'weekly'})
+                return single, unknown, missing, bulk
+        
+        single, unknown, missing, bulk = asyncio.run(run())
+        
+        assert single.json()['predicted_demand'] == 6.0
+        assert unknown.status_code == 404
+        assert missing.status_code == 400
+        assert bulk.json()['predictions'] == [{'item_id': '1', 'predicted_demand': 3.0},
+                                              {'item_id': 2, 'predicted_demand': 6.0}]
+        assert bulk.json()['missing'] == ['x']
+    
+    def test_unknown_items_match_flask(self, client):
+        """Test that both apps answer unknown and unforecastable items alike."""
+        from src.api.routes import app as flask_app
+        original = flask_app.extensions['app_context']
+        flask_app.extensions['app_context'] = _holder()
+        # Item 5 is known but has no usable quantities, so its forecast is NaN
+        nan_sales = pd.DataFrame({'item_id': [5], 'quantity': [np.nan], 'date': [1700000000]})
+        for holder in (flask_app.extensions['app_context'], app.state.context_holder):
+            holder.get().inventory_service.ingest(nan_sales)
+        
+        async def run():
+            async with client:
+                return [await client.post('/api/inventory/predict', json={'item_id': item_id})
+                        for item_id in ('5', '9')]
+        
+        try:
+            responses = asyncio.run(run())
+            expected = [flask_app.test_client().post('/api/inventory/predict',
+                                                     json={'item_id': item_id})
+                        for item_id in ('5', '9')]
+        finally:
+            flask_app.extensions['app_context'] = original
+        
+        for response, flask_response in zip(responses, expected):
+            assert response.status_code == flask_response.status_code == 404
+            assert response.json() == flask_response.get_json()
+    
+    def test_concurrent_http_requests_are_batched(self, client):
+        """Test that concurrent HTTP requests coalesce in the batcher."""
+        async def run():
+            async with client:
+                return await asyncio.gather(*(
+                    client.post('/api/inventory/predict', json={'item_id': str(1 + i % 3)})
+                    for i in range(30)))
+        
+        responses = asyncio.run(run())
+        
+        assert {r.status_code for r in responses} == {200}
+        assert app.state.batcher.batches < 30
+    
+    def test_health_and_validation(self, client):
+        """Test health readiness and the menu and shift endpoints while cold."""
+        app.state.context_holder = ContextHolder(builder=lambda: None, freeze=False)
+        
+        async def run():
+            async with client:
+                return (await client.get('/api/health'),
+                        await client.post('/api/menu/analyze', json={'place_id': '7'}),
+                        await client.post('/api/shifts/optimize', json={'place_id': '7'}))
+        
+        health, menu, shifts = asyncio.run(run())
+        
+        assert health.status_code == 503
+        assert menu.status_code == 503
+        assert shifts.status_code == 400
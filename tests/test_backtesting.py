@@ -0,0 +1,146 @@
+"""
+File: test_backtesting.py
+Description: Unit tests for the rolling-origin backtesting harness.
+Dependencies: pytest, pandas, numpy, scikit-learn
+Author: Sample Team
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+import sys
+import os
+
+# Add parent directory to path to import from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.services.backtesting import (
+    Backtester,
+    DailyHistory,
+    MovingAverage,
+    backtest_place,
+    resolve_forecaster
+)
+from src.services.inventory_service import InventoryService
+
+
+# 2023-01-01 00:00 UTC
+START = 1672531200
+DAY = 86400
+
+
+def _order_items(rows=6000, days=90):
+    """Builds random order lines for 20 items at three places."""
+    rng = np.random.default_rng(4)
+    item_id = rng.integers(1, 21, rows)
+    return pd.DataFrame({
+        'place_id': item_id % 3,
+        'item_id': item_id,
+        'created': START + rng.integers(0, days * DAY, rows),
+        'quantity': rng.integers(1, 4, rows),
+    })
+
+
+def _origin_day(day_offset):
+    """Day number of START + day_offset days."""
+    return START // DAY + day_offset
+
+
+class TestForecasters:
+    """Test suite for the forecasters and the history they read."""
+    
+    def test_moving_average_matches_predict_demand(self):
+        """Test that ma_<n> at an origin equals predict_demand on the history up to it."""
+        daily = Backtester.from_order_items(_order_items()).daily
+        place = daily[daily['place_id'] == 1]
+        origin = _origin_day(60)
+        history = DailyHistory(place)
+        
+        forecast = MovingAverage(4)(history, origin)
+        truncated = place[place['date'] <= pd.Timestamp(origin * DAY, unit='s')]
+        expected = InventoryService(pd.DataFrame(), truncated).predict_demand_many(
+            history.item_ids, 'weekly')
+        
+        np.testing.assert_allclose(np.round(forecast, 2), expected['predicted_demand'])
+    
+    def test_resolve_forecaster(self):
+        """Test forecaster names and that unknown names raise ValueError."""
+        assert resolve_forecaster('ma_7').window == 7
+        assert resolve_forecaster('mean_28d').days == 28
+        assert resolve_forecaster('linear').name == 'linear'
+        with pytest.raises(ValueError):
+            resolve_forecaster('arima')
+
+
+class TestBacktestPlace:
+    """Test suite for the per-place scoring task."""
+    
+    def test_errors_and_inventory_cost(self):
+        """Test actual demand, errors and reorder-point waste/stockout by hand."""
+        dates = pd.date_range('2023-01-01', periods=10, freq='D')
+        sales = pd.DataFrame({'item_id': 1, 'date': dates,
+                              'quantity': [2.0] * 7 + [6.0, 0.0, 6.0]})
+        origin = _origin_day(6)  # 2023-01-07, the last day at 2 per day
+        
+        result = backtest_place(1, sales, pd.DataFrame(), ['ma_7'], [origin],
+                                horizon_days=3, lead_time_days=2)
+        
+        row = result.iloc[0]
+        # Forecast 2/day; next 3 days sell 6, 0, 6 (4/day); reorder point ceil(2 * 2 * 1.5) = 6
+        assert (row['forecast'], row['actual'], row['abs_error']) == (2.0, 4.0, 2.0)
+        assert (row['waste'], row['stockout'], row['cost']) == (0.0, 0.0, 0.0)
+        assert row['origin'] == pd.Timestamp('2023-01-07')
+        assert row['seconds'] >= 0
+    
+    def test_items_without_history_are_skipped(self):
+        """Test that items first sold after the origin are not scored."""
+        sales = pd.DataFrame({'item_id': [1, 2], 'quantity': [1.0, 1.0],
+                              'date': pd.to_datetime(['2023-01-01', '2023-01-05'])})
+        
+        result = backtest_place(1, sales, pd.DataFrame(), ['ma_3'], [_origin_day(2)])
+        
+        assert result['item_id'].tolist() == [1]
+        assert backtest_place(1, sales, pd.DataFrame(), ['ma_3'], [_origin_day(-5)]).empty
+
+
+class TestBacktester:
+    """Test suite for Backtester."""
+    
+    def test_parallel_run_matches_inline(self):
+        """Test that origin slices on a process pool give the inline results."""
+        backtester = Backtester.from_order_items(_order_items())
+        origins = backtester.rolling_origins(n_origins=4, step_days=7)
+        
+        backtester.max_workers = 1
+        inline = backtester.run(['ma_7', 'mean_28d'], origins)
+        backtester.max_workers = 2
+        pooled = backtester.run(['ma_7', 'mean_28d'], origins, origin_chunks=2)
+        
+        columns = [c for c in inline.columns if c not in ('seconds', 'peak_mb')]
+        pd.testing.assert_frame_equal(inline[columns], pooled[columns])
+        assert sorted(inline['origin'].unique()) == [pd.Timestamp(o) for o in origins]
+        assert list(inline['place_id'].unique()) == [0, 1, 2]
+    
+    def test_summarize(self):
+        """Test per-model accuracy, cost and runtime, cheapest model first."""
+        backtester = Backtester.from_order_items(_order_items(), max_workers=1)
+        
+        results = backtester.run(['ma_7', 'ma_3', 'linear'],
+                                 backtester.rolling_origins(n_origins=2), trace_memory=True)
+        untraced = backtester.run(['ma_7'], backtester.rolling_origins(n_origins=2))
+        summary = Backtester.summarize(results)
+        by_place = Backtester.summarize(results, by=('place_id', 'model'))
+        
+        assert set(summary['model']) == {'ma_7', 'ma_3', 'linear'}
+        assert summary['cost'].is_monotonic_increasing
+        assert (summary['items'] == len(results) // 3).all()
+        assert (summary['seconds'] > 0).all() and (summary['peak_mb'] > 0).all()
+        assert (untraced['seconds'] > 0).all() and untraced['peak_mb'].isna().all()
+        assert len(by_place) == 9
+        with pytest.raises(ValueError):
+            backtester.run(['ma_x'])
+
+
+# Run tests if executed directly
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
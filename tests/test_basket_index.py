@@ -0,0 +1,110 @@
+"""
+File: test_basket_index.py
+Description: Unit tests for the sparse co-purchase index.
+Dependencies: pytest, pandas, numpy, scipy
+Author: Sample Team
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+from itertools import combinations
+import sys
+import os
+
+# Add parent directory to path to import from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.services.basket_index import CoPurchaseIndex
+
+
+def _order_items():
+    """Builds five orders at place 1 (burger/fries/soda) and one at place 2."""
+    orders = {1: [10, 11, 12], 2: [10, 11], 3: [10, 11, 11], 4: [10], 5: [12, 13]}
+    rows = [(order_id, 1, item) for order_id, items in orders.items() for item in items]
+    rows.append((6, 2, 10))
+    return pd.DataFrame(rows, columns=['order_id', 'place_id', 'item_id'])
+
+
+class TestCoPurchaseIndex:
+    """Test suite for CoPurchaseIndex."""
+    
+    def test_counts_match_brute_force(self):
+        """Test pair counts against counting item pairs of every order."""
+        rng = np.random.default_rng(2)
+        lines = pd.DataFrame({'order_id': np.repeat(np.arange(300), 3),
+                              'place_id': np.repeat(np.arange(300) % 3, 3),
+                              'item_id': rng.integers(0, 8, 900)})
+        index = CoPurchaseIndex.from_order_items(lines)
+        
+        expected = {}
+        for (_, place), group in lines.groupby(['order_id', 'place_id']):
+            for a, b in combinations(sorted(set(group['item_id'])), 2):
+                expected[(place, a, b)] = expected.get((place, a, b), 0) + 1
+        
+        for (place, a, b), count in expected.items():
+            assert index.pair(place, a, b)['count'] == count
+        assert index.orders_indexed == 300
+    
+    def test_bought_together_statistics(self):
+        """Test confidence and lift for a known anchor item."""
+        index = CoPurchaseIndex.from_order_items(_order_items())
+        
+        result = index.bought_together(1, 10, k=5, metric='count')
+        
+        # 4 of 5 orders hold item 10; 3 of those also hold 11 (which is in 3 orders)
+        assert result['item_id'].tolist() == [11, 12]
+        assert result['count'].tolist() == [3, 1]
+        assert result['confidence'].tolist() == [0.75, 0.25]
+        assert result['lift'].iloc[0] == pytest.approx(0.75 * 5 / 3, abs=1e-4)
+        assert index.bought_together(2, 11).empty
+    
+    def test_top_pairs_and_pair(self):
+        """Test the strongest pairs of a place and single-pair statistics."""
+        index = CoPurchaseIndex.from_order_items(_order_items())
+        
+        pairs = index.top_pairs(1, k=2, metric='count', min_count=1)
+        stats = index.pair(1, 12, 13)
+        
+        assert (pairs['item_a'].iloc[0], pairs['item_b'].iloc[0]) == (10, 11)
+        assert stats['count'] == 1
+        assert stats['support'] == pytest.approx(0.2)
+        assert stats['confidence'] == pytest.approx(0.5)
+        assert index.pair(1, 12, 99)['count'] == 0
+        with pytest.raises(ValueError):
+            index.top_pairs(1, metric='support')
+    
+    def test_chunks_and_incremental_updates(self):
+        """Test that chunked and incremental builds equal one batch build."""
+        lines = _order_items()
+        full = CoPurchaseIndex.from_order_items(lines)
+        
+        # Boundaries split orders 1 and 3 across chunks
+        chunked = CoPurchaseIndex.from_chunks([lines.iloc[:2], lines.iloc[2:7], lines.iloc[7:]])
+        incremental = CoPurchaseIndex.from_order_items(lines[lines['order_id'] <= 3])
+        incremental.add(lines[lines['order_id'] > 3])
+        
+        for index in (chunked, incremental):
+            assert index.place_orders == full.place_orders
+            assert index.top_pairs(1, k=10, min_count=1).equals(full.top_pairs(1, k=10, min_count=1))
+    
+    @pytest.mark.parametrize('name', ['baskets.npz', 'baskets'])
+    def test_save_and_load(self, tmp_path, name):
+        """Test that a persisted index answers queries identically and keeps updating."""
+        index = CoPurchaseIndex.from_order_items(_order_items())
+        path = str(tmp_path / name)
+        
+        index.save(path)
+        restored = CoPurchaseIndex.load(path)
+        
+        assert os.listdir(tmp_path) == [name]
+        assert restored.bought_together(1, 10).equals(index.bought_together(1, 10))
+        restored.add(pd.DataFrame({'order_id': [7, 7], 'place_id': [1, 1], 'item_id': [12, 13]}))
+        assert restored.pair(1, 12, 13)['count'] == 2
+        assert restored.place_orders[1] == index.place_orders[1] + 1
+        assert 2 in restored
+
+
+# Run tests if executed directly
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,96 @@
+"""
+File: test_bom_service.py
+Description: Unit tests for the bill-of-materials explosion engine.
+Dependencies: pytest, pandas, scipy
+
+Run tests with: pytest tests/
+"""
+
+import logging
+import pytest
+import pandas as pd
+import sys
+import os
+
+# Add parent directory to path to import from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.services.bom_service import BomExplosionEngine
+from src.services.inventory_service import InventoryService
+
+
+def _bom():
+    """Burger uses a bun and a patty sub-recipe; the patty uses beef and salt."""
+    return pd.DataFrame({
+        'menu_item_id': ['burger', 'burger', 'patty', 'patty', 'fries'],
+        'item_id': ['bun', 'patty', 'beef', 'salt', 'potato'],
+        'quantity': [1, 2, 0.15, 0.01, 0.3],
+    })
+
+
+class TestBomExplosionEngine:
+    """Test suite for BomExplosionEngine."""
+    
+    def test_multi_level_recipes_are_flattened(self):
+        """Test that sub-recipes expand into raw ingredients only."""
+        engine = BomExplosionEngine(_bom())
+        
+        assert set(engine.ingredients) == {'bun', 'beef', 'salt', 'potato'}
+        
+        result = engine.explode({'burger': 10})
+        
+        assert result['bun'] == pytest.approx(10)
+        assert result['beef'] == pytest.approx(3.0)
+        assert result['salt'] == pytest.approx(0.2)
+        assert 'potato' not in result
+    
+    def test_unknown_items_are_ignored(self):
+        """Test that demand for items without a recipe contributes nothing."""
+        engine = BomExplosionEngine(_bom())
+        
+        result = engine.explode({'fries': 4, 'soda': 100})
+        
+        assert result.to_dict() == {'potato': pytest.approx(1.2)}
+    
+    def test_explode_by_place(self):
+        """Test that per-place demand is exploded in one product."""
+        engine = BomExplosionEngine(_bom())
+        demand = pd.DataFrame({'place_id': [2, 1, 2],
+                               'item_id': ['fries', 'burger', 'burger'],
+                               'quantity': [10, 1, 2]})
+        
+        result = engine.explode_by_place(demand)
+        
+        place_two = result[result['place_id'] == 2].set_index('ingredient_id')['quantity']
+        assert result['place_id'].tolist()[:4] == [1, 1, 1, 2]
+        assert place_two['potato'] == pytest.approx(3.0)
+        assert place_two['beef'] == pytest.approx(0.6)
+    
+    def test_unmatched_keys_warn(self, caplog):
+        """Test that demand sharing no id with the BOM parents logs a warning."""
+        engine = BomExplosionEngine(_bom())
+        
+        with caplog.at_level(logging.WARNING, logger='src'):
+            result = engine.explode({101: 5.0, 102: 1.0})
+        
+        assert result.empty
+        assert [r.getMessage() for r in caplog.records] == ['bom_keys_unmatched']
+    
+    def test_cyclic_recipes_raise(self):
+        """Test that cyclic recipes are rejected."""
+        bom = pd.DataFrame({'menu_item_id': ['a', 'b'], 'item_id': ['b', 'a'],
+                            'quantity': [1, 1]})
+        
+        with pytest.raises(ValueError):
+            BomExplosionEngine(bom)
+    
+    def test_inventory_service_ingredient_demand(self):
+        """Test that item forecasts are exploded into ingredient demand."""
+        sales = pd.DataFrame({'item_id': ['burger'] * 7 + ['fries'] * 7,
+                              'quantity': [4] * 7 + [10] * 7})
+        service = InventoryService(pd.DataFrame(), sales)
+        
+        result = service.predict_ingredient_demand(BomExplosionEngine(_bom()))
+        
+        assert result['beef'] == pytest.approx(1.2)
+        assert result['potato'] == pytest.approx(3.0)
@@ -0,0 +1,183 @@
+"""
+File: test_data_loader.py
+Description: Unit tests for the CSV data loader, its columnar cache and streaming.
+Dependencies: pytest, pandas, pyarrow
+
+Run tests with: pytest tests/
+"""
+
+import pytest
+import pandas as pd
+import sys
+import os
+
+# Add parent directory to path to import from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.data_loader import DataLoader
+
+
+pytest.importorskip('pyarrow')
+
+
+def _write_orders(path, rows):
+    """Writes a small fct_orders-shaped CSV."""
+    pd.DataFrame({
+        'id': range(rows),
+        'place_id': [i % 3 for i in range(rows)],
+        'total_amount': [10.5 * i for i in range(rows)],
+        'type': ['eat_in', 'takeaway'] * (rows // 2) + ['delivery'] * (rows % 2),
+    }).to_csv(path, index=False)
+
+
+class TestDataLoaderCache:
+    """Test suite for the DataLoader columnar cache."""
+    
+    def test_first_load_writes_cache(self, tmp_path):
+        """Test that the first load parses the CSV and writes a cache file."""
+        _write_orders(tmp_path / 'fct_orders.csv', 10)
+        loader = DataLoader(str(tmp_path))
+        
+        df = loader.load_csv('fct_orders.csv')
+        
+        assert len(df) == 10
+        cached = os.listdir(loader.cache_dir)
+        assert len(cached) == 1
+        assert cached[0].startswith('fct_orders-')
+    
+    def test_second_load_reads_cache(self, tmp_path, monkeypatch):
+        """Test that a fresh cache is used instead of parsing the CSV."""
+        _write_orders(tmp_path / 'fct_orders.csv', 10)
+        loader = DataLoader(str(tmp_path))
+        first = loader.load_csv('fct_orders.csv')
+        
+        def fail(*args, **kwargs):
+            raise AssertionError("read_csv should not be called on a cache hit")
+        monkeypatch.setattr(pd, 'read_csv', fail)
+        
+        second = loader.load_csv('fct_orders.csv')
+        pd.testing.assert_frame_equal(first, second, check_dtype=False)
+    
+    def test_stale_cache_is_rebuilt(self, tmp_path):
+        """Test that changing the source file rebuilds and replaces the cache."""
+        csv_path = tmp_path / 'fct_orders.csv'
+        _write_orders(csv_path, 10)
+        loader = DataLoader(str(tmp_path))
+        loader.load_csv('fct_orders.csv')
+        
+        _write_orders(csv_path, 25)
+        stat = os.stat(csv_path)
+        os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        
+        df = loader.load_csv('fct_orders.csv')
+        
+        assert len(df) == 25
+        assert len(os.listdir(loader.cache_dir)) == 1
+    
+    def test_same_table_in_subfolders(self, tmp_path, monkeypatch):
+        """Test that same-named tables and different options keep separate entries."""
+        for folder, rows in (('a', 4), ('b', 6)):
+            os.makedirs(tmp_path / folder)
+            _write_orders(tmp_path / folder / 'fct_orders.csv', rows)
+        loader = DataLoader(str(tmp_path))
+        loader.load_csv('a/fct_orders.csv')
+        loader.load_csv('b/fct_orders.csv')
+        loader.load_csv('a/fct_orders.csv', parse_dates=[])
+        
+        def fail(*args, **kwargs):
+            raise AssertionError("read_csv should not be called on a cache hit")
+        monkeypatch.setattr(pd, 'read_csv', fail)
+        
+        assert len(loader.load_csv('a/fct_orders.csv')) == 4
+        assert len(loader.load_csv('b/fct_orders.csv')) == 6
+        assert len(os.listdir(loader.cache_dir)) == 3
+    
+    def test_cache_disabled(self, tmp_path):
+        """Test that no cache directory is created when the cache is off."""
+        _write_orders(tmp_path / 'fct_orders.csv', 4)
+        loader = DataLoader(str(tmp_path), use_cache=False)
+        
+        loader.load_csv('fct_orders.csv')
+        
+        assert not os.path.exists(loader.cache_dir)
+    
+    def test_clear_cache(self, tmp_path):
+        """Test that clear_cache removes every cached table."""
+        _write_orders(tmp_path / 'fct_orders.csv', 4)
+        loader = DataLoader(str(tmp_path))
+        loader.load_csv('fct_orders.csv')
+        
+        assert loader.clear_cache() == 1
+        assert os.listdir(loader.cache_dir) == []
+    
+    def test_missing_file_raises(self, tmp_path):
+        """Test that a missing CSV raises FileNotFoundError."""
+        loader = DataLoader(str(tmp_path))
+        
+        with pytest.raises(FileNotFoundError):
+            loader.load_csv('missing.csv')
+
+
+class TestDataLoaderStreaming:
+    """Test suite for DataLoader.iter_csv."""
+    
+    def test_chunks_are_bounded(self, tmp_path):
+        """Test that chunks never exceed chunk_rows and cover every row."""
+        _write_orders(tmp_path / 'fct_orders.csv', 25)
+        loader = DataLoader(str(tmp_path), use_cache=False)
+        
+        chunks = list(loader.iter_csv('fct_orders.csv', chunk_rows=10))
+        
+        assert [len(c) for c in chunks] == [10, 10, 5]
+        assert pd.concat(chunks)['id'].tolist() == list(range(25))
+    
+    def test_schema_mismatch_falls_back(self, tmp_path, caplog):
+        """Test that a schema that breaks mid-stream continues untyped, like load_csv."""
+        pd.DataFrame({'id': range(10), 'place_id': [1] * 7 + ['x', 'y', 'z']}).to_csv(
+            tmp_path / 'fct_orders.csv', index=False)
+        loader = DataLoader(str(tmp_path), use_cache=False)
+        
+        chunks = list(loader.iter_csv('fct_orders.csv', chunk_rows=4))
+        
+        streamed = pd.concat(chunks)
+        assert streamed['id'].tolist() == list(range(10))
+        assert streamed.index.tolist() == list(range(10))
+        assert streamed['place_id'].astype(str).tolist() == \
+            loader.load_csv('fct_orders.csv')['place_id'].astype(str).tolist()
+        assert [r.getMessage() for r in caplog.records].count('schema_mismatch') == 2
+    
+    def test_projection_and_dtype(self, tmp_path):
+        """Test that usecols and dtype are applied to each chunk."""
+        _write_orders(tmp_path / 'fct_orders.csv', 6)
+        loader = DataLoader(str(tmp_path), use_cache=False)
+        
+        chunk = next(loader.iter_csv('fct_orders.csv', chunk_rows=4,
+                                     usecols=['place_id', 'type'],
+                                     dtype={'place_id': 'int16', 'type': 'category'}))
+        
+        assert list(chunk.columns) == ['place_id', 'type']
+        assert chunk['place_id'].dtype == 'int16'
+        assert chunk['type'].dtype == 'category'
+    
+    def test_streams_from_cache(self, tmp_path, monkeypatch):
+        """Test that a fresh cache is sliced instead of re-parsing the CSV."""
+        _write_orders(tmp_path / 'fct_orders.csv', 25)
+        loader = DataLoader(str(tmp_path))
+        loader.load_csv('fct_orders.csv')
+        
+        def fail(*args, **kwargs):
+            raise AssertionError("read_csv should not be called on a cache hit")
+        monkeypatch.setattr(pd, 'read_csv', fail)
+        
+        chunks = list(loader.iter_csv('fct_orders.csv', chunk_rows=10, usecols=['id']))
+        
+        assert [len(c) for c in chunks] == [10, 10, 5]
+        assert pd.concat(chunks)['id'].tolist() == list(range(25))
+    
+    def test_invalid_chunk_rows(self, tmp_path):
+        """Test that a non-positive chunk size raises ValueError."""
+        _write_orders(tmp_path / 'fct_orders.csv', 4)
+        loader = DataLoader(str(tmp_path))
+        
+        with pytest.raises(ValueError):
+            next(loader.iter_csv('fct_orders.csv', chunk_rows=0))
@@ -0,0 +1,104 @@
+"""
+File: test_demand_state.py
+Description: Unit tests for the incremental per-item demand state.
+Dependencies: pytest, pandas, numpy
+
+Run tests with: pytest tests/
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+import sys
+import os
+
+# Add parent directory to path to import from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.services.demand_state import DemandState, RING_SIZE
+
+
+def _sales(seed=3, rows=1500, items=40):
+    """Builds random interleaved sales rows with a few missing quantities."""
+    rng = np.random.default_rng(seed)
+    quantity = rng.integers(0, 25, rows).astype(float)
+    quantity[::29] = np.nan
+    return pd.DataFrame({'item_id': rng.integers(0, items, rows),
+                         'date': 1609459200 + np.arange(rows) * 60,
+                         'quantity': quantity})
+
+
+class TestDemandState:
+    """Test suite for DemandState."""
+    
+    def test_recent_keeps_last_rows_in_order(self):
+        """Test that the ring buffer returns the last rows oldest first."""
+        sales = pd.DataFrame({'item_id': ['A'] * 10, 'quantity': range(10)})
+        
+        state = DemandState.from_sales(sales)
+        
+        assert state.recent('A').tolist() == [3, 4, 5, 6, 7, 8, 9]
+        assert state.recent('A', 3).tolist() == [7, 8, 9]
+        assert len(state.recent('missing')) == 0
+    
+    def test_incremental_matches_full_rebuild(self):
+        """Test that ingesting in batches equals building from all rows."""
+        sales = _sales()
+        
+        incremental = DemandState.from_sales(sales.iloc[:500])
+        for start in range(500, len(sales), 137):
+            incremental.ingest(sales.iloc[start:start + 137])
+        full = DemandState.from_sales(sales)
+        
+        for window in (3, 4, RING_SIZE):
+            for item_id in full.item_ids:
+                np.testing.assert_array_equal(incremental.recent(item_id, window),
+                                              full.recent(item_id, window))
+        assert incremental.rows_ingested == len(sales)
+        assert incremental.watermark == int(sales['date'].max())
+    
+    def test_ingest_updates_only_affected_items(self):
+        """Test that ingest leaves untouched items unchanged."""
+        state = DemandState.from_sales(_sales())
+        before = state.buffer.copy()
+        
+        updated = state.ingest(pd.DataFrame({'item_id': [0, 999], 'quantity': [5, 6]}))
+        
+        assert updated == 2
+        unaffected = [state.positions[i] for i in range(1, 40) if i in state.positions]
+        np.testing.assert_array_equal(state.buffer[unaffected], before[unaffected])
+        assert state.recent(999).tolist() == [6]
+    
+    def test_window_means_match_pandas(self):
+        """Test that vectorised window means equal pandas tail().mean()."""
+        sales = _sales()
+        state = DemandState.from_sales(sales)
+        positions = state.positions_of(state.item_ids)
+        
+        means = state.window_means(positions, 4)
+        
+        for item_id, mean in zip(state.item_ids, means):
+            expected = sales[sales['item_id'] == item_id]['quantity'].tail(4).mean()
+            assert mean == pytest.approx(expected, nan_ok=True)
+    
+    @pytest.mark.parametrize('name', ['state.npz', 'state'])
+    def test_snapshot_round_trip(self, tmp_path, name):
+        """Test that a snapshot written to exactly the given path restores the same state."""
+        state = DemandState.from_sales(_sales())
+        path = str(tmp_path / name)
+        
+        state.save(path)
+        restored = DemandState.load(path)
+        
+        assert os.listdir(tmp_path) == [name]
+        assert restored.item_ids.tolist() == state.item_ids.tolist()
+        np.testing.assert_array_equal(restored.buffer, state.buffer)
+        np.testing.assert_array_equal(restored.counts, state.counts)
+        assert restored.watermark == state.watermark
+    
+    def test_snapshot_rejects_mixed_ids(self, tmp_path):
+        """Test that mixed-type item ids cannot be snapshotted."""
+        state = DemandState.from_sales(pd.DataFrame({'item_id': [1, 'B'], 'quantity': [1, 2]}))
+        
+        with pytest.raises(ValueError):
+            state.save(str(tmp_path / 'state.npz'))
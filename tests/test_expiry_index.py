@@ -0,0 +1,104 @@
+"""
+File: test_expiry_index.py
+Description: Unit tests for the per-place expiry index.
+Dependencies: pytest, pandas
+
+Run tests with: pytest tests/
+"""
+
+import pandas as pd
+import sys
+import os
+
+# Add parent directory to path to import from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.services.expiry_index import ExpiryIndex
+from src.services.inventory_service import InventoryService
+
+
+def _inventory():
+    """Builds inventory rows for two places with absolute expiry dates."""
+    return pd.DataFrame({
+        'place_id': [1, 1, 1, 2, 2],
+        'item_id': ['milk', 'bread', 'rice', 'milk', 'eggs'],
+        'quantity_on_hand': [5, 3, 40, 8, 12],
+        'expiration_date': pd.to_datetime(['2024-03-03', '2024-03-01', '2024-09-01',
+                                           '2024-03-05', '2024-02-28']),
+    })
+
+
+class TestExpiryIndex:
+    """Test suite for ExpiryIndex."""
+    
+    def test_threshold_query_per_place(self):
+        """Test that a place query returns its expiring rows soonest first."""
+        index = ExpiryIndex(_inventory())
+        
+        result = index.expiring(7, place_id=1, today='2024-03-01')
+        
+        assert result['item_id'].tolist() == ['bread', 'milk']
+        assert result['days_until_expiration'].tolist() == [0, 2]
+    
+    def test_days_follow_reference_date(self):
+        """Test that days_until_expiration moves with the reference date."""
+        index = ExpiryIndex(_inventory())
+        
+        monday = index.expiring(2, place_id=2, today='2024-03-03')
+        tuesday = index.expiring(2, place_id=2, today='2024-03-04')
+        
+        assert monday['days_until_expiration'].tolist() == [-4, 2]
+        assert tuesday['days_until_expiration'].tolist() == [-5, 1]
+    
+    def test_all_places_sorted(self):
+        """Test that a global query merges places by days until expiration."""
+        index = ExpiryIndex(_inventory())
+        
+        result = index.expiring(3, today='2024-03-01')
+        
+        assert result['item_id'].tolist() == ['eggs', 'bread', 'milk']
+    
+    def test_full_snapshot_replaces_place(self):
+        """Test that a snapshot replaces only the places it covers."""
+        index = ExpiryIndex(_inventory())
+        report = pd.DataFrame({'place_id': [1], 'item_id': ['cheese'],
+                               'expiration_date': pd.to_datetime(['2024-03-02'])})
+        
+        assert index.update(report) == 1
+        
+        assert index.expiring(30, place_id=1, today='2024-03-01')['item_id'].tolist() == ['cheese']
+        assert len(index.expiring(30, place_id=2, today='2024-03-01')) == 2
+    
+    def test_partial_update_upserts_items(self):
+        """Test that a partial report replaces matching items only."""
+        index = ExpiryIndex(_inventory())
+        report = pd.DataFrame({'place_id': [1], 'item_id': ['bread'],
+                               'expiration_date': pd.to_datetime(['2024-03-10'])})
+        
+        index.update(report, full_snapshot=False)
+        
+        result = index.expiring(30, place_id=1, today='2024-03-01')
+        assert result['item_id'].tolist() == ['milk', 'bread']
+    
+    def test_unix_expiry_and_empty_result(self):
+        """Test UNIX-second expiry dates and an empty result."""
+        inventory = _inventory()
+        epoch_seconds = (inventory['expiration_date'] - pd.Timestamp(0)) // pd.Timedelta(seconds=1)
+        inventory['expiration_date'] = epoch_seconds
+        index = ExpiryIndex(inventory)
+        
+        result = index.expiring(0, place_id=1, today='2024-01-01')
+        
+        assert result.empty
+        assert 'quantity_on_hand' in result.columns
+    
+    def test_service_uses_relative_days(self):
+        """Test the service with legacy days_until_expiration data."""
+        inventory = pd.DataFrame({'item_id': ['A', 'B', 'C'],
+                                  'days_until_expiration': [2, 10, 5]})
+        service = InventoryService(inventory, pd.DataFrame({'item_id': [], 'quantity': []}))
+        
+        result = service.identify_expiring_items(7)
+        
+        assert result['item_id'].tolist() == ['A', 'C']
+        assert result['days_until_expiration'].tolist() == [2, 5]
@@ -0,0 +1,177 @@
+"""
+File: test_forecasting.py
+Description: Unit tests for the pluggable forecasting backends.
+Dependencies: pytest, pandas, numpy, scikit-learn
+Author: Sample Team
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+import sys
+import os
+
+# Add parent directory to path to import from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.services.forecasting import (
+    ForecastBackend,
+    GlobalModelBackend,
+    build_features
+)
+from src.services.inventory_service import InventoryService
+
+
+def _daily_sales(days=120, scale=1.0):
+    """Builds daily sales for four items at two places with a weekend peak."""
+    dates = pd.date_range('2023-01-02', periods=days, freq='D')
+    rows = []
+    for item_id, place_id, base in [(1, 10, 5.0), (2, 10, 2.0), (3, 20, 8.0), (4, 20, 1.0)]:
+        quantity = base * scale * np.where(dates.weekday >= 5, 2.0, 1.0)
+        rows.append(pd.DataFrame({'item_id': item_id, 'place_id': place_id,
+                                  'date': dates, 'quantity': quantity}))
+    return pd.concat(rows, ignore_index=True)
+
+
+class TestBuildFeatures:
+    """Test suite for the feature panel."""
+    
+    def test_lags_means_and_targets(self):
+        """Test features and targets on a short series with a gap."""
+        sales = pd.DataFrame({'item_id': [7, 7, 7],
+                              'date': pd.to_datetime(['2024-01-01', '2024-01-02', '2024-01-04']),
+                              'quantity': [1.0, 2.0, 4.0]})
+        
+        panel, latest = build_features(sales, lags=(1, 2), windows=(2,), horizons=(1, 2))
+        
+        # Dense days: 1, 2, 0 (the gap on Jan 3rd), 4
+        assert panel['lag_1'].tolist() == [1.0, 2.0, 0.0, 4.0]
+        assert panel['lag_2'].tolist() == [0.0, 1.0, 2.0, 0.0]
+        assert panel['mean_2'].tolist() == [1.0, 1.5, 1.0, 2.0]
+        assert panel['target_1'].tolist()[:3] == [2.0, 0.0, 4.0]
+        assert panel['target_2'].tolist()[:2] == [1.0, 2.0]
+        assert panel['target_2'].isna().tolist()[2:] == [True, True]
+        # Calendar describes the forecast day: Jan 2nd 2024 is a Tuesday
+        assert panel['weekday'].iloc[0] == 1
+        assert panel['is_holiday'].tolist() == [0.0] * 4
+        assert latest['item_id'].tolist() == [7]
+        assert latest['lag_1'].tolist() == [4.0]
+
+
+class TestGlobalModelBackend:
+    """Test suite for GlobalModelBackend."""
+    
+    def test_forecasts_follow_demand(self):
+        """Test that per-place models learn the weekly pattern of every item."""
+        backend = GlobalModelBackend(max_workers=1).fit(_daily_sales())
+        
+        daily = backend.predict([1, 3, 99], 'daily')
+        weekly = backend.predict([1, 3], 'weekly')
+        
+        # Sales end on Monday 2023-05-01, so the forecast day is a plain Tuesday
+        assert daily[0] == pytest.approx(5.0, rel=0.15)
+        assert daily[1] == pytest.approx(8.0, rel=0.15)
+        assert np.isnan(daily[2])
+        assert weekly[0] == pytest.approx(5.0 * 9 / 7, rel=0.15)
+        assert np.isnan(backend.predict([1], 'monthly')).all()
+        assert backend.trained == [10, 20]
+    
+    def test_model_cache(self, tmp_path):
+        """Test that unchanged places load from the cache and changed ones retrain."""
+        sales = _daily_sales()
+        first = GlobalModelBackend('linear', cache_dir=str(tmp_path), max_workers=1).fit(sales)
+        
+        second = GlobalModelBackend('linear', cache_dir=str(tmp_path), max_workers=1).fit(sales)
+        sales.loc[sales['item_id'] == 4, 'quantity'] += 1
+        third = GlobalModelBackend('linear', cache_dir=str(tmp_path), max_workers=1).fit(sales)
+        tuned = GlobalModelBackend('linear', {'alpha': 5.0}, cache_dir=str(tmp_path),
+                                   max_workers=1).fit(sales)
+        
+        assert first.trained == [10, 20] and first.loaded == []
+        assert second.trained == [] and second.loaded == [10, 20]
+        np.testing.assert_array_equal(second.forecasts['daily'], first.forecasts['daily'])
+        assert third.trained == [20] and third.loaded == [10]
+        assert tuned.trained == [10, 20]
+        # Retraining place 20 replaced its file; the tuned models have their own
+        assert len(os.listdir(tmp_path)) == 4
+    
+    def test_parallel_training_matches_inline(self, tmp_path):
+        """Test that training on a process pool gives the inline forecasts."""
+        sales = _daily_sales(days=60)
+        inline = GlobalModelBackend('linear', max_workers=1).fit(sales)
+        pooled = GlobalModelBackend('linear', cache_dir=str(tmp_path), max_workers=2).fit(sales)
+        
+        np.testing.assert_allclose(pooled.forecasts['daily'], inline.forecasts['daily'])
+    
+    def test_item_places_and_validation(self):
+        """Test partitioning by an item -> place mapping and invalid arguments."""
+        sales = _daily_sales(days=60).drop(columns='place_id')
+        places = pd.Series([10, 10, 20], index=[1, 2, 3])
+        
+        backend = GlobalModelBackend('linear', max_workers=1).fit(sales, item_places=places)
+        
+        # Item 4 has no place and gets its own global partition
+        assert backend.trained == [-1, 10, 20]
+        with pytest.raises(ValueError):
+            GlobalModelBackend('prophet')
+        with pytest.raises(ValueError):
+            GlobalModelBackend(periods=('hourly',))
+    
+    def test_string_place_ids(self, tmp_path):
+        """Test that non-integer place ids partition and cache like integer ones."""
+        sales = _daily_sales(days=60)
+        sales['place_id'] = sales['place_id'].map({10: 'north/1', 20: 'south'})
+        
+        first = GlobalModelBackend('linear', cache_dir=str(tmp_path), max_workers=1).fit(sales)
+        second = GlobalModelBackend('linear', cache_dir=str(tmp_path), max_workers=1).fit(sales)
+        
+        assert first.trained == ['north/1', 'south']
+        assert second.loaded == ['north/1', 'south'] and second.trained == []
+        assert sorted(name.split('-')[1] for name in os.listdir(tmp_path)) == ['north%2F1', 'south']
+        np.testing.assert_array_equal(second.forecasts['daily'], first.forecasts['daily'])
+    
+    def test_backend_requires_predict(self):
+        """Test that a backend without predict() fails at construction."""
+        class Incomplete(ForecastBackend):
+            name = 'incomplete'
+        
+        with pytest.raises(TypeError):
+            Incomplete()
+
+
+class TestServiceBackend:
+    """Test suite for InventoryService with a forecast backend."""
+    
+    def test_service_uses_backend(self):
+        """Test single and bulk forecasts come from the backend, with a fallback."""
+        sales = _daily_sales()
+        backend = GlobalModelBackend('linear', max_workers=1)
+        service = InventoryService(pd.DataFrame(), sales, forecast_backend=backend)
+        
+        bulk = service.predict_demand_many([1, 2, 3, 4])
+        recommendations = service.generate_recommendations_bulk([1, 2])
+        service.ingest(pd.DataFrame({'item_id': [5], 'place_id': [10],
+                                     'date': [pd.Timestamp('2023-05-01')], 'quantity': [3.0]}))
+        
+        assert backend.fitted
+        assert bulk['predicted_demand'].tolist() == [service.predict_demand(i) for i in [1, 2, 3, 4]]
+        assert service.predict_demand(1) == pytest.approx(backend.predict([1])[0], abs=0.01)
+        assert recommendations['predicted_weekly_demand'].iloc[0] == pytest.approx(
+            backend.predict([1], 'weekly')[0], abs=0.01)
+        assert service.predict_demand(5) == 3.0
+        assert service.predict_demand(1, 'monthly') == 8.33
+    
+    def test_string_dates(self):
+        """Test that a service with a backend accepts sales with string dates."""
+        sales = _daily_sales(days=60)
+        sales['date'] = sales['date'].dt.strftime('%Y-%m-%d')
+        backend = GlobalModelBackend('linear', max_workers=1)
+        
+        service = InventoryService(pd.DataFrame(), sales, forecast_backend=backend)
+        
+        assert service.predict_demand(1) == pytest.approx(backend.predict([1])[0], abs=0.01)
+
+
+# Run tests if executed directly
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
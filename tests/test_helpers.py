@@ -11,6 +11,7 @@ Run tests with: pytest tests/
 """
 
 import pytest
+import numpy as np
 import pandas as pd
 from datetime import datetime
 import sys
@@ -23,7 +24,10 @@ from src.utils.helpers import (
     convert_unix_timestamp,
     calculate_percentage_change,
     categorize_performance,
-    format_currency
+    format_currency,
+    aggregate_by_period,
+    aggregate_by_period_fast,
+    aggregate_chunks
 )
 
 
@@ -103,6 +107,132 @@ class TestHelpers:
         assert result == 'USD 1,250.50'
 
 
+
+class TestChunkAggregation:
+    """Test suite for chunk-aware aggregation helpers."""
+    
+    @staticmethod
+    def _order_items():
+        """Builds order lines spanning three days for two items."""
+        day = 86400
+        base = 1609459200
+        return pd.DataFrame({
+            'item_id': [1, 2, 1, 1, 2, 2],
+            'created': [base, base + 10, base + day, base + day + 5, base + 2 * day, base + 2 * day],
+            'quantity': [1, 2, 3, 4, 5, 6],
+        })
+    
+    def test_aggregate_chunks_by_item(self):
+        """Test that chunked per-item daily sums match a single groupby."""
+        df = self._order_items()
+        chunks = [df.iloc[:3], df.iloc[3:5], df.iloc[5:]]
+        
+        result = aggregate_chunks(chunks, 'created', 'quantity', group_by=['item_id'])
+        
+        assert result['item_id'].tolist() == [1, 1, 2, 2]
+        assert result['quantity'].tolist() == [1, 7, 2, 11]
+    
+    def test_aggregate_chunks_empty_stream(self):
+        """Test that an empty stream returns an empty frame with the expected columns."""
+        result = aggregate_chunks(iter([]), 'created', 'quantity', group_by=['place_id'])
+        
+        assert list(result.columns) == ['place_id', 'created', 'quantity']
+        assert result.empty
+    
+    def test_aggregate_by_period_accepts_chunks(self):
+        """Test that aggregate_by_period reduces a chunk stream like a DataFrame."""
+        df = self._order_items()
+        df['created'] = pd.to_datetime(df['created'], unit='s')
+        
+        expected = aggregate_by_period(df, 'created', 'quantity')
+        result = aggregate_by_period(iter([df.iloc[:2], df.iloc[2:]]), 'created', 'quantity')
+        
+        assert result['quantity'].tolist() == expected['quantity'].tolist()
+
+
+class TestFastAggregation:
+    """Test suite for aggregate_by_period_fast."""
+    
+    @staticmethod
+    def _order_items(rows=2000, seed=7):
+        """Builds random order lines over ten weeks for a few places and items."""
+        rng = np.random.default_rng(seed)
+        return pd.DataFrame({
+            'place_id': rng.integers(1, 5, rows),
+            'item_id': rng.integers(100, 120, rows),
+            'created': 1609459200 + rng.integers(0, 70 * 86400, rows),
+            'quantity': rng.integers(1, 6, rows),
+            'price': rng.uniform(10, 100, rows).round(2),
+        })
+    
+    def test_matches_groupby(self):
+        """Test that weekly per-place aggregations match a pandas groupby."""
+        df = self._order_items()
+        dates = pd.to_datetime(df['created'], unit='s')
+        week = (dates.dt.floor('D') - pd.to_timedelta(dates.dt.weekday, unit='D')).astype(
+            'datetime64[s]')
+        expected = (df.assign(created=week)
+                    .groupby(['place_id', 'item_id', 'created'])[['quantity', 'price']]
+                    .agg(['sum', 'count', 'mean', 'min', 'max']))
+        
+        result = aggregate_by_period_fast(df, 'created', ['quantity', 'price'], 'W',
+                                          group_by=['place_id', 'item_id'],
+                                          aggs=['sum', 'count', 'mean', 'min', 'max'])
+        
+        assert len(result) == len(expected)
+        assert (result['created'].dt.weekday == 0).all()
+        for column in ('quantity', 'price'):
+            for agg in ('sum', 'count', 'mean', 'min', 'max'):
+                assert np.allclose(result[f"{column}_{agg}"], expected[(column, agg)])
+        assert result['quantity_sum'].dtype == np.int64
+    
+    def test_monthly_and_datetime_input(self):
+        """Test that datetime input gives the same monthly totals as UNIX seconds."""
+        df = self._order_items()
+        as_dates = df.assign(created=pd.to_datetime(df['created'], unit='s'))
+        
+        result = aggregate_by_period_fast(df, 'created', 'quantity', 'M', group_by=['place_id'])
+        from_dates = aggregate_by_period_fast(as_dates, 'created', 'quantity', 'M',
+                                              group_by=['place_id'])
+        
+        pd.testing.assert_frame_equal(result, from_dates)
+        assert (result['created'].dt.day == 1).all()
+        assert result['quantity'].sum() == df['quantity'].sum()
+    
+    def test_missing_values_are_skipped(self):
+        """Test that rows with missing timestamps or keys are dropped and NaN values skipped."""
+        df = pd.DataFrame({
+            'place_id': ['a', 'a', None, 'b'],
+            'created': [0.0, 60.0, 120.0, np.nan],
+            'price': [1.0, np.nan, 5.0, 7.0],
+        })
+        
+        result = aggregate_by_period_fast(df, 'created', 'price', 'D', group_by=['place_id'],
+                                          aggs=['sum', 'count'])
+        
+        assert result['place_id'].tolist() == ['a']
+        assert result['price_sum'].tolist() == [1.0]
+        assert result['price_count'].tolist() == [1]
+    
+    def test_input_is_not_modified(self):
+        """Test that the input frame is only read."""
+        df = self._order_items(rows=100)
+        before = df.copy()
+        
+        aggregate_by_period_fast(df, 'created', 'quantity', 'D', group_by=['item_id'])
+        
+        pd.testing.assert_frame_equal(df, before)
+    
+    def test_unsupported_arguments(self):
+        """Test that unknown aggregations and periods raise ValueError."""
+        df = self._order_items(rows=10)
+        
+        with pytest.raises(ValueError):
+            aggregate_by_period_fast(df, 'created', 'quantity', aggs='median')
+        with pytest.raises(ValueError):
+            aggregate_by_period_fast(df, 'created', 'quantity', period='Q')
+
+
 # Run tests if executed directly
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
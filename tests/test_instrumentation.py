@@ -0,0 +1,215 @@
+"""
+File: test_instrumentation.py
+Description: Unit tests for spans, latency histograms, the metrics endpoints, profiling and structured logs.
+Dependencies: pytest, pandas, flask, fastapi, httpx
+Author: Sample Team
+"""
+
+import asyncio
+import json
+import logging
+import pytest
+import pandas as pd
+import sys
+import os
+import tracemalloc
+
+# Add parent directory to path to import from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.api.app_context import AppContext, ContextHolder
+from src.services.inventory_service import InventoryService
+from src.utils.instrumentation import (
+    METRICS,
+    REQUEST_SECONDS,
+    SPAN_PEAK_BYTES,
+    SPAN_SECONDS,
+    Histogram,
+    MetricsRegistry,
+    StructuredFormatter,
+    log_event,
+    profile_mode,
+    traced,
+    wants_profile
+)
+
+
+def _holder():
+    """Builds a warm holder over two items."""
+    sales = pd.DataFrame({'item_id': [1, 1, 2], 'quantity': [2, 4, 5],
+                          'created': [1700000000, 1700086400, 1700000000]})
+    holder = ContextHolder(builder=lambda: AppContext.from_tables(
+        {'fct_order_items': sales}, version='v1'), freeze=False)
+    holder.load()
+    return holder
+
+
+@pytest.fixture
+def metrics():
+    """Clears the process registry before and after a test."""
+    enabled = METRICS.enabled
+    METRICS.enabled = True
+    METRICS.reset()
+    yield METRICS
+    METRICS.reset()
+    METRICS.enabled = enabled
+
+
+class TestMetricsRegistry:
+    """Test suite for Histogram and MetricsRegistry."""
+    
+    def test_histogram_buckets(self):
+        """Test that bounds are inclusive upper limits and buckets are cumulative."""
+        histogram = Histogram((1.0, 2.0))
+        for value in (0.5, 1.0, 1.5, 3.0):
+            histogram.observe(value)
+        
+        assert histogram.cumulative() == [2, 3, 4]
+        assert (histogram.count, histogram.sum) == (4, 6.0)
+    
+    def test_render_prometheus_text(self):
+        """Test the exposition format, label escaping and one TYPE line per metric."""
+        registry = MetricsRegistry()
+        registry.observe_request('/api/health', 'GET', 200, 0.002)
+        registry.observe_request('/api/health', 'GET', 200, 0.2)
+        registry.observe(SPAN_SECONDS, 0.01, span='say "hi"')
+        
+        text = registry.render()
+        
+        assert text.count(f"# TYPE {REQUEST_SECONDS} histogram") == 1
+        assert (f'{REQUEST_SECONDS}_bucket{{endpoint="/api/health",method="GET",status="200",'
+                f'le="0.0025"}} 1') in text
+        assert f'{REQUEST_SECONDS}_count{{endpoint="/api/health",method="GET",status="200"}} 2' in text
+        assert f'{SPAN_SECONDS}_bucket{{span="say \\"hi\\"",le="+Inf"}} 1' in text
+        assert text.endswith('\n')
+    
+    def test_nested_memory_spans(self):
+        """Test that an outer span's peak covers the allocations of inner spans."""
+        registry = MetricsRegistry(trace_memory=True)
+        
+        try:
+            with registry.span('outer'):
+                with registry.span('inner'):
+                    block = bytearray(4 * 1024 * 1024)
+                    del block
+        finally:
+            tracemalloc.stop()
+        
+        inner = registry.histogram(SPAN_PEAK_BYTES, span='inner').sum
+        outer = registry.histogram(SPAN_PEAK_BYTES, span='outer').sum
+        assert inner >= 4 * 1024 * 1024
+        assert outer >= inner
+    
+    def test_traced_and_disabled(self, metrics):
+        """Test that traced records every call and records nothing when disabled."""
+        @traced('unit.work')
+        def work(value):
+            return value * 2
+        
+        assert work(2) == 4 and work(3) == 6
+        metrics.enabled = False
+        assert work(4) == 8
+        
+        assert metrics.histogram(SPAN_SECONDS, span='unit.work').count == 2
+    
+    def test_service_methods_are_spans(self, metrics):
+        """Test that InventoryService methods show up under their qualified names."""
+        sales = pd.DataFrame({'item_id': [1, 1], 'quantity': [2.0, 4.0],
+                              'date': pd.to_datetime(['2023-01-01', '2023-01-02'])})
+        service = InventoryService(pd.DataFrame(), sales)
+        
+        service.generate_recommendations(1)
+        
+        for name in ('InventoryService.__init__', 'InventoryService.generate_recommendations',
+                     'InventoryService.predict_demand'):
+            assert metrics.histogram(SPAN_SECONDS, span=name).count >= 1
+
+
+class TestProfilingAndLogs:
+    """Test suite for profiling switches and structured log output."""
+    
+    def test_profile_modes(self, monkeypatch):
+        """Test mode resolution from the environment and the per-request decision."""
+        monkeypatch.setenv('PROFILE_REQUESTS', 'header')
+        
+        assert profile_mode() == 'header'
+        assert wants_profile('header', '1') and not wants_profile('header', None)
+        assert wants_profile('all', None) and not wants_profile('off', '1')
+        with pytest.raises(ValueError):
+            profile_mode('sampling')
+    
+    def test_structured_formatter(self):
+        """Test that events render as JSON objects with their fields."""
+        records = []
+        handler = logging.Handler()
+        handler.emit = lambda record: records.append(handler.format(record))
+        handler.setFormatter(StructuredFormatter('json'))
+        target = logging.getLogger('src.tests.instrumentation')
+        target.addHandler(handler)
+        target.setLevel(logging.INFO)
+        
+        log_event(target, 'table_loaded', file='fct_orders.csv', rows=10)
+        log_event(target, 'hidden', level=logging.DEBUG)
+        target.removeHandler(handler)
+        
+        entry = json.loads(records[0])
+        assert len(records) == 1
+        assert (entry['event'], entry['file'], entry['rows']) == ('table_loaded', 'fct_orders.csv', 10)
+        assert entry['level'] == 'INFO'
+
+
+class TestMetricsEndpoints:
+    """Test suite for request histograms and /metrics in both API apps."""
+    
+    def test_flask_routes(self, metrics, monkeypatch, caplog):
+        """Test latency per route template, Server-Timing and an opt-in profile."""
+        from src.api.routes import app
+        original = app.extensions['app_context']
+        app.extensions['app_context'] = _holder()
+        monkeypatch.setitem(app.config, 'PROFILE_REQUESTS', 'header')
+        client = app.test_client()
+        
+        try:
+            with caplog.at_level(logging.INFO, logger='src'):
+                response = client.get('/api/health', headers={'X-Profile': '1'})
+            client.post('/api/inventory/predict', json={'item_id': 1})
+            client.post('/api/inventory/predict', json={})
+            text = client.get('/metrics').get_data(as_text=True)
+        finally:
+            app.extensions['app_context'] = original
+        
+        assert response.headers['Server-Timing'].startswith('app;dur=')
+        assert any(record.getMessage() == 'request_profile' for record in caplog.records)
+        assert metrics.histogram(REQUEST_SECONDS, endpoint='/api/health',
+                                 method='GET', status=200).count == 1
+        assert ('endpoint="/api/inventory/predict",method="POST",status="400"') in text
+        assert 'span="InventoryService.predict_demand"' in text
+    
+    def test_asgi_routes(self, metrics):
+        """Test that the ASGI middleware labels requests by route template."""
+        pytest.importorskip('fastapi')
+        httpx = pytest.importorskip('httpx')
+        from src.api.asgi import app
+        original = app.state.context_holder
+        app.state.context_holder = _holder()
+        
+        async def calls():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+                await client.get('/api/health')
+                await client.get('/api/unknown')
+                return await client.get('/metrics')
+        
+        try:
+            response = asyncio.run(calls())
+        finally:
+            app.state.context_holder = original
+        
+        assert response.headers['content-type'].startswith('text/plain')
+        assert 'endpoint="/api/health",method="GET",status="200"' in response.text
+        assert 'endpoint="unmatched",method="GET",status="404"' in response.text
+
+
+# Run tests if executed directly
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,195 @@
+"""
+File: test_inventory_service.py
+Description: Unit tests for the inventory management service.
+Dependencies: pytest, pandas
+
+Run tests with: pytest tests/
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+import sys
+import os
+
+# Add parent directory to path to import from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.services.inventory_service import InventoryService
+
+
+DAY = 86400
+BASE = 1609459200
+
+
+def _sales():
+    """Builds daily sales for two items over ten days."""
+    return pd.DataFrame({
+        'item_id': ['A'] * 10 + ['B'] * 10,
+        'date': list(pd.date_range('2021-01-01', periods=10)) * 2,
+        'quantity': list(range(1, 11)) + [5] * 10,
+    })
+
+
+def _inventory():
+    """Builds a small inventory snapshot."""
+    return pd.DataFrame({
+        'item_id': ['A', 'B', 'C'],
+        'days_until_expiration': [2, 10, 5],
+    })
+
+
+class TestInventoryService:
+    """Test suite for InventoryService forecasting."""
+    
+    def test_predict_demand_daily(self):
+        """Test the 7-day moving average."""
+        service = InventoryService(_inventory(), _sales())
+        
+        assert service.predict_demand('A', 'daily') == 7.0
+    
+    def test_predict_demand_unknown_item(self):
+        """Test that an unknown item raises ValueError."""
+        service = InventoryService(_inventory(), _sales())
+        
+        with pytest.raises(ValueError):
+            service.predict_demand('Z')
+    
+    def test_calculate_reorder_point(self):
+        """Test reorder point with 50% safety stock."""
+        service = InventoryService(_inventory(), _sales())
+        
+        assert service.calculate_reorder_point('B', lead_time_days=2) == 15
+    
+    def test_string_dates(self):
+        """Test that sales with string dates build the service and set the watermark."""
+        sales = pd.DataFrame({'item_id': ['a', 'a'], 'date': ['2024-01-01', '2024-01-02'],
+                              'quantity': [1, 2]})
+        
+        service = InventoryService(_inventory(), sales)
+        
+        assert service.predict_demand('a') == 1.5
+        assert service.demand_state.watermark == int(pd.Timestamp('2024-01-02').timestamp())
+    
+    def test_from_sales_chunks(self):
+        """Test that order-line chunks are reduced to daily per-item sales."""
+        order_lines = pd.DataFrame({
+            'item_id': ['A', 'A', 'A', 'B'],
+            'created': [BASE, BASE + 60, BASE + DAY, BASE],
+            'quantity': [2, 3, 4, 1],
+        })
+        chunks = [order_lines.iloc[:2], order_lines.iloc[2:]]
+        
+        service = InventoryService.from_sales_chunks(_inventory(), chunks)
+        
+        assert list(service.sales_data.columns) == ['item_id', 'date', 'quantity']
+        assert service.sales_data['quantity'].tolist() == [5, 4, 1]
+        assert service.predict_demand('A') == 4.5
+
+
+class TestForecastHistory:
+    """Test suite for forecasts over interleaved and replaced sales history."""
+    
+    def test_matches_full_scan(self):
+        """Test that forecasts equal the boolean-scan moving average."""
+        rng = np.random.default_rng(1)
+        sales = pd.DataFrame({'item_id': rng.integers(0, 50, 2000),
+                              'quantity': rng.integers(0, 20, 2000)})
+        service = InventoryService(_inventory(), sales)
+        
+        for item_id in range(50):
+            expected = sales[sales['item_id'] == item_id]['quantity'].tail(4).mean()
+            assert service.predict_demand(item_id, 'weekly') == round(expected, 2)
+    
+    def test_reassigning_sales_rebuilds_state(self):
+        """Test that replacing sales_data rebuilds the forecasting state."""
+        service = InventoryService(_inventory(), _sales())
+        
+        service.sales_data = pd.DataFrame({'item_id': ['Q'], 'quantity': [3]})
+        
+        assert service.predict_demand('Q') == 3.0
+        with pytest.raises(ValueError):
+            service.predict_demand('A')
+
+
+class TestBulkForecasting:
+    """Test suite for the vectorised bulk forecasting API."""
+    
+    @staticmethod
+    def _service():
+        """Builds a service over random interleaved sales with some gaps."""
+        rng = np.random.default_rng(7)
+        quantity = rng.integers(0, 30, 3000).astype(float)
+        quantity[::37] = np.nan
+        sales = pd.DataFrame({'item_id': rng.integers(0, 120, 3000),
+                              'quantity': quantity})
+        return InventoryService(_inventory(), sales)
+    
+    def test_predict_demand_many_matches_loop(self):
+        """Test that bulk predictions equal per-item predictions."""
+        service = self._service()
+        
+        for period in ('daily', 'weekly', 'monthly'):
+            bulk = service.predict_demand_many('all', period)
+            loop = [service.predict_demand(i, period) for i in bulk['item_id']]
+            assert bulk['predicted_demand'].tolist() == loop
+    
+    def test_recommendations_bulk_matches_loop(self):
+        """Test that bulk recommendations equal generate_recommendations per item."""
+        service = self._service()
+        item_ids = [5, 3, 99, 3]
+        
+        bulk = service.generate_recommendations_bulk(item_ids)
+        
+        assert bulk.to_dict('records') == [service.generate_recommendations(i) for i in item_ids]
+    
+    def test_reorder_points_keep_requested_order(self):
+        """Test that bulk reorder points follow the requested item order."""
+        service = self._service()
+        
+        result = service.calculate_reorder_points([7, 1], lead_time_days=5)
+        
+        assert result['item_id'].tolist() == [7, 1]
+        assert result['reorder_point'].tolist() == [
+            service.calculate_reorder_point(7, 5), service.calculate_reorder_point(1, 5)]
+    
+    def test_unknown_items(self):
+        """Test that unknown items raise by default and become NaN when coerced."""
+        service = self._service()
+        
+        with pytest.raises(ValueError):
+            service.predict_demand_many([1, 'missing'])
+        
+        result = service.calculate_reorder_points([1, 'missing'], errors='coerce')
+        assert result['reorder_point'].isna().tolist() == [False, True]
+
+
+class TestIncrementalForecasting:
+    """Test suite for InventoryService.ingest and state snapshots."""
+    
+    def test_ingest_updates_forecasts(self):
+        """Test that ingested rows change forecasts like a full rebuild."""
+        new_rows = pd.DataFrame({'item_id': ['A', 'C'],
+                                 'date': pd.to_datetime(['2021-01-11', '2021-01-11']),
+                                 'quantity': [30, 4]})
+        service = InventoryService(_inventory(), _sales())
+        
+        assert service.ingest(new_rows) == 2
+        
+        rebuilt = InventoryService(_inventory(), pd.concat([_sales(), new_rows]))
+        for item_id in ('A', 'B', 'C'):
+            assert service.predict_demand(item_id) == rebuilt.predict_demand(item_id)
+        assert len(service.sales_data) == 22
+    
+    def test_restore_from_snapshot(self, tmp_path):
+        """Test that a restored service forecasts without raw history."""
+        service = InventoryService(_inventory(), _sales())
+        path = str(tmp_path / 'state.npz')
+        service.save_state(path)
+        
+        restored = InventoryService.from_state(_inventory(), path)
+        
+        assert restored.sales_data.empty
+        assert restored.predict_demand('A') == service.predict_demand('A')
+        assert restored.generate_recommendations_bulk().equals(
+            service.generate_recommendations_bulk())
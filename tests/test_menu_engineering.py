@@ -0,0 +1,118 @@
+"""
+File: test_menu_engineering.py
+Description: Unit tests for the menu-engineering matrix engine.
+Dependencies: pytest, pandas
+
+Run tests with: pytest tests/
+"""
+
+import pandas as pd
+import sys
+import os
+
+# Add parent directory to path to import from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.api.app_context import AppContext, ContextHolder
+from src.services.menu_engineering import MenuEngineeringEngine
+
+
+def _order_items():
+    """
+    Builds order lines for two places.
+    
+    Place 1 sells four items on 2024-01-01 and only item 4 on 2024-02-01:
+    item 1 is popular with a high margin, item 2 popular with a low margin,
+    item 3 unpopular with a high margin and item 4 unpopular with a low margin.
+    """
+    day1 = 1704067200  # 2024-01-01
+    day2 = 1706745600  # 2024-02-01
+    return pd.DataFrame({
+        'place_id': [1, 1, 1, 1, 1, 2, 2],
+        'item_id': [1, 2, 3, 4, 4, 10, 11],
+        'quantity': [50, 60, 5, 4, 100, 10, 10],
+        'price': [100.0, 40.0, 120.0, 30.0, 30.0, 50.0, 20.0],
+        'cost': [30.0, 30.0, 20.0, 25.0, 25.0, None, 5.0],
+        'created': [day1, day1, day1, day1, day2, day1, day1],
+    })
+
+
+class TestMenuEngineeringEngine:
+    """Test suite for MenuEngineeringEngine."""
+    
+    def test_quadrants(self):
+        """Test that items land in the expected quadrants."""
+        engine = MenuEngineeringEngine(_order_items())
+        
+        result = engine.analyze(end_date='2024-01-31').set_index('item_id')
+        
+        assert result.loc[[1, 2, 3, 4], 'category'].tolist() == ['star', 'plowhorse',
+                                                                  'puzzle', 'dog']
+        assert result.loc[1, 'popularity_share'] == round(50 / 119, 4)
+        assert result.loc[1, 'popularity_threshold'] == 0.175
+        assert result.loc[10, 'unit_margin'] == 50.0
+    
+    def test_date_window_uses_rollups(self):
+        """Test that a later window reclassifies without raw order lines."""
+        engine = MenuEngineeringEngine(_order_items())
+        
+        result = engine.analyze('2024-02-01', '2024-02-29')
+        
+        assert result[['place_id', 'item_id', 'category']].values.tolist() == [[1, 4, 'star']]
+        assert len(engine.rollups) == 7
+    
+    def test_matches_per_place_loop(self):
+        """Test that the grouped pass equals analysing each place on its own."""
+        engine = MenuEngineeringEngine(_order_items())
+        combined = engine.analyze()
+        
+        for place_id in engine.places:
+            single = engine.analyze(places=[place_id])
+            expected = combined[combined['place_id'] == place_id].reset_index(drop=True)
+            pd.testing.assert_frame_equal(single, expected)
+    
+    def test_add_folds_new_order_lines(self):
+        """Test that add() merges rollups for existing days."""
+        lines = _order_items()
+        engine = MenuEngineeringEngine(lines.iloc[:3])
+        
+        engine.add(lines.iloc[3:])
+        
+        pd.testing.assert_frame_equal(engine.analyze(), MenuEngineeringEngine(lines).analyze())
+    
+    def test_analyze_place(self):
+        """Test that one place's items are grouped and sorted by quadrant."""
+        engine = MenuEngineeringEngine(_order_items())
+        
+        result = engine.analyze_place(1, end_date='2024-01-31', sort_by='unit_margin')
+        
+        assert [item['item_id'] for item in result['stars']] == [1]
+        assert [len(result[name]) for name in ('plowhorses', 'puzzles', 'dogs')] == [1, 1, 1]
+
+
+class TestMenuRoute:
+    """Test suite for POST /api/menu/analyze."""
+    
+    def test_analyze_route(self):
+        """Test the Flask endpoint end to end."""
+        from src.api.routes import app
+        holder = ContextHolder(builder=lambda: AppContext.from_tables(
+            {'fct_order_items': _order_items()}), freeze=False)
+        holder.load()
+        original, app.extensions['app_context'] = app.extensions['app_context'], holder
+        client = app.test_client()
+        try:
+            found = client.post('/api/menu/analyze',
+                                json={'place_id': '1', 'end_date': '2024-01-31'})
+            missing = client.post('/api/menu/analyze', json={'place_id': '99'})
+            invalid = client.post('/api/menu/analyze',
+                                  json={'place_id': '1', 'analysis_type': 'x'})
+            bad_date = client.post('/api/menu/analyze',
+                                   json={'place_id': '1', 'start_date': 'not-a-date'})
+        finally:
+            app.extensions['app_context'] = original
+        
+        assert found.get_json()['stars'][0]['item_id'] == 1
+        assert missing.status_code == 404
+        assert invalid.status_code == 400
+        assert bad_date.status_code == 400
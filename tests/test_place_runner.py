@@ -0,0 +1,132 @@
+"""
+File: test_place_runner.py
+Description: Unit tests for the parallel per-place runner.
+Dependencies: pytest, pandas, numpy
+
+Run tests with: pytest tests/
+"""
+
+import numpy as np
+import pandas as pd
+import sys
+import os
+
+# Add parent directory to path to import from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.services.inventory_service import InventoryService
+from src.services.place_runner import PlaceRunner, SharedColumns
+
+
+def _sales():
+    """Builds sales for five places with string item ids."""
+    rng = np.random.default_rng(11)
+    rows = 3000
+    return pd.DataFrame({
+        'place_id': rng.integers(1, 6, rows),
+        'item_id': rng.choice(['burger', 'fries', 'soda', 'salad'], rows),
+        'quantity': rng.integers(0, 12, rows),
+    })
+
+
+def count_rows(place_id, sales, inventory):
+    """Task returning the number of sales and inventory rows of a place."""
+    return pd.DataFrame({'sales_rows': [len(sales)], 'inventory_rows': [len(inventory)]})
+
+
+def count_rows_scaled(place_id, sales, inventory, scale=1):
+    """Task returning the number of sales rows of a place times scale."""
+    return pd.DataFrame({'scaled_rows': [len(sales) * scale]})
+
+
+class TestSharedColumns:
+    """Test suite for the memory-mapped column buffers."""
+    
+    def test_round_trip(self, tmp_path):
+        """Test that numeric, string, categorical and nullable columns survive."""
+        df = pd.DataFrame({
+            'a': [1, 2, 3],
+            'b': ['x', None, 'y'],
+            'c': pd.Categorical(['lo', 'hi', 'lo']),
+            'd': pd.array([1, None, 3], dtype='Int32'),
+            'e': pd.to_datetime(['2024-01-01', '2024-01-02', '2024-01-03']),
+        })
+        
+        descriptor = SharedColumns(df, str(tmp_path), 'frame').descriptor
+        result = SharedColumns.read(descriptor, 1, 3)
+        
+        assert result['a'].tolist() == [2, 3]
+        assert result['b'].isna().tolist() == [True, False]
+        assert result['b'].iloc[1] == 'y'
+        assert result['c'].dtype == 'category'
+        assert np.isnan(result['d'].iloc[0])
+        assert result['e'].iloc[1] == pd.Timestamp('2024-01-03')
+
+
+class TestPlaceRunner:
+    """Test suite for PlaceRunner."""
+    
+    def test_matches_per_place_service(self):
+        """Test that merged results equal running each place separately."""
+        sales = _sales()
+        
+        result = PlaceRunner(sales, max_workers=1, batch_size=2).generate_recommendations()
+        
+        for place_id, place_result in result.groupby('place_id'):
+            expected = InventoryService(pd.DataFrame(), sales[sales['place_id'] == place_id]) \
+                .generate_recommendations_bulk()
+            assert place_result['item_id'].tolist() == expected['item_id'].tolist()
+            assert place_result['reorder_point'].tolist() == expected['reorder_point'].tolist()
+    
+    def test_process_pool_is_deterministic(self):
+        """Test that a process pool gives the same ordered output as inline runs."""
+        sales = _sales()
+        
+        inline = PlaceRunner(sales, max_workers=1, batch_size=1).generate_recommendations()
+        pooled = PlaceRunner(sales, max_workers=2, batch_size=1).generate_recommendations()
+        
+        pd.testing.assert_frame_equal(inline, pooled)
+        assert list(pooled.columns)[0] == 'place_id'
+        assert pooled['place_id'].is_monotonic_increasing
+    
+    def test_inventory_sharding_and_progress(self):
+        """Test that inventory is sharded by place and progress is reported."""
+        sales = _sales()
+        inventory = pd.DataFrame({'place_id': [1, 1, 3], 'item_id': ['a', 'b', 'c']})
+        calls = []
+        runner = PlaceRunner(sales, inventory, max_workers=1, batch_size=2,
+                             progress=lambda done, total: calls.append((done, total)))
+        
+        result = runner.run(count_rows, places=[3, 1, 99])
+        
+        assert result['place_id'].tolist() == [3, 1]
+        assert result['inventory_rows'].tolist() == [1, 2]
+        assert calls == [(2, 2)]
+    
+    def test_variants_run_per_place(self):
+        """Test that each place runs once per variant, in place then variant order."""
+        sales = _sales()
+        runner = PlaceRunner(sales, max_workers=2, batch_size=1)
+        
+        result = runner.run(count_rows_scaled, places=[2, 1],
+                            variants=[{'scale': 1}, {'scale': 10}])
+        
+        rows = sales['place_id'].value_counts()
+        assert result['place_id'].tolist() == [2, 2, 1, 1]
+        assert result['scaled_rows'].tolist() == [rows[2], rows[2] * 10, rows[1], rows[1] * 10]
+    
+    def test_shared_buffers_once_per_runner(self, monkeypatch, tmp_path):
+        """Test that inline runs write no buffers and pooled runs share one set until close."""
+        monkeypatch.setattr('src.services.place_runner.SHARED_DIR', str(tmp_path))
+        sales = _sales()
+        
+        inline = PlaceRunner(sales, max_workers=1, batch_size=1).run(count_rows)
+        assert os.listdir(tmp_path) == []
+        with PlaceRunner(sales, max_workers=2, batch_size=1) as runner:
+            first = runner.run(count_rows)
+            second = runner.run(count_rows, places=[1, 2])
+            assert len(os.listdir(tmp_path)) == 1
+        
+        assert os.listdir(tmp_path) == []
+        pd.testing.assert_frame_equal(first, inline)
+        assert second['place_id'].tolist() == [1, 2]
@@ -0,0 +1,152 @@
+"""
+File: test_response_cache.py
+Description: Unit tests for the API response cache.
+Dependencies: pytest, pandas, flask
+
+Run tests with: pytest tests/
+"""
+
+import pytest
+import pandas as pd
+import sys
+import os
+import threading
+import time
+
+# Add parent directory to path to import from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.api.app_context import AppContext, ContextHolder
+from src.api.response_cache import ResponseCache
+
+
+class TestResponseCache:
+    """Test suite for ResponseCache."""
+    
+    def test_lru_eviction_and_counters(self):
+        """Test that the least recently used entry is evicted first."""
+        cache = ResponseCache(max_entries=2, ttl_seconds=0)
+        
+        cache.get_or_compute('a', lambda: 1)
+        cache.get_or_compute('b', lambda: 2)
+        cache.get_or_compute('a', lambda: 0)
+        cache.get_or_compute('c', lambda: 3)
+        
+        assert cache.get_or_compute('a', lambda: 0) == 1
+        assert cache.get_or_compute('b', lambda: 20) == 20
+        stats = cache.stats()
+        assert (stats['hits'], stats['misses'], stats['evictions']) == (2, 4, 2)
+    
+    def test_ttl_expiry(self):
+        """Test that expired entries are recomputed."""
+        cache = ResponseCache(ttl_seconds=0.01)
+        cache.get_or_compute('a', lambda: 1)
+        
+        time.sleep(0.02)
+        
+        assert cache.get_or_compute('a', lambda: 2) == 2
+    
+    def test_concurrent_misses_compute_once(self):
+        """Test that a stampede of misses for one key runs compute once."""
+        cache = ResponseCache()
+        calls = []
+        release = threading.Event()
+        
+        def compute():
+            calls.append(1)
+            release.wait(5)
+            return 'value'
+        
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute('k', compute)))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        while cache.stats()['coalesced'] < 7:
+            time.sleep(0.001)
+        release.set()
+        for thread in threads:
+            thread.join()
+        
+        assert len(calls) == 1
+        assert results == ['value'] * 8
+    
+    def test_failures_are_not_cached(self):
+        """Test that an exception propagates and the next call recomputes."""
+        cache = ResponseCache()
+        
+        with pytest.raises(KeyError):
+            cache.get_or_compute('k', lambda: {}['missing'])
+        
+        assert cache.get_or_compute('k', lambda: 5) == 5
+
+
+class TestCachedRoutes:
+    """Test suite for the cached Flask endpoints."""
+    
+    @pytest.fixture
+    def client(self):
+        """Flask test client over a warm context and an empty cache."""
+        from src.api.routes import app
+        sales = pd.DataFrame({'item_id': [1, 1], 'quantity': [2, 4],
+                              'created': [1700000000, 1700086400]})
+        original = app.extensions['app_context']
+        holder = ContextHolder(builder=lambda: AppContext.from_tables(
+            {'fct_order_items': sales}, version='v1'), freeze=False)
+        holder.load()
+        app.extensions['app_context'] = holder
+        app.extensions['response_cache'].invalidate()
+        yield app.test_client(), holder
+        app.extensions['app_context'] = original
+    
+    def test_etag_and_304(self, client):
+        """Test that repeated requests hit the cache and revalidate with 304."""
+        client, _ = client
+        before = client.get('/api/cache/stats').get_json()
+        
+        first = client.post('/api/inventory/predict', json={'item_id': '1'})
+        second = client.post('/api/inventory/predict', json={'item_id': '1'})
+        revalidated = client.post('/api/inventory/predict', json={'item_id': '1'},
+                                  headers={'If-None-Match': first.headers['ETag']})
+        
+        strip = lambda body: {k: v for k, v in body.items() if k != 'timestamp'}
+        assert strip(second.get_json()) == strip(first.get_json())
+        assert revalidated.status_code == 304
+        after = client.get('/api/cache/stats').get_json()
+        assert after['hits'] - before['hits'] == 2
+        assert after['misses'] - before['misses'] == 1
+    
+    def test_ingest_invalidates(self, client):
+        """Test that ingested sales change the ETag and the cached answer."""
+        client, holder = client
+        first = client.post('/api/inventory/predict', json={'item_id': '1'})
+        
+        holder.get().inventory_service.ingest(pd.DataFrame(
+            {'item_id': [1], 'quantity': [9], 'date': [pd.Timestamp('2023-11-17')]}))
+        second = client.post('/api/inventory/predict', json={'item_id': '1'},
+                             headers={'If-None-Match': first.headers['ETag']})
+        
+        assert second.status_code == 200
+        assert second.get_json()['predicted_demand'] == 5.0
+        assert second.headers['ETag'] != first.headers['ETag']
+    
+    def test_errors_carry_no_etag(self, client):
+        """Test that a 404 is not tagged and never revalidates to 304."""
+        client, _ = client
+        missing = client.post('/api/inventory/predict', json={'item_id': '99'})
+        
+        assert missing.status_code == 404
+        assert 'ETag' not in missing.headers
+        again = client.post('/api/inventory/predict', json={'item_id': '99'},
+                            headers={'If-None-Match': '*'})
+        assert again.status_code == 404
+    
+    def test_timestamp_is_not_cached(self, client):
+        """Test that cached payloads leave the timestamp to each response."""
+        from src.api.routes import app
+        client, _ = client
+        response = client.post('/api/inventory/predict', json={'item_id': '1'})
+        
+        assert 'timestamp' in response.get_json()
+        cached = [value for _, value in app.extensions['response_cache']._entries.values()]
+        assert cached and all('timestamp' not in payload for payload, _ in cached)
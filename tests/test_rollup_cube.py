@@ -0,0 +1,108 @@
+"""
+File: test_rollup_cube.py
+Description: Unit tests for the materialised rollup cube.
+Dependencies: pytest, pandas
+
+Run tests with: pytest tests/
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# Add parent directory to path to import from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.services.menu_engineering import MenuEngineeringEngine
+from src.services.rollup_cube import RollupCube, period_start
+from src.utils.helpers import aggregate_by_period
+from src.utils.synthetic import generate_dataset
+
+
+@pytest.fixture(scope='module')
+def tables():
+    """Synthetic order lines and orders."""
+    return generate_dataset(20_000, seed=5)
+
+
+class TestRollupCube:
+    """Test suite for RollupCube."""
+    
+    def test_totals_match_raw_lines(self, tables):
+        """Test that the cube preserves quantity, revenue and order counts."""
+        lines = tables['fct_order_items']
+        cube = RollupCube.from_order_items(lines, tables['fct_orders'])
+        
+        totals = cube.query(['place_id'], 'M').groupby('place_id')[['quantity', 'revenue']].sum()
+        expected = lines.assign(revenue=lines['quantity'] * lines['price']) \
+            .groupby('place_id')[['quantity', 'revenue']].sum()
+        
+        assert np.allclose(totals.to_numpy(), expected.to_numpy())
+        assert cube.query()['order_count'].sum() == lines.groupby(
+            [pd.to_datetime(lines['created'], unit='s').dt.floor('D'), 'item_id'])['order_id'].nunique().sum()
+        assert len(cube) < len(lines)
+    
+    def test_weekly_matches_aggregate_by_period(self, tables):
+        """Test that weekly rollups agree with aggregate_by_period on raw lines."""
+        lines = tables['fct_order_items']
+        cube = RollupCube.from_order_items(lines, tables['fct_orders'])
+        raw = pd.DataFrame({'date': pd.to_datetime(lines['created'], unit='s'),
+                            'quantity': lines['quantity']})
+        
+        weekly = cube.query(period='W')
+        expected = aggregate_by_period(raw, 'date', 'quantity', 'W-SUN')
+        
+        assert np.allclose(weekly['quantity'].to_numpy(), expected['quantity'].to_numpy())
+    
+    def test_incremental_matches_batch(self, tables):
+        """Test that adding days (with an overlapping late batch) matches one build."""
+        lines = tables['fct_order_items']
+        orders = tables['fct_orders']
+        full = RollupCube.from_order_items(lines, orders)
+        
+        cube = RollupCube()
+        cube.add(lines.iloc[:8_000], orders)
+        cube.add(lines.iloc[8_000:15_000], orders)
+        cube.add(lines.iloc[15_000:], orders)
+        
+        by = ['place_id', 'item_id', 'channel']
+        pd.testing.assert_frame_equal(cube.query(by)[['quantity', 'revenue']],
+                                      full.query(by)[['quantity', 'revenue']])
+    
+    def test_filters_and_validation(self, tables):
+        """Test key filters, date windows and unknown keys."""
+        cube = RollupCube.from_order_items(tables['fct_order_items'], tables['fct_orders'])
+        
+        result = cube.query(['channel'], place_id=1, channel=['App', 'Kiosk'],
+                            start_date='2023-03-01', end_date='2023-03-31')
+        
+        assert set(result['channel']) == {'App', 'Kiosk'}
+        assert result['date'].min() >= pd.Timestamp('2023-03-01')
+        assert result['date'].max() <= pd.Timestamp('2023-03-31')
+        with pytest.raises(ValueError):
+            cube.query(['title'])
+        with pytest.raises(ValueError):
+            RollupCube().add(tables['fct_order_items'])
+    
+    def test_period_start(self):
+        """Test week (Monday) and month starts."""
+        dates = pd.Series(pd.to_datetime(['2024-01-03', '2024-01-07', '2024-02-29']))
+        
+        assert period_start(dates, 'W').dt.strftime('%Y-%m-%d').tolist() == \
+            ['2024-01-01', '2024-01-01', '2024-02-26']
+        assert period_start(dates, 'M').dt.strftime('%Y-%m-%d').tolist() == \
+            ['2024-01-01', '2024-01-01', '2024-02-01']
+    
+    def test_menu_engine_from_cube(self, tables):
+        """Test that the menu engine over cube rollups matches one over raw lines."""
+        lines = tables['fct_order_items']
+        cube = RollupCube.from_order_items(lines, tables['fct_orders'])
+        
+        engine = MenuEngineeringEngine.from_rollups(
+            cube.query(['place_id', 'item_id'], measures=('quantity', 'revenue', 'cost')))
+        
+        pd.testing.assert_frame_equal(engine.analyze('2023-02-01', '2023-04-30'),
+                                      MenuEngineeringEngine(lines).analyze('2023-02-01', '2023-04-30'),
+                                      check_dtype=False)
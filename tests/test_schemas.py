@@ -0,0 +1,121 @@
+"""
+File: test_schemas.py
+Description: Unit tests for the table schema registry and its use in DataLoader.
+Dependencies: pytest, pandas, numpy
+
+Run tests with: pytest tests/
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+import sys
+import os
+
+# Add parent directory to path to import from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.data_loader import DataLoader
+from src.models.schemas import TableSchema, get_schema
+
+
+def _write_orders(path, rows=2000):
+    """Writes a fct_orders-shaped CSV with nullable timestamps."""
+    rng = np.random.default_rng(0)
+    created = (1609459200 + rng.integers(0, 10_000_000, rows)).astype(float)
+    created[::10] = np.nan
+    pd.DataFrame({
+        'id': np.arange(rows),
+        'place_id': rng.integers(1, 50, rows),
+        'created': created,
+        'total_amount': rng.random(rows) * 300,
+        'type': rng.choice(['eat_in', 'takeaway', 'delivery'], rows),
+        'channel': rng.choice(['App', 'Kiosk', 'Counter'], rows),
+        'platform': rng.choice(['Wolt', 'JustEat', 'Direct'], rows),
+    }).to_csv(path, index=False)
+
+
+class TestSchemaRegistry:
+    """Test suite for schema lookup and dtype declarations."""
+    
+    def test_get_schema_accepts_file_names(self):
+        """Test that table and file names resolve to the same schema."""
+        assert get_schema('fct_orders') is get_schema('fct_orders.csv')
+        assert get_schema('not_a_table') is None
+    
+    def test_read_dtypes_restricted_to_columns(self):
+        """Test that read_dtypes can be projected onto a column subset."""
+        schema = TableSchema('t', categories=['type'], integers={'id': 'int64'},
+                             booleans=['dormant'], timestamps=['created'])
+        
+        assert schema.read_dtypes(['type', 'created']) == {'type': 'category',
+                                                           'created': 'Int64'}
+
+
+class TestSchemaLoading:
+    """Test suite for schema-driven parsing in DataLoader."""
+    
+    def test_compact_dtypes(self, tmp_path):
+        """Test that fct_orders columns are parsed with compact dtypes."""
+        _write_orders(tmp_path / 'fct_orders.csv')
+        
+        df = DataLoader(str(tmp_path), use_cache=False).load_csv('fct_orders.csv')
+        
+        assert df['type'].dtype == 'category'
+        assert df['place_id'].dtype == 'Int32'
+        assert df['created'].dtype == 'datetime64[s]'
+        assert df['created'].isna().sum() == 200
+    
+    def test_memory_reduction(self, tmp_path):
+        """Test that the schema shrinks fct_orders' resident memory."""
+        _write_orders(tmp_path / 'fct_orders.csv')
+        
+        inferred = DataLoader(str(tmp_path), use_cache=False,
+                              apply_schema=False).load_csv('fct_orders.csv')
+        compact = DataLoader(str(tmp_path), use_cache=False).load_csv('fct_orders.csv')
+        
+        ratio = inferred.memory_usage(deep=True).sum() / compact.memory_usage(deep=True).sum()
+        assert ratio >= 2
+    
+    def test_nullable_boolean_flags(self, tmp_path):
+        """Test that 0/1/NULL flags in dim_places become nullable booleans."""
+        (tmp_path / 'dim_places.csv').write_text('id,title,dormant,termination_date\n'
+                                                 '1,A,1,\n2,B,,1609459200\n3,C,0,\n')
+        
+        df = DataLoader(str(tmp_path), use_cache=False).load_csv('dim_places.csv')
+        
+        assert df['dormant'].dtype == 'boolean'
+        assert df['dormant'].tolist()[0] is True
+        assert df['dormant'].isna().tolist() == [False, True, False]
+        assert df['termination_date'].isna().tolist() == [True, False, True]
+    
+    def test_schema_mismatch_falls_back(self, tmp_path):
+        """Test that data violating the schema is loaded with inferred dtypes."""
+        (tmp_path / 'dim_places.csv').write_text('id,dormant\n1,maybe\n2,1\n')
+        
+        df = DataLoader(str(tmp_path), use_cache=False).load_csv('dim_places.csv')
+        
+        assert df['dormant'].tolist() == ['maybe', '1']
+    
+    def test_streamed_chunks_use_schema(self, tmp_path):
+        """Test that iter_csv applies the schema to projected columns."""
+        _write_orders(tmp_path / 'fct_orders.csv')
+        loader = DataLoader(str(tmp_path), use_cache=False)
+        
+        chunk = next(loader.iter_csv('fct_orders.csv', chunk_rows=100,
+                                     usecols=['created', 'channel']))
+        
+        assert chunk['channel'].dtype == 'category'
+        assert chunk['created'].dtype == 'datetime64[s]'
+    
+    def test_cached_load_keeps_dtypes(self, tmp_path):
+        """Test that the Arrow cache round-trips the compact dtypes."""
+        pytest.importorskip('pyarrow')
+        _write_orders(tmp_path / 'fct_orders.csv')
+        loader = DataLoader(str(tmp_path))
+        
+        first = loader.load_csv('fct_orders.csv')
+        second = loader.load_csv('fct_orders.csv')
+        
+        assert second['type'].dtype == 'category'
+        assert second['created'].dtype == first['created'].dtype
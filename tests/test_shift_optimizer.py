@@ -0,0 +1,272 @@
+"""
+File: test_shift_optimizer.py
+Description: Unit tests for demand-curve driven shift planning.
+Dependencies: pytest, pandas, numpy
+Author: Sample Team
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+import sys
+import os
+
+# Add parent directory to path to import from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.api.app_context import AppContext, ContextHolder
+from src.models.data_loader import DataLoader
+from src.services.shift_optimizer import (
+    ShiftOptimizer,
+    plan_active_places,
+    resolve_constraints,
+    solve_shifts,
+    staff_requirements
+)
+
+
+# Monday 2024-01-01 00:00 in Copenhagen (23:00 UTC the day before)
+MONDAY = 1704063600
+
+
+def _orders():
+    """Builds four Mondays of orders for place 1 (busy lunch) and one order for place 2."""
+    created = []
+    for week in range(4):
+        day = MONDAY + week * 7 * 86400
+        # 40 orders between 12:00 and 13:00, 4 between 16:00 and 17:00
+        created += [day + 12 * 3600 + minute * 90 for minute in range(40)]
+        created += [day + 16 * 3600 + minute * 900 for minute in range(4)]
+    return pd.DataFrame({
+        'id': range(1, len(created) + 2),
+        'place_id': [1] * len(created) + [2],
+        'created': created + [MONDAY + 10 * 3600],
+    })
+
+
+def _covered(shifts, slots=96):
+    """Staff on duty per slot for (start, length, staff) shifts."""
+    covered = np.zeros(slots, dtype=int)
+    for start, length, staff in shifts:
+        covered[start:start + length] += staff
+    return covered
+
+
+class TestShiftSolver:
+    """Test suite for requirements and the covering solvers."""
+    
+    def test_staff_requirements(self):
+        """Test that orders become staff per slot with min_staff while open and a cap."""
+        curve = np.zeros(96)
+        curve[40], curve[44] = 10.0, 2.5
+        
+        required = staff_requirements(curve, orders_per_staff_hour=10, min_staff=1)
+        capped = staff_requirements(curve, orders_per_staff_hour=10, min_staff=1, max_staff=2)
+        
+        assert required[40] == 4 and required[44] == 1
+        assert (required[41:44] == 1).all()
+        assert required[:40].sum() == 0 and required[45:].sum() == 0
+        assert capped.max() == 2
+    
+    @pytest.mark.parametrize('solver', ['milp', 'greedy'])
+    def test_solvers_cover_requirements(self, solver):
+        """Test that both solvers return plans covering every slot."""
+        required = np.zeros(96, dtype=int)
+        required[36:80] = 1
+        required[46:54] = 3
+        
+        shifts, used = solve_shifts(required, [16, 24, 32], solver)
+        
+        assert used == solver
+        assert (_covered(shifts) >= required).all()
+    
+    def test_milp_is_not_worse_than_greedy(self):
+        """Test that the exact solver never needs more staff hours than the heuristic."""
+        rng = np.random.default_rng(5)
+        required = np.zeros(96, dtype=int)
+        required[32:88] = rng.integers(1, 5, 56)
+        
+        exact, _ = solve_shifts(required, [16, 24, 32], 'milp')
+        greedy, _ = solve_shifts(required, [16, 24, 32], 'greedy')
+        
+        assert _covered(exact).sum() <= _covered(greedy).sum()
+    
+    def test_empty_day_and_validation(self):
+        """Test that nothing is planned without demand and bad inputs raise ValueError."""
+        assert solve_shifts(np.zeros(96, dtype=int), [16]) == ([], 'none')
+        with pytest.raises(ValueError):
+            solve_shifts(np.ones(96, dtype=int), [16], solver='annealing')
+        with pytest.raises(ValueError):
+            resolve_constraints({'breaks': 2})
+        with pytest.raises(ValueError):
+            resolve_constraints({'shift_hours': [4.1]})
+        with pytest.raises(ValueError):
+            resolve_constraints({'min_staff': 3, 'max_staff': 2})
+
+
+class TestShiftOptimizer:
+    """Test suite for ShiftOptimizer."""
+    
+    def test_demand_curve_averages_same_weekday(self):
+        """Test that the curve averages previous Mondays in Copenhagen time."""
+        optimizer = ShiftOptimizer(_orders())
+        
+        curve = optimizer.demand_curve(1, '2024-01-29')
+        
+        assert curve[48:52].sum() == pytest.approx(40)
+        assert curve[64:68].tolist() == [1.0, 1.0, 1.0, 1.0]
+        assert optimizer.demand_curve(1, '2024-01-30').sum() == 0
+        assert optimizer.demand_curve(99, '2024-01-29').sum() == 0
+    
+    def test_plan(self):
+        """Test that a plan covers the lunch peak and reports its totals."""
+        optimizer = ShiftOptimizer(_orders())
+        
+        plan = optimizer.plan(1, '2024-01-29', {'orders_per_staff_hour': 20})
+        
+        assert plan['estimated_coverage'] == 1.0
+        assert plan['peak_staff'] >= 2
+        assert plan['total_staff_hours'] == sum(s['hours'] * s['staff'] for s in plan['shifts'])
+        assert plan['shifts'][0]['start'] <= '12:00'
+        with pytest.raises(ValueError):
+            optimizer.plan(1, 'next monday')
+    
+    def test_max_staff_lowers_coverage(self):
+        """Test that capping staff below the peak is reported as partial coverage."""
+        optimizer = ShiftOptimizer(_orders())
+        
+        plan = optimizer.plan(1, '2024-01-29', {'max_staff': 1})
+        
+        assert plan['peak_staff'] == 1
+        assert plan['estimated_coverage'] < 1.0
+    
+    def test_plan_active_places(self):
+        """Test the batch over active places only."""
+        places = pd.DataFrame({'id': [1, 2], 'termination_date': [None, 1704063600]})
+        
+        plans = plan_active_places(DataLoader('.'), places, _orders(), '2024-01-29',
+                                   max_workers=1)
+        expected = ShiftOptimizer(_orders()).plan_many('2024-01-29', places=[1])
+        
+        assert set(plans['place_id']) == {1}
+        pd.testing.assert_frame_equal(plans, expected, check_dtype=False)
+
+
+
+class TestReplan:
+    """Test suite for ShiftOptimizer.replan."""
+    
+    def _plan(self):
+        """Plans place 1 on a Monday with a lunch peak of two staff."""
+        optimizer = ShiftOptimizer(_orders())
+        return optimizer, optimizer.plan(1, '2024-01-29', {'orders_per_staff_hour': 20})
+    
+    def test_call_off_keeps_other_shifts(self):
+        """Test that a call-off only adds cover for the missing person."""
+        optimizer, plan = self._plan()
+        dropped = plan['shifts'][0]
+        event = {'type': 'call_off', 'start': dropped['start'], 'end': dropped['end'], 'staff': 1}
+        
+        result = optimizer.replan(1, '2024-01-29', plan['shifts'], [event],
+                                  {'orders_per_staff_hour': 20})
+        
+        assert result['estimated_coverage'] == 1.0
+        assert result['removed'] == [{**dropped, 'staff': 1}]
+        assert result['added']
+        assert result['window'] is not None
+        kept = [s for s in plan['shifts'] if s is not dropped]
+        for shift in kept:
+            assert any(s['start'] == shift['start'] and s['end'] == shift['end']
+                       and s['staff'] >= shift['staff'] for s in result['shifts'])
+    
+    def test_demand_spike_adds_staff_in_window(self):
+        """Test that a spike adds shifts overlapping the spike window only."""
+        optimizer, plan = self._plan()
+        event = {'type': 'demand_spike', 'start': '16:00', 'end': '17:00', 'orders': 40}
+        
+        result = optimizer.replan(1, '2024-01-29', plan['shifts'], [event],
+                                  {'orders_per_staff_hour': 20})
+        
+        assert result['removed'] == []
+        assert result['window'] == {'start': '16:00', 'end': '17:00'}
+        assert all(s['start'] < '17:00' and s['end'] > '16:00' for s in result['added'])
+        assert result['total_staff_hours'] > plan['total_staff_hours']
+    
+    def test_no_change_needed(self):
+        """Test that a covered schedule comes back unchanged."""
+        optimizer, plan = self._plan()
+        
+        result = optimizer.replan(1, '2024-01-29', plan['shifts'], [],
+                                  {'orders_per_staff_hour': 20})
+        
+        assert result['shifts'] == plan['shifts']
+        assert result['added'] == [] and result['window'] is None
+    
+    def test_invalid_events(self):
+        """Test that unknown events and call-offs of unscheduled shifts raise ValueError."""
+        optimizer, plan = self._plan()
+        
+        with pytest.raises(ValueError):
+            optimizer.replan(1, '2024-01-29', plan['shifts'], [{'type': 'strike'}])
+        with pytest.raises(ValueError):
+            optimizer.replan(1, '2024-01-29', plan['shifts'],
+                             [{'type': 'pto', 'start': '03:00', 'end': '04:00'}])
+        with pytest.raises(ValueError):
+            optimizer.replan(1, '2024-01-29', [{'start': '10:07', 'end': '12:00'}], [])
+    
+    @pytest.mark.parametrize('shifts, events', [
+        ([{'start': '10:00', 'end': '12:00', 'staff': -3}], []),
+        ([{'start': '10:00', 'end': '12:00', 'staff': None}], []),
+        ([{'start': '10:00', 'end': '12:00', 'staff': 1.5}], []),
+        (['10:00-12:00'], []),
+        ([], ['call_off']),
+        ([], [{'type': 'demand_spike', 'start': '10:00', 'end': '12:00'}]),
+        ([], [{'type': 'demand_spike', 'start': '10:00', 'end': '12:00', 'factor': -1}]),
+        ([], [{'type': 'demand_spike', 'start': '10:00', 'end': '12:00', 'orders': 'many'}]),
+    ])
+    def test_invalid_records(self, shifts, events):
+        """Test that malformed shift and event records raise ValueError."""
+        optimizer, _ = self._plan()
+        
+        with pytest.raises(ValueError):
+            optimizer.replan(1, '2024-01-29', shifts, events)
+
+
+class TestShiftRoute:
+    """Test suite for POST /api/shifts/optimize."""
+    
+    def test_optimize_route(self):
+        """Test the Flask endpoint end to end."""
+        from src.api.routes import app
+        holder = ContextHolder(builder=lambda: AppContext.from_tables(
+            {'fct_orders': _orders()}), freeze=False)
+        holder.load()
+        original, app.extensions['app_context'] = app.extensions['app_context'], holder
+        client = app.test_client()
+        try:
+            found = client.post('/api/shifts/optimize',
+                                json={'place_id': '1', 'date': '2024-01-29'})
+            missing = client.post('/api/shifts/optimize',
+                                  json={'place_id': '99', 'date': '2024-01-29'})
+            invalid = client.post('/api/shifts/optimize',
+                                  json={'place_id': '1', 'date': '2024-01-29',
+                                        'constraints': {'min_staff': -1}})
+            replanned = client.post('/api/shifts/replan', json={
+                'place_id': '1', 'date': '2024-01-29', 'shifts': found.get_json()['shifts'],
+                'events': [{'type': 'demand_spike', 'start': '16:00', 'end': '17:00',
+                            'factor': 10}]})
+            incomplete = client.post('/api/shifts/replan', json={'place_id': '1'})
+            negative = client.post('/api/shifts/replan', json={
+                'place_id': '1', 'date': '2024-01-29', 'events': [],
+                'shifts': [{'start': '10:00', 'end': '12:00', 'staff': -3}]})
+        finally:
+            app.extensions['app_context'] = original
+        
+        assert replanned.status_code == 200
+        assert replanned.get_json()['added']
+        assert incomplete.status_code == 400
+        assert negative.status_code == 400
+        assert found.status_code == 200
+        assert found.get_json()['shifts']
+        assert missing.status_code == 404
+        assert invalid.status_code == 400
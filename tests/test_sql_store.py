@@ -0,0 +1,166 @@
+"""
+File: test_sql_store.py
+Description: Unit tests for the embedded SQLite store and the loader's SQL backend.
+Dependencies: pytest, pandas, sqlalchemy
+Author: Sample Team
+"""
+
+import logging
+import pytest
+import pandas as pd
+import sys
+import os
+
+# Add parent directory to path to import from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.data_loader import DataLoader
+from src.models.schemas import get_schema
+from src.models.sql_store import SqlStore
+from src.utils.synthetic import write_dataset
+
+
+pytest.importorskip('sqlalchemy')
+
+
+@pytest.fixture(scope='module')
+def dataset_dir(tmp_path_factory):
+    """Writes a small synthetic CSV release."""
+    directory = tmp_path_factory.mktemp('release')
+    write_dataset(str(directory), order_items=20_000)
+    return str(directory)
+
+
+class TestSqlStore:
+    """Test suite for SqlStore."""
+    
+    def test_import_once_and_reimport_on_change(self, tmp_path):
+        """Test that a current import is skipped and a changed CSV is re-imported."""
+        csv_path = tmp_path / 'fct_orders.csv'
+        pd.DataFrame({'id': [1, 2], 'place_id': [5, 6]}).to_csv(csv_path, index=False)
+        store = SqlStore(str(tmp_path / 'db.sqlite'))
+        
+        assert store.import_csv(str(csv_path)) is True
+        assert store.import_csv(str(csv_path)) is False
+        pd.DataFrame({'id': [1, 2, 3], 'place_id': [5, 6, 7]}).to_csv(csv_path, index=False)
+        assert store.import_csv(str(csv_path)) is True
+        
+        assert store.tables() == ['fct_orders']
+        assert store.query('fct_orders')['id'].tolist() == [1, 2, 3]
+    
+    def test_filters_are_pushed_down(self, dataset_dir, tmp_path):
+        """Test the compiled WHERE clause, the index it uses and the projection."""
+        store = SqlStore(str(tmp_path / 'db.sqlite'))
+        store.import_csv(os.path.join(dataset_dir, 'fct_order_items.csv'))
+        
+        statement = store.select('fct_order_items', ['item_id', 'quantity'], {'place_id': 2},
+                                 'created', '2023-03-01', '2023-03-31')
+        sql = str(statement.compile(store.engine))
+        
+        assert 'WHERE' in sql and 'place_id' in sql and 'created' in sql
+        assert sql.startswith('SELECT fct_order_items.item_id, fct_order_items.quantity')
+        assert any('USING INDEX ix_fct_order_items_place_id_created' in step
+                   for step in store.explain(statement))
+    
+    def test_unknown_table_and_column(self, tmp_path):
+        """Test that unknown tables and columns raise ValueError."""
+        csv_path = tmp_path / 'fct_orders.csv'
+        pd.DataFrame({'id': [1]}).to_csv(csv_path, index=False)
+        store = SqlStore(str(tmp_path / 'db.sqlite'))
+        store.import_csv(str(csv_path))
+        
+        with pytest.raises(ValueError):
+            store.query('fct_missing')
+        with pytest.raises(ValueError):
+            store.query('fct_orders', filters={'place_id': 1})
+    
+    def test_schema_mismatch_is_logged(self, tmp_path, caplog):
+        """Test that a column the schema cannot cast is logged and left as stored."""
+        csv_path = tmp_path / 'fct_orders.csv'
+        pd.DataFrame({'id': ['x', 'y'], 'place_id': [5, 6]}).to_csv(csv_path, index=False)
+        store = SqlStore(str(tmp_path / 'db.sqlite'))
+        schema = get_schema('fct_orders')
+        store.import_csv(str(csv_path), schema=schema)
+        
+        with caplog.at_level(logging.WARNING, logger='src'):
+            df = store.query('fct_orders', schema=schema)
+        
+        assert df['id'].tolist() == ['x', 'y']
+        assert df['place_id'].dtype == schema.integers['place_id']
+        assert any(record.getMessage() == 'schema_mismatch'
+                   and record.fields.get('column') == 'id'
+                   for record in caplog.records)
+
+class TestSqlBackend:
+    """Test suite for DataLoader with backend='sql'."""
+    
+    @pytest.mark.parametrize('filename, options', [
+        ('fct_order_items.csv', {'place_id': [1, 2], 'start_date': '2023-03-01',
+                                 'end_date': '2023-04-01'}),
+        ('fct_orders.csv', {'place_id': 3, 'columns': ['id', 'created', 'total_amount']}),
+        ('fct_orders.csv', {'end_date': '2023-01-15'}),
+        ('dim_places.csv', {'active_only': True}),
+    ])
+    def test_query_matches_csv_backend(self, dataset_dir, tmp_path, filename, options):
+        """Test that pushed-down reads equal in-memory filtering, dtypes included."""
+        csv = DataLoader(dataset_dir, use_cache=False)
+        sql = DataLoader(dataset_dir, backend='sql', db_path=str(tmp_path / 'db.sqlite'))
+        
+        expected = csv.query(filename, **options)
+        
+        assert len(expected) > 0
+        pd.testing.assert_frame_equal(sql.query(filename, **options), expected)
+    
+    def test_helper_filters(self, dataset_dir, tmp_path):
+        """Test that query() keeps the rows of filter_active_merchants and the date helper."""
+        loader = DataLoader(dataset_dir, backend='sql', db_path=str(tmp_path / 'db.sqlite'))
+        places = DataLoader(dataset_dir, use_cache=False).load_csv('dim_places.csv')
+        orders = loader.load_csv('fct_orders.csv')
+        
+        active = loader.query('dim_places.csv', columns=['id'], active_only=True)
+        march = loader.query('fct_orders.csv', start_date='2023-03-01', end_date='2023-03-31')
+        
+        assert active['id'].tolist() == loader.filter_active_merchants(places)['id'].tolist()
+        assert march['id'].tolist() == orders[(orders['created'] >= '2023-03-01')
+                                              & (orders['created'] <= '2023-03-31')]['id'].tolist()
+        assert orders['created'].dtype == 'datetime64[s]'
+        assert orders['place_id'].dtype == get_schema('fct_orders').integers['place_id']
+    
+    def test_dtypes_of_filtered_and_empty_results(self, tmp_path):
+        """Test full category sets on filtered reads and stored dtypes on empty ones."""
+        pd.DataFrame({'id': [1, 2, 3], 'place_id': [5, 5, 6],
+                      'status': ['open', 'closed', 'void'],
+                      'total_amount': [1.5, 2.0, 3.25]}).to_csv(tmp_path / 'fct_orders.csv', index=False)
+        csv = DataLoader(str(tmp_path), use_cache=False)
+        sql = DataLoader(str(tmp_path), backend='sql', db_path=str(tmp_path / 'db.sqlite'))
+        
+        for place in (5, 6, 7):
+            expected = csv.query('fct_orders.csv', place_id=place)
+            pd.testing.assert_frame_equal(sql.query('fct_orders.csv', place_id=place), expected)
+        both = pd.concat([sql.query('fct_orders.csv', place_id=5),
+                          sql.query('fct_orders.csv', place_id=6)])
+        
+        assert both['status'].dtype == 'category'
+        assert both['status'].cat.categories.tolist() == ['closed', 'open', 'void']
+    
+    def test_same_table_in_subfolders(self, tmp_path):
+        """Test that same-named files in different folders get their own tables."""
+        for folder, ids in (('a', [1, 2]), ('b', [3])):
+            os.makedirs(tmp_path / folder)
+            pd.DataFrame({'id': ids}).to_csv(tmp_path / folder / 'fct_orders.csv', index=False)
+        loader = DataLoader(str(tmp_path), backend='sql', db_path=str(tmp_path / 'db.sqlite'))
+        
+        assert loader.query('a/fct_orders.csv')['id'].tolist() == [1, 2]
+        assert loader.query('b/fct_orders.csv')['id'].tolist() == [3]
+        assert loader.store.import_csv(str(tmp_path / 'a' / 'fct_orders.csv'), 'a/fct_orders') is False
+        assert sorted(loader.store.tables()) == ['a/fct_orders', 'b/fct_orders']
+    
+    def test_unknown_backend(self, tmp_path):
+        """Test that an unknown backend raises ValueError."""
+        with pytest.raises(ValueError):
+            DataLoader(str(tmp_path), backend='duckdb')
+
+
+# Run tests if executed directly
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
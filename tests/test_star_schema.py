@@ -0,0 +1,159 @@
+"""
+File: test_star_schema.py
+Description: Unit tests for dimension indexes and gather-based fact joins.
+Dependencies: pytest, pandas, numpy
+Author: Sample Team
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+import sys
+import os
+
+# Add parent directory to path to import from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.data_loader import DataLoader
+from src.models.star_schema import DimensionIndex, StarSchema
+
+
+def _items():
+    """Builds a small dim_items table."""
+    return pd.DataFrame({
+        'id': [10, 11, 12, 14],
+        'title': ['Burger', 'Fries', 'Soda', 'Salad'],
+        'price': [95, 35, 25, 80],
+        'unit': pd.Categorical(['pcs', 'g', 'ml', 'g']),
+    })
+
+
+def _order_items():
+    """Builds fact rows, including an unknown item (13) and a missing one."""
+    return pd.DataFrame({
+        'order_id': [1, 1, 2, 3, 3, 4],
+        'place_id': [1, 1, 1, 2, 2, 2],
+        'item_id': pd.array([10, 11, 13, 12, None, 14], dtype='Int64'),
+        'quantity': [1, 2, 1, 1, 3, 1],
+    })
+
+
+class TestDimensionIndex:
+    """Test suite for DimensionIndex."""
+    
+    @pytest.mark.parametrize('ids', [[10, 11, 12, 14], [10, 11, 12, 10 ** 12]])
+    def test_positions_dense_and_hashed(self, ids):
+        """Test lookups through the dense array and the hashed index alike."""
+        index = DimensionIndex(_items().assign(id=ids))
+        
+        positions = index.positions(pd.Series([ids[2], 13, None, ids[0]], dtype='Int64'))
+        
+        assert positions.tolist() == [2, -1, -1, 0]
+        assert index.positions(np.array([ids[3]])).tolist() == [3]
+    
+    def test_take_only_requested_columns(self):
+        """Test that take gathers just the requested attributes, aligned to the keys."""
+        index = DimensionIndex(_items())
+        keys = pd.Series([12, 10], index=[7, 8])
+        
+        taken = index.take(keys, ['title'])
+        
+        assert list(taken.columns) == ['title']
+        assert taken.index.tolist() == [7, 8]
+        assert taken['title'].tolist() == ['Soda', 'Burger']
+    
+    def test_attach_inner_and_prefix(self):
+        """Test prefixed attributes and that inner joins drop unmatched rows."""
+        fact = _order_items()
+        
+        result = DimensionIndex(_items()).attach(fact, 'item_id', ['title'], how='inner')
+        
+        assert result['item_title'].tolist() == ['Burger', 'Fries', 'Soda', 'Salad']
+        assert 'item_title' not in fact.columns
+    
+    def test_invalid_inputs(self):
+        """Test that bad keys, columns and join types raise ValueError."""
+        with pytest.raises(ValueError):
+            DimensionIndex(_items().assign(id=[1, 1, 2, 3]))
+        with pytest.raises(ValueError):
+            DimensionIndex(_items(), key='item_id')
+        with pytest.raises(ValueError):
+            DimensionIndex(_items()).take([10], ['colour'])
+        with pytest.raises(ValueError):
+            DimensionIndex(_items()).attach(_order_items(), 'item_id', how='outer')
+
+
+class TestStarSchema:
+    """Test suite for StarSchema and DataLoader joins."""
+    
+    @pytest.mark.parametrize('how', ['left', 'inner'])
+    def test_merge_datasets_matches_pd_merge(self, how):
+        """Test that the gather path returns exactly what pd.merge returns."""
+        fact = _order_items()
+        items = _items().rename(columns={'id': 'item_id'})
+        
+        result = DataLoader('.').merge_datasets(fact, items, on='item_id', how=how)
+        
+        pd.testing.assert_frame_equal(result, pd.merge(fact, items, on='item_id', how=how))
+    
+    def test_merge_datasets_falls_back(self):
+        """Test that duplicate right keys still produce one row per match."""
+        fact = _order_items()
+        menu = pd.DataFrame({'item_id': [10, 10], 'menu': ['lunch', 'dinner']})
+        
+        result = DataLoader('.').merge_datasets(fact, menu, on='item_id')
+        
+        assert result['menu'].tolist() == ['lunch', 'dinner']
+    
+    def test_merge_datasets_key_dtype_mismatch(self):
+        """Test that string keys against integer keys raise like pd.merge."""
+        fact = _order_items().astype({'item_id': str})
+        items = _items().rename(columns={'id': 'item_id'})
+        
+        with pytest.raises(ValueError):
+            pd.merge(fact, items, on='item_id')
+        with pytest.raises(ValueError):
+            DataLoader('.').merge_datasets(fact, items, on='item_id', how='left')
+    
+    def test_dimensions_load_once_on_demand(self, tmp_path, monkeypatch):
+        """Test that a dimension is loaded through the loader only on first use."""
+        _items().drop(columns='unit').to_csv(tmp_path / 'dim_items.csv', index=False)
+        loader = DataLoader(str(tmp_path), use_cache=False)
+        schema = loader.star_schema()
+        calls = []
+        original = loader.load_csv
+        monkeypatch.setattr(loader, 'load_csv', lambda name: calls.append(name) or original(name))
+        
+        assert 'dim_items' not in schema
+        titles = schema.lookup(_order_items(), 'dim_items', 'title')
+        schema.lookup(_order_items(), 'dim_items', 'price')
+        
+        assert calls == ['dim_items.csv']
+        assert loader.star_schema() is schema
+        assert titles.tolist()[:2] == ['Burger', 'Fries']
+        assert pd.isna(titles.iloc[2])
+    
+    def test_enrich_several_dimensions(self):
+        """Test enrichment from several dimensions, including an explicit taxonomy key."""
+        places = pd.DataFrame({'id': [1, 2], 'title': ['Cafe', 'Bistro'], 'cuisine_id': [7, 8]})
+        terms = pd.DataFrame({'id': [7, 8], 'name': ['Danish', 'Italian']})
+        schema = StarSchema(tables={'dim_items': _items(), 'dim_places': places,
+                                    'dim_taxonomy_terms': terms})
+        
+        enriched = schema.enrich(_order_items(), {'dim_items': ['title'],
+                                                  'dim_places': ['title', 'cuisine_id']})
+        enriched = schema.enrich(enriched, {'dim_taxonomy_terms': ['name']},
+                                 on={'dim_taxonomy_terms': 'place_cuisine_id'})
+        
+        assert enriched['place_title'].tolist() == ['Cafe'] * 3 + ['Bistro'] * 3
+        assert enriched['place_cuisine_name'].tolist()[-1] == 'Italian'
+        assert enriched['item_title'].iloc[0] == 'Burger'
+        with pytest.raises(ValueError):
+            schema.enrich(_order_items(), {'dim_taxonomy_terms': ['name']})
+        with pytest.raises(ValueError):
+            schema.dimension('dim_users')
+
+
+# Run tests if executed directly
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
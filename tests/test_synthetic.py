@@ -0,0 +1,77 @@
+"""
+File: test_synthetic.py
+Description: Unit tests for the synthetic data generator.
+Dependencies: pytest, pandas
+
+Run tests with: pytest tests/
+"""
+
+import pandas as pd
+import sys
+import os
+
+# Add parent directory to path to import from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.data_loader import DataLoader
+from src.utils.synthetic import (
+    generate_dataset,
+    iter_order_items,
+    iter_orders,
+    scaled_sizes,
+    write_dataset
+)
+
+
+class TestSyntheticData:
+    """Test suite for the synthetic generator."""
+    
+    def test_same_seed_same_data(self):
+        """Test that output depends only on seed and sizes."""
+        first = generate_dataset(2_000, seed=3)
+        second = generate_dataset(2_000, seed=3)
+        
+        for name in first:
+            pd.testing.assert_frame_equal(first[name], second[name])
+        assert not first['fct_order_items'].equals(generate_dataset(2_000, seed=4)['fct_order_items'])
+    
+    def test_keys_are_consistent(self):
+        """Test that order lines reference their order's place and that place's items."""
+        tables = generate_dataset(5_000)
+        lines = tables['fct_order_items']
+        
+        assert len(lines) == 5_000
+        assert len(tables['fct_orders']) == scaled_sizes(5_000)['fct_orders']
+        orders = tables['fct_orders'].set_index('id')['place_id']
+        items = tables['dim_items'].set_index('id')['place_id']
+        assert (lines['place_id'].to_numpy() == orders.loc[lines['order_id']].to_numpy()).all()
+        assert (lines['place_id'].to_numpy() == items.loc[lines['item_id']].to_numpy()).all()
+    
+    def test_chunked_write_matches_in_memory(self, tmp_path):
+        """Test that streamed CSV output matches the in-memory tables."""
+        write_dataset(str(tmp_path), 3_000, chunk_rows=700)
+        sizes = scaled_sizes(3_000)
+        expected = pd.concat(iter_order_items(3_000, sizes['fct_orders'], sizes['dim_places'],
+                                              sizes['dim_items'], chunk_rows=700))
+        
+        loaded = DataLoader(str(tmp_path), use_cache=False).load_csv('fct_order_items.csv')
+        
+        assert len(loaded) == 3_000
+        assert (loaded['item_id'].to_numpy() == expected['item_id'].to_numpy()).all()
+    
+    def test_chunk_size_does_not_change_rows(self, monkeypatch):
+        """Test that chunks within and across random blocks give the same rows."""
+        monkeypatch.setattr('src.utils.synthetic._BLOCK_ROWS', 500)
+        sizes = scaled_sizes(3_000)
+        
+        def lines(chunk_rows):
+            return pd.concat(iter_order_items(3_000, sizes['fct_orders'], sizes['dim_places'],
+                                              sizes['dim_items'], chunk_rows=chunk_rows),
+                             ignore_index=True)
+        
+        def orders(chunk_rows):
+            return pd.concat(iter_orders(sizes['fct_orders'], sizes['dim_places'],
+                                         chunk_rows=chunk_rows), ignore_index=True)
+        
+        pd.testing.assert_frame_equal(lines(700), lines(3_000))
+        pd.testing.assert_frame_equal(orders(333), orders(1_000))
@@ -0,0 +1,163 @@
+"""
+File: test_timestamps.py
+Description: Unit tests for vectorised timestamp conversion and calendar features.
+Dependencies: pytest, pandas, numpy
+Author: Sample Team
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+from datetime import date
+import sys
+import os
+
+# Add parent directory to path to import from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.helpers import convert_timestamp_column
+from src.utils.timestamps import (
+    add_calendar_features,
+    calendar_features,
+    convert_timestamp_columns,
+    danish_holidays,
+    easter_sunday,
+    local_seconds,
+    to_local_datetimes
+)
+
+
+# 2021-03-28 01:00:00 UTC, when Copenhagen switches from CET to CEST
+DST_START = 1616893200
+
+
+class TestHolidays:
+    """Test suite for the Danish holiday calendar."""
+    
+    def test_easter_sunday(self):
+        """Test Easter dates against known years."""
+        assert easter_sunday(2021) == date(2021, 4, 4)
+        assert easter_sunday(2024) == date(2024, 3, 31)
+        assert easter_sunday(2026) == date(2026, 4, 5)
+    
+    def test_danish_holidays(self):
+        """Test movable holidays, the abolished Store Bededag and observances."""
+        holidays_2023 = danish_holidays(2023)
+        holidays_2024 = danish_holidays(2024, observances=False)
+        
+        assert holidays_2023[date(2023, 5, 5)] == 'Store bededag'
+        assert holidays_2023[date(2023, 5, 18)] == 'Kristi himmelfartsdag'
+        assert 'Store bededag' not in holidays_2024.values()
+        assert date(2024, 12, 24) not in holidays_2024
+        assert danish_holidays(2024)[date(2024, 12, 24)] == 'Juleaftensdag'
+    
+    def test_holidays_are_read_only(self):
+        """Test that the cached holiday mapping cannot be modified."""
+        with pytest.raises(TypeError):
+            danish_holidays(2025)[date(2025, 7, 1)] = 'Sommerferie'
+
+
+class TestConversion:
+    """Test suite for timestamp conversion."""
+    
+    def test_local_seconds_across_dst(self):
+        """Test that the UTC offset switches from +1h to +2h at the DST transition."""
+        values = pd.Series([DST_START - 1, DST_START])
+        
+        seconds, valid = local_seconds(values)
+        
+        assert valid.all()
+        assert (seconds - values.to_numpy()).tolist() == [3600, 7200]
+    
+    def test_to_local_datetimes_matches_pandas(self):
+        """Test that conversion matches pandas' tz_convert, including missing values."""
+        values = pd.Series([1609459200, None, DST_START], dtype='Int64')
+        
+        result = to_local_datetimes(values)
+        expected = pd.to_datetime(values, unit='s', utc=True).dt.tz_convert('Europe/Copenhagen')
+        
+        assert str(result.dtype) == 'datetime64[s, Europe/Copenhagen]'
+        assert result.isna().tolist() == [False, True, False]
+        assert (result.dropna() == expected.dropna()).all()
+    
+    def test_naive_conversion_is_a_view(self):
+        """Test that tz=None returns a view of the int64 buffer."""
+        values = pd.Series(np.array([0, 86400], dtype=np.int64))
+        
+        result = to_local_datetimes(values, tz=None)
+        
+        assert np.shares_memory(result.to_numpy(), values.to_numpy())
+        assert result.tolist() == [pd.Timestamp('1970-01-01'), pd.Timestamp('1970-01-02')]
+    
+    def test_convert_timestamp_columns_in_place(self):
+        """Test that declared timestamp columns are converted and others left alone."""
+        df = pd.DataFrame({'created': [1609459200], 'updated': [1609459260], 'quantity': [3]})
+        
+        result = convert_timestamp_columns(df)
+        
+        assert result is df
+        assert str(df['created'].dtype) == 'datetime64[s, Europe/Copenhagen]'
+        assert str(df['updated'].dtype) == 'datetime64[s, Europe/Copenhagen]'
+        assert df['quantity'].tolist() == [3]
+    
+    def test_convert_timestamp_column_leaves_input(self):
+        """Test that the single-column helper still returns a new frame."""
+        df = pd.DataFrame({'created': [1609459200]})
+        
+        result = convert_timestamp_column(df, 'created')
+        
+        assert df['created'].dtype == np.int64
+        assert result['created'].dtype.kind == 'M'
+
+
+class TestCalendarFeatures:
+    """Test suite for calendar feature extraction."""
+    
+    def test_features_match_pandas(self):
+        """Test hour, weekday, week and month against pandas' datetime accessors."""
+        rng = np.random.default_rng(3)
+        values = pd.Series(1672531200 + rng.integers(0, 2 * 365 * 86400, 5000))
+        local = pd.to_datetime(values, unit='s', utc=True).dt.tz_convert('Europe/Copenhagen')
+        
+        result = calendar_features(values)
+        
+        assert (result['hour'].to_numpy() == local.dt.hour.to_numpy()).all()
+        assert (result['weekday'].to_numpy() == local.dt.weekday.to_numpy()).all()
+        assert (result['week'].to_numpy() == local.dt.isocalendar()['week'].to_numpy()).all()
+        assert (result['month'].to_numpy() == local.dt.month.to_numpy()).all()
+        assert (result['date'] == local.dt.tz_localize(None).dt.floor('D')).all()
+        assert (result['is_weekend'] == (local.dt.weekday >= 5)).all()
+    
+    def test_holiday_uses_local_day(self):
+        """Test that 23:30 UTC on Christmas Eve counts as Christmas Day in Copenhagen."""
+        christmas_eve_late = pd.Series([1703460600])  # 2023-12-24 23:30 UTC
+        
+        result = calendar_features(christmas_eve_late, observances=False)
+        
+        assert result['date'].iloc[0] == pd.Timestamp('2023-12-25')
+        assert bool(result['is_holiday'].iloc[0])
+        assert result['hour'].iloc[0] == 0
+    
+    def test_missing_timestamps(self):
+        """Test that missing timestamps get NaT, -1 and False."""
+        values = pd.Series([None, 1609459200.0])
+        
+        result = calendar_features(values)
+        
+        assert pd.isna(result['date'].iloc[0])
+        assert result['hour'].tolist() == [-1, 1]
+        assert result['is_holiday'].tolist() == [False, True]
+    
+    def test_add_calendar_features(self):
+        """Test that features are added to the frame in place with a prefix."""
+        df = pd.DataFrame({'created': pd.to_datetime([DST_START], unit='s')})
+        
+        add_calendar_features(df, 'created', prefix='created_')
+        
+        assert df['created_hour'].tolist() == [3]
+        assert df['created_weekday'].tolist() == [6]
+
+
+# Run tests if executed directly
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])